@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+benchmark.py
+Latency and memory benchmark for the wrap scripts on large TEI documents.
+
+The real scripts/wrap_*.py stubs are read, compiled and executed the way
+PythonScript runs them, against tests/mock_npp.MockScintilla holding a
+synthetic Serbian (Cyrillic) TEI corpus. Each configuration reports p50/p99
+latency and peak Python memory while the document size, the selection
+length and the number of selections grow.
+
+Usage:
+    python benchmark.py [--quick] [-o results.json] [--baseline benchmarks/baseline.json]
+
+With --baseline the run fails (exit code 1) when a configuration's p50
+latency or peak memory regressed past the tolerance, so the GitHub Actions
+benchmark job catches slowdowns. Every run also times a fixed reference
+workload that does not touch the scripts; baseline latencies are scaled by
+the ratio of the two reference times, so a slower or faster machine does
+not read as a regression or hide one.
+"""
+
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+SCRIPTS_DIR = ROOT / 'scripts'
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from teiwrap import elements  # noqa: E402
+from tests.mock_npp import MockNotepad, MockScintilla, fake_npp  # noqa: E402
+
+MB = 1024 * 1024
+
+# Document sizes (bytes) for quick (CI) and full runs
+QUICK_SIZES = [1 * MB, 4 * MB]
+FULL_SIZES = [1 * MB, 10 * MB, 50 * MB, 100 * MB]
+
+# Selection lengths: one word, one <p> element, whole <div> elements of about 1 MB
+SELECTION_KINDS = ['word', 'paragraph', '1mb']
+
+# Numbers of simultaneous selections (one word each)
+SELECTION_COUNTS = [1, 100, 1000]
+
+# Scripts measured on every document size with a single word selected
+SIZE_SCRIPTS = ['wrap_hi.py']
+
+# Default regression tolerance: p50 and peak memory may grow this many times
+# over the (speed-scaled) baseline, plus an absolute floor that absorbs timer
+# and CI noise
+TOLERANCE = 3.0
+FLOOR_MS = 1.0
+FLOOR_KB = 256
+
+WORDS = ('реч текст књига писмо народ језик песма град река село време живот '
+         'човек земља вода сунце дан ноћ година прича кућа пут отац мајка брат '
+         'сестра пријатељ љубав наука школа читање ћирилица ђак џеп шума поље '
+         'Београд Нови Сад Ниш Вук Караџић Доситеј Обрадовић Андрић Дрина').split()
+FOREIGN = ['carpe diem', 'alea iacta est', 'in medias res', 'ad fontes', 'nota bene']
+
+
+class Corpus:
+    """A synthetic TEI document and the element spans used as selections."""
+
+    def __init__(self, text, words, paragraphs, divs):
+        self.text = text
+        self.words = words            # (start, end) of the first plain word of each <p>
+        self.paragraphs = paragraphs  # (start, end) of each <p> element
+        self.divs = divs              # (start, end) of each <div> element
+
+    def selection(self, kind, rng):
+        """Return one balanced (start, end) selection of the given kind."""
+        if kind == 'word':
+            return rng.choice(self.words)
+        if kind == 'paragraph':
+            return rng.choice(self.paragraphs)
+        first = rng.randrange(len(self.divs))
+        last = first
+        while self.divs[last][1] - self.divs[first][0] < MB and last + 1 < len(self.divs):
+            last += 1
+        while self.divs[last][1] - self.divs[first][0] < MB and first > 0:
+            first -= 1
+        return self.divs[first][0], self.divs[last][1]
+
+    def word_selections(self, count, rng):
+        """Return count sorted one-word selections spread over the document."""
+        step = max(1, len(self.words) // count)
+        offset = rng.randrange(step)
+        return [self.words[i] for i in range(offset, len(self.words), step)][:count]
+
+
+def generate_corpus(size, seed=0, paragraphs_per_div=50):
+    """
+    Build a well-formed Serbian Cyrillic TEI document of about size bytes
+    with <div>, <head>, <p>, <hi>, <foreign>, <lb/>, comments and quotes.
+    """
+    rng = random.Random(seed)
+    parts = []
+    pos = 0
+    words, paragraphs, divs = [], [], []
+
+    def add(text):
+        nonlocal pos
+        data_len = len(text.encode('utf-8'))
+        parts.append(text)
+        pos += data_len
+        return pos - data_len
+
+    add('<?xml version="1.0" encoding="UTF-8"?>\n<TEI xmlns="http://www.tei-c.org/ns/1.0">\n'
+        '<teiHeader><fileDesc><titleStmt><title>Синтетички корпус</title></titleStmt>'
+        '</fileDesc></teiHeader>\n<text><body>\n')
+    closing = '</body></text>\n</TEI>\n'
+    number = 0
+    while pos < size - len(closing):
+        div_start = add('<div n="{0}">'.format(len(divs) + 1))
+        add('<head>Глава {0}</head>\n'.format(len(divs) + 1))
+        for _ in range(paragraphs_per_div):
+            number += 1
+            p_start = add('<p n="{0}">'.format(number))
+            first = rng.choice(WORDS)
+            word_start = add(first)
+            words.append((word_start, pos))
+            for _ in range(rng.randrange(3, 7)):
+                sentence = ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(6, 14)))
+                roll = rng.random()
+                if roll < 0.2:
+                    sentence += ' <hi rend="italic">{0}</hi>'.format(rng.choice(WORDS))
+                elif roll < 0.3:
+                    sentence += ' <foreign xml:lang="la">{0}</foreign>'.format(rng.choice(FOREIGN))
+                elif roll < 0.4:
+                    sentence += ' "{0}"'.format(rng.choice(WORDS))
+                elif roll < 0.45:
+                    sentence += '<lb/>'
+                add(' ' + sentence + '.')
+            if rng.random() < 0.05:
+                add(' <!-- напомена уредника -->')
+            add('</p>')
+            paragraphs.append((p_start, pos))
+            add('\n')
+        add('</div>')
+        divs.append((div_start, pos))
+        add('\n')
+    add(closing)
+    return Corpus(''.join(parts), words, paragraphs, divs)
+
+
+def load_script(script_name):
+    """Read a stub script; like PythonScript, it is compiled again on every run."""
+    path = SCRIPTS_DIR / script_name
+    return path.read_text(encoding='utf-8'), str(path)
+
+
+def run_script(source, editor, notepad):
+    """Compile and execute a stub with the Npp module faked."""
+    code = compile(source[0], source[1], 'exec')
+    with fake_npp(editor, notepad):
+        exec(code, {'__name__': '__main__'})
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def measure(editor, script_name, pick, repeats, rng):
+    """
+    Run a script repeats times, each time on new selections from pick(rng),
+    undoing the edit after every run. Returns the result fields.
+    """
+    source = load_script(script_name)
+    notepad = MockNotepad('la')
+
+    def once(trace=False):
+        ranges = pick(rng)
+        editor.selections = [list(r) for r in ranges]
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        run_script(source, editor, notepad)
+        elapsed = time.perf_counter() - started
+        peak = 0
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if editor.canUndo():
+            editor.undo()
+        editor.emptyUndoBuffer()
+        return elapsed, peak, ranges
+
+    cold, _, ranges = once()
+    peak = once(trace=True)[1]
+    samples = [once()[0] * 1000.0 for _ in range(repeats)]
+    return {
+        'script': script_name,
+        'selections': len(ranges),
+        'selection_bytes': sum(end - start for start, end in ranges) // max(1, len(ranges)),
+        'first_ms': round(cold * 1000.0, 3),
+        'p50_ms': round(percentile(samples, 0.50), 3),
+        'p99_ms': round(percentile(samples, 0.99), 3),
+        'peak_kb': round(peak / 1024.0, 1),
+    }
+
+
+def reference_ms(repeats=7):
+    """
+    Median time of a fixed pure-Python workload (regex over Cyrillic text,
+    dict counting, UTF-8 coding, sorting) that uses none of the scripts,
+    so it measures the machine and interpreter, not the code under test.
+    """
+    text = ' '.join(WORDS) * 2000
+    pattern = re.compile(r'\w+')
+
+    def once():
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            counts = {}
+            for word in pattern.findall(text):
+                counts[word] = counts.get(word, 0) + 1
+            text.encode('utf-8').decode('utf-8')
+            sorted(range(100000), key=lambda i: (i * 7919) % 100003)
+            return (time.perf_counter() - started) * 1000.0
+        finally:
+            gc.enable()
+
+    return percentile([once() for _ in range(repeats)], 0.50)
+
+
+def open_document(corpus):
+    """Load the corpus into a mock editor whose element index follows edits."""
+    editor = MockScintilla(corpus.text)
+    elements.watch(editor, 'MODIFIED')
+    return editor
+
+
+def run_benchmarks(sizes, repeats, seed=0, log=print):
+    """Run the whole grid and return the list of result dicts."""
+    results = []
+    scripts = sorted(path.name for path in SCRIPTS_DIR.glob('wrap_*.py'))
+    for size in sizes:
+        started = time.perf_counter()
+        corpus = generate_corpus(size, seed)
+        editor = open_document(corpus)
+        log("Document {0:.0f} MB ({1} paragraphs) generated in {2:.1f} s".format(
+            editor.getLength() / MB, len(corpus.paragraphs), time.perf_counter() - started))
+        rng = random.Random(seed)
+        largest = size == sizes[-1]
+
+        def add(axis, selection_kind, result):
+            result.update({'axis': axis, 'doc_mb': round(size / MB), 'kind': selection_kind})
+            results.append(result)
+            log("  {axis:<10} {script:<24} {kind:<9} x{selections:<5} "
+                "p50 {p50_ms:8.3f} ms  p99 {p99_ms:8.3f} ms  peak {peak_kb:9.1f} KB".format(**result))
+
+        for script in (scripts if largest else SIZE_SCRIPTS):
+            add('script' if largest else 'size', 'word',
+                measure(editor, script, lambda r: [corpus.selection('word', r)], repeats, rng))
+        if not largest:
+            elements.unwatch(editor)
+            continue
+        for kind in SELECTION_KINDS[1:]:
+            add('length', kind, measure(editor, 'wrap_hi.py',
+                                        lambda r, k=kind: [corpus.selection(k, r)], repeats, rng))
+        for count in SELECTION_COUNTS[1:]:
+            add('count', 'word', measure(editor, 'wrap_hi.py',
+                                         lambda r, c=count: corpus.word_selections(c, r),
+                                         max(3, repeats // 4), rng))
+        elements.unwatch(editor)
+    return results
+
+
+def result_key(result):
+    """Identify a configuration across runs."""
+    return (result['axis'], result['script'], result['doc_mb'], result['kind'], result['selections'])
+
+
+def machine_speed(report, baseline):
+    """
+    How many times slower this machine ran the reference workload than the
+    machine that recorded the baseline (1.0 if either report lacks it).
+    """
+    if not report.get('reference_ms') or not baseline.get('reference_ms'):
+        return 1.0
+    return report['reference_ms'] / baseline['reference_ms']
+
+
+def compare(results, baseline, tolerance=TOLERANCE, floor_ms=FLOOR_MS, floor_kb=FLOOR_KB, speed=1.0):
+    """
+    Return messages for configurations whose p50 or peak memory regressed.
+    Baseline latencies are multiplied by speed (see machine_speed).
+    """
+    previous = {result_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        base = previous.get(result_key(result))
+        if base is None:
+            continue
+        label = "{script} {doc_mb} MB {kind} x{selections}".format(**result)
+        expected = base['p50_ms'] * speed
+        if result['p50_ms'] > expected * tolerance + floor_ms:
+            regressions.append("{0}: p50 {1} ms, baseline {2:.3f} ms on this machine".format(
+                label, result['p50_ms'], expected))
+        if result['peak_kb'] > base['peak_kb'] * tolerance + floor_kb:
+            regressions.append("{0}: peak {1} KB, baseline {2} KB".format(
+                label, result['peak_kb'], base['peak_kb']))
+    return regressions
+
+
+def build_parser():
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(description="Benchmark the wrap scripts on large TEI documents.")
+    parser.add_argument('--quick', action='store_true', help="small documents and fewer repeats (CI)")
+    parser.add_argument('--sizes', type=float, nargs='+', help="document sizes in MB")
+    parser.add_argument('--repeats', type=int, help="timed runs per configuration")
+    parser.add_argument('--seed', type=int, default=0, help="corpus and selection seed")
+    parser.add_argument('-o', '--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="fail if results regressed against this JSON file")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="allowed growth factor over the baseline (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    """Main CLI function."""
+    args = build_parser().parse_args(argv)
+    if args.sizes:
+        sizes = [int(mb * MB) for mb in args.sizes]
+    else:
+        sizes = QUICK_SIZES if args.quick else FULL_SIZES
+    repeats = args.repeats or (20 if args.quick else 50)
+
+    # Measured first, before the documents fill the heap
+    reference = reference_ms()
+    results = run_benchmarks(sizes, repeats, args.seed)
+    report = {
+        'python': platform.python_version(),
+        'platform': '{0} {1}'.format(platform.system(), platform.machine()),
+        'repeats': repeats,
+        'reference_ms': round(reference, 3),
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"✓ Results → {args.output}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        speed = machine_speed(report, baseline)
+        print(f"Reference workload {report['reference_ms']} ms, {speed:.2f}x the baseline machine")
+        regressions = compare(results, baseline, args.tolerance, speed=speed)
+        for message in regressions:
+            print(f"✗ REGRESSION: {message}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"✓ No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
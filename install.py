@@ -6,29 +6,60 @@ Windows installer for Notepad++ PythonScript scripts with keyboard shortcuts.
 This script:
 1. Detects Notepad++ installation directory
 2. Finds PythonScript plugin configuration folder
-3. Copies all .py files from local /scripts folder
-4. Creates/updates shortcuts.xml with predefined keyboard shortcuts
+3. Generates a stub script for every action of the tag catalogue
+   (scripts/teiwrap/catalog.py) and installs the stubs, the other .py files
+   and the shared packages from local /scripts folder that changed since the
+   last run (tracked in a manifest of content hashes); removes previously
+   installed files that are no longer shipped
+4. Registers the resident wrap dispatcher in PythonScript's startup.py
+5. Creates/updates shortcuts.xml with predefined keyboard shortcuts
+
+Run with --verify to only report differences between the installed scripts
+and this checkout, without writing anything.
 """
 
+import argparse
+import hashlib
+import json
 import os
+import re
 import sys
 import shutil
 import winreg
+from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET
 from pathlib import Path
+from xml.sax.saxutils import unescape
+
+# The tag catalogue lives with the scripts it describes
+sys.path.insert(0, str(Path(__file__).parent / 'scripts'))
+
+from teiwrap import catalog
+
+
+# Keyboard shortcut mappings, generated from the tag catalogue
+# (scripts/teiwrap/catalog.py), e.g. 'wrap_title.py' -> Ctrl+Alt+1
+SCRIPT_SHORTCUTS = catalog.shortcuts()
+
+# Manifest of installed files, kept in the PythonScript scripts directory
+MANIFEST_NAME = 'teiwrap_manifest.json'
 
+# Files are hashed and copied in parallel; roaming profiles on network shares
+# are latency-bound, so a few workers hide most of the round trips
+COPY_WORKERS = 8
 
-# Keyboard shortcut mappings
-SCRIPT_SHORTCUTS = {
-    'wrap_title.py': {'key': '49', 'ctrl': 'yes', 'alt': 'yes', 'shift': 'no'},  # Ctrl+Alt+1
-    'wrap_head.py': {'key': '50', 'ctrl': 'yes', 'alt': 'yes', 'shift': 'no'},   # Ctrl+Alt+2
-    'wrap_hi.py': {'key': '51', 'ctrl': 'yes', 'alt': 'yes', 'shift': 'no'},     # Ctrl+Alt+3
-    'wrap_quote.py': {'key': '52', 'ctrl': 'yes', 'alt': 'yes', 'shift': 'no'},  # Ctrl+Alt+4
-    'wrap_trailer.py': {'key': '53', 'ctrl': 'yes', 'alt': 'yes', 'shift': 'no'}, # Ctrl+Alt+5
-    'wrap_foreign_prompt.py': {'key': '54', 'ctrl': 'yes', 'alt': 'yes', 'shift': 'no'}, # Ctrl+Alt+6
-    'wrap_foreign_fixed.py': {'key': '55', 'ctrl': 'yes', 'alt': 'yes', 'shift': 'no'}, # Ctrl+Alt+7
-    'wrap_serbian_quotes.py': {'key': '56', 'ctrl': 'yes', 'alt': 'yes', 'shift': 'no'}, # Ctrl+Alt+8
-}
+HASH_CHUNK = 1024 * 1024
+
+# Block appended to the user's PythonScript startup.py so the wrap dispatcher
+# is imported (and compiled) once per Notepad++ session
+STARTUP_MARKER = '# teiwrap: resident wrap dispatcher'
+STARTUP_BLOCK = (
+    f"{STARTUP_MARKER}\n"
+    "try:\n"
+    "    import teiwrap.dispatch\n"
+    "except ImportError:\n"
+    "    pass\n"
+)
 
 
 def detect_notepad_install():
@@ -82,20 +113,134 @@ def get_pythonscript_dir():
     return appdata_npp / 'plugins' / 'Config' / 'PythonScript' / 'scripts'
 
 
-def copy_scripts(source_dir, target_dir):
+def file_hash(path):
     """
-    Copy all .py files from source to target directory.
+    Compute the SHA-256 hex digest of a file, reading it in chunks.
     
     Args:
-        source_dir: Source directory path
-        target_dir: Target directory path
+        path: File path
         
     Returns:
-        List of copied script names
+        Hex digest string
     """
-    source_path = Path(source_dir)
-    target_path = Path(target_dir)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def shipped_files(source_path):
+    """
+    List the files the installer ships: top-level scripts (except test
+    scripts) and every file of the shared packages (e.g. teiwrap/).
+    
+    Args:
+        source_path: Path to the local scripts folder
+        
+    Returns:
+        Sorted list of paths relative to source_path, with '/' separators
+    """
+    files = [f.name for f in source_path.glob('*.py') if f.name not in ['test_scripts.py']]
+    for package_dir in source_path.iterdir():
+        if package_dir.is_dir() and (package_dir / '__init__.py').exists():
+            for f in package_dir.rglob('*'):
+                if f.is_file() and '__pycache__' not in f.parts and f.suffix != '.pyc':
+                    files.append(f.relative_to(source_path).as_posix())
+    return sorted(files)
+
+
+def generated_stubs():
+    """
+    Generate the stub script of every catalogue entry.
+    
+    Returns:
+        Dict of script name -> UTF-8 source bytes
+    """
+    return {item['script']: catalog.stub_source(item).encode('utf-8') for item in catalog.CATALOG}
+
+
+def load_manifest(target_path):
+    """
+    Read the manifest written by the previous installation.
+    
+    Returns:
+        Dict of relative path -> {'sha256', 'size', 'mtime_ns'}; empty if the
+        manifest is missing or unreadable
+    """
+    try:
+        data = json.loads((Path(target_path) / MANIFEST_NAME).read_text(encoding='utf-8'))
+        return dict(data['files'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def write_manifest(target_path, files):
+    """Write the manifest atomically (temporary file + rename)."""
+    manifest_file = Path(target_path) / MANIFEST_NAME
+    temp_file = manifest_file.with_name(MANIFEST_NAME + '.tmp')
+    temp_file.write_text(json.dumps({'version': 1, 'files': files}, indent=1, sort_keys=True),
+                         encoding='utf-8')
+    os.replace(temp_file, manifest_file)
+
+
+def file_record(path, digest):
+    """Manifest entry for an installed file."""
+    stat = os.stat(path)
+    return {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def installed_hash(path, record):
+    """
+    Return the content hash of an installed file, or None if it is missing.
+    
+    A file whose size and modification time still match its manifest record
+    is trusted without reading it back from the (possibly remote) disk.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if record and record.get('size') == stat.st_size and record.get('mtime_ns') == stat.st_mtime_ns:
+        return record['sha256']
+    return file_hash(path)
+
+
+def compare_installation(source_path, target_path, manifest, pool, generated=None):
+    """
+    Compare the shipped files (and generated files, given as a dict of
+    relative path -> bytes) with the installed ones.
+    
+    Returns:
+        (source hashes, files to copy, stale files no longer shipped, stale
+        files that were modified after installation) - paths are relative
+    """
+    generated = generated or {}
+    names = sorted(set(shipped_files(source_path)) | set(generated))
     
+    def source_hash(name):
+        if name in generated:
+            return hashlib.sha256(generated[name]).hexdigest()
+        return file_hash(source_path / name)
+    
+    source_hashes = dict(zip(names, pool.map(source_hash, names)))
+    installed = dict(zip(names, pool.map(
+        lambda name: installed_hash(target_path / name, manifest.get(name)), names)))
+    to_copy = [name for name in names if installed[name] != source_hashes[name]]
+
+    stale, modified = [], []
+    old_names = [name for name in sorted(manifest) if name not in source_hashes]
+    for name, digest in zip(old_names, pool.map(
+            lambda name: installed_hash(target_path / name, manifest[name]), old_names)):
+        if digest == manifest[name]['sha256']:
+            stale.append(name)
+        elif digest is not None:
+            modified.append(name)
+    return source_hashes, to_copy, stale, modified
+
+
+def check_target_dir(source_path, target_path):
+    """Raise RuntimeError if the source or the PythonScript scripts directory is missing."""
     if not source_path.exists():
         raise RuntimeError(f"Source directory not found: {source_path}")
     
@@ -110,83 +255,406 @@ def copy_scripts(source_dir, target_dir):
             f"  4. Restart Notepad++\n"
             f"  5. Run this installer again"
         )
+
+
+def remove_empty_dirs(target_path, names):
+    """Remove package directories left empty after stale files were deleted."""
+    dirs = {(target_path / name).parent for name in names}
+    for directory in sorted(dirs, key=lambda d: len(d.parts), reverse=True):
+        while directory != target_path and directory.is_dir() and not any(directory.iterdir()):
+            directory.rmdir()
+            directory = directory.parent
+
+
+def copy_scripts(source_dir, target_dir, generated=None):
+    """
+    Install the scripts and shared packages from source to target directory,
+    plus generated files (e.g. the stub scripts of the tag catalogue).
+    
+    Only files whose content differs from the installed copy are copied (in
+    parallel); files installed by an earlier run that are no longer shipped
+    are removed unless they were edited since. The result is recorded in
+    the manifest (MANIFEST_NAME) in the target directory.
+    
+    Args:
+        source_dir: Source directory path
+        target_dir: Target directory path
+        generated: Optional dict of relative path -> bytes to install; an
+            entry replaces the source file of the same name
+        
+    Returns:
+        List of installed script names (changed or not)
+    """
+    source_path = Path(source_dir)
+    target_path = Path(target_dir)
+    check_target_dir(source_path, target_path)
     
-    copied_scripts = []
-    py_files = list(source_path.glob('*.py'))
+    manifest = load_manifest(target_path)
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as pool:
+        source_hashes, to_copy, stale, modified = compare_installation(
+            source_path, target_path, manifest, pool, generated)
+        
+        def copy_one(name):
+            target_file = target_path / name
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            if generated and name in generated:
+                target_file.write_bytes(generated[name])
+            else:
+                shutil.copy2(source_path / name, target_file)
+            return name
+        
+        for name in pool.map(copy_one, to_copy):
+            print(f"  ✓ Copied: {name}")
     
-    # Filter out test scripts
-    py_files = [f for f in py_files if f.name not in ['test_scripts.py']]
+    for name in stale:
+        (target_path / name).unlink()
+        print(f"  ✓ Removed: {name} (no longer shipped)")
+    remove_empty_dirs(target_path, stale)
+    for name in modified:
+        print(f"  ℹ Kept: {name} (no longer shipped, but edited after installation)")
     
-    if not py_files:
+    files = {}
+    for name, digest in source_hashes.items():
+        record = manifest.get(name)
+        if name in to_copy or not record or record.get('sha256') != digest:
+            record = file_record(target_path / name, digest)
+        files[name] = record
+    write_manifest(target_path, files)
+    
+    copied_scripts = [name for name in source_hashes if '/' not in name]
+    if not copied_scripts:
         print("WARNING: No .py files found in scripts directory!")
-        return copied_scripts
+    print(f"  {len(to_copy)} changed, {len(source_hashes) - len(to_copy)} unchanged, "
+          f"{len(stale)} removed")
+    return copied_scripts
+
+
+def verify_installation(source_dir, target_dir, generated=None):
+    """
+    Report drift between this checkout and the installed scripts without
+    writing anything.
     
-    for py_file in py_files:
-        target_file = target_path / py_file.name
-        shutil.copy2(py_file, target_file)
-        copied_scripts.append(py_file.name)
-        print(f"  ✓ Copied: {py_file.name}")
+    Args:
+        source_dir: Source directory path
+        target_dir: Target directory path
+        generated: Optional dict of relative path -> bytes, as for copy_scripts
+        
+    Returns:
+        Dict with sorted lists: 'missing' (shipped but not installed),
+        'changed' (installed copy differs), 'stale' (installed earlier, no
+        longer shipped)
+    """
+    source_path = Path(source_dir)
+    target_path = Path(target_dir)
+    check_target_dir(source_path, target_path)
     
-    return copied_scripts
+    manifest = load_manifest(target_path)
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as pool:
+        _, to_copy, stale, modified = compare_installation(
+            source_path, target_path, manifest, pool, generated)
+    missing = [name for name in to_copy if not (target_path / name).exists()]
+    return {
+        'missing': missing,
+        'changed': [name for name in to_copy if name not in missing],
+        'stale': sorted(stale + modified),
+    }
+
+
+def register_startup(target_dir):
+    """
+    Make the user's PythonScript startup.py preload the wrap dispatcher.
+    
+    Existing startup.py content is preserved; the block is appended once.
+    
+    Args:
+        target_dir: PythonScript scripts directory path
+        
+    Returns:
+        True if startup.py was changed, False if already registered
+    """
+    startup_file = Path(target_dir) / 'startup.py'
+    
+    if startup_file.exists():
+        content = startup_file.read_text(encoding='utf-8')
+        if STARTUP_MARKER in content:
+            return False
+        if content and not content.endswith('\n'):
+            content += '\n'
+        content += '\n'
+    else:
+        content = '# -*- coding: utf-8 -*-\n'
+    
+    startup_file.write_text(content + STARTUP_BLOCK, encoding='utf-8')
+    return True
+
+
+# One XML token: comment, CDATA, processing instruction, or a start/end/empty tag
+XML_TOKEN = re.compile(
+    r'<!--.*?-->|<!\[CDATA\[.*?\]\]>|<[?!].*?>'
+    r'|<(/?)([\w:.-]+)((?:\s+[\w:.-]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*)\s*(/?)>',
+    re.S,
+)
+XML_ATTRIBUTE = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+
+def command_name(script_name):
+    """PluginCommands entry name for a script, e.g. PythonScript:wrap_title."""
+    return f"PythonScript:{script_name.replace('.py', '')}"
+
+
+def shortcut_binding(attributes):
+    """
+    Key binding of a shortcuts.xml entry as (ctrl, alt, shift, key code), or
+    None if the entry has no key assigned.
+    """
+    key = attributes.get('Key', '0')
+    if not key.isdigit() or key == '0':
+        return None
+    return tuple(attributes.get(m, 'no') == 'yes' for m in ('Ctrl', 'Alt', 'Shift')) + (int(key),)
+
+
+def describe_shortcut(shortcut):
+    """Human-readable shortcut, e.g. Ctrl+Alt+Shift+6 or Ctrl+Shift+F10."""
+    keys = [label for label, flag in (('Ctrl', 'ctrl'), ('Alt', 'alt'), ('Shift', 'shift'))
+            if shortcut[flag] == 'yes']
+    return '+'.join(keys + [catalog.key_name(shortcut['key'])])
+
+
+def command_element(script_name):
+    """Serialized PluginCommands entry for one of our scripts."""
+    shortcut = SCRIPT_SHORTCUTS[script_name]
+    return (f'<Command name="{command_name(script_name)}" Ctrl="{shortcut["ctrl"]}" '
+            f'Alt="{shortcut["alt"]}" Shift="{shortcut["shift"]}" Key="{shortcut["key"]}" />')
+
+
+def index_shortcuts(text):
+    """
+    Index a shortcuts.xml document in one pass over its tags.
+    
+    Args:
+        text: Document text
+        
+    Returns:
+        Dict with 'commands' (PluginCommands Command name -> list of
+        (start, end) spans), 'bindings' (key binding -> list of
+        'Section/Tag name' labels of every entry with a key, in any
+        section), 'plugin_commands' (span of
+        the PluginCommands start and end tags, or of its empty tag) and
+        'root' (span of the root start and end tags, or of its empty tag)
+    """
+    index = {'commands': {}, 'bindings': {}, 'plugin_commands': None, 'root': None}
+    stack = []
+    for match in XML_TOKEN.finditer(text):
+        closing, tag, attribute_text, empty = match.groups()
+        if tag is None:
+            continue
+        if closing:
+            tag, opening, attributes = stack.pop()
+            close_start, close_end = match.start(), match.end()
+        else:
+            attributes = {name: unescape(v1 or v2) for name, v1, v2 in XML_ATTRIBUTE.findall(attribute_text)}
+            if not empty:
+                stack.append((tag, match, attributes))
+                continue
+            opening, close_start, close_end = match, None, match.end()
+        
+        # The element is complete here; stack holds its ancestors
+        depth = len(stack)
+        span = (opening.start(), opening.end(), close_start, close_end)
+        if depth == 0:
+            index['root'] = span
+            continue
+        if depth == 1:
+            if tag == 'PluginCommands':
+                index['plugin_commands'] = span
+            continue
+        section = stack[1][0]
+        if section == 'PluginCommands' and tag == 'Command':
+            index['commands'].setdefault(attributes.get('name'), []).append((opening.start(), close_end))
+        binding = shortcut_binding(attributes)
+        if binding:
+            label = (attributes.get('name') or attributes.get('id') or attributes.get('internalID')
+                     or attributes.get('ScintID') or '?')
+            index['bindings'].setdefault(binding, []).append(f"{section}/{tag} {label}")
+    return index
+
+
+def line_span(text, start, end):
+    """Widen (start, end) to whole lines if nothing else is on them."""
+    line_start = start
+    while line_start > 0 and text[line_start - 1] in ' \t':
+        line_start -= 1
+    line_end = end
+    while line_end < len(text) and text[line_end] in ' \t':
+        line_end += 1
+    if (line_start == 0 or text[line_start - 1] == '\n') and text.startswith('\n', line_end):
+        return line_start, line_end + 1
+    if (line_start == 0 or text[line_start - 1] == '\n') and text.startswith('\r\n', line_end):
+        return line_start, line_end + 2
+    return start, end
+
+
+def line_indent(text, pos):
+    """Whitespace between the start of pos's line and pos."""
+    line_start = text.rfind('\n', 0, pos) + 1
+    prefix = text[line_start:pos]
+    return prefix if not prefix.strip() else ''
+
+
+def insert_children(text, container, elements, newline):
+    """
+    Edit that appends elements to a container given as the span from
+    index_shortcuts(); an empty container tag (e.g. <PluginCommands />)
+    is expanded to a start and end tag.
+    
+    Returns:
+        (start, end, replacement)
+    """
+    open_start, open_end, close_start, close_end = container
+    if close_start is None:
+        indent = line_indent(text, open_start)
+        tag = XML_TOKEN.match(text, open_start).group(2)
+        opening = re.sub(r'\s*/>$', '>', text[open_start:open_end])
+        lines = ''.join(f"{newline}{indent}{indent or '  '}{element}" for element in elements)
+        return open_start, open_end, f"{opening}{lines}{newline}{indent}</{tag}>"
+    indent = line_indent(text, close_start)
+    if indent or text[close_start - 1:close_start] == '\n':
+        # New children are indented like the existing ones
+        child_indent = indent + (indent or '  ')
+        for line in reversed(text[open_end:close_start].splitlines()):
+            if line.strip():
+                child_indent = line[:len(line) - len(line.lstrip())]
+                break
+        lines = ''.join(f"{child_indent}{element}{newline}" for element in elements)
+        position = close_start - len(indent)
+        return position, position, lines
+    return close_start, close_start, ''.join(elements)
+
+
+def merge_shortcuts(text, copied_scripts):
+    """
+    Merge our PluginCommands entries into a shortcuts.xml document, changing
+    only the lines of our own entries; comments, formatting and every other
+    entry are kept as they are.
+    
+    Scripts whose shortcut is already bound to another entry (internal
+    command, macro, plugin or Scintilla command) are not given the shortcut.
+    Entries for our scripts that were not installed are removed.
+    
+    Args:
+        text: Current shortcuts.xml text
+        copied_scripts: List of installed script names
+        
+    Returns:
+        (new text, list of (script name, shortcut) added or updated,
+        list of (script name, shortcut, conflicting entries))
+    """
+    index = index_shortcuts(text)
+    ours = {f"PluginCommands/Command {command_name(name)}" for name in SCRIPT_SHORTCUTS}
+    newline = '\r\n' if '\r\n' in text else '\n'
+    
+    # Bindings used by entries other than our own commands
+    taken = {}
+    for binding, labels in index['bindings'].items():
+        others = [label for label in labels if label not in ours]
+        if others:
+            taken[binding] = others
+    
+    edits, added, to_insert, collisions = [], [], [], []
+    for script_name, shortcut in SCRIPT_SHORTCUTS.items():
+        spans = index['commands'].get(command_name(script_name), [])
+        binding = shortcut_binding({'Ctrl': shortcut['ctrl'], 'Alt': shortcut['alt'],
+                                    'Shift': shortcut['shift'], 'Key': shortcut['key']})
+        keep = script_name in copied_scripts and binding not in taken
+        if script_name in copied_scripts and not keep:
+            collisions.append((script_name, describe_shortcut(shortcut), taken[binding]))
+        # Duplicates of an entry (and entries we no longer want) are removed
+        for span in spans[1 if keep else 0:]:
+            edits.append(line_span(text, *span) + ('',))
+        if not keep:
+            continue
+        span = spans[0] if spans else None
+        element = command_element(script_name)
+        if span is None:
+            to_insert.append(element)
+            added.append((script_name, describe_shortcut(shortcut)))
+        elif text[span[0]:span[1]] != element:
+            edits.append(span + (element,))
+            added.append((script_name, describe_shortcut(shortcut)))
+    
+    if to_insert:
+        if index['plugin_commands'] is not None:
+            edits.append(insert_children(text, index['plugin_commands'], to_insert, newline))
+        else:
+            block = ["<PluginCommands>"] + [f"  {element}" for element in to_insert] + ["</PluginCommands>"]
+            edits.append(insert_children(text, index['root'], block, newline))
+    
+    for start, end, replacement in sorted(edits, reverse=True):
+        text = text[:start] + replacement + text[end:]
+    return text, added, collisions
+
+
+def write_atomically(path, data):
+    """
+    Replace a file with new bytes through a temporary file in the same
+    directory and a rename, so readers see either the old or the new file.
+    """
+    path = Path(path)
+    temp_file = path.with_name(path.name + '.tmp')
+    with open(temp_file, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
 
 
 def create_or_update_shortcuts(appdata_npp, copied_scripts):
     """
     Create or update shortcuts.xml with keyboard shortcuts for scripts.
     
+    An existing file is updated in place (see merge_shortcuts) and replaced
+    atomically; it is not written at all if nothing changed.
+    
     Args:
         appdata_npp: Path to Notepad++ AppData directory
         copied_scripts: List of script names that were copied
+        
+    Returns:
+        List of (script name, shortcut, conflicting entries) collisions
     """
     shortcuts_file = appdata_npp / 'shortcuts.xml'
     
-    # Parse existing file or create new structure
+    # Read existing file or create new structure
+    original = None
     if shortcuts_file.exists():
+        original = shortcuts_file.read_bytes()
         try:
-            tree = ET.parse(shortcuts_file)
-            root = tree.getroot()
-        except ET.ParseError:
-            print("WARNING: shortcuts.xml is corrupted, creating new one")
-            root = create_empty_shortcuts_xml()
-    else:
+            ET.fromstring(original)
+            text = original.decode('utf-8')
+        except (ET.ParseError, UnicodeDecodeError):
+            print("WARNING: shortcuts.xml is corrupted, creating new one "
+                  "(old file kept as shortcuts.xml.bak)")
+            write_atomically(shortcuts_file.with_name('shortcuts.xml.bak'), original)
+            original = None
+    if original is None:
         root = create_empty_shortcuts_xml()
+        indent_xml(root)
+        text = "<?xml version='1.0' encoding='utf-8'?>\n" + ET.tostring(root, encoding='unicode') + "\n"
     
-    # Ensure PluginCommands section exists
-    plugin_commands = root.find('PluginCommands')
-    if plugin_commands is None:
-        plugin_commands = ET.SubElement(root, 'PluginCommands')
+    text, added, collisions = merge_shortcuts(text, copied_scripts)
+    for script_name, shortcut in added:
+        print(f"  ✓ Shortcut added: {command_name(script_name)} → {shortcut}")
+    for script_name, shortcut, others in collisions:
+        print(f"  ⚠ {shortcut} is already used by {', '.join(others)}; "
+              f"{command_name(script_name)} was left without a shortcut")
     
-    # Remove existing PythonScript shortcuts for our scripts
-    for script_name in SCRIPT_SHORTCUTS.keys():
-        script_base = script_name.replace('.py', '')
-        command_name = f"PythonScript:{script_base}"
-        
-        for cmd in plugin_commands.findall('Command'):
-            if cmd.get('name') == command_name:
-                plugin_commands.remove(cmd)
-    
-    # Add new shortcuts for copied scripts
-    for script_name in copied_scripts:
-        if script_name in SCRIPT_SHORTCUTS:
-            script_base = script_name.replace('.py', '')
-            command_name = f"PythonScript:{script_base}"
-            shortcut = SCRIPT_SHORTCUTS[script_name]
-            
-            cmd_elem = ET.SubElement(plugin_commands, 'Command')
-            cmd_elem.set('name', command_name)
-            cmd_elem.set('Ctrl', shortcut['ctrl'])
-            cmd_elem.set('Alt', shortcut['alt'])
-            cmd_elem.set('Shift', shortcut['shift'])
-            cmd_elem.set('Key', shortcut['key'])
-            
-            print(f"  ✓ Shortcut added: {command_name} → Ctrl+Alt+{chr(int(shortcut['key']))}")
-    
-    # Write XML file with proper formatting
-    indent_xml(root)
-    tree = ET.ElementTree(root)
-    tree.write(shortcuts_file, encoding='utf-8', xml_declaration=True)
-    
-    print(f"\n✓ Shortcuts saved to: {shortcuts_file}")
+    data = text.encode('utf-8')
+    if data != original:
+        write_atomically(shortcuts_file, data)
+        print(f"\n✓ Shortcuts saved to: {shortcuts_file}")
+    else:
+        print(f"\n✓ Shortcuts already up to date: {shortcuts_file}")
+    return collisions
 
 
 def create_empty_shortcuts_xml():
@@ -229,8 +697,41 @@ def indent_xml(elem, level=0):
             elem.tail = indent
 
 
-def main():
+def verify(pythonscript_dir):
+    """Print drift between this checkout and the installation; return exit code."""
+    script_source = Path(__file__).parent / 'scripts'
+    try:
+        drift = verify_installation(script_source, pythonscript_dir, generated_stubs())
+    except RuntimeError as e:
+        print(f"  ✗ ERROR: {e}")
+        return 1
+    labels = {'missing': 'Missing', 'changed': 'Changed', 'stale': 'No longer shipped'}
+    for kind in ('missing', 'changed', 'stale'):
+        for name in drift[kind]:
+            print(f"  ✗ {labels[kind]}: {name}")
+    if any(drift.values()):
+        print("\nInstallation differs from this checkout; run install.py to update it.")
+        return 1
+    print("  ✓ Installation is up to date")
+    return 0
+
+
+def main(argv=None):
     """Main installer function."""
+    parser = argparse.ArgumentParser(description="Install the TEI wrap scripts into Notepad++ PythonScript.")
+    parser.add_argument('--verify', action='store_true',
+                        help="only report differences from the installed scripts, write nothing")
+    args = parser.parse_args(argv)
+    
+    if args.verify:
+        try:
+            pythonscript_dir = get_pythonscript_dir()
+        except RuntimeError as e:
+            print(f"  ✗ ERROR: {e}")
+            return 1
+        print(f"Verifying {pythonscript_dir}")
+        return verify(pythonscript_dir)
+    
     print("=" * 70)
     print("Notepad++ PythonScript Scripts Installer")
     print("=" * 70)
@@ -261,8 +762,10 @@ def main():
     print("[3/4] Copying script files...")
     try:
         script_source = Path(__file__).parent / 'scripts'
-        copied_scripts = copy_scripts(script_source, pythonscript_dir)
-        print(f"\n  Total scripts copied: {len(copied_scripts)}")
+        copied_scripts = copy_scripts(script_source, pythonscript_dir, generated_stubs())
+        print(f"\n  Total scripts installed: {len(copied_scripts)}")
+        if register_startup(pythonscript_dir):
+            print("  ✓ Registered wrap dispatcher in startup.py")
     except RuntimeError as e:
         print(f"  ✗ ERROR: {e}")
         return 1
@@ -289,9 +792,8 @@ def main():
     print()
     for script_name, shortcut in SCRIPT_SHORTCUTS.items():
         if script_name in copied_scripts:
-            key_char = chr(int(shortcut['key']))
             script_base = script_name.replace('.py', '')
-            print(f"     • {script_base:20s} → Ctrl+Alt+{key_char}")
+            print(f"     • {script_base:20s} → {describe_shortcut(shortcut)}")
     print()
     
     return 0
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+auto_markup.py
+PythonScript skripta za Notepad++ koja u celom dokumentu obeležava sve fraze
+iz gazetira (gazetteer.tsv u Scripts folderu) odgovarajućim tagovima.
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("auto_markup")
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+convert_serbian_quotes.py
+PythonScript skripta za Notepad++ koja u celom dokumentu pretvara prave
+navodnike ("...") u srpske („...“), preskačući tagove i vrednosti atributa.
+Neupareni navodnici se ne menjaju, već se prijavljuju sa brojem reda.
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("convert_quotes")
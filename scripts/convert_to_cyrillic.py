@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+convert_to_cyrillic.py
+PythonScript skripta za Notepad++ koja preslovljava selekciju (ili ceo dokument)
+iz latinice u ćirilicu (lj, nj, dž -> љ, њ, џ). Tagovi, vrednosti atributa,
+komentari i sadržaj <foreign> elemenata se ne menjaju; jedan Undo korak.
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("to_cyrillic")
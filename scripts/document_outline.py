@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+document_outline.py
+PythonScript skripta za Notepad++ koja prikazuje spisak svih <head> i <title>
+elemenata sa brojem reda i skače na izabrani (broj stavke ili deo naslova).
+Spisak dolazi iz indeksa elemenata koji prati izmene, bez ponovnog skeniranja.
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("outline")
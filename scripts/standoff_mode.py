@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+standoff_mode.py
+PythonScript skripta za Notepad++ koja uključuje ili isključuje standoff režim
+za aktivni dokument: wrap akcije tada upisuju opsege u <dokument>.standoff,
+a tekst se ne menja (python teiwrap_cli.py render pravi inline TEI).
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("standoff_mode")
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+teiwrap
+Zajednička biblioteka za PythonScript wrap skripte.
+Kao i skripte u scripts/ folderu, mora ostati kompatibilna sa Python 2.7.
+"""
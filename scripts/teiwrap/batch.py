@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+batch.py
+Obavija sve selekcije (višestruka i kolonska selekcija) jednom grupisanom
+izmenom. Tagovi se umeću od kraja ka početku dokumenta, pa nijedna pozicija
+ne mora ponovo da se traži, a cela operacija je jedan Undo korak.
+
+Selektovani tekst se nikada ne kopira u Python: umeću se samo otvarajući
+i zatvarajući tag na granicama selekcije, pa vreme, memorija i veličina
+Undo bafera ne zavise od dužine selekcije.
+"""
+
+from teiwrap.escaping import to_native
+
+# Windows poruka kojom se privremeno isključuje iscrtavanje prozora
+WM_SETREDRAW = 0x000B
+
+
+def byte_len(text):
+    """Vraća dužinu teksta u UTF-8 bajtovima (Scintilla pozicije su bajtovi)."""
+    if isinstance(text, bytes):
+        return len(text)
+    return len(text.encode('utf-8'))
+
+
+def selection_ranges(editor):
+    """Vraća sortiranu listu (start, end) za sve neprazne selekcije."""
+    ranges = set()
+    for i in range(editor.getSelections()):
+        start = editor.getSelectionNStart(i)
+        end = editor.getSelectionNEnd(i)
+        if end > start:
+            ranges.add((start, end))
+    return sorted(ranges)
+
+
+class undo_action(object):
+    """Grupiše sve izmene unutar with bloka u jedan Undo korak."""
+
+    def __init__(self, editor):
+        self.editor = editor
+
+    def __enter__(self):
+        self.editor.beginUndoAction()
+        return self.editor
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.editor.endUndoAction()
+        return False
+
+
+class suppressed_redraw(object):
+    """Isključuje iscrtavanje editora dok traje izmena (samo na Windows-u)."""
+
+    def __init__(self, editor):
+        self.hwnd = getattr(editor, 'hwnd', None)
+
+    def _send(self, flag):
+        if not self.hwnd:
+            return
+        try:
+            import ctypes
+            user32 = ctypes.windll.user32
+            user32.SendMessageW(self.hwnd, WM_SETREDRAW, flag, 0)
+            if flag:
+                user32.InvalidateRect(self.hwnd, None, True)
+        except (ImportError, AttributeError):
+            self.hwnd = None
+
+    def __enter__(self):
+        self._send(0)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._send(1)
+        return False
+
+
+def restore_selections(editor, ranges, open_len, close_len):
+    """Ponovo selektuje obavijeni sadržaj (bez tagova) posle umetanja."""
+    step = open_len + close_len
+    for i, (start, end) in enumerate(ranges):
+        shift = i * step + open_len
+        if i == 0:
+            editor.setSelection(end + shift, start + shift)
+        else:
+            editor.addSelection(end + shift, start + shift)
+
+
+def wrap_ranges(editor, ranges, open_text, close_text, restore=True):
+    """
+    Obavija zadate (start, end) opsege u open_text/close_text.
+    Opsezi moraju biti sortirani i da se ne preklapaju. Ako je restore
+    uključen, posle izmene je selektovan isti sadržaj kao pre nje.
+    """
+    if not ranges:
+        return 0
+    with suppressed_redraw(editor):
+        with undo_action(editor):
+            for start, end in reversed(ranges):
+                editor.insertText(end, close_text)
+                editor.insertText(start, open_text)
+        if restore:
+            restore_selections(editor, ranges, byte_len(open_text), byte_len(close_text))
+    return len(ranges)
+
+
+def insert_all(editor, plan):
+    """
+    Umeće sve (pozicija, tekst) parove iz sortiranog plana, od kraja ka
+    početku, kao jedan Undo korak. Vraća broj umetanja.
+    """
+    if not plan:
+        return 0
+    with suppressed_redraw(editor):
+        with undo_action(editor):
+            for pos, text in reversed(plan):
+                editor.insertText(pos, to_native(text))
+    return len(plan)
+
+
+def replace_all(editor, edits):
+    """
+    Primenjuje sortirane izmene (pozicija, dužina, tekst) od kraja ka
+    početku, kao jedan Undo korak. Vraća broj izmena.
+    """
+    if not edits:
+        return 0
+    with suppressed_redraw(editor):
+        with undo_action(editor):
+            for pos, length, text in reversed(edits):
+                editor.setTargetRange(pos, pos + length)
+                editor.replaceTarget(to_native(text))
+    return len(edits)
+
+
+def wrap_selections(editor, open_text, close_text, restore=True):
+    """Obavija svaku nepraznu selekciju; vraća broj obavijenih selekcija."""
+    return wrap_ranges(editor, selection_ranges(editor), open_text, close_text, restore)
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+catalog.py
+Katalog wrap akcija: jedan unos po akciji (tag, fiksni atributi, atribut
+koji se traži kroz dijalog, prečica). Iz kataloga dispečer pravi handlere
+pri učitavanju, install.py generiše stub skripte i prečice, a
+`python teiwrap_cli.py stubs` osvežava stubove u scripts/ folderu.
+
+Novi tag se dodaje jednim redom u CATALOG, npr.:
+    entry("persName", tag="persName"),
+    entry("note_place", tag="note", attrs=[("place", "foot")], key="Ctrl+Shift+F5"),
+a lanac elemenata (jedna izmena) imenima postojećih unosa:
+    entry("head_hi", chain=("head", "hi")),
+"""
+
+from teiwrap.tags import SERBIAN_QUOTES
+
+STUB_TEMPLATE = u'''# -*- coding: utf-8 -*-
+"""
+{script}
+{doc}
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("{name}")
+'''
+
+TAG_DOC = (u"PythonScript skripta za Notepad++ koja obavija selektovani tekst u <{tag}> tag.\n"
+           u"Radi i sa višestrukom i kolonskom selekcijom (jedan Undo korak).")
+
+CHAIN_DOC = (u"PythonScript skripta za Notepad++ koja obavija selektovani tekst u lanac elemenata\n"
+             u"{chain} (od spoljašnjeg ka unutrašnjem), jednom izmenom i jednim Undo korakom.")
+
+TOGGLE_DOC = (u"PythonScript skripta za Notepad++ koja uklanja <{tag}> element oko selekcije\n"
+              u"ili kursora, a ako ga nema, obavija selektovani tekst u <{tag}> tag.")
+
+# Virtuelni kodovi tastera koji nisu slovo ili cifra
+_KEY_CODES = dict(('F{0}'.format(n), 111 + n) for n in range(1, 13))
+
+# Imena ostalih tastera bez znaka, za prikaz tuđih prečica iz shortcuts.xml
+_KEY_NAMES = dict((code, name) for name, code in _KEY_CODES.items())
+_KEY_NAMES.update({8: 'Backspace', 9: 'Tab', 13: 'Enter', 27: 'Esc', 32: 'Space',
+                   33: 'PageUp', 34: 'PageDown', 35: 'End', 36: 'Home', 37: 'Left',
+                   38: 'Up', 39: 'Right', 40: 'Down', 45: 'Insert', 46: 'Delete',
+                   106: 'Num*', 107: 'Num+', 109: 'Num-', 110: 'Num.', 111: 'Num/',
+                   186: ';', 187: '=', 188: ',', 189: '-', 190: '.', 191: '/', 192: '`',
+                   219: '[', 220: '\\', 221: ']', 222: "'"})
+_KEY_NAMES.update(dict((96 + n, 'Num{0}'.format(n)) for n in range(10)))
+
+_MODIFIERS = ('Ctrl', 'Alt', 'Shift')
+
+
+def entry(name, tag=None, attrs=(), prompt=None, text=None, key=None, script=None, doc=None,
+          custom=False, toggle=False, chain=None):
+    """
+    Pravi unos kataloga.
+
+    name: ime akcije za dispatch.run; tag i attrs: element i fiksni atributi;
+    prompt: (atribut, pitanje, naslov, podrazumevano) za vrednost koja se
+    traži kroz dijalog; text: (otvarajući, zatvarajući) tekst umesto taga;
+    key: prečica, npr. "Ctrl+Alt+1"; script: ime stub skripte (podrazumevano
+    wrap_<name>.py); doc: opis za stub; custom: handler je posebna funkcija
+    u dispatch modulu; toggle: akcija uklanja element oko kursora, a obavija
+    samo ako ga nema; chain: imena unosa kataloga (tag, text ili prompt) od
+    spoljašnjeg ka unutrašnjem, npr. ("quote", "hi"), koje akcija umeće
+    odjednom, a sva pitanja postavlja unapred.
+    """
+    if chain:
+        default_doc = CHAIN_DOC.format(chain=u" > ".join(chain))
+    else:
+        default_doc = (TOGGLE_DOC if toggle else TAG_DOC).format(tag=tag)
+    return {
+        'name': name, 'tag': tag, 'attrs': list(attrs), 'prompt': prompt, 'text': text,
+        'key': key, 'script': script or 'wrap_{0}.py'.format(name), 'custom': custom,
+        'toggle': toggle, 'chain': list(chain or ()), 'doc': doc or default_doc,
+    }
+
+
+CATALOG = (
+    entry("title", tag="title", key="Ctrl+Alt+1"),
+    entry("head", tag="head", key="Ctrl+Alt+2"),
+    entry("hi", tag="hi", key="Ctrl+Alt+3"),
+    entry("quote", tag="quote", key="Ctrl+Alt+4"),
+    entry("trailer", tag="trailer", key="Ctrl+Alt+5"),
+    entry("foreign_prompt", tag="foreign",
+          prompt=("xml:lang", u"Unesite vrednost za xml:lang atribut:", u"Jezik", "en"),
+          key="Ctrl+Alt+6",
+          doc=u"PythonScript skripta za Notepad++ koja obavija selektovani tekst\n"
+              u"u <foreign> tag sa xml:lang atributom koji korisnik unosi kroz dijalog.\n"
+              u"Radi i sa višestrukom i kolonskom selekcijom (jedan Undo korak)."),
+    entry("foreign_fixed", tag="foreign", attrs=[("xml:lang", "en")], key="Ctrl+Alt+7",
+          doc=u"PythonScript skripta za Notepad++ koja obavija selektovani tekst\n"
+              u"u <foreign> tag sa fiksnim xml:lang=\"en\" atributom.\n"
+              u"Radi i sa višestrukom i kolonskom selekcijom (jedan Undo korak)."),
+    entry("serbian_quotes", text=SERBIAN_QUOTES, key="Ctrl+Alt+8",
+          doc=u"PythonScript skripta za Notepad++ koja obavija selektovani tekst\n"
+              u"u srpske navodnike („ i “).\n"
+              u"Radi i sa višestrukom i kolonskom selekcijom (jedan Undo korak)."),
+    entry("auto_markup", script="auto_markup.py", key="Ctrl+Alt+9", custom=True,
+          doc=u"PythonScript skripta za Notepad++ koja u celom dokumentu obeležava sve fraze\n"
+              u"iz gazetira (gazetteer.tsv u Scripts folderu) odgovarajućim tagovima."),
+    entry("convert_quotes", script="convert_serbian_quotes.py", key="Ctrl+Alt+0", custom=True,
+          doc=u"PythonScript skripta za Notepad++ koja u celom dokumentu pretvara prave\n"
+              u"navodnike (\"...\") u srpske („...“), preskačući tagove i vrednosti atributa.\n"
+              u"Neupareni navodnici se ne menjaju, već se prijavljuju sa brojem reda."),
+    entry("foreign_auto", key="Ctrl+Alt+Shift+6", custom=True,
+          doc=u"PythonScript skripta za Notepad++ koja obavija selektovani tekst\n"
+              u"u <foreign> tag sa xml:lang atributom koji se prepoznaje automatski\n"
+              u"(lokalni prepoznavač jezika, bez dijaloga)."),
+    entry("find_wrap", script="wrap_all.py", key="Ctrl+Alt+Shift+8", custom=True,
+          doc=u"PythonScript skripta za Notepad++ koja obavija sva pojavljivanja selektovanog\n"
+              u"teksta (ili regularnog izraza, ako selekcije nema) u element koji korisnik unese.\n"
+              u"Pogoci već unutar istog taga se preskaču; cela izmena je jedan Undo korak."),
+    entry("standoff_mode", script="standoff_mode.py", key="Ctrl+Alt+Shift+0", custom=True,
+          doc=u"PythonScript skripta za Notepad++ koja uključuje ili isključuje standoff režim\n"
+              u"za aktivni dokument: wrap akcije tada upisuju opsege u <dokument>.standoff,\n"
+              u"a tekst se ne menja (python teiwrap_cli.py render pravi inline TEI)."),
+    entry("to_latin", script="convert_to_latin.py", key="Ctrl+Shift+F6", custom=True,
+          doc=u"PythonScript skripta za Notepad++ koja preslovljava selekciju (ili ceo dokument)\n"
+              u"iz ćirilice u latinicu (љ -> lj, ЉУБАВ -> LJUBAV). Tagovi, vrednosti atributa,\n"
+              u"komentari i sadržaj <foreign> elemenata se ne menjaju; jedan Undo korak."),
+    entry("to_cyrillic", script="convert_to_cyrillic.py", key="Ctrl+Shift+F7", custom=True,
+          doc=u"PythonScript skripta za Notepad++ koja preslovljava selekciju (ili ceo dokument)\n"
+              u"iz latinice u ćirilicu (lj, nj, dž -> љ, њ, џ). Tagovi, vrednosti atributa,\n"
+              u"komentari i sadržaj <foreign> elemenata se ne menjaju; jedan Undo korak."),
+    entry("outline", script="document_outline.py", key="Ctrl+Shift+F8", custom=True,
+          doc=u"PythonScript skripta za Notepad++ koja prikazuje spisak svih <head> i <title>\n"
+              u"elemenata sa brojem reda i skače na izabrani (broj stavke ili deo naslova).\n"
+              u"Spisak dolazi iz indeksa elemenata koji prati izmene, bez ponovnog skeniranja."),
+    entry("wrap_chain", script="wrap_chain.py", key="Ctrl+Shift+F9", custom=True,
+          doc=u"PythonScript skripta za Notepad++ koja obavija selektovani tekst u lanac\n"
+              u"elemenata unet kroz dijalog, npr. quote > hi ili title > foreign xml:lang=\"la\".\n"
+              u"Svi tagovi se umeću jednom izmenom (jedan Undo korak)."),
+    entry("quote_hi", chain=("quote", "hi"), key="Ctrl+Shift+F10"),
+    entry("title_foreign", chain=("title", "foreign_prompt"), key="Ctrl+Shift+F11"),
+    entry("persName", tag="persName"),
+    entry("placeName", tag="placeName"),
+    entry("l", tag="l"),
+    entry("note", tag="note"),
+    entry("toggle_title", tag="title", toggle=True, script="toggle_title.py", key="Ctrl+Alt+Shift+1"),
+    entry("toggle_head", tag="head", toggle=True, script="toggle_head.py", key="Ctrl+Alt+Shift+2"),
+    entry("toggle_hi", tag="hi", toggle=True, script="toggle_hi.py", key="Ctrl+Alt+Shift+3"),
+    entry("toggle_quote", tag="quote", toggle=True, script="toggle_quote.py", key="Ctrl+Alt+Shift+4"),
+    entry("toggle_trailer", tag="trailer", toggle=True, script="toggle_trailer.py", key="Ctrl+Alt+Shift+5"),
+    entry("toggle_foreign", tag="foreign", attrs=[("xml:lang", "en")], toggle=True,
+          script="toggle_foreign.py", key="Ctrl+Alt+Shift+7"),
+)
+
+
+def by_script():
+    """Vraća rečnik ime stub skripte -> unos kataloga."""
+    return dict((item['script'], item) for item in CATALOG)
+
+
+def stub_source(item):
+    """Vraća izvorni kod stub skripte za unos kataloga."""
+    return STUB_TEMPLATE.format(script=item['script'], doc=item['doc'], name=item['name'])
+
+
+def parse_key(key):
+    """
+    Pretvara prečicu ("Ctrl+Alt+Shift+6", "Ctrl+F5") u rečnik za
+    shortcuts.xml: {'key': virtuelni kod, 'ctrl'/'alt'/'shift': 'yes'/'no'}.
+    Baca ValueError za nepoznat taster ili modifikator.
+    """
+    parts = key.split('+')
+    name = parts[-1]
+    modifiers = parts[:-1]
+    for modifier in modifiers:
+        if modifier not in _MODIFIERS:
+            raise ValueError(u"Nepoznat modifikator u prečici {0}: {1}".format(key, modifier))
+    if name in _KEY_CODES:
+        code = _KEY_CODES[name]
+    elif len(name) == 1 and (name.isdigit() or 'A' <= name.upper() <= 'Z'):
+        code = ord(name.upper())
+    else:
+        raise ValueError(u"Nepoznat taster u prečici {0}: {1}".format(key, name))
+    result = {'key': str(code)}
+    for modifier in _MODIFIERS:
+        result[modifier.lower()] = 'yes' if modifier in modifiers else 'no'
+    return result
+
+
+def key_name(code):
+    """
+    Obrnuto od parse_key za sam taster: virtuelni kod (broj ili string iz
+    shortcuts.xml) -> ime tastera ("F6", "A", "7", "Delete"). Nepoznat kod
+    se prikazuje heksadecimalno, npr. "0xE2".
+    """
+    code = int(code)
+    if code in _KEY_NAMES:
+        return _KEY_NAMES[code]
+    if 48 <= code <= 57 or 65 <= code <= 90:
+        return chr(code)
+    return '0x{0:02X}'.format(code)
+
+
+def shortcuts():
+    """Vraća rečnik ime stub skripte -> parse_key(prečica) za unose sa prečicom."""
+    return dict((item['script'], parse_key(item['key'])) for item in CATALOG if item['key'])
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+corpus.py
+Primena recepta za obeležavanje na ceo korpus (folder sa hiljadama TEI
+fajlova), van Notepad++. Fajlovi se raspoređuju na više procesa, izlaz
+se upisuje atomski (privremeni fajl pa preimenovanje), a napredak se
+čuva u kontrolnom fajlu: prekinut rad se nastavlja gde je stao, a fajl
+čiji se sadržaj i recept nisu promenili se preskače.
+
+Format recepta (UTF-8, polja razdvojena tabom):
+    phrase<TAB>fraza<TAB>element[<TAB>ime=vrednost ...]
+    regex<TAB>regularni izraz<TAB>element[<TAB>ime=vrednost ...]
+    gazetteer<TAB>putanja do gazetira (relativno u odnosu na recept)
+Element je ime taga ili @akcija iz kataloga (npr. @foreign_fixed), pa se
+tagovi prave istim šablonima kao u scripts/wrap_*.py; atributi iz recepta
+zamenjuju istoimene atribute akcije.
+"""
+
+import hashlib
+import io
+import json
+import mmap
+import os
+import re
+import tempfile
+import time
+from bisect import bisect_left
+
+from teiwrap import catalog
+from teiwrap.findall import parse_element
+from teiwrap.gazetteer import Gazetteer, _wrapped, parse_gazetteer
+from teiwrap.headless import _replace, apply_spans, file_hash
+from teiwrap.offsets import OffsetIndex
+from teiwrap.tags import element, to_bytes
+
+# Verzija obrade; povećati kad se promeni način primene recepta
+RECIPE_VERSION = 2
+
+# Ime kontrolnog fajla u izlaznom folderu
+CHECKPOINT_NAME = '.teiwrap_checkpoint.json'
+
+# Kontrolni fajl se upisuje posle ovoliko obrađenih fajlova ili sekundi
+CHECKPOINT_EVERY = 200
+CHECKPOINT_SECONDS = 5.0
+
+# Recept za procese radnike (učitava se jednom po procesu)
+_worker_recipe = None
+
+
+class Recipe(object):
+    """
+    Učitan recept: automat za fraze (sa frazama iz gazetira) i lista
+    (regularni izraz, tag, attrs). digest se menja sa sadržajem recepta,
+    gazetira i sa RECIPE_VERSION.
+    """
+
+    def __init__(self, entries, regexes, digest):
+        self.gazetteer = Gazetteer(entries)
+        self.regexes = regexes
+        self.digest = digest
+
+    def find(self, data):
+        """
+        Vraća nepreklapajuće opsege (start, end, tag, attrs). Fraze imaju
+        prednost, pa regularni izrazi redom iz recepta; pogoci unutar
+        tagova ili preko tagova se preskaču, kao i pogoci koje recept već
+        obavija, pa ponovna obrada istog fajla ništa ne menja.
+        """
+        spans = self.gazetteer.find(data)
+        # Zauzeti opsezi se ne preklapaju, pa su sortirani i po početku i po kraju
+        starts = [span[0] for span in spans]
+        ends = [span[1] for span in spans]
+        # Regularni izrazi rade nad tekstom (\w i \b prepoznaju ćirilicu), a
+        # pozicije karaktera se preslikavaju u bajtove preko indeksa pozicija
+        text = data[:].decode('utf-8') if self.regexes else u''
+        positions = OffsetIndex.for_bytes(data)
+        for pattern, tag, attrs in self.regexes:
+            for match in pattern.finditer(text):
+                if match.end() <= match.start():
+                    continue
+                start, end = positions.to_byte(match.start()), positions.to_byte(match.end())
+                if end <= start or _in_markup(data, start, end) or _wrapped(data, start, end, tag):
+                    continue
+                i = bisect_left(starts, end)
+                if i and ends[i - 1] > start:
+                    continue
+                starts.insert(i, start)
+                ends.insert(i, end)
+                spans.append((start, end, tag, attrs))
+        spans.sort(key=lambda span: span[0])
+        return spans
+
+
+def _in_markup(data, start, end):
+    """Da li opseg sadrži '<' ili '>' ili počinje unutar taga."""
+    if data.find(b'<', start, end) >= 0 or data.find(b'>', start, end) >= 0:
+        return True
+    return data.rfind(b'<', 0, start) > data.rfind(b'>', 0, start)
+
+
+def _element(name, number):
+    """Vraća (tag, attrs) za ime taga ili @akciju iz kataloga."""
+    if not name.startswith('@'):
+        return parse_element(name)[0], []
+    item = dict((entry['name'], entry) for entry in catalog.CATALOG).get(name[1:])
+    if item is None or not item['tag'] or item['prompt'] or item['custom']:
+        raise ValueError("Red {0}: nema akcije sa fiksnim tagom u katalogu: {1}".format(number, name))
+    return item['tag'], list(item['attrs'])
+
+
+def _attrs(fields, number):
+    attrs = []
+    for field in fields:
+        name, sep, value = field.partition('=')
+        if not sep:
+            raise ValueError("Red {0}: atribut mora biti ime=vrednost".format(number))
+        attrs.append((name, value))
+    return attrs
+
+
+def load_recipe(path):
+    """Učitava recept iz fajla; baca ValueError za neispravan red."""
+    digest = hashlib.sha1(str(RECIPE_VERSION).encode('ascii'))
+    with open(path, 'rb') as handle:
+        raw = handle.read()
+    digest.update(raw)
+    entries = []
+    regexes = []
+    for number, line in enumerate(io.StringIO(raw.decode('utf-8-sig')), 1):
+        line = line.rstrip('\r\n')
+        if not line.strip() or line.startswith('#'):
+            continue
+        fields = line.split('\t')
+        kind = fields[0]
+        if kind == 'gazetteer' and len(fields) == 2:
+            gaz_path = os.path.join(os.path.dirname(os.path.abspath(path)), fields[1])
+            with open(gaz_path, 'rb') as handle:
+                gaz_raw = handle.read()
+            digest.update(gaz_raw)
+            entries.extend(parse_gazetteer(io.StringIO(gaz_raw.decode('utf-8-sig'))))
+            continue
+        if kind not in ('phrase', 'regex') or len(fields) < 3 or not fields[1]:
+            raise ValueError("Red {0}: očekivano phrase|regex, uzorak i element".format(number))
+        tag, attrs = _element(fields[2], number)
+        extra = _attrs(fields[3:], number)
+        # Atribut iz recepta zamenjuje istoimeni atribut akcije iz kataloga
+        names = set(name for name, _ in extra)
+        attrs = [attr for attr in attrs if attr[0] not in names] + extra
+        if kind == 'phrase':
+            entries.append((fields[1], tag, attrs))
+            continue
+        try:
+            pattern = re.compile(fields[1], re.U)
+        except re.error as error:
+            raise ValueError("Red {0}: neispravan regularni izraz: {1}".format(number, error))
+        regexes.append((pattern, tag, attrs))
+    # Proverava atribute odmah, a ne tek u prvom fajlu sa pogotkom; tagovi
+    # iz kataloga ulaze u digest, pa izmena kataloga menja verziju recepta
+    for _, tag, attrs in entries + regexes:
+        digest.update(repr(element(tag, attrs)).encode('utf-8'))
+    return Recipe(entries, regexes, digest.hexdigest())
+
+
+def up_to_date(record, recipe_digest, src_hash, in_place, out_path):
+    """
+    Da li je fajl već obrađen ovim receptom: ulaz je isti kao pri prošloj
+    obradi (ili je, za obradu na mestu, već njen izlaz) i izlaz postoji.
+    """
+    if not record or record.get('recipe') != recipe_digest:
+        return False
+    if in_place:
+        return src_hash in (record.get('input'), record.get('output'))
+    return src_hash == record.get('input') and os.path.exists(out_path)
+
+
+def process_file(recipe, src_path, out_path, record=None):
+    """
+    Primenjuje recept na jedan fajl. Vraća (status, zapis za kontrolni
+    fajl, broj opsega); status je 'done' ili 'skipped'.
+    """
+    in_place = os.path.abspath(out_path) == os.path.abspath(src_path)
+    src_hash = file_hash(src_path)
+    if up_to_date(record, recipe.digest, src_hash, in_place, out_path):
+        return 'skipped', record, record.get('spans', 0)
+    with open(src_path, 'rb') as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            spans = []
+        else:
+            data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                spans = recipe.find(data)
+            finally:
+                data.close()
+    if spans or not in_place:
+        out_dir = os.path.dirname(os.path.abspath(out_path))
+        if not os.path.isdir(out_dir):
+            try:
+                os.makedirs(out_dir)
+            except OSError:
+                if not os.path.isdir(out_dir):
+                    raise
+        apply_spans(src_path, spans, out_path)
+    out_hash = file_hash(out_path) if spans else src_hash
+    return 'done', {'recipe': recipe.digest, 'input': src_hash, 'output': out_hash,
+                    'spans': len(spans)}, len(spans)
+
+
+def load_checkpoint(path):
+    """Vraća rečnik relativna putanja -> zapis iz kontrolnog fajla (prazan ako ga nema)."""
+    try:
+        with open(path, 'rb') as handle:
+            data = json.loads(handle.read().decode('utf-8'))
+    except (IOError, OSError, ValueError):
+        return {}
+    files = data.get('files') if isinstance(data, dict) else None
+    return files if isinstance(files, dict) else {}
+
+
+def save_checkpoint(path, files):
+    """Atomski upisuje kontrolni fajl."""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(json.dumps({'version': RECIPE_VERSION, 'files': files},
+                                    sort_keys=True).encode('utf-8'))
+        _replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def corpus_files(folder, extension='.xml'):
+    """Vraća sortirane relativne putanje (sa '/') fajlova sa ekstenzijom u folderu."""
+    found = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.endswith(extension):
+                rel = os.path.relpath(os.path.join(root, name), folder)
+                found.append(rel.replace(os.sep, '/'))
+    return sorted(found)
+
+
+def _init_worker(recipe_path):
+    global _worker_recipe
+    _worker_recipe = load_recipe(recipe_path)
+
+
+def _work(task, recipe=None):
+    """Obrada jednog fajla (u procesu radniku); greška se vraća, a ne baca."""
+    rel, src_path, out_path, record = task
+    try:
+        status, record, count = process_file(recipe or _worker_recipe, src_path, out_path, record)
+    except (IOError, OSError, ValueError) as error:
+        return rel, 'error', None, str(error)
+    return rel, status, record, count
+
+
+def run_corpus(recipe_path, folder, out_folder=None, extension='.xml', jobs=None,
+               checkpoint_path=None, progress=None):
+    """
+    Primenjuje recept na sve fajlove u folderu (izlaz u out_folder ili na
+    mestu) na jobs procesa (podrazumevano broj jezgara; 1 = bez procesa).
+    progress(relativna putanja, status, broj opsega ili poruka) se poziva
+    posle svakog fajla. Vraća rečnik status -> broj fajlova.
+    """
+    recipe = load_recipe(recipe_path)
+    out_folder = out_folder or folder
+    if checkpoint_path is None:
+        checkpoint_path = os.path.join(out_folder, CHECKPOINT_NAME)
+    if not os.path.isdir(os.path.dirname(os.path.abspath(checkpoint_path))):
+        os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)))
+    files = load_checkpoint(checkpoint_path)
+    tasks = [(rel, os.path.join(folder, rel), os.path.join(out_folder, rel), files.get(rel))
+             for rel in corpus_files(folder, extension)]
+    totals = {'done': 0, 'skipped': 0, 'error': 0}
+    state = {'pending': 0, 'saved': time.time()}
+
+    def finish(result):
+        rel, status, record, detail = result
+        totals[status] += 1
+        if status == 'done':
+            files[rel] = record
+            state['pending'] += 1
+        if (state['pending'] >= CHECKPOINT_EVERY
+                or (state['pending'] and time.time() - state['saved'] >= CHECKPOINT_SECONDS)):
+            save_checkpoint(checkpoint_path, files)
+            state['pending'] = 0
+            state['saved'] = time.time()
+        if progress is not None:
+            progress(rel, status, detail)
+
+    try:
+        if jobs == 1:
+            for task in tasks:
+                finish(_work(task, recipe))
+        else:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(recipe_path,)) as pool:
+                futures = [pool.submit(_work, task) for task in tasks]
+                try:
+                    for future in as_completed(futures):
+                        finish(future.result())
+                except BaseException:
+                    # Fajlovi koji su već u obradi se završavaju, ostali se otkazuju
+                    for future in futures:
+                        future.cancel()
+                    raise
+    finally:
+        if state['pending']:
+            save_checkpoint(checkpoint_path, files)
+    return totals
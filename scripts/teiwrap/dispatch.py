@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+dispatch.py
+Rezidentni dispečer wrap akcija. Učitava se jednom iz PythonScript
+startup.py fajla i drži sve wrap handlere u memoriji, pa skripte za
+prečice (wrap_title.py, wrap_hi.py, ...) samo pozivaju run("ime").
+Handleri za tagove se prave iz kataloga (teiwrap/catalog.py).
+"""
+
+import os
+
+from teiwrap import (catalog, elements, escaping, findall, gazetteer, langid, outline, profiling, quotes,
+                     standoff, translit, unwrap, wellformed)
+from teiwrap.batch import byte_len, selection_ranges, wrap_ranges
+from teiwrap.tags import element, nest
+
+# Podrazumevani jezik za <foreign> tag
+DEFAULT_LANG = "en"
+
+# Gazetir za automatsko obeležavanje, u Scripts folderu pored skripti
+GAZETTEER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gazetteer.tsv')
+
+# Primeri ispravnih vrednosti uz poruku o odbijenom unosu u dijalog
+PROMPT_EXAMPLES = {"xml:lang": "\n(npr. en, sr-Latn, de-CH-1901)"}
+
+# Ime akcije -> funkcija(editor, notepad)
+HANDLERS = {}
+
+# Poslednji unosi u dijalozima akcije find_wrap ('element', 'regex')
+_find_wrap_last = {}
+
+# Poslednji lanac unet u dijalog akcije wrap_chain ('chain')
+_wrap_chain_last = {}
+
+# Učitani gazetir i vreme izmene fajla iz kog je učitan
+_gazetteer_cache = {}
+
+
+def register(name, func):
+    """Registruje handler pod zadatim imenom i vraća ga."""
+    HANDLERS[name] = func
+    return func
+
+
+def checked_wrap(editor, notepad, ranges, open_text, close_text, check=True):
+    """
+    Obavija opsege posle provere da nijedan ne seče postojeće elemente.
+    Ako bi neki napravio ukrštene elemente, ništa se ne menja i korisnik
+    dobija spisak redova sa problemom. U standoff režimu (teiwrap.standoff)
+    opsezi se, posle iste provere, upisuju u sidecar fajl, a tekst se ne menja.
+    """
+    problems = wellformed.check_ranges(editor, ranges) if check else []
+    if problems:
+        lines = ["red {0}: {1}".format(editor.lineFromPosition(start) + 1, reason)
+                 for start, _, reason in problems[:20]]
+        if len(problems) > 20:
+            lines.append("...")
+        notepad.messageBox(
+            "Obavijanje bi napravilo ukrštene elemente, ništa nije promenjeno:\n" + "\n".join(lines),
+            "Dobro formiran XML")
+        return 0
+    if standoff.is_enabled(notepad):
+        return standoff.record(editor, notepad, ranges, open_text, close_text)
+    count = wrap_ranges(editor, ranges, open_text, close_text)
+    wellformed.note_wrap(editor, ranges, byte_len(open_text), byte_len(close_text))
+    return count
+
+
+def tag_handler(open_text, close_text, check=True):
+    """Pravi handler koji obavija sve selekcije u zadati par tagova."""
+    def handler(editor, notepad):
+        return checked_wrap(editor, notepad, selection_ranges(editor), open_text, close_text, check)
+    return handler
+
+
+def ask_attribute(editor, notepad, prompt):
+    """
+    Pita za vrednost atributa prompt = (ime, pitanje, naslov, podrazumevano).
+    Za xml:lang je dijalog popunjen jezikom koji langid prepozna u
+    selekciji. Vraća vrednost, ili None ako je dijalog otkazan ili je
+    vrednost neispravna (korisnik tada dobija poruku).
+    """
+    name, question, title, default = prompt
+    suggested = langid.detect_selection(editor, default) if name == "xml:lang" else default
+    value = notepad.prompt(question, title, suggested)
+    if not value:
+        return None
+    reason = escaping.check_attr(name, value)
+    if reason:
+        notepad.messageBox(reason + PROMPT_EXAMPLES.get(name, ""), title)
+        return None
+    return value
+
+
+def prompt_handler(tag, attrs, prompt):
+    """
+    Pravi handler koji pita za vrednost jednog atributa (jednom za sve
+    selekcije) i obavija ih u tag; neispravna vrednost se odbija.
+    """
+    def handler(editor, notepad):
+        ranges = selection_ranges(editor)
+        if not ranges:
+            return 0
+        value = ask_attribute(editor, notepad, prompt)
+        if value is None:
+            return 0
+        open_text, close_text = element(tag, attrs + [(prompt[0], value)])
+        return checked_wrap(editor, notepad, ranges, open_text, close_text)
+    return handler
+
+
+def chain_handler(links):
+    """
+    Pravi handler koji obavija selekcije u lanac elemenata, od spoljašnjeg
+    ka unutrašnjem; links su unosi kataloga (tag, text ili prompt). Sva
+    pitanja se postavljaju unapred, a svi tagovi se umeću jednom izmenom.
+    Lanac bez pitanja se pravi jednom, pri učitavanju.
+    """
+    check = any(not link['text'] for link in links)
+    if not any(link['prompt'] for link in links):
+        pairs = [link['text'] or element(link['tag'], link['attrs']) for link in links]
+        open_text, close_text = nest(pairs)
+        return tag_handler(open_text, close_text, check)
+
+    def handler(editor, notepad):
+        ranges = selection_ranges(editor)
+        if not ranges:
+            return 0
+        pairs = []
+        for link in links:
+            attrs = link['attrs']
+            if link['prompt']:
+                value = ask_attribute(editor, notepad, link['prompt'])
+                if value is None:
+                    return 0
+                attrs = attrs + [(link['prompt'][0], value)]
+            pairs.append(link['text'] or element(link['tag'], attrs))
+        open_text, close_text = nest(pairs)
+        return checked_wrap(editor, notepad, ranges, open_text, close_text, check)
+    return handler
+
+
+def toggle_handler(tag, attrs):
+    """
+    Pravi handler koji uklanja element tag oko selekcija ili kursora
+    (teiwrap.unwrap); ako takvog elementa nema, obavija selekcije u tag.
+    """
+    open_text, close_text = element(tag, attrs)
+
+    def handler(editor, notepad):
+        count, _ = unwrap.unwrap_selections(editor, tag)
+        if count:
+            return count
+        ranges = selection_ranges(editor)
+        if not ranges:
+            notepad.messageBox(
+                "Kursor nije unutar <{0}> elementa (traži se do {1} KB oko kursora).".format(
+                    tag, unwrap.SEARCH_WINDOW // 1024),
+                "Uklanjanje taga")
+            return 0
+        return checked_wrap(editor, notepad, ranges, open_text, close_text)
+    return handler
+
+
+def foreign_auto(editor, notepad):
+    """Obavija selekcije u <foreign> sa prepoznatim jezikom, bez dijaloga."""
+    ranges = selection_ranges(editor)
+    if not ranges:
+        return 0
+    lang = langid.detect_selection(editor, DEFAULT_LANG)
+    open_text, close_text = element("foreign", [("xml:lang", lang)])
+    return checked_wrap(editor, notepad, ranges, open_text, close_text)
+
+
+def auto_markup(editor, notepad):
+    """Obeležava sve fraze iz gazetira u celom dokumentu (jedan Undo korak)."""
+    if not os.path.exists(GAZETTEER_PATH):
+        notepad.messageBox("Gazetir nije pronađen:\n{0}".format(GAZETTEER_PATH), "Gazetir")
+        return 0
+    mtime = os.path.getmtime(GAZETTEER_PATH)
+    if _gazetteer_cache.get('mtime') != mtime:
+        _gazetteer_cache['gazetteer'] = gazetteer.load_gazetteer(GAZETTEER_PATH)
+        _gazetteer_cache['mtime'] = mtime
+    return gazetteer.markup_document(editor, _gazetteer_cache['gazetteer'])
+
+
+def convert_quotes(editor, notepad):
+    """Pretvara sve prave navodnike u dokumentu u srpske i prijavljuje neuparene."""
+    count, unbalanced = quotes.convert_document(editor)
+    if unbalanced:
+        lines = [str(editor.lineFromPosition(pos) + 1) for pos in unbalanced[:20]]
+        if len(unbalanced) > 20:
+            lines.append("...")
+        notepad.messageBox(
+            "Pretvoreno parova: {0}\nNeupareni navodnici ({1}) u redovima: {2}".format(
+                count, len(unbalanced), ", ".join(lines)),
+            "Srpski navodnici")
+    return count
+
+
+def _transliterate(direction, title):
+    """Pravi handler koji preslovljava selekcije ili ceo dokument u zadato pismo."""
+    def handler(editor, notepad):
+        count, skipped = translit.convert_selection(editor, direction)
+        if skipped:
+            notepad.messageBox(
+                "Preskočeno selekcija koje počinju ili se završavaju unutar taga: {0}".format(skipped),
+                title)
+        return count
+    return handler
+
+
+def wrap_chain(editor, notepad):
+    """
+    Obavija selekcije u lanac elemenata unet kroz dijalog, npr.
+    title > foreign xml:lang="la", jednom izmenom (jedan Undo korak).
+    """
+    title = "Lanac elemenata"
+    ranges = selection_ranges(editor)
+    if not ranges:
+        return 0
+    spec = notepad.prompt('Elementi od spoljašnjeg ka unutrašnjem, npr. title > foreign xml:lang="la":',
+                          title, _wrap_chain_last.get('chain', "quote > hi"))
+    if not spec:
+        return 0
+    try:
+        pairs = [element(tag, attrs) for tag, attrs in findall.parse_chain(spec)]
+    except ValueError as error:
+        notepad.messageBox(str(error), title)
+        return 0
+    _wrap_chain_last['chain'] = spec
+    open_text, close_text = nest(pairs)
+    return checked_wrap(editor, notepad, ranges, open_text, close_text)
+
+
+def find_wrap(editor, notepad):
+    """
+    Obavija sva pojavljivanja selektovanog teksta (ili regularnog izraza
+    unetog u dijalog, ako selekcije nema) u element koji korisnik unese,
+    npr. foreign xml:lang="la", i prijavljuje broj obavijenih i preskočenih.
+    """
+    title = "Obavij sve"
+    ranges = selection_ranges(editor)
+    if ranges:
+        text = editor.getTextRange(*ranges[0])
+        regex = False
+        default = 'foreign xml:lang="{0}"'.format(langid.detect_selection(editor, DEFAULT_LANG))
+    else:
+        text = notepad.prompt("Regularni izraz za pretragu:", title, _find_wrap_last.get('regex', ""))
+        if not text:
+            return 0
+        _find_wrap_last['regex'] = text
+        regex = True
+        default = "hi"
+    spec = notepad.prompt('Element i atributi, npr. foreign xml:lang="la":', title,
+                          _find_wrap_last.get('element', default))
+    if not spec:
+        return 0
+    try:
+        tag, attrs = findall.parse_element(spec)
+        open_text, close_text = element(tag, attrs)
+        wrapped, inside, crossing = findall.wrap_all(editor, text, tag, open_text, close_text, regex)
+    except ValueError as error:
+        notepad.messageBox(str(error), title)
+        return 0
+    _find_wrap_last['element'] = spec
+    lines = ["Obavijeno: {0}".format(len(wrapped))]
+    if inside:
+        lines.append("Već u <{0}>: {1}".format(tag, len(inside)))
+    if crossing:
+        lines.append("Preskočeno zbog ukrštenih elemenata: {0} (prvi u redu {1})".format(
+            len(crossing), editor.lineFromPosition(crossing[0][0]) + 1))
+    notepad.messageBox("\n".join(lines), title)
+    return len(wrapped)
+
+
+register("foreign_auto", foreign_auto)
+register("find_wrap", find_wrap)
+register("auto_markup", auto_markup)
+register("convert_quotes", convert_quotes)
+register("standoff_mode", standoff.toggle)
+register("to_latin", _transliterate(translit.LATIN, "Latinica"))
+register("to_cyrillic", _transliterate(translit.CYRILLIC, "Ćirilica"))
+register("outline", outline.show)
+register("wrap_chain", wrap_chain)
+
+
+def register_catalog(items):
+    """
+    Registruje handlere za unose kataloga (teiwrap.catalog) koji nisu posebne
+    funkcije. Karike lanca se traže među items i u celom katalogu; baca
+    ValueError za nepoznatu kariku ili kariku koja nije tag, text ili prompt.
+    """
+    by_name = dict((item['name'], item) for item in catalog.CATALOG)
+    by_name.update((item['name'], item) for item in items)
+    for item in items:
+        if item['custom']:
+            continue
+        if item['chain']:
+            links = [by_name.get(name) for name in item['chain']]
+            for name, link in zip(item['chain'], links):
+                if link is None or link['custom'] or link['toggle'] or link['chain']:
+                    raise ValueError(u"Lanac {0}: {1} nije tag, text ili prompt unos kataloga".format(
+                        item['name'], name))
+            handler = chain_handler(links)
+        elif item['toggle']:
+            handler = toggle_handler(item['tag'], item['attrs'])
+        elif item['text']:
+            handler = tag_handler(item['text'][0], item['text'][1], check=False)
+        elif item['prompt']:
+            handler = prompt_handler(item['tag'], item['attrs'], item['prompt'])
+        else:
+            handler = tag_handler(*element(item['tag'], item['attrs']))
+        register(item['name'], handler)
+
+
+register_catalog(catalog.CATALOG)
+
+
+def watch_npp():
+    """
+    U Notepad++ registruje Scintilla callback kojim indeks elemenata prati
+    sve izmene dokumenta (van Notepad++ ne radi ništa).
+    """
+    try:
+        from Npp import SCINTILLANOTIFICATION, editor
+    except ImportError:
+        return False
+    elements.watch(editor, SCINTILLANOTIFICATION.MODIFIED)
+    return True
+
+
+watch_npp()
+
+
+def run(name, editor=None, notepad=None):
+    """Izvršava registrovanu akciju; editor/notepad podrazumevano dolaze iz Npp."""
+    if editor is None or notepad is None:
+        import Npp
+        editor = editor or Npp.editor
+        notepad = notepad or Npp.notepad
+    if profiling.active:
+        return profiling.measure(name, HANDLERS[name], editor, notepad)
+    return HANDLERS[name](editor, notepad)
@@ -0,0 +1,613 @@
+# -*- coding: utf-8 -*-
+"""
+elements.py
+Zajednički indeks elemenata otvorenog dokumenta. Dokument se jednom
+skenira i deli u blokove od po ~4 KB; za svaki blok se pamte tagovi
+(pozicija, kraj, promena dubine, ime) i sažetak steka tagova. Nad
+sažecima blokova je stablo segmenata, pa pitanja "koji elementi obuhvataju
+poziciju X" i "sledeći element tipa T" traju O(log n) (po nivou ugnežđenja).
+
+Izmene dokumenta (Scintilla SCN_MODIFIED callback ili note_insert/
+note_delete) ponovo skeniraju samo blokove koje su dotakle. Pomeranje
+početaka blokova iza izmene se odlaže i spaja sa sledećim izmenama, pa
+niz umetanja od kraja ka početku (wrap 2.000 selekcija) prolazi kroz
+početke blokova jednom, a ne jednom po umetanju.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from teiwrap.tags import to_bytes
+
+# Približna veličina bloka indeksa u bajtovima (manji blok = brža provera posle izmene)
+BLOCK_SIZE = 4096
+
+# Broj dokumenata za koje se indeks čuva u memoriji
+MAX_INDEXES = 8
+
+# Scintilla modificationType bitovi (SCN_MODIFIED)
+SC_MOD_INSERTTEXT = 0x1
+SC_MOD_DELETETEXT = 0x2
+
+# Komentar, CDATA, instrukcija obrade, tag (grupe: '/', ime); sam '<'
+# znači nezavršen token. Tag ne sadrži '<' (ni u vrednostima atributa),
+# pa se završava pre sledećeg.
+_MARKUP_RE = re.compile(
+    b'<!--.*?-->|<!\\[CDATA\\[.*?\\]\\]>|<\\?.*?\\?>'
+    b'|<(?!!--|!\\[CDATA\\[)(/?)([^\\s/<>"\']*)[^<>"\']*(?:(?:"[^<"]*"|\'[^<\']*\')[^<>"\']*)*>'
+    b'|<', re.S)
+
+_EMPTY = frozenset()
+
+_indexes = OrderedDict()
+# id(editor) -> (editor, callback); referenca na editor sprečava da isti id
+# dobije drugi objekat
+_watched = {}
+
+
+def _token(match):
+    """Vraća (promena dubine, ime) tokena: +1 otvarajući, -1 zatvarajući, 0 ostalo."""
+    name = match.group(2)
+    if not name or name[:1] in (b'!', b'?'):
+        return 0, None
+    if match.group(1):
+        return -1, name
+    if match.group().endswith(b'/>'):
+        return 0, name
+    return 1, name
+
+
+def _scan(data, pos, limit, final):
+    """
+    Vraća (tokeni, nezavršen) za tokene (start, kraj, promena dubine, ime)
+    koji počinju u [pos, limit); nezavršen je True ako postoji nezatvoren
+    komentar, CDATA ili instrukcija obrade. Vraća None ako token nije
+    završen u data, a data nije kraj dokumenta.
+    """
+    tokens = []
+    open_ended = False
+    for match in _MARKUP_RE.finditer(data, pos):
+        start, end = match.span()
+        if start >= limit:
+            break
+        if end - start == 1:
+            if not final:
+                return None
+            open_ended = open_ended or data[end:end + 1] in (b'!', b'?')
+        delta, name = _token(match)
+        tokens.append((start, end, delta, name))
+    return tokens, open_ended
+
+
+class _Block(object):
+    """
+    Tokeni bloka (pozicije relativne u odnosu na početak bloka) i sažetak:
+    net (promena dubine), low (najmanja dubina), top (najveći zbir
+    promena od kraja bloka), names (imena otvorenih elemenata), reach
+    (dokle sežu tokeni ovog ili ranijih blokova) i spill (da li reach
+    prelazi u sledeći blok).
+    """
+
+    __slots__ = ('starts', 'tokens', 'net', 'low', 'top', 'names', 'reach', 'spill', 'dirty')
+
+    def __init__(self, tokens, reach=0, size=0):
+        self.set_tokens(tokens, reach, size)
+
+    def set_tokens(self, tokens, reach, size):
+        self.tokens = tokens
+        self.starts = [token[0] for token in tokens]
+        self.reach = max([reach] + [token[1] for token in tokens[-1:]])
+        self.spill = self.reach > size
+        depth = low = 0
+        names = set()
+        for token in tokens:
+            depth += token[2]
+            if depth < low:
+                low = depth
+            if token[2] > 0:
+                names.add(token[3])
+        suffix = top = 0
+        for token in reversed(tokens):
+            suffix += token[2]
+            if suffix > top:
+                top = suffix
+        self.net = depth
+        self.low = low
+        self.top = top
+        self.names = frozenset(names) if names else _EMPTY
+        self.dirty = False
+
+
+class _Tree(object):
+    """Stablo segmenata nad sažecima blokova (net, low, top, names)."""
+
+    def __init__(self, blocks):
+        size = 1
+        while size < len(blocks):
+            size *= 2
+        self.size = size
+        self.net = [0] * (2 * size)
+        self.low = [0] * (2 * size)
+        self.top = [0] * (2 * size)
+        self.names = [_EMPTY] * (2 * size)
+        for index, block in enumerate(blocks):
+            self._set_leaf(size + index, block)
+        for node in range(size - 1, 0, -1):
+            self._pull(node)
+
+    def _set_leaf(self, node, block):
+        self.net[node] = block.net
+        self.low[node] = block.low
+        self.top[node] = block.top
+        self.names[node] = block.names
+
+    def _pull(self, node):
+        left, right = 2 * node, 2 * node + 1
+        self.net[node] = self.net[left] + self.net[right]
+        self.low[node] = min(self.low[left], self.net[left] + self.low[right])
+        self.top[node] = max(self.top[right], self.net[right] + self.top[left])
+        self.names[node] = self.names[left] | self.names[right]
+
+    def update(self, index, block):
+        node = self.size + index
+        self._set_leaf(node, block)
+        node //= 2
+        while node:
+            self._pull(node)
+            node //= 2
+
+    def _nodes(self, lo, hi):
+        """Čvorovi koji pokrivaju blokove [lo, hi), s leva na desno."""
+        left = []
+        right = []
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                left.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right.append(hi)
+            lo //= 2
+            hi //= 2
+        return left + right[::-1]
+
+    def summary(self, lo, hi, depth, low):
+        """Nastavlja (dubina, najmanja dubina) preko blokova [lo, hi)."""
+        for node in self._nodes(lo, hi):
+            low = min(low, depth + self.low[node])
+            depth += self.net[node]
+        return depth, low
+
+    def first_below(self, lo, hi, depth):
+        """
+        Prvi blok u [lo, hi) u kom dubina (počev od depth) pada ispod nule.
+        Vraća (blok ili None, dubina na početku tog bloka).
+        """
+        for node in self._nodes(lo, hi):
+            if depth + self.low[node] < 0:
+                while node < self.size:
+                    node *= 2
+                    if depth + self.low[node] >= 0:
+                        depth += self.net[node]
+                        node += 1
+                return node - self.size, depth
+            depth += self.net[node]
+        return None, depth
+
+    def last_above(self, lo, hi, pending):
+        """
+        Poslednji blok u [lo, hi) sa otvarajućim tagom koji nije zatvoren
+        do kraja opsega, kad posle njega ima još pending nezatvorenih
+        zatvarajućih. Vraća (blok ili None, pending na kraju tog bloka).
+        """
+        for node in reversed(self._nodes(lo, hi)):
+            if self.top[node] > pending:
+                while node < self.size:
+                    node = 2 * node + 1
+                    if self.top[node] <= pending:
+                        pending -= self.net[node]
+                        node -= 1
+                return node - self.size, pending
+            pending -= self.net[node]
+        return None, pending
+
+    def first_named(self, lo, hi, name):
+        """Prvi blok u [lo, hi) koji otvara element sa datim imenom."""
+        for node in self._nodes(lo, hi):
+            if name in self.names[node]:
+                while node < self.size:
+                    node *= 2
+                    if name not in self.names[node]:
+                        node += 1
+                return node - self.size
+        return None
+
+
+def _text(name):
+    return name.decode('utf-8') if isinstance(name, bytes) else name
+
+
+class ElementIndex(object):
+    """
+    Indeks elemenata dokumenta u editoru. Pozicije su UTF-8 bajtovi, kao u
+    Scintilli; element je (start otvarajućeg taga, kraj zatvarajućeg, ime).
+
+    Nezatvoren komentar ili CDATA (neispravan dokument) menja značenje
+    celog ostatka dokumenta; tada je stale True i indeks treba napraviti
+    ponovo.
+
+    Počeci blokova od indeksa shift_from naviše su u offsets upisani bez
+    odloženog pomeranja shift; pravi početak bloka daje _offset().
+    """
+
+    def __init__(self, editor, block_size=BLOCK_SIZE):
+        self.editor = editor
+        data = to_bytes(editor.getText())
+        self.length = len(data)
+        self.offsets = [0]
+        pos = block_size
+        while pos < self.length:
+            # Granica bloka nikad ne seče UTF-8 karakter
+            while pos < self.length and b'\x80' <= data[pos:pos + 1] < b'\xc0':
+                pos += 1
+            if pos < self.length:
+                self.offsets.append(pos)
+            pos += block_size
+        self.shift_from = len(self.offsets)
+        self.shift = 0
+        self.blocks = [_Block([]) for _ in self.offsets]
+        # Nijedan blok pre ovog nije prljav
+        self.dirty_from = len(self.offsets)
+        tokens, self.stale = _scan(data, 0, self.length, True)
+        buckets = [[] for _ in self.offsets]
+        current = 0
+        for start, end, delta, name in tokens:
+            while current + 1 < len(self.offsets) and start >= self.offsets[current + 1]:
+                current += 1
+            base = self.offsets[current]
+            buckets[current].append((start - base, end - base, delta, name))
+        for index, bucket in enumerate(buckets):
+            base = self.offsets[index]
+            self.blocks[index].set_tokens(bucket, self._carry_end(index) - base,
+                                          self._block_end(index) - base)
+        self._tree = _Tree(self.blocks)
+
+    def _offset(self, index):
+        """Početak bloka index, sa odloženim pomeranjem."""
+        if index >= self.shift_from:
+            return self.offsets[index] + self.shift
+        return self.offsets[index]
+
+    def _block_at(self, pos):
+        first = self.shift_from
+        if first < len(self.offsets) and pos >= self.offsets[first] + self.shift:
+            return bisect_right(self.offsets, pos - self.shift, first) - 1
+        return max(0, bisect_right(self.offsets, pos, 0, first) - 1)
+
+    def _block_end(self, index):
+        return self._offset(index + 1) if index + 1 < len(self.offsets) else self.length
+
+    def _carry_end(self, index):
+        """Apsolutna pozicija dokle sežu tokeni iz blokova pre bloka index."""
+        if not index:
+            return 0
+        return self._offset(index - 1) + self.blocks[index - 1].reach
+
+    def _shift_offsets(self, first, delta):
+        """
+        Pomera početke blokova od first naviše za delta. Upisuju se samo
+        blokovi između starog i novog shift_from (tako da im zbir sa novim
+        odloženim pomeranjem daje pravi početak), pa uzastopne izmene u
+        istom smeru ukupno prođu kroz početke blokova jednom.
+        """
+        if self.shift and first != self.shift_from:
+            low, high = min(first, self.shift_from), max(first, self.shift_from)
+            extra = -self.shift if first < self.shift_from else self.shift
+            self.offsets[low:high] = [offset + extra for offset in self.offsets[low:high]]
+        self.shift_from = first
+        self.shift += delta
+
+    def _settle(self):
+        """Upisuje odloženo pomeranje u sve početke blokova."""
+        if self.shift:
+            first = self.shift_from
+            self.offsets[first:] = [offset + self.shift for offset in self.offsets[first:]]
+        self.shift_from = len(self.offsets)
+        self.shift = 0
+
+    def _owner(self, index):
+        """Indeks poslednjeg bloka pre bloka index koji ima tokene (ili 0)."""
+        for prev in range(index - 1, -1, -1):
+            if self.blocks[prev].tokens:
+                return prev
+        return 0
+
+    def _rescan(self, index):
+        block = self.blocks[index]
+        base = self._offset(index)
+        limit = self._block_end(index)
+        begin = max(base, self._carry_end(index))
+        old_spill = block.spill
+        window = index
+        while True:
+            window_end = self._block_end(window)
+            data = to_bytes(self.editor.getTextRange(base, window_end))
+            final = window_end >= self.length
+            scanned = _scan(data, begin - base, limit - base, final)
+            if scanned is not None:
+                break
+            window += 1
+        tokens, open_ended = scanned
+        self.stale = self.stale or open_ended
+        block.set_tokens(tokens, begin - base, limit - base)
+        if self._tree is not None:
+            self._tree.update(index, block)
+        # Token koji prelazi u sledeći blok (pre ili posle izmene) menja
+        # mesto od kog se sledeći blok skenira
+        if index + 1 < len(self.blocks) and (old_spill or block.spill):
+            self.blocks[index + 1].dirty = True
+
+    def refresh(self, upto=None):
+        """Ponovo skenira prljave blokove (zaključno sa blokom upto)."""
+        if upto is None or upto >= len(self.blocks):
+            upto = len(self.blocks) - 1
+        if self._tree is None:
+            self._tree = _Tree(self.blocks)
+        for index in range(self.dirty_from, upto + 1):
+            if self.blocks[index].dirty:
+                self._rescan(index)
+        self.dirty_from = max(self.dirty_from, upto + 1)
+
+    def _mark(self, pos):
+        """
+        Označava blok sa pozicijom pos i, ako u njemu nema tokena pre pos,
+        blok sa poslednjim ranijim tokenom: nezavršen '<' se prepoznaje tek
+        na sledećem '<', pa izmena posle njega može da ga pretvori u tag.
+        """
+        index = self._block_at(pos)
+        block = self.blocks[index]
+        block.dirty = True
+        owner = index
+        if not block.starts or block.starts[0] >= pos - self._offset(index):
+            owner = self._owner(index)
+            self.blocks[owner].dirty = True
+        self.dirty_from = min(self.dirty_from, owner)
+        return index
+
+    def note_insert(self, pos, length):
+        """Prijavljuje umetanje length bajtova na poziciji pos."""
+        index = self._mark(pos)
+        self._shift_offsets(index + 1, length)
+        self.length += length
+
+    def note_delete(self, pos, length):
+        """Prijavljuje brisanje length bajtova počev od pozicije pos."""
+        end = pos + length
+        index = self._mark(pos)
+        last = len(self.offsets) - 1
+        if self._block_at(end) == index and (index < last or not index
+                                             or self._offset(index) < self.length - length):
+            # Nijedan blok ne počinje u obrisanom delu
+            self._shift_offsets(index + 1, -length)
+            self.length -= length
+            return
+        self._settle()
+        offsets = []
+        blocks = []
+        for offset, block in zip(self.offsets, self.blocks):
+            if offset > end:
+                offset -= length
+            elif offset > pos:
+                offset = pos
+                block.dirty = True
+            if offsets and offsets[-1] == offset:
+                # Blok je ceo obrisan; njegov naslednik počinje na istom mestu
+                blocks[-1] = block
+                continue
+            offsets.append(offset)
+            blocks.append(block)
+        self.length -= length
+        if offsets[-1] >= self.length and len(offsets) > 1:
+            offsets.pop()
+            blocks.pop()
+            blocks[-1].dirty = True
+            self.dirty_from = min(self.dirty_from, len(blocks) - 1)
+        if len(blocks) != len(self.blocks):
+            self._tree = None
+        self.offsets = offsets
+        self.shift_from = len(offsets)
+        self.blocks = blocks
+
+    def on_modified(self, args):
+        """Obrađuje argumente Scintilla SCN_MODIFIED obaveštenja."""
+        kind = args.get('modificationType', 0)
+        if kind & SC_MOD_INSERTTEXT:
+            self.note_insert(args['position'], args['length'])
+        elif kind & SC_MOD_DELETETEXT:
+            self.note_delete(args['position'], args['length'])
+
+    def inside(self, pos):
+        """Da li je pos strogo unutar nekog taga, komentara ili CDATA sekcije."""
+        index = self._block_at(pos)
+        self.refresh(index)
+        if self._carry_end(index) > pos:
+            return True
+        block = self.blocks[index]
+        rel = pos - self._offset(index)
+        i = bisect_right(block.starts, rel) - 1
+        return i >= 0 and block.tokens[i][0] < rel < block.tokens[i][1]
+
+    def balance(self, start, end):
+        """
+        Vraća (neto promena dubine, najmanja dubina) preko tagova koji su
+        ceo unutar [start, end).
+        """
+        first = self._block_at(start)
+        last = self._block_at(end)
+        self.refresh(last)
+        depth = low = 0
+        for index in (first, last) if first != last else (first,):
+            base = self._offset(index)
+            for token_start, token_end, delta, _ in self.blocks[index].tokens:
+                if base + token_start < start:
+                    continue
+                if base + token_end > end:
+                    break
+                depth += delta
+                low = min(low, depth)
+            if index == first and last > first + 1:
+                depth, low = self._tree.summary(first + 1, last, depth, low)
+        return depth, low
+
+    def _open_before(self, index, count, pending=0):
+        """
+        Najbliži nezatvoren otvarajući tag pre prvih count tokena bloka
+        index. Vraća (blok, indeks tokena) ili None.
+        """
+        tokens = self.blocks[index].tokens
+        for k in range(count - 1, -1, -1):
+            delta = tokens[k][2]
+            if delta < 0:
+                pending += 1
+            elif delta > 0:
+                if not pending:
+                    return index, k
+                pending -= 1
+        found, pending = self._tree.last_above(0, index, pending)
+        if found is None:
+            return None
+        return self._open_before(found, len(self.blocks[found].tokens), pending)
+
+    def _close_after(self, index, k):
+        """Apsolutni kraj zatvarajućeg taga za otvarajući token k bloka index."""
+        depth = 0
+        for token in self.blocks[index].tokens[k + 1:]:
+            depth += token[2]
+            if depth < 0:
+                return self._offset(index) + token[1]
+        found, depth = self._tree.first_below(index + 1, len(self.blocks), depth)
+        if found is None:
+            return None
+        for token in self.blocks[found].tokens:
+            depth += token[2]
+            if depth < 0:
+                return self._offset(found) + token[1]
+        return None
+
+    def _element(self, index, k):
+        start, _, _, name = self.blocks[index].tokens[k]
+        end = self._close_after(index, k)
+        return self._offset(index) + start, self.length if end is None else end, _text(name)
+
+    def enclosing(self, pos):
+        """
+        Vraća elemente koji obuhvataju poziciju pos, od najdubljeg ka
+        korenu. Element obuhvata pos ako mu otvarajući tag počinje pre pos,
+        a zatvarajući tag počinje na pos ili posle.
+        """
+        self.refresh()
+        index = self._block_at(pos)
+        found = self._open_before(index, bisect_left(self.blocks[index].starts, pos - self._offset(index)))
+        result = []
+        while found is not None:
+            result.append(self._element(*found))
+            found = self._open_before(*found)
+        return result
+
+    def next_element(self, name, pos=0):
+        """Vraća prvi element sa datim imenom koji počinje na pos ili posle, ili None."""
+        self.refresh()
+        name = to_bytes(name)
+        index = self._block_at(pos)
+        block = self.blocks[index]
+        first = bisect_left(block.starts, pos - self._offset(index))
+        while index is not None:
+            for k in range(first, len(block.tokens)):
+                token = block.tokens[k]
+                if token[2] > 0 and token[3] == name:
+                    return self._element(index, k)
+            index = self._tree.first_named(index + 1, len(self.blocks), name)
+            if index is not None:
+                block = self.blocks[index]
+                first = 0
+        return None
+
+
+def _unwrap(editor):
+    """Editor koji meri teiwrap.profiling deli indeks sa editorom koji obavija."""
+    return getattr(editor, 'wrapped', editor)
+
+
+def _document_key(editor):
+    get_pointer = getattr(editor, 'getDocPointer', None)
+    return get_pointer() if get_pointer is not None else id(editor)
+
+
+def index_for(editor):
+    """
+    Vraća indeks elemenata tekućeg dokumenta. Indeks se pravi ponovo ako se
+    dužina dokumenta promenila mimo prijavljenih izmena ili ako dokument
+    ima nezatvoren komentar.
+    """
+    editor = _unwrap(editor)
+    key = _document_key(editor)
+    index = _indexes.get(key)
+    current = (index is not None and index.editor is editor
+               and index.length == editor.getLength())
+    if current:
+        index.refresh()
+    if not current or index.stale:
+        index = ElementIndex(editor)
+        _indexes[key] = index
+        if len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def cached_index(editor):
+    """Vraća već napravljen indeks tekućeg dokumenta ili None."""
+    editor = _unwrap(editor)
+    index = _indexes.get(_document_key(editor))
+    if index is None or index.editor is not editor:
+        return None
+    return index
+
+
+def on_modified(editor, args):
+    """SCN_MODIFIED callback: prosleđuje izmenu indeksu tekućeg dokumenta."""
+    index = cached_index(editor)
+    if index is not None:
+        index.on_modified(args)
+
+
+def watch(editor, notification):
+    """
+    Registruje sinhroni callback za Scintilla izmene (notification je
+    SCINTILLANOTIFICATION.MODIFIED), pa indeks prati i kucanje, Undo i
+    izmene drugih skripti.
+    """
+    editor = _unwrap(editor)
+    if watching(editor):
+        return
+    callback = lambda args: on_modified(editor, args)
+    editor.callbackSync(callback, [notification])
+    _watched[id(editor)] = (editor, callback)
+
+
+def unwatch(editor):
+    """Uklanja callback koji je registrovao watch()."""
+    editor = _unwrap(editor)
+    if not watching(editor):
+        return
+    _, callback = _watched.pop(id(editor))
+    editor.clearCallbacks(callback)
+
+
+def watching(editor):
+    """Da li indeks dobija izmene ovog editora kroz callback."""
+    editor = _unwrap(editor)
+    entry = _watched.get(id(editor))
+    return entry is not None and entry[0] is editor
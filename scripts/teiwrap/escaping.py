@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+escaping.py
+Escapovanje i provera teksta koji ulazi u XML: vrednosti atributa, imena,
+sadržaj i xml:lang oznake. Escapovanje je jedan prolaz kroz translate
+tabelu (bez niza .replace() poziva), a sadržaj svih opsega se proverava
+odjednom, pa se mogu pozivati pri svakom obavijanju.
+"""
+
+import re
+
+# Escapovanje vrednosti atributa pod navodnicima; tab i novi red se čuvaju
+# kao reference jer bi ih XML parser inače pretvorio u razmake
+ATTR_TABLE = {
+    ord('&'): u'&amp;', ord('<'): u'&lt;', ord('>'): u'&gt;', ord('"'): u'&quot;',
+    ord('\t'): u'&#9;', ord('\n'): u'&#10;', ord('\r'): u'&#13;',
+}
+
+# Neescapovan & i kontrolni karakteri koji nisu dozvoljeni u XML 1.0
+_CONTENT_RE = re.compile(
+    br'&(?!#[0-9]+;|#x[0-9a-fA-F]+;|[^\s&;<>"\'#]+;)|[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# XML ime elementa ili atributa (Name iz XML 1.0, bez retkih znakova):
+# slovo, _ ili :, pa slova, cifre, _, :, . i -
+_NAME_RE = re.compile(r'[^\W\d.-][\w.:-]*\Z', re.U)
+
+# BCP 47 (RFC 5646) oznaka jezika: jezik[-extlang][-pismo][-region][-varijante]
+# [-proširenja][-x-privatno]
+_LANGTAG_RE = re.compile(
+    r'(?:[a-z]{2,3}(?:-[a-z]{3}){0,3}|[a-z]{4,8})'
+    r'(?:-[a-z]{4})?'
+    r'(?:-(?:[a-z]{2}|[0-9]{3}))?'
+    r'(?:-(?:[a-z0-9]{5,8}|[0-9][a-z0-9]{3}))*'
+    r'(?:-[0-9a-wy-z](?:-[a-z0-9]{2,8})+)*'
+    r'(?:-x(?:-[a-z0-9]{1,8})+)?\Z'
+    r'|x(?:-[a-z0-9]{1,8})+\Z', re.IGNORECASE)
+
+# Oznake iz starijih standarda koje RFC 5646 zadržava u celini
+GRANDFATHERED = frozenset([
+    'en-gb-oed', 'i-ami', 'i-bnn', 'i-default', 'i-enochian', 'i-hak', 'i-klingon',
+    'i-lux', 'i-mingo', 'i-navajo', 'i-pwn', 'i-tao', 'i-tay', 'i-tsu', 'sgn-be-fr',
+    'sgn-be-nl', 'sgn-ch-de', 'art-lojban', 'cel-gaulish', 'no-bok', 'no-nyn',
+    'zh-guoyu', 'zh-hakka', 'zh-min', 'zh-min-nan', 'zh-xiang',
+])
+
+
+def to_native(text):
+    """
+    Vraća tekst kao str: UTF-8 bajtove u Python 2, unicode u Python 3, pa se
+    vrednosti iz editora, dijaloga i gazetira (unicode) mogu spajati u iste tagove.
+    """
+    if isinstance(text, str):
+        return text
+    if isinstance(text, bytes):
+        return text.decode('utf-8')
+    return text.encode('utf-8')
+
+
+def _translate(value, table):
+    """Primenjuje tabelu na tekst; bajtovi (Python 2 str) se vraćaju kao bajtovi."""
+    if isinstance(value, bytes):
+        return value.decode('utf-8').translate(table).encode('utf-8')
+    return value.translate(table)
+
+
+def escape_attr(value):
+    """Escapuje vrednost atributa (&, <, >, ", tab i novi red) u jednom prolazu."""
+    return _translate(value, ATTR_TABLE)
+
+
+def valid_lang(value):
+    """Da li je vrednost ispravna BCP 47 oznaka jezika (prazna znači "bez jezika")."""
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', 'replace')
+    if value == u'':
+        return True
+    return value.lower() in GRANDFATHERED or _LANGTAG_RE.match(value) is not None
+
+
+def valid_name(name):
+    """Da li je name ispravno XML ime elementa ili atributa."""
+    if isinstance(name, bytes):
+        name = name.decode('utf-8', 'replace')
+    return _NAME_RE.match(name) is not None
+
+
+def check_name(name):
+    """Vraća opis problema sa imenom elementa ili atributa ili None."""
+    if not valid_name(name):
+        return "\"{0}\" nije ispravno XML ime".format(to_native(name))
+    return None
+
+
+def check_attr(name, value):
+    """Vraća opis problema sa vrednošću atributa ili None."""
+    if name == 'xml:lang' and not valid_lang(value):
+        return "xml:lang \"{0}\" nije ispravna BCP 47 oznaka jezika".format(to_native(value))
+    return None
+
+
+def check_text(data, start=0, end=None):
+    """
+    Vraća listu (pozicija, opis) za neescapovane & i nedozvoljene kontrolne
+    karaktere u data[start:end]; data su bajtovi ili mmap.
+    """
+    if end is None:
+        end = len(data)
+    problems = []
+    for match in _CONTENT_RE.finditer(data, start, end):
+        if match.group() == b'&':
+            problems.append((match.start(), "neescapovan & (treba &amp;)"))
+        else:
+            problems.append((match.start(), "kontrolni karakter nije dozvoljen u XML-u"))
+    return problems
+
+
+def check_spans(data, spans):
+    """
+    Proverava sadržaj svih opsega (start, end) odjednom: preklopljeni i
+    ugnježdeni opsezi se spajaju, pa se svaki bajt čita najviše jednom.
+    """
+    problems = []
+    merged_start = merged_end = None
+    for start, end in sorted(spans):
+        if merged_end is not None and start <= merged_end:
+            merged_end = max(merged_end, end)
+            continue
+        if merged_end is not None:
+            problems.extend(check_text(data, merged_start, merged_end))
+        merged_start, merged_end = start, end
+    if merged_end is not None:
+        problems.extend(check_text(data, merged_start, merged_end))
+    return problems
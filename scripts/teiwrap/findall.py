@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+findall.py
+Obavijanje svih pojavljivanja fraze ili regularnog izraza u dokumentu.
+Pogoci dolaze iz Scintilla pretrage (searchInTarget), bez kopiranja
+dokumenta u Python. Pogoci koji su već unutar istog taga ili bi napravili
+ukrštene elemente se preskaču po zajedničkom indeksu elemenata
+(teiwrap.elements): on pri prvom pravljenju jednom kopira dokument
+(getText), a posle prati izmene. Sve ostalo se obavija jednom izmenom
+(jedan Undo korak, jedno iscrtavanje).
+"""
+
+import re
+
+from teiwrap import elements, wellformed
+from teiwrap.batch import byte_len, wrap_ranges
+from teiwrap.escaping import valid_name
+from teiwrap.unwrap import SCFIND_MATCHCASE
+
+# Scintilla SCFIND_REGEX i SCFIND_CXX11REGEX (ECMAScript sintaksa, kao u Find dijalogu)
+SCFIND_REGEX = 0x00200000
+SCFIND_CXX11REGEX = 0x00800000
+
+# searchInTarget vraća -2 za neispravan regularni izraz
+SEARCH_ERROR = -2
+
+# Atribut ime="vrednost", ime='vrednost' ili ime=vrednost
+_SPEC_RE = re.compile(r'\s*(\S+?)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\']+))', re.U)
+
+# Jedan element lanca: tekst do '>' van navodnika
+_LINK_RE = re.compile(r'(?:[^>"\']|"[^"]*"|\'[^\']*\')+')
+
+
+def parse_element(spec):
+    """
+    Pretvara unos kao 'foreign xml:lang="la"' u (tag, [(ime, vrednost)]).
+    Baca ValueError za neispravno ime ili atribut.
+    """
+    spec = spec.strip()
+    parts = spec.split(None, 1)
+    if not parts or not valid_name(parts[0]):
+        raise ValueError(u"Neispravno ime elementa: {0}".format(parts[0] if parts else spec))
+    rest = parts[1] if len(parts) > 1 else u''
+    attrs = []
+    pos = 0
+    while rest[pos:].strip():
+        match = _SPEC_RE.match(rest, pos)
+        if match is None or not valid_name(match.group(1)):
+            raise ValueError(u"Neispravan atribut: {0}".format(rest[pos:].strip()))
+        value = [group for group in match.groups()[1:] if group is not None][0]
+        attrs.append((match.group(1), value))
+        pos = match.end()
+    return parts[0], attrs
+
+
+def parse_chain(spec):
+    """
+    Pretvara lanac elemenata od spoljašnjeg ka unutrašnjem, kao
+    'title > foreign xml:lang="la"', u listu (tag, [(ime, vrednost)]).
+    Baca ValueError za prazan lanac ili neispravan element.
+    """
+    links = [link for link in _LINK_RE.findall(spec) if link.strip()]
+    if not links or spec.count('>') - sum(link.count('>') for link in links) != len(links) - 1:
+        raise ValueError(u"Neispravan lanac elemenata: {0}".format(spec))
+    return [parse_element(link) for link in links]
+
+
+def find_all(editor, text, regex=False):
+    """
+    Vraća (start, end) svih nepreklapajućih pojavljivanja teksta (ili
+    regularnog izraza) u dokumentu; prazni pogoci se preskaču. Baca
+    ValueError za neispravan regularni izraz.
+    """
+    flags = SCFIND_MATCHCASE | (SCFIND_REGEX | SCFIND_CXX11REGEX if regex else 0)
+    editor.setSearchFlags(flags)
+    length = editor.getLength()
+    matches = []
+    pos = 0
+    while pos < length:
+        editor.setTargetRange(pos, length)
+        found = editor.searchInTarget(text)
+        if found == SEARCH_ERROR:
+            raise ValueError(u"Neispravan regularni izraz: {0}".format(text))
+        if found < 0:
+            break
+        end = editor.getTargetEnd()
+        if end > found:
+            matches.append((found, end))
+            pos = end
+        else:
+            pos = editor.positionAfter(found)
+    return matches
+
+
+def split_matches(editor, matches, tag):
+    """
+    Deli pogotke na (za obavijanje, već u tagu, ukršteni): pogodak unutar
+    elementa tag se ne obavija ponovo, a pogodak koji seče elemente (ili je
+    unutar taga ili komentara) ne sme da se obavije. Koristi indeks
+    elemenata dokumenta, koji se pravi (uz kopiju teksta) samo ako ga nema.
+    """
+    if not matches:
+        return [], [], []
+    index = elements.index_for(editor)
+    wrap, inside, crossing = [], [], []
+    for start, end in matches:
+        if wellformed.problem(index, start, end):
+            crossing.append((start, end))
+        elif any(name == tag for _, _, name in index.enclosing(start)):
+            inside.append((start, end))
+        else:
+            wrap.append((start, end))
+    return wrap, inside, crossing
+
+
+def wrap_all(editor, text, tag, open_text, close_text, regex=False):
+    """
+    Obavija sva pojavljivanja teksta u open_text/close_text i vraća
+    (obavijeni, već u tagu, ukršteni) kao liste opsega pre izmene.
+    Selekcije se pomeraju sa izmenom, a ne menjaju se.
+    """
+    wrap, inside, crossing = split_matches(editor, find_all(editor, text, regex), tag)
+    if wrap:
+        wrap_ranges(editor, wrap, open_text, close_text, restore=False)
+        wellformed.note_wrap(editor, wrap, byte_len(open_text), byte_len(close_text))
+    return wrap, inside, crossing
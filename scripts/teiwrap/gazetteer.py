@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+gazetteer.py
+Automatsko obeležavanje po gazetiru (spisak fraza -> tag/atributi).
+Sve fraze se traže u jednom prolazu kroz tekst pomoću Aho-Corasick
+automata nad UTF-8 bajtovima, pa vreme pretrage ne zavisi od broja fraza.
+Izgrađeni automat se kešira na disku pored gazetira.
+
+Format gazetira (UTF-8, polja razdvojena tabom):
+    fraza<TAB>tag[<TAB>ime=vrednost ...]
+"""
+
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import sys
+
+from teiwrap.batch import insert_all
+from teiwrap.escaping import check_attr, check_name
+from teiwrap.headless import CHUNK_SIZE, apply_spans, insertion_plan
+from teiwrap.tags import to_bytes
+
+# Verzija formata keša; povećati kad se promeni struktura automata
+CACHE_VERSION = 1
+
+
+def parse_gazetteer(lines):
+    """Vraća listu (fraza, tag, attrs) iz redova gazetira."""
+    entries = []
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if not line.strip() or line.startswith('#'):
+            continue
+        fields = line.split('\t')
+        if len(fields) < 2 or not fields[0]:
+            raise ValueError("Red {0}: očekivano fraza i tag".format(number))
+        reason = check_name(fields[1])
+        if reason:
+            raise ValueError("Red {0}: {1}".format(number, reason))
+        attrs = []
+        for field in fields[2:]:
+            name, sep, value = field.partition('=')
+            if not sep:
+                raise ValueError("Red {0}: atribut mora biti ime=vrednost".format(number))
+            reason = check_name(name) or check_attr(name, value)
+            if reason:
+                raise ValueError("Red {0}: {1}".format(number, reason))
+            attrs.append((name, value))
+        entries.append((fields[0], fields[1], attrs))
+    return entries
+
+
+def _is_word(char):
+    return char.isalnum() or char == '_'
+
+
+class Gazetteer(object):
+    """Aho-Corasick automat nad UTF-8 bajtovima fraza iz gazetira."""
+
+    def __init__(self, entries):
+        # Stanje 0 je koren; goto[stanje] je rečnik bajt -> sledeće stanje
+        self.entries = []
+        self.goto = [{}]
+        self.output = [-1]
+        phrase_index = {}
+        for phrase, tag, attrs in entries:
+            data = to_bytes(phrase)
+            if data in phrase_index:
+                # Kasniji unos iste fraze pobeđuje
+                self.entries[phrase_index[data]] = (len(data), tag, attrs, self._bounded(phrase))
+                continue
+            state = 0
+            for byte in bytearray(data):
+                nxt = self.goto[state].get(byte)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][byte] = nxt
+                    self.goto.append({})
+                    self.output.append(-1)
+                state = nxt
+            phrase_index[data] = len(self.entries)
+            self.output[state] = len(self.entries)
+            self.entries.append((len(data), tag, attrs, self._bounded(phrase)))
+        self._build_links()
+
+    @staticmethod
+    def _bounded(phrase):
+        """Da li fraza zahteva granicu reči na početku i na kraju."""
+        if not isinstance(phrase, type(u'')):
+            phrase = phrase.decode('utf-8')
+        return _is_word(phrase[0]), _is_word(phrase[-1])
+
+    def _build_links(self):
+        """Računa fail i dictionary linkove obilaskom u širinu."""
+        self.fail = [0] * len(self.goto)
+        self.dict_link = [-1] * len(self.goto)
+        queue = list(self.goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for byte, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and byte not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(byte, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                link = self.fail[nxt]
+                self.dict_link[nxt] = link if self.output[link] >= 0 else self.dict_link[link]
+
+    def scan(self, data, chunk_size=CHUNK_SIZE):
+        """
+        Vraća sve pogotke kao listu (start, end, indeks unosa) u jednom
+        prolazu. Pogoci unutar tagova (<...>) i preko tagova se preskaču.
+        """
+        goto, fail, output, dict_link = self.goto, self.fail, self.output, self.dict_link
+        entries = self.entries
+        matches = []
+        state = 0
+        in_tag = False
+        last_markup = -1
+        size = len(data)
+        for offset in range(0, size, chunk_size):
+            pos = offset
+            for byte in bytearray(data[offset:offset + chunk_size]):
+                if byte == 60:  # '<'
+                    in_tag = True
+                    last_markup = pos
+                elif byte == 62:  # '>'
+                    in_tag = False
+                    last_markup = pos
+                while state and byte not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(byte, 0)
+                hit = state if output[state] >= 0 else dict_link[state]
+                while hit > 0:
+                    index = output[hit]
+                    start = pos + 1 - entries[index][0]
+                    if not in_tag and start > last_markup:
+                        matches.append((start, pos + 1, index))
+                    hit = dict_link[hit]
+                pos += 1
+        return matches
+
+    def find(self, data):
+        """
+        Vraća nepreklapajuće pogotke (najlevlji, pa najduži) kao (start, end,
+        tag, attrs). Pogodak koji je već ceo sadržaj svog elementa se ne
+        vraća (ali zauzima mesto), pa ponovno obeležavanje ništa ne menja.
+        """
+        candidates = sorted(self.scan(data), key=lambda m: (m[0], m[0] - m[1]))
+        spans = []
+        last_end = 0
+        for start, end, index in candidates:
+            if start < last_end:
+                continue
+            _, tag, attrs, (bound_start, bound_end) = self.entries[index]
+            if bound_start and _is_word(data[max(0, start - 4):start].decode('utf-8', 'ignore')[-1:] or ' '):
+                continue
+            if bound_end and _is_word(data[end:end + 4].decode('utf-8', 'ignore')[:1] or ' '):
+                continue
+            if not _wrapped(data, start, end, tag):
+                spans.append((start, end, tag, attrs))
+            last_end = end
+        return spans
+
+
+def _wrapped(data, start, end, tag):
+    """Da li je opseg ceo sadržaj elementa tag (<tag ...>opseg</tag>)."""
+    tag = to_bytes(tag)
+    close = b'</' + tag + b'>'
+    if data[end:end + len(close)] != close or data[start - 1:start] != b'>':
+        return False
+    open_start = data.rfind(b'<', 0, start)
+    return (data[open_start:open_start + len(tag) + 1] == b'<' + tag
+            and data[open_start + len(tag) + 1:open_start + len(tag) + 2] in (b'>', b' ', b'\t', b'\n', b'\r'))
+
+
+def load_gazetteer(path, cache_path=None):
+    """
+    Učitava gazetir iz fajla. Automat se čuva u cache_path (podrazumevano
+    path + '.cache') i ponovo gradi samo kad se sadržaj gazetira promeni.
+    """
+    if cache_path is None:
+        cache_path = path + '.cache'
+    with open(path, 'rb') as handle:
+        raw = handle.read()
+    digest = hashlib.sha1(raw).hexdigest()
+    try:
+        with open(cache_path, 'rb') as handle:
+            cached = pickle.load(handle)
+        if (cached.get('version') == CACHE_VERSION and cached.get('digest') == digest
+                and cached.get('python') == sys.version_info[0]):
+            return cached['gazetteer']
+    except (IOError, OSError, EOFError, ValueError, pickle.UnpicklingError, AttributeError):
+        pass
+    gazetteer = Gazetteer(parse_gazetteer(io.StringIO(raw.decode('utf-8-sig'))))
+    try:
+        with open(cache_path, 'wb') as handle:
+            pickle.dump({'version': CACHE_VERSION, 'digest': digest,
+                         'python': sys.version_info[0], 'gazetteer': gazetteer}, handle, 2)
+    except (IOError, OSError):
+        pass
+    return gazetteer
+
+
+def markup_document(editor, gazetteer):
+    """Obeležava sve pogotke u dokumentu editora kao jedan Undo korak."""
+    spans = gazetteer.find(to_bytes(editor.getText()))
+    insert_all(editor, insertion_plan(spans))
+    return len(spans)
+
+
+def markup_file(path, gazetteer, out_path=None):
+    """Obeležava sve pogotke u fajlu; vraća broj obeleženih fraza."""
+    with open(path, 'rb') as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            spans = []
+        else:
+            data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                spans = gazetteer.find(data)
+            finally:
+                data.close()
+    if spans or (out_path and out_path != path):
+        apply_spans(path, spans, out_path or path)
+    return len(spans)
+
+
+def markup_folder(folder, gazetteer, extension='.xml', out_folder=None):
+    """Obeležava sve fajlove sa datom ekstenzijom u folderu (rekurzivno)."""
+    results = {}
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if not name.endswith(extension):
+                continue
+            path = os.path.join(root, name)
+            out_path = None
+            if out_folder:
+                out_path = os.path.join(out_folder, os.path.relpath(path, folder))
+                if not os.path.isdir(os.path.dirname(out_path)):
+                    os.makedirs(os.path.dirname(out_path))
+            results[path] = markup_file(path, gazetteer, out_path)
+    return results
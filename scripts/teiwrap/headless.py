@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+headless.py
+Primena wrap operacija na fajlove van Notepad++ (za obradu korpusa).
+Ulaz se čita kroz mmap i prepisuje u delovima, pa potrošnja memorije ne
+zavisi od veličine fajla, već samo od broja opsega. Tagovi se prave istim
+kodom kao u editoru (teiwrap.tags), pa je izlaz bajt-identičan.
+"""
+
+import hashlib
+import mmap
+import os
+import shutil
+import tempfile
+
+from teiwrap.elements import _MARKUP_RE, _token
+from teiwrap.escaping import check_attr, check_name, check_spans
+from teiwrap.offsets import OffsetIndex
+from teiwrap.tags import element, to_bytes
+
+# Veličina dela koji se odjednom kopira iz ulaza u izlaz
+CHUNK_SIZE = 1024 * 1024
+
+
+def parse_spans(lines):
+    """
+    Čita opsege iz redova oblika: start<TAB>end<TAB>tag[<TAB>ime=vrednost ...].
+    Prazni redovi i redovi koji počinju sa # se preskaču.
+    Vraća listu (start, end, tag, attrs); baca ValueError sa brojem reda za
+    neispravan red, ime elementa ili atributa.
+    """
+    spans = []
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if not line.strip() or line.startswith('#'):
+            continue
+        fields = line.split('\t')
+        if len(fields) < 3:
+            raise ValueError("Red {0}: očekivano start, end i tag".format(number))
+        reason = check_name(fields[2])
+        if reason:
+            raise ValueError("Red {0}: {1}".format(number, reason))
+        attrs = []
+        for field in fields[3:]:
+            name, sep, value = field.partition('=')
+            if not sep:
+                raise ValueError("Red {0}: atribut mora biti ime=vrednost".format(number))
+            reason = check_name(name) or check_attr(name, value)
+            if reason:
+                raise ValueError("Red {0}: {1}".format(number, reason))
+            attrs.append((name, value))
+        spans.append((int(fields[0]), int(fields[1]), fields[2], attrs))
+    return spans
+
+
+def char_spans_to_bytes(src_path, spans):
+    """
+    Pretvara opsege (start, end, tag, attrs) sa pozicijama karaktera (npr. iz
+    alata koji rade nad Python tekstom) u bajt pozicije fajla src_path.
+    Baca ValueError za poziciju van fajla.
+    """
+    with open(src_path, 'rb') as src:
+        size = os.fstat(src.fileno()).st_size
+        data = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        try:
+            index = OffsetIndex.for_bytes(data)
+            return [(index.to_byte(start), index.to_byte(end), tag, attrs) for start, end, tag, attrs in spans]
+        finally:
+            if size:
+                data.close()
+
+
+def insertion_plan(spans):
+    """
+    Pretvara opsege (start, end, tag, attrs) u sortiranu listu (pozicija, bajtovi).
+    Opsezi smeju biti ugnježdeni ali ne i da se seku. Na istoj poziciji
+    zatvarajući tagovi idu pre otvarajućih; za iste opsege prvi u listi je spoljašnji.
+    Prazni opsezi se preskaču, kao prazne selekcije u editoru.
+    """
+    for start, end, _, _ in spans:
+        if start < 0 or end < start:
+            raise ValueError("Neispravan opseg: {0}-{1}".format(start, end))
+    spans = [span for span in spans if span[1] > span[0]]
+    _check_nesting(spans)
+    tagged = []
+    for start, end, tag, attrs in spans:
+        open_text, close_text = element(tag, attrs)
+        tagged.append((start, end, to_bytes(open_text), to_bytes(close_text)))
+    return text_plan(tagged)
+
+
+def text_plan(spans):
+    """
+    Kao insertion_plan, ali za gotove tagove: opsezi su (start, end,
+    otvarajući bajtovi, zatvarajući bajtovi), već provereni da se ne seku.
+    """
+    events = []
+    for order, (start, end, open_text, close_text) in enumerate(spans):
+        # (pozicija, vrsta, ključ za redosled, tekst); vrsta 0 = zatvaranje
+        events.append((start, 1, (-end, order), open_text))
+        events.append((end, 0, (-start, -order), close_text))
+    events.sort(key=lambda event: event[:3])
+    return [(pos, text) for pos, _, _, text in events]
+
+
+def _check_nesting(spans):
+    """Baca ValueError ako se neka dva opsega seku."""
+    stack = []
+    for start, end, tag, _ in sorted(spans, key=lambda span: (span[0], -span[1])):
+        while stack and stack[-1][1] <= start:
+            stack.pop()
+        if stack and end > stack[-1][1]:
+            raise ValueError("Opsezi se seku: <{0}> {1}-{2} i <{3}> {4}-{5}".format(
+                stack[-1][2], stack[-1][0], stack[-1][1], tag, start, end))
+        stack.append((start, end, tag))
+
+
+def check_markup(data, spans):
+    """
+    Baca ValueError ako neki opseg (start, end, opis) počinje ili se završava
+    unutar taga ili komentara u tekstu, ili seče elemente koji su već u
+    tekstu, kao wellformed.problem u editoru. Opsezi se ne smeju seći
+    međusobno (_check_nesting). Tekst se čita jednim prolazom.
+    """
+    # (pozicija, vrsta, ključ za redosled, opseg); vrsta 0 = kraj, kao u text_plan
+    events = []
+    for number, (start, end, _) in enumerate(spans):
+        events.append((start, 1, (-end, number), number))
+        events.append((end, 0, (-start, -number), number))
+    events.sort()
+    open_depths = []
+    depth = 0
+    k = 0
+
+    def fail(number, reason):
+        start, end, label = spans[number]
+        raise ValueError(u"{0} {1}-{2}: {3}".format(label, start, end, reason))
+
+    def settle(limit):
+        """Obrađuje početke i krajeve opsega do pozicije limit; vraća indeks sledećeg."""
+        index = k
+        while index < len(events) and events[index][0] <= limit:
+            _, kind, _, number = events[index]
+            if kind:
+                open_depths.append((depth, number))
+            else:
+                if open_depths.pop()[0] != depth:
+                    fail(number, u"seče element koji se zatvara posle kraja")
+            index += 1
+        return index
+
+    for match in _MARKUP_RE.finditer(data):
+        k = settle(match.start())
+        if k < len(events) and events[k][0] < match.end():
+            fail(events[k][3], u"počinje ili se završava unutar taga")
+        delta = _token(match)[0]
+        depth += delta
+        if delta < 0 and open_depths and open_depths[-1][0] > depth:
+            fail(open_depths[-1][1], u"seče element otvoren pre početka")
+    settle(len(data))
+
+
+def check_file_markup(src_path, spans):
+    """check_markup za fajl src_path, čitan kroz mmap; prazni opsezi se preskaču."""
+    spans = [span for span in spans if span[1] > span[0]]
+    if not spans or not os.path.getsize(src_path):
+        return
+    with open(src_path, 'rb') as src:
+        data = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            check_markup(data, spans)
+        finally:
+            data.close()
+
+
+def _is_continuation(data, pos):
+    """Da li pozicija pada u sredinu UTF-8 karaktera."""
+    return b'\x80' <= data[pos:pos + 1] <= b'\xbf'
+
+
+def _copy(data, out, start, end, chunk_size):
+    while start < end:
+        stop = min(start + chunk_size, end)
+        out.write(data[start:stop])
+        start = stop
+
+
+def apply_edits(src, out, edits, chunk_size=CHUNK_SIZE):
+    """
+    Prepisuje otvoreni binarni fajl src u out, primenjujući sortirane izmene
+    (pozicija, broj obrisanih bajtova, novi tekst).
+    """
+    size = os.fstat(src.fileno()).st_size
+    data = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+    try:
+        pos = 0
+        for at, length, text in edits:
+            if at < pos or at + length > size:
+                raise ValueError("Pozicija {0} je van fajla ({1} bajtova)".format(at, size))
+            if at < size and _is_continuation(data, at):
+                raise ValueError("Pozicija {0} je u sredini UTF-8 karaktera".format(at))
+            _copy(data, out, pos, at, chunk_size)
+            out.write(text)
+            pos = at + length
+        _copy(data, out, pos, size, chunk_size)
+    finally:
+        if size:
+            data.close()
+
+
+def apply_plan(src, out, plan, chunk_size=CHUNK_SIZE):
+    """Prepisuje otvoreni binarni fajl src u out, umećući tekst po planu."""
+    apply_edits(src, out, [(pos, 0, text) for pos, text in plan], chunk_size)
+
+
+def rewrite_file(src_path, edits, out_path, chunk_size=CHUNK_SIZE):
+    """
+    Primenjuje izmene (pozicija, dužina, tekst) na fajl src_path i upisuje
+    rezultat u out_path. Izlaz se piše u privremeni fajl pa preimenuje, pa
+    out_path sme biti isti kao src_path.
+    """
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            with open(src_path, 'rb') as src:
+                apply_edits(src, out, edits, chunk_size)
+        shutil.copymode(src_path, tmp_path)
+        _replace(tmp_path, out_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def apply_spans(src_path, spans, out_path, chunk_size=CHUNK_SIZE):
+    """
+    Obavija opsege (bajt pozicije, kao u Scintilli) u fajlu src_path i upisuje
+    rezultat u out_path (sme biti isti kao src_path). Baca ValueError, kao
+    wrap u editoru, za opseg koji počinje unutar taga ili seče element.
+    """
+    plan = insertion_plan(spans)
+    check_file_markup(src_path, [(start, end, u"Opseg <{0}>".format(tag)) for start, end, tag, _ in spans])
+    rewrite_file(src_path, [(pos, 0, text) for pos, text in plan], out_path, chunk_size)
+    return len(spans)
+
+
+def content_problems(src_path, spans):
+    """
+    Vraća listu (pozicija, opis) za neescapovane & i kontrolne karaktere
+    unutar opsega (start, end, tag, attrs) u fajlu src_path.
+    """
+    with open(src_path, 'rb') as src:
+        if not os.fstat(src.fileno()).st_size:
+            return []
+        data = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return check_spans(data, [(span[0], min(span[1], len(data))) for span in spans])
+        finally:
+            data.close()
+
+
+def file_hash(path, chunk_size=CHUNK_SIZE):
+    """SHA-1 sadržaja fajla, čitanog u delovima."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _replace(src, dst):
+    """os.replace (Python 3) sa rezervom za Python 2.7."""
+    replace = getattr(os, 'replace', None)
+    if replace is not None:
+        replace(src, dst)
+        return
+    if os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src, dst)
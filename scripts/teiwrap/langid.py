@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+langid.py
+Mali, potpuno lokalni prepoznavač jezika za predlog xml:lang vrednosti.
+Koristi n-grame karaktera (1-3) i unapred izračunate, rangirane profile
+jezika iz teiwrap.langprofiles (Cavnar-Trenkle "out-of-place" mera).
+Rezultati za kratke tekstove (do SAMPLE_BYTES znakova) se keširaju po
+samom tekstu.
+"""
+
+import re
+from collections import OrderedDict
+
+from teiwrap.langprofiles import PROFILES, PROFILE_SIZE
+
+# Najviše ovoliko bajtova selekcije se čita za prepoznavanje
+SAMPLE_BYTES = 1024
+
+# Broj zapamćenih rezultata (izbacuje se najdavnije korišćen, LRU)
+CACHE_SIZE = 256
+
+_NON_LETTERS = re.compile(u"[^\\w']+|[\\d_]+", re.UNICODE)
+
+# Slova po kojima se ćirilica razlikuje između srpskog i ruskog
+_SERBIAN_ONLY = set(u'ђћџљњј')
+_RUSSIAN_ONLY = set(u'ыэъёщй')
+
+# Slova srpske latinice kojih nema u ostalim profilisanim jezicima
+_SERBIAN_LATIN = set(u'čćđšž')
+
+_ranks = dict(
+    (lang, dict((gram, rank) for rank, gram in enumerate(profile.split(' '))))
+    for lang, profile in PROFILES.items()
+)
+_cache = OrderedDict()
+
+
+def _to_text(text):
+    if isinstance(text, bytes):
+        return text.decode('utf-8', 'ignore')
+    return text
+
+
+def ngrams(text):
+    """Vraća rečnik n-gram -> broj pojavljivanja (n = 1..3, reči su omeđene sa _)."""
+    counts = {}
+    for word in _NON_LETTERS.sub(u' ', text.lower()).split():
+        padded = u'_' + word + u'_'
+        length = len(padded)
+        for n in (1, 2, 3):
+            for i in range(length - n + 1):
+                gram = padded[i:i + n]
+                if gram != u'_':
+                    counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def build_profile(text, size=PROFILE_SIZE):
+    """Pravi rangirani profil (niz n-grama razdvojenih razmakom) iz uzorka teksta."""
+    counts = ngrams(_to_text(text))
+    ranked = sorted(counts, key=lambda gram: (-counts[gram], gram))
+    return u' '.join(ranked[:size])
+
+
+def _candidates(text):
+    """Sužava skup jezika po pismu teksta."""
+    letters = set(text.lower())
+    if any(u'Ͱ' <= char <= u'Ͽ' or u'ἀ' <= char <= u'῿' for char in letters):
+        return ['el']
+    if any(u'Ѐ' <= char <= u'ӿ' for char in letters):
+        if letters & _SERBIAN_ONLY:
+            return ['sr']
+        if letters & _RUSSIAN_ONLY:
+            return ['ru']
+        return ['sr', 'ru']
+    if letters & _SERBIAN_LATIN:
+        return ['sr']
+    return [lang for lang in _ranks if lang not in ('el', 'ru')]
+
+
+def scores(text):
+    """Vraća listu (rastojanje, jezik) sortiranu od najverovatnijeg jezika."""
+    text = _to_text(text)
+    counts = ngrams(text)
+    doc_ranked = sorted(counts, key=lambda gram: (-counts[gram], gram))[:PROFILE_SIZE]
+    result = []
+    for lang in _candidates(text):
+        ranks = _ranks[lang]
+        distance = 0
+        for doc_rank, gram in enumerate(doc_ranked):
+            rank = ranks.get(gram)
+            distance += PROFILE_SIZE if rank is None else abs(rank - doc_rank)
+        result.append((distance, lang))
+    result.sort()
+    return result
+
+
+def detect(text, default=None):
+    """Vraća najverovatniji jezik teksta ili default ako tekst nema slova."""
+    # Ključ je ceo tekst (heš sam nije jedinstven), pa keš drži najviše
+    # CACHE_SIZE tekstova od po SAMPLE_BYTES znakova
+    text = _to_text(text)
+    cached = len(text) <= SAMPLE_BYTES
+    if cached and text in _cache:
+        # Pogodak ide na kraj (LRU); move_to_end ne postoji u Python 2.7
+        lang = _cache[text] = _cache.pop(text)
+        return lang or default
+    ranked = scores(text) if _NON_LETTERS.sub(u'', text) else []
+    lang = ranked[0][1] if ranked else None
+    if cached:
+        _cache[text] = lang
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return lang or default
+
+
+def detect_selection(editor, default=None):
+    """Prepoznaje jezik prve neprazne selekcije, čitajući najviše SAMPLE_BYTES bajtova."""
+    for i in range(editor.getSelections()):
+        start = editor.getSelectionNStart(i)
+        end = editor.getSelectionNEnd(i)
+        if end > start:
+            stop = min(end, start + SAMPLE_BYTES)
+            if stop < end:
+                # Uzorak se ne sme završiti usred UTF-8 znaka
+                stop = editor.positionBefore(stop + 1)
+            return detect(editor.getTextRange(start, stop), default)
+    return default
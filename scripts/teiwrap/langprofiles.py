@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+langprofiles.py
+Rangirani profili n-grama karaktera za teiwrap.langid, napravljeni sa
+langid.build_profile iz nekoliko pasusa opšteg teksta po jeziku.
+Svaki profil je niz od najviše PROFILE_SIZE n-grama razdvojenih razmakom,
+od najčešćeg ka ređem.
+"""
+
+PROFILE_SIZE = 500
+
+PROFILES = {
+    'de': (
+        u"e n i r s t d a h er en n_ u g c ch m r_ e_ t_ _d l de en_ er_ _s ie "
+        u"w ei s_ ge nd _g ic ich _w in der un b _e d_ f ht ie_ o re te _de _u "
+        u"nd_ _i _m es z _ge as cht h_ st _un ch_ _n he ht_ _a _di _si an di "
+        u"die ein ni si und wa _ni _z as_ it m_ sc sch se _b es_ ne we _f _we "
+        u"be da it_ k li me ns ten _da _ei _v _wa ed el ens g_ ges ine is ng "
+        u"nic st_ u_ v zu zu_ _h _ic _so _ve _zu ac ach al che das de_ ede eh "
+        u"eit hen in_ le ll ma nde p ren so ss ter ve ver ze ß ä _be _er _fr "
+        u"_gr _me _mi _t ar eg em fe fr fre gr ind lt men mi ng_ or ra rd ru "
+        u"sie tt um ung ü _al _k ab and eb elt erl eu geh ha hte ih ist l_ la "
+        u"lic lie lle lt_ mu rde rei rl sa sp sse ste te_ tr tte ut was wer _bi "
+        u"_es _in _is _l _ma _r _re _sc _se _st _tr _um _ze abe all am ar_ ass "
+        u"au bi des ehe eht eiß em_ ere ern ese et gen gre hei hi hr hre im iß "
+        u"iß_ ke man mit mm nie nsc nst nt o_ re_ rli rn sen sic sin so_ ta um_ "
+        u"ur us war wi zei zen ß_ _ab _an _au _ha _ih _im _j _je _li _sa _sp "
+        u"_wi _wü a_ af ag ah am_ an_ at bed beg br bs bst cha deu eih end enz "
+        u"erd erw esp eut ew fen ff ffe ft ft_ ga geb gew gi haf he_ hl hü ieb "
+        u"ien ier ig ihe ihr im_ j je jed ko kom las lei ler ls mac mei mic mme "
+        u"mut na nan nem nen ner nes nge nn nn_ nu nz nze ol oll om omm or_ pe "
+        u"pen rac reg rg rge rn_ ro run rw rwa seh sel sol spe tas tl tra tu "
+        u"tun tz us_ ute utt wei wel wü wür zi ße ür ürd _ac _am _br _do _en "
+        u"_et _eu _fa _fe _fi _ga _gi _gl _he _hi _ho _hü _ka _ki _kl _ko _la "
+        u"_mo _mu _mä _no _nu _nä _ta _te _vo _wo _wu _wä _zi _ä _än aa aat abt "
+        u"aff aft age agt ah_ ahl al_ als alt ams ang ank ann ans ant art aru "
+        u"asc ast atl att auf aur aus az azu aß aße b_ ba bar be_ ben ber bet "
+        u"bin bis bit bo bor bra brü bt bt_ chi chk chl chs chw chü dan daz dc "
+        u"dch del dem den dl dla do dor eb_ ebo ebr ebs ec ech eda ef efe ega"
+    ),
+    'el': (
+        u"α ο ι ν ε τ α_ ι_ ρ π μ σ η ν_ αι κ δ _τ ύ _μ ά αι_ τα ό _π ί ε_ λ το "
+        u"υ _κ _ο _σ έ γ κα οι ς ς_ η_ ο_ οι_ τα_ φ _ε _κα ή και να ον ού _δ "
+        u"_το άν β εί ερ θ με ον_ ου πο _α _γ _με _ν _να _στ αν ια ικ λο μο νε "
+        u"ντ ντα ξ πε ρι ρο στ τον χ ω _β _η _η_ _τα ή_ αν_ ατ βα γι δα δα_ δι "
+        u"δρ εν εύ ζ ην ην_ ιά ια_ ιο μα να_ ναι νη πα σα σε στο τη την του ό_ "
+        u"ύ_ ώ _ά _άν _ή _απ _γι _δι _δρ _εί _λ _μι _μο _ο_ _οἶ _πο _συ _τη _φ "
+        u"_ό ά_ άντ έν ένο έπ έρ έχ ίδ ίν ίνα ίσ αξ απ από γε για δε διά δρό "
+        u"είν ει ελ θε ιά_ ιού κή καν κρ μέ με_ μι νεί νν νο οπ ος ος_ ους ού_ "
+        u"ούσ οἶ οἶδ παι περ πρ πό πό_ ρα ρα_ ροι ρό ρόμ σα_ σε_ σο συ τέ ται "
+        u"τό υ_ υν υς υς_ φο όμ όμο ύν ύσ ύσε ύτ ἶ ἶδ ἶδα _έ _έπ _ήξ _ήρ _ί _ίσ "
+        u"_αδ _αξ _βα _βγ _βρ _γε _γν _δε _ελ _εν _εφ _εύ _ζ _ζω _ι _ιθ _κή _κο "
+        u"_λο _λό _μέ _μα _μη _ξ _ξέ _οι _οφ _ού _οὐ _πά _πί _πα _πε _πη _πν "
+        u"_πρ _σα _σε _τέ _τσ _τό _φά _φώ _χ _χω _όλ _ότ _ἓ _ἓν _ἔ _ἔν _ὅ _ὅτ "
+        u"_ῥ _ῥε άβ άβα άδ άδυ άκ άκη άλ άλη άνδ άνη άνθ έπα έπε έρα έρο έχν "
+        u"έχρ ήξ ήξε ήπ ήπο ήρ ήρθ ί_ ίδα ίδη ίλ ίλο ίς ίς_ ίσο ίσω αδ αδε αζ "
+        u"αζε αιδ αιζ αιμ αιώ ακ ακρ αλ αλο ανε αξι αξύ αρ αρι ατί ατα ατο αυ "
+        u"αυτ βαζ βαλ βαρ βγ βγε βρ βρά γά γάλ γα γαι γει γεν γικ γν γνῶ δελ "
+        u"δεν δη δησ δικ δρα δυ δυ_ δὲ δὲν είδ είλ είς εα εαυ εγ εγά εια εις "
+        u"ελε ελφ εν_ ενν ενώ επ επε ερί ερε ερι ερο ερπ εσ εσα ετ ετα εφ εφη "
+        u"εύθ εύμ εύχ εῖ εῖ_ ζα ζαν ζε ζε_ ζω ζωή ηγ ηγα ηκ ηκα ημ ημε ης ης_ "
+        u"ησ ηση ητ ητέ θά θάκ θε_ θερ θι θι_ θρ θρω ιάβ ιατ ιδ ιδι ιζ ιζα ιθ "
+        u"ιθά ική ικα ικι ικρ ιμ ιμό ιοπ ις ις_ ισ ισμ ιφ ιφέ ιώ ιώμ κή_ κήπ κη "
+        u"κη_ κι κισ κο κου κρή κρύ λε λεύ λη λη_ λογ λοι λου λού λφ λφο λό λόφ "
+        u"λύ λύτ μέν μέχ μα_ μακ ματ μεγ μερ μετ μη μητ μια μικ μο_ μοι μος μοῦ "
+        u"μπ μπε μό μό_ νδ νδρ νεπ νεύ νη_ νηκ νης νθ νθρ νι νιο ννε ννι νοι "
+        u"νος νώ νώ_ νῶ νῶθ ξέ ξέν ξε ξερ ξι"
+    ),
+    'en': (
+        u"e t h n o a i e_ r s th _t he _th d l the g w he_ _a _w d_ in t_ s_ u "
+        u"f er n_ _i _o r_ _s c b m an ng re nd _b hi v y er_ g_ ing ve ha it "
+        u"ng_ p _h _of f_ of of_ nd_ ne _an _n ed is or ou and es on ver wa y_ "
+        u"_f _wa al ar as be in_ k l_ le ll st _be at ee en h_ to _c _wi ea ed_ "
+        u"ev eve it_ ll_ o_ re_ thi wi _e _in _it _l _ne _r _wh all ch es_ ge "
+        u"hat her hin is_ no un wh _a_ a_ as_ at_ do gh m_ on_ ot ri sh ti was "
+        u"_g _hi _m _sh _to ag fo ght ho ht il ith la me ni om oo oth ow pe ro "
+        u"se tha _d _fr _is _no _p fr ge_ his ig ld ma not om_ ree so th_ to_ "
+        u"ut we _ag _al _ar _fo _he _on _so _we ac ad are bo ch_ ee_ en_ ere "
+        u"for fre ga ht_ ie igh io ion iv ive ld_ li nev nin nt od ry ss tr ug "
+        u"ut_ wit _ba _bu _ch _ev _go _ha _i_ _la _li _ma _or _re _se _st _wo "
+        u"_y _yo ad_ age ai an_ ang ap av ba be_ bu but ci cie ck de di dom ear "
+        u"ec ei em et go hal hil hou i_ ill im ind ist k_ ke kn le_ man nge nt_ "
+        u"od_ ood or_ ore oug oul oun pl rn rr rt ru ry_ see sha sp st_ sto te "
+        u"tio ts ts_ ty ty_ ugh ul uld und ur w_ we_ wo yo you _ac _bo _ca _cl "
+        u"_co _do _fi _ga _k _kn _le _mo _pl _po _ri _ro _sp _su _ti _tr _u _un "
+        u"ack aga ain app ar_ ard arr ate ave bef ca cha ck_ cl co ct dg dge "
+        u"din do_ dow ds ds_ eas eav edg edo eed ef efo end ery ess est ety ew "
+        u"ex ey ey_ fi fig gai ged gl gle goo han hea hey hts iet ime ink ir "
+        u"kno las lea led les lo me_ mes mo ndo ne_ nes new nk nn nni now ns oc "
+        u"oci ol one ons op orn ory os ou_ ov ove owl ple po pp ppe q qu rd rea "
+        u"ren rin riv rou rri rs sa se_ she si soc ss_ sti str su ter tho tim "
+        u"tor tow tru u_ unt ve_ ved war wha whe whi win wl wle wou x yt yth "
+        u"_ab _ap _br _de _di _du _ei _el _en _eq _ex _gr _ho _hu _mu _ol _ov "
+        u"_pe _q _qu _ru _sa _si _sm _v _vi _wr ab abo ach act adi ag_ aid ak "
+        u"ake al_ alk alo am ame ano ant any ape art ase"
+    ),
+    'es': (
+        u"e a o n l s r d i c a_ u e_ o_ s_ t _l m n_ _d _e de en h _de b er os "
+        u"os_ _c p de_ es la no re ue v _a _n el an y _la _p ar da l_ lo y_ _m "
+        u"_s co q qu ta _h _v g ie la_ r_ _q _qu _y _y_ ad am el_ en_ no_ or ch "
+        u"es_ na nt _co _el _lo _no _t al ca le mi on que st te un í ami as do "
+        u"ha los nd ro ó _en _es _f _ha ab ce cho ci ent f ho li to uc ue_ ve "
+        u"ía ía_ _ca _mu _u _un _ve cam di ec ga in ma mu muc pe ra rd sa uch á "
+        u"ñ ño _an _pe _r _su ac and ar_ as_ bi da_ ero ho_ ia ib ien lo_ min "
+        u"nc oc on_ po rec su é ón _di _li _ma _vi ad_ be con cor cu d_ dar do_ "
+        u"eñ eño id lib ll me na_ nda nte or_ ot por pu re_ res ri ro_ so ta_ "
+        u"te_ tr ua ueñ vi ás ás_ ños ón_ _b _cu _hi _j _le _na _po _pu _re _sa "
+        u"_so _ta aba ada al_ alg ant ard ast ba br bre ca_ cer cie eb ed ere "
+        u"est ga_ go he he_ hi ia_ ida ier ig il ina ino is ist ió j lg lle mie "
+        u"má más ni noc nto ol om pa pue qui rde rr rt rta se sta sue tad tar "
+        u"ter ti to_ ui un_ ven ver z _a_ _al _ce _fr _fu _g _ja _ll _lu _má "
+        u"_ni _nu _pa _se _te _to abí ace aco adr ale an_ ano are ay ay_ az ba_ "
+        u"ber bie bl blo bí bía cen che co_ com cua dad del dic dos dr dre dí "
+        u"ebl eci edo elo em er_ ern err ert esp ev fr fu go_ gu gua ha_ hab "
+        u"hay hos ibe ibr ic igu im ir iv iví ié ién ión ja las lev lgo lia lu "
+        u"man mb me_ men mo mp mpo nad nca nci ndo ne nos nu nun och od one ord "
+        u"ota par per pr ras raz rda rn ron rra rs rá sab se_ si son sp ste sto "
+        u"su_ tan tes tod u_ uan ueb ug uga uié una unc ué va viv ví vía x za "
+        u"za_ é_ én én_ ín ín_ ño_ _ac _ad _ap _aq _as _au _añ _bi _bo _bu _do "
+        u"_dó _e_ _er _ex _fa _fl _fo _ga _go _he _hu _i _ig _ju _mi _o _ot _pr "
+        u"_ra _ro _ti _tr _va _vo abe abi aci adi ado alm amb ame amá ana anc "
+        u"anz ap apa aq aqu arg arm ars ará at ate au aur aza azó añ año ban "
+        u"be_ ben bia bir bit bo bol bu bue cc cci"
+    ),
+    'fr': (
+        u"e s n e_ i t a r l u o s_ _l t_ d p es m _d c le en _p _e _s ou _le "
+        u"ai on re v es_ é er ne nt a_ is it j n_ ne_ te ' _c _j de la _de le_ "
+        u"q qu _la _n b ie la_ nt_ _q _qu an f ns r_ se ur de_ et g oi _m _v "
+        u"et_ h is_ li me re_ _et _f _r _u _un ais ent il in it_ les ma pa ra "
+        u"so te_ un é_ _pa _pe ar co ns_ pe ue ue_ _a _co _es _je _li _ne _t "
+        u"est i_ ib ien je je_ l_ que ri rt se_ st st_ tr té té_ ut _i _se ait "
+        u"au em en_ ir lib ll on_ our res son u_ ve 'a 'e _il _po _so _é as ch "
+        u"eu il_ mai nd par po ss tre ur_ us vi ê êt _en _fe _lo _o _su _vi am "
+        u"ans av be br bre ce cha d_ da dan di do ei ers fe fo ge ha ine ir_ jo "
+        u"lo me_ men na ng ni nn onn or out pas rd rm rs sa si sse su to tou ui "
+        u"une us_ vo x è èr ère ét 'es 'o _au _b _da _di _do _h _ja _jo _ma _me "
+        u"_n' _ra _ri _sa _te _to _vo _ét ag ama ant as_ ava ber c_ con cou d' "
+        u"ec ein el eme emp er_ ert fer ibe ibr ie_ ill iso ité ja jou lle mp "
+        u"mps n' nc oir ons ont ous pen pr ps ps_ qu' rai rie rn ro rr rté tem "
+        u"ti ts ts_ u' ua ut_ ux ux_ va ver voi x_ êtr 'av 'h _bo _ce _ch _cœ "
+        u"_d' _fo _l' _on _re _si _y _ye _ê _êt age aie ain and ang ass au_ aut "
+        u"bl bo ce_ ci cœ cœu des ell enc end ens erm ern err esp ess eur eux "
+        u"ez ez_ foi ge_ ger gi hai hu int io ion ite iv ive iè ièr jam l' lag "
+        u"lie lla lon lu mi mm mme n'a nai nce nd_ nge nit nne nts nv oc oi_ "
+        u"ois oit ol om omm ong orm ort où où_ per pou qua ran rd_ rit rma rme "
+        u"rs_ rte sai sen si_ sp sui ta tai ter tra u'a uan uis um un_ uns urd "
+        u"ure ute utr vai ven vil y ye yeu z z_ à à_ ée ée_ ête ù ù_ œ œu œur "
+        u"'ai 'ar 'au 'en 'ex 'ho 'hu 'on 'ou 'où _a_ _ag _ap _av _bi _c' _cr "
+        u"_dr _du _eû _fi _fr _fê _g _go _he _hi _hu _in _j' _ju _lu _là _m' "
+        u"_mi _mo _mè _na _ni _né _ou _où _pl _pr _ro _s' _tr _ve _vu _vé _à "
+        u"_à_ _ég _él ab abe ac ac_ agi ai_ al al_ amb"
+    ),
+    'it': (
+        u"a i e o n l a_ r t s o_ c i_ e_ d m u _d _l v p g _c er _s no di _di "
+        u"la _e _p no_ on li ra la_ di_ h ta z _a _n _u _v an ch el it l_ un "
+        u"_la _m am co n_ ro _un b in ma na ni or ri te va _ch de le se st tr "
+        u"_e_ _t es ne pe va_ _de _g _i ca en f ic ll mi na_ ra_ so ta_ _f at "
+        u"ia ie io me ti tt _co _pe al ar ci da del el_ gl gli nt ol os re ro_ "
+        u"ss to ve à à_ _ca _le _r che gi he he_ im le_ lo mo ni_ ono ov to_ tu "
+        u"tà tà_ una vi _li _ma _ne _no _se _so _vi chi do eg ell era ev ez gn "
+        u"hi il li_ lo_ pi r_ re_ rit rt se_ te_ ti_ tra un_ vo zz ' _a_ _am "
+        u"_fo _gl _il _in _me _pi _q _qu _st _tu _è _è_ ani ano be ber bi cam "
+        u"cos ero ezz fo gio go ia_ ib ibe ico il_ in_ ir ita leg lib lla nd "
+        u"ne_ non oc og on_ pa per po q qu sa sc si str tro tut ut utt za za_ "
+        u"zo zzo è è_ _al _b _da _es _gi _lo _lu _mi _o _pr _ri _sp _te _tr _va "
+        u"_ve _vo ag ai ai_ amb amo ap as ate av cc cit da_ ed em ent ese ess "
+        u"eva fi ge hi_ ien ier ig ima ino ion ior iri is itt lia lu ma_ mar mb "
+        u"mbi me_ mo_ nel nte nz nza ost ova par pr rd ri_ rn rov rr ser son sp "
+        u"sse sta su tto ua ue ul ver zo_ é é_ 'a _ap _do _er _fi _go _pa _po "
+        u"_ra _sa _su ad agi al_ ali ama ami amm and anz app ata ati ava ca_ "
+        u"cat cch ce ché cie co_ col com con dat der dic dir do_ egg egn emp "
+        u"ene eni er_ erc eri err ert est et fin fon for ge_ gg gge gni gno go_ "
+        u"hé hé_ ica iet igl imi ina ità l' lic lle lt mai man men mez mi_ mig "
+        u"min mm mmi mp nda ndo nes ng nie nit nta ogn ola om ond one ont or_ "
+        u"orn oro ort osc ot ove pez pia pp ppa qua que ran rat rc rim rno rs "
+        u"rtà san sci sim so_ spe ssi sto sul sì sì_ tan tas ter tti uan ull us "
+        u"vol zi zio ì ì_ 'a_ 'an 'e 'er 'i 'it _ag _ba _bi _bo _c' _ci _du _ed "
+        u"_eg _el _fa _fr _h _ho _i_ _l' _mo _na _ni _nu _né _oc _og _os _re "
+        u"_si _sm _sì _um _us ac ace ada adr ae aes ago ale all alt ame"
+    ),
+    'la': (
+        u"e a i t u r n s m o l p c m_ d e_ er s_ a_ t_ v um at _a _e _p ta b "
+        u"in q qu um_ _v ra i_ g te _i _l _s ia it li _c di en es nt _d an ni "
+        u"or am is re st ti vi _n et o_ us ita pe r_ ri ae am_ et_ f ic ue _vi "
+        u"de em n_ om tu us_ ve _di _et ar cu ne no per que ue_ un _in _t as "
+        u"at_ ca ci em_ is_ na os ra_ ro rt ru ter ur _f _m _no _q _qu _ve h "
+        u"ia_ in_ la le qui ui _es _li _o _pr ae_ al be ent es_ lu ma mi mu nt_ "
+        u"po pr se tr _ca _g _h _u ati bu ce co d_ er_ era est ga ib id ie im "
+        u"ll na_ nd nit pa rat re_ rum sa sc sp st_ tat tia unt ur_ ut _co _er "
+        u"_pa _pe _po _r _sa ab as_ ate cum el ere eri ho iam il iu min nos nu "
+        u"on ort ost pu te_ tur ua ud ul va ver _al _ho _lu _om _se ad ali ani "
+        u"ant ap av ba ber di_ eb ed eq equ ibe ici icu ine io lib me men mn "
+        u"ntu ol omi omn ora pi por qua ro_ spe str ta_ tan tas to tra vit _ad "
+        u"_ap _b _cu _de _la _le _ma _mu _ne _re _sp _te _va ac ag aq aqu are "
+        u"atu bat bum dic du eba eg eni erb ero ert eru fi fu ge gi gr gu hom "
+        u"ice imu ina ini ist lia lin lli mni mut nc ne_ ni_ nis nte nus os_ "
+        u"pat rae rb rbu ria rta san sci si sq squ ste su tae uam ude ui_ usq "
+        u"uta van ven vid x _ab _ag _ar _as _be _du _fo _fu _ga _gr _it _iu _or "
+        u"_pu _sc _si _su _ta _tr _tu _un _us abo ad_ agi all and ano anu app "
+        u"aru ave ben bi bi_ bo cat cc ce_ ci_ cie col ct cun deb dem den deu "
+        u"die diu do dum ea ea_ ec ed_ ege ena end ep esp eu ev fic fo for ga_ "
+        u"gal gis gra hi iaq ide idi ien ies if ile inc inu io_ ip ir iti iv "
+        u"ivi la_ lab le_ leg len lic lis lla lo lud ma_ man mo mo_ mq mqu mus "
+        u"nde ndi nem neq nes ng nia no_ non ns nti on_ ori oru par pe_ pos pp "
+        u"pra pri pro ps rar res ri_ rim rin rp rs rte rti se_ sed spi ss sse "
+        u"sun tam tem tes tis to_ tor tum tuu u_ ub uer uid ula umq una und ute "
+        u"uu vat vic vis _ae _am _an _aq _at _au _av _br _ce _ci _cr _do _el "
+        u"_eo"
+    ),
+    'ru': (
+        u"о е а и с н в т д м л р у г е_ и_ к _н _с а_ п я _в ч о_ ь _п з _д _и "
+        u"ы б не ог _не _о ст ю _по по ь_ я_ во до ра х _м в_ го да мо ни но ш "
+        u"_в_ _и_ ас ко не_ об ов од ть _з _св _ч бо ва ве да_ ем ес ж л_ ли м_ "
+        u"на ом он св сво се ть_ че _до ал ви го_ де ел ер за й ло ор т_ у_ х_ "
+        u"_за _к _на _р ав ат вы ит й_ ме н_ ны ого ое ос ру то ча ю_ ё _г _др "
+        u"_ни _он _пр _т _я аст ать бод ва_ воб г_ гд гда до_ др дру ду ен ка "
+        u"ког ку обо ове огд ой ой_ ол ом_ он_ от пр рав ре ро руг се_ сл ств "
+        u"сь сь_ та тв уг ум ше ы_ _вс _вы _го _из _л _мо _об _са _се _у _че "
+        u"ави ад аз ак ам вил вое вс все га дн ест ет ив из ик ил ин их их_ ле "
+        u"ли_ лив лов ми мог мом мы нес ни_ ник пра са стл сч сча тл тли то_ тс "
+        u"ую хо час щ ят ёл _б _ве _де _ка _ко _лю _мы _от _ра _ро _сл _ув _ш "
+        u"_э _эт _я_ _яв аде аж ако али амо ар ах ая ая_ бщ век веч вид вн га_ "
+        u"гн гор дел дет ди дно дя ед ез ек ек_ ел_ ело ему емь ени ере есч еч "
+        u"ече жа жд жда зв зм зме зн зна ива ид иде изм ико ил_ им им_ ис ит_ "
+        u"ию к_ ки ку_ ла лу ль лю ля ма мат ми_ мн му му_ мь на_ над нов ног "
+        u"нс ны_ ным общ ово ог_ ода одн одо ое_ оем ож ок ока оме оро оря ост "
+        u"па по_ под пок р_ рас ри рк ря рят сам сем си сли со ся ся_ сё сёт "
+        u"тва те ти тк тку тн тся ту ув уг_ уга уд умо уч ую_ чел чер чи чит "
+        u"ше_ шё шёл щи ым ыми ых ых_ э эт это ют ютс яв ят_ ёл_ ёт ёт_ _а _ар "
+        u"_бо _бр _ви _вр _га _ду _дя _е _ес _ж _жа _зв _зн _иг _их _ию _кр _лу "
+        u"_ма _мг _ми _мн _ог _од _ос _пе _ру _см _со _сп _су _сч _та _те _ты "
+        u"_тя _ум _х _хо _чи _чр _чт _чу _шу _шё ава авн аду ажа ажд аза азе "
+        u"азу ай айн аку ал_ ала але ало амы ан ане арк арш асе асо ась асё атс "
+        u"ах_ ахо ач ача аю ают бл бло бн бно бог бол бор бр бра бще бщи бя бя_ "
+        u"важ вах вая ве_ вен вес вит вл вля вни вны во_ вой вор вр вре ву вуч "
+        u"выб выд вые выч"
+    ),
+    'sr': (
+        u"a а е и о o i e а_ р у a_ d s д е_ n r к ј e_ и_ н t v в п с _s k l "
+        u"о_ u т _ј _је j м у_ је _п i_ _с б л _n _и o_ u_ b da m ре ra z је_ "
+        u"da_ г ко ра _d _i _p _к p ед _и_ je ni ма по пр ћ _j _je _б _д _по "
+        u"_пр _р ka la or š на _k _ni _у ad ko od sl te vi ве да з ма_ од ри "
+        u"_pr _se _sl _t _v ada bo g it je_ la_ na no pr se ć ва дн ек ио ио_ "
+        u"ка на_ ни ов ор ч јед _z _в _г _м _н _ра _у_ ak lo m_ ob re se_ va ve "
+        u"za č би ва_ во го д_ да_ едн им има ко_ ку ом ој пре ст ц ш _do _i_ "
+        u"_iz _m _r _sv _u _za _би _ко _о _св _т an av bod de dn do ed ik iz "
+        u"kad lob ma obo oj ov slo sv ti ti_ to št ак ан ат ла ле ово ро св то "
+        u"х ци љ њ ће _b _da _g _ka _ko _o _po _ra _su _te _u_ _vi _а _а_ _ве "
+        u"_да _на _ре _се _су _ћ ako al ao ao_ avi c el em eć gr gra ite iš ja "
+        u"ju ka_ ko_ ku li lj ne nik oda oja ora po ran ri ro st su su_ ta te_ "
+        u"tv va_ vo će će_ ао ао_ ба вор гов ди еб ед_ еко ем ема ен ин ит ка_ "
+        u"ке ке_ ку_ ли м_ не ни_ но оди ом_ пор р_ рек ри_ се се_ су тв те тр "
+        u"ук уп ци_ ја ће_ ћу _gr _l _lj _ma _na _ne _no _to _го _гр _др _ж _ка "
+        u"_ку _му _не _си _ср _те _тр _уч _ш _љ _љу _њ _ћу ab aj ala am am_ as "
+        u"aš ašt ba bi bor d_ dna dno edn ela er et g_ h id ide ih ika im is "
+        u"iti ič jed ji ku_ le lju ma_ me na_ ne_ nit no_ odn og og_ om os ovo "
+        u"por pre pro ra_ rav si si_ sli sva sve tem to_ ve_ vid vor zi či ša "
+        u"šao ž ав аз ако ар ац аци ај ају био бо бр ве_ вел ви вим гл гле гр "
+        u"гра диц дна дно др ду еда ез ел ени ер еч ећ ж зг зго зи ив из ик ис "
+        u"их их_ иц ици иш као ков кој ла_ лед ло лу ме му н_ об ог од_ ол ори "
+        u"оро ос ост оја оји па при раз ран рат реб ред рем род сва све си сл "
+        u"ср сре ств сто су_ та тва ти то_ тој уке ут уч учи х_ че чи ђ ђа ја_ "
+        u"ји"
+    ),
+}
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+offsets.py
+Preslikavanje bajt pozicija (Scintilla, mmap) u pozicije karaktera
+(Python tekst, npr. getSelText() ili re nad dekodiranim tekstom) i nazad.
+Na svakih ~4 KB (na granici karaktera; u ćiriličnom tekstu ~2.000 slova)
+pamti se kontrolna tačka (bajt, karakter) u dva niza (array), pa obe
+konverzije traže tačku binarnom pretragom i broje najviše jedan blok.
+
+Kontrolne tačke se prave tek kad zatrebaju (pitanje na početku velikog
+dokumenta ne čita ostatak). Izmene (on_modified za Scintilla SCN_MODIFIED
+ili note_insert/note_delete) pomeraju tačke posle izmene odloženo, kao
+teiwrap.elements: pomeranje se pamti za sve tačke od shift_from naviše, pa
+niz izmena od kraja ka početku ukupno prođe kroz tačke jednom.
+"""
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+from teiwrap.elements import SC_MOD_DELETETEXT, SC_MOD_INSERTTEXT
+from teiwrap.tags import to_bytes
+
+# Razmak između kontrolnih tačaka u bajtovima
+BLOCK_SIZE = 4096
+
+# Broj blokova koji se čitaju odjednom dok se prave kontrolne tačke
+READ_BLOCKS = 64
+
+# UTF-8 bajtovi nastavka (10xxxxxx) i početni bajtovi 4-bajtnih karaktera
+_CONTINUATION = bytes(bytearray(range(0x80, 0xc0)))
+_ASTRAL = bytes(bytearray(range(0xf0, 0xf8)))
+
+# U "uskom" Python 2 (Windows) karakter van BMP-a je dva karaktera (surogat par)
+_NARROW = sys.maxunicode == 0xFFFF
+
+
+def count_chars(data):
+    """Broj Python karaktera u UTF-8 bajtovima (bajtovi koji nisu nastavak)."""
+    count = len(data.translate(None, _CONTINUATION))
+    if _NARROW:
+        count += len(data) - len(data.translate(None, _ASTRAL))
+    return count
+
+
+def _advance(data, chars):
+    """Bajt pozicija posle prvih chars karaktera u data (binarna pretraga)."""
+    if chars <= 0:
+        return 0
+    low, high = 0, len(data)
+    # Najmanja dužina prefiksa koja ima više od chars karaktera, minus jedan bajt
+    while low < high:
+        middle = (low + high) // 2
+        if count_chars(data[:middle + 1]) > chars:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+class OffsetIndex(object):
+    """
+    Kontrolne tačke (bajt, karakter) jednog teksta. read(start, end) vraća
+    bajtove teksta, a length je dužina u bajtovima; for_bytes i for_editor
+    prave indeks za bajtove (i mmap) i za dokument u editoru.
+
+    Tačke od indeksa shift_from naviše su u bytes i chars upisane bez
+    odloženog pomeranja (shift_bytes, shift_chars); pravu tačku daje _point().
+    """
+
+    def __init__(self, read, length, editor=None, block_size=BLOCK_SIZE):
+        self.read = read
+        self.length = length
+        self.editor = editor
+        self.block_size = block_size
+        self.bytes = array('l', [0])
+        self.chars = array('l', [0])
+        self.shift_from = 1
+        self.shift_bytes = 0
+        self.shift_chars = 0
+
+    @classmethod
+    def for_bytes(cls, data, block_size=BLOCK_SIZE):
+        """Indeks za bajtove ili mmap (headless obrada)."""
+        return cls(lambda start, end: data[start:end], len(data), block_size=block_size)
+
+    @classmethod
+    def for_editor(cls, editor, block_size=BLOCK_SIZE):
+        """Indeks za dokument u editoru; čita se kroz getTextRange, deo po deo."""
+        return cls(lambda start, end: to_bytes(editor.getTextRange(start, end)),
+                   editor.getLength(), editor, block_size)
+
+    def _point(self, k):
+        """Kontrolna tačka k kao (bajt, karakter), sa odloženim pomeranjem."""
+        if k >= self.shift_from:
+            return self.bytes[k] + self.shift_bytes, self.chars[k] + self.shift_chars
+        return self.bytes[k], self.chars[k]
+
+    def _bisect(self, values, shift, target, search=bisect_right):
+        """bisect nad bytes ili chars, čiji je deo od shift_from pomeren za shift."""
+        first = self.shift_from
+        if first < len(values) and (target > values[first] + shift or
+                                    (search is bisect_right and target == values[first] + shift)):
+            return search(values, target - shift, first)
+        return search(values, target, 0, first)
+
+    def _shift(self, first, length, chars):
+        """
+        Pomera tačke od first naviše za length bajtova i chars karaktera.
+        Upisuju se samo tačke između starog i novog shift_from (tako da im
+        zbir sa novim odloženim pomeranjem daje pravu tačku).
+        """
+        if (self.shift_bytes or self.shift_chars) and first != self.shift_from:
+            low, high = min(first, self.shift_from), max(first, self.shift_from)
+            sign = -1 if first < self.shift_from else 1
+            extra_bytes, extra_chars = sign * self.shift_bytes, sign * self.shift_chars
+            self.bytes[low:high] = array('l', [pos + extra_bytes for pos in self.bytes[low:high]])
+            self.chars[low:high] = array('l', [char + extra_chars for char in self.chars[low:high]])
+        self.shift_from = first
+        self.shift_bytes += length
+        self.shift_chars += chars
+
+    def _append(self, pos, char):
+        """Dodaje tačku na kraj (uvek od shift_from naviše)."""
+        self.bytes.append(pos - self.shift_bytes)
+        self.chars.append(char - self.shift_chars)
+
+    def _extend(self, byte_target=None, char_target=None):
+        """Dodaje kontrolne tačke dok poslednja ne pređe traženu poziciju."""
+        step = self.block_size
+        last_byte, last_char = self._point(len(self.bytes) - 1)
+        while last_byte + step < self.length:
+            if byte_target is not None and last_byte > byte_target:
+                return
+            if char_target is not None and last_char > char_target:
+                return
+            base = last_byte
+            end = min(self.length, base + step * READ_BLOCKS + 4)
+            if self.editor is not None and end < self.length:
+                # Editor čita samo do granice karaktera
+                end = self.editor.positionAfter(end - 1)
+            data = self.read(base, end)
+            pos = 0
+            while True:
+                cut = pos + step
+                # Granica bloka nikad ne seče UTF-8 karakter
+                while cut < len(data) and b'\x80' <= data[cut:cut + 1] < b'\xc0':
+                    cut += 1
+                if cut >= len(data) or base + cut >= self.length:
+                    break
+                last_byte, last_char = base + cut, last_char + count_chars(data[pos:cut])
+                self._append(last_byte, last_char)
+                pos = cut
+                if byte_target is not None and last_byte > byte_target:
+                    return
+                if char_target is not None and last_char > char_target:
+                    return
+            if not pos:
+                return
+
+    def to_char(self, pos):
+        """Pozicija karaktera za bajt poziciju pos (granicu karaktera)."""
+        if pos < 0 or pos > self.length:
+            raise ValueError(u"Pozicija {0} je van teksta ({1} bajtova)".format(pos, self.length))
+        self._extend(byte_target=pos)
+        base, chars = self._point(self._bisect(self.bytes, self.shift_bytes, pos) - 1)
+        return chars + count_chars(self.read(base, pos))
+
+    def to_byte(self, char):
+        """Bajt pozicija karaktera char; baca ValueError ako je char van teksta."""
+        if char < 0:
+            raise ValueError(u"Pozicija karaktera {0} je van teksta".format(char))
+        self._extend(char_target=char)
+        k = self._bisect(self.chars, self.shift_chars, char) - 1
+        base, chars = self._point(k)
+        end = self._point(k + 1)[0] if k + 1 < len(self.bytes) else self.length
+        data = self.read(base, end)
+        remaining = char - chars
+        if remaining > count_chars(data):
+            raise ValueError(u"Pozicija karaktera {0} je van teksta".format(char))
+        return base + _advance(data, remaining)
+
+    def note_insert(self, pos, length, chars=None):
+        """
+        Prijavljuje umetanje length bajtova (chars karaktera) na poziciji pos.
+        Bez chars se umetnuti tekst čita iz editora.
+        """
+        if chars is None:
+            chars = count_chars(self.read(pos, pos + length))
+        self.length += length
+        self._shift(self._bisect(self.bytes, self.shift_bytes, pos), length, chars)
+
+    def note_delete(self, pos, length, chars=None):
+        """
+        Prijavljuje brisanje length bajtova (chars karaktera) od pozicije pos.
+        Bez chars se tačke posle pos odbacuju i prave ponovo kad zatrebaju.
+        """
+        first = self._bisect(self.bytes, self.shift_bytes, pos)
+        self.length -= length
+        if chars is None:
+            del self.bytes[first:]
+            del self.chars[first:]
+            if self.shift_from >= first:
+                self.shift_from, self.shift_bytes, self.shift_chars = first, 0, 0
+            return
+        last = max(first, self._bisect(self.bytes, self.shift_bytes, pos + length, bisect_left))
+        # Tačke u obrisanom tekstu su ispod novog shift_from, pa se brišu bez pomeranja
+        self._shift(last, -length, -chars)
+        del self.bytes[first:last]
+        del self.chars[first:last]
+        self.shift_from = first
+
+    def on_modified(self, args):
+        """Obrađuje argumente Scintilla SCN_MODIFIED obaveštenja."""
+        kind = args.get('modificationType', 0)
+        text = args.get('text')
+        chars = count_chars(to_bytes(text)) if text is not None else None
+        if kind & SC_MOD_INSERTTEXT:
+            self.note_insert(args['position'], args['length'], chars)
+        elif kind & SC_MOD_DELETETEXT:
+            self.note_delete(args['position'], args['length'], chars)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+outline.py
+Pregled dokumenta: spisak svih <head> i <title> elemenata sa brojem reda i
+početkom teksta, i skok na izabrani. Elementi se traže u indeksu elemenata
+(teiwrap.elements) koji prati izmene kroz Scintilla callback, pa se
+dokument ne skenira ponovo: svaki element je jedan next_element poziv, a
+za naslov se čita najviše LABEL_BYTES bajtova.
+"""
+
+import re
+
+from teiwrap import elements
+
+# Elementi koji ulaze u pregled
+OUTLINE_TAGS = ('head', 'title')
+
+# Koliko bajtova od početka elementa se čita za naslov stavke
+LABEL_BYTES = 240
+
+# Najveća dužina naslova stavke u spisku (u karakterima)
+LABEL_CHARS = 60
+
+# Najveći broj stavki u jednom dijalogu
+MAX_LISTED = 40
+
+# Koliko stavki pre kursora se prikazuje kad spisak ne staje u dijalog
+CONTEXT_BEFORE = 5
+
+_TAG_RE = re.compile(u'<[^<>]*>?')
+_SPACE_RE = re.compile(u'\\s+', re.U)
+
+
+def _native(text):
+    """Tekst za Notepad++ dijalog: UTF-8 bajtovi u Python 2, str u Python 3."""
+    return text if isinstance(text, str) else text.encode('utf-8')
+
+
+def _unicode(text):
+    """Tekst iz editora ili dijaloga (bajtovi u Python 2) kao unicode."""
+    return text.decode('utf-8') if isinstance(text, bytes) else text
+
+
+def _label(editor, start, end):
+    """Tekst elementa bez tagova, skraćen na LABEL_CHARS karaktera."""
+    if end - start > LABEL_BYTES:
+        end = editor.positionBefore(start + LABEL_BYTES)
+    text = _unicode(editor.getTextRange(start, end))
+    text = _SPACE_RE.sub(u' ', _TAG_RE.sub(u' ', text)).strip()
+    if len(text) > LABEL_CHARS:
+        text = text[:LABEL_CHARS - 1].rstrip() + u'…'
+    return text
+
+
+def outline(editor, names=OUTLINE_TAGS):
+    """
+    Vraća stavke pregleda (start, kraj, ime, dubina, naslov) po redu u
+    dokumentu; dubina je broj stavki koje obuhvataju stavku (npr. <title>
+    u <head>).
+    """
+    index = elements.index_for(editor)
+    found = []
+    for name in names:
+        element = index.next_element(name)
+        while element is not None:
+            found.append(element)
+            element = index.next_element(name, element[0] + 1)
+    found.sort()
+    entries = []
+    open_ends = []
+    for start, end, name in found:
+        while open_ends and open_ends[-1] <= start:
+            open_ends.pop()
+        entries.append((start, end, name, len(open_ends), _label(editor, start, end)))
+        open_ends.append(end)
+    return entries
+
+
+def _listing(editor, entries, first, last):
+    """Redovi dijaloga za stavke [first, last), numerisane od 1."""
+    lines = []
+    if first:
+        lines.append(u"... ({0} pre)".format(first))
+    for number in range(first, last):
+        start, _, name, depth, label = entries[number]
+        lines.append(u"{0}. {1}<{2}> {3} (red {4})".format(
+            number + 1, u"  " * depth, name, label, editor.lineFromPosition(start) + 1))
+    if last < len(entries):
+        lines.append(u"... ({0} posle)".format(len(entries) - last))
+    return lines
+
+
+def _window(entries, caret):
+    """Prve i poslednje stavke koje se prikazuju: okolina kursora ako ih je previše."""
+    if len(entries) <= MAX_LISTED:
+        return 0, len(entries)
+    current = sum(1 for entry in entries if entry[0] <= caret) - 1
+    first = min(max(0, current - CONTEXT_BEFORE), len(entries) - MAX_LISTED)
+    return first, first + MAX_LISTED
+
+
+def jump(editor, entry):
+    """Pomera kursor na početak stavke i prikazuje je."""
+    editor.gotoPos(entry[0])
+
+
+def show(editor, notepad):
+    """
+    Prikazuje pregled i skače na stavku čiji je broj unet. Uneti tekst
+    sužava spisak na stavke koje ga sadrže; kad ostane jedna (ili se isti
+    tekst unese ponovo), skače na prvu. Vraća 1 ako je bilo skoka.
+    """
+    title = "Pregled dokumenta"
+    entries = outline(editor)
+    if not entries:
+        notepad.messageBox("Dokument nema <head> ni <title> elemenata.", title)
+        return 0
+    shown = entries
+    caret = editor.getSelectionNStart(0)
+    while True:
+        first, last = _window(shown, caret)
+        lines = _listing(editor, shown, first, last)
+        lines.append(u"")
+        lines.append(u"Broj stavke ili deo naslova:")
+        answer = notepad.prompt(_native(u"\n".join(lines)), title, "")
+        if not answer or not answer.strip():
+            return 0
+        answer = _unicode(answer).strip()
+        try:
+            number = int(answer)
+        except ValueError:
+            number = None
+        if number is not None:
+            if not 1 <= number <= len(shown):
+                notepad.messageBox("Nema stavke broj {0}.".format(number), title)
+                return 0
+            jump(editor, shown[number - 1])
+            return 1
+        query = answer.lower()
+        matches = [entry for entry in shown if query in entry[4].lower()]
+        if not matches:
+            notepad.messageBox(_native(u"Nijedna stavka ne sadrži „{0}“.".format(answer)), title)
+            return 0
+        if len(matches) == 1 or len(matches) == len(shown):
+            jump(editor, matches[0])
+            return 1
+        shown = matches
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+profiling.py
+Merenje wrap akcija po potrebi. Kada je uključeno, dispatch.run za svaku
+akciju beleži trajanje, dužinu selekcije i dokumenta i broj Scintilla
+poziva u kružni bafer, a po želji čuva i cProfile najsporijih poziva.
+Isključeno košta samo proveru jedne promenljive po pozivu.
+
+Iz PythonScript konzole:
+    from teiwrap import profiling
+    profiling.enable()            # ili enable(profile_slowest=5)
+    ... rad u editoru ...
+    profiling.report()            # percentili po akciji
+    profiling.report_profiles()   # cProfile najsporijih poziva
+"""
+
+import cProfile
+import heapq
+import io
+import itertools
+import pstats
+import sys
+import time
+from collections import deque, namedtuple
+
+# Broj poslednjih merenja koja se čuvaju
+RING_SIZE = 1000
+
+# Broj redova cProfile izveštaja po pozivu
+PROFILE_LINES = 15
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+# Jedno merenje: akcija, ms, bajtova u selekcijama, bajtova u dokumentu, Scintilla poziva
+Sample = namedtuple('Sample', 'name ms selection_bytes document_bytes calls')
+
+# dispatch.run meri akcije samo dok je active True
+active = False
+
+_samples = deque(maxlen=RING_SIZE)
+_profiles = []
+_profile_slowest = 0
+_sequence = itertools.count()
+
+
+class CountingEditor(object):
+    """Prosleđuje sve pozive editoru i broji pozive njegovih metoda."""
+
+    def __init__(self, editor):
+        self.wrapped = editor
+        self.calls = 0
+
+    def __getattr__(self, name):
+        value = getattr(self.wrapped, name)
+        if not callable(value):
+            return value
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return value(*args, **kwargs)
+        return counted
+
+
+def enable(profile_slowest=0):
+    """Uključuje merenje; profile_slowest > 0 čuva cProfile toliko najsporijih poziva."""
+    global active, _profile_slowest
+    _profile_slowest = profile_slowest
+    active = True
+
+
+def disable():
+    """Isključuje merenje (zabeležena merenja ostaju do clear())."""
+    global active
+    active = False
+
+
+def clear():
+    """Briše sva merenja i sačuvane profile."""
+    _samples.clear()
+    del _profiles[:]
+
+
+def samples():
+    """Vraća listu zabeleženih merenja, od najstarijeg."""
+    return list(_samples)
+
+
+def _selection_bytes(editor):
+    total = 0
+    for i in range(editor.getSelections()):
+        total += editor.getSelectionNEnd(i) - editor.getSelectionNStart(i)
+    return total
+
+
+def measure(name, handler, editor, notepad):
+    """Izvršava handler(editor, notepad), beleži merenje i vraća rezultat handlera."""
+    selection = _selection_bytes(editor)
+    counting = CountingEditor(editor)
+    profile = cProfile.Profile() if _profile_slowest > 0 else None
+    started = _clock()
+    try:
+        if profile is not None:
+            return profile.runcall(handler, counting, notepad)
+        return handler(counting, notepad)
+    finally:
+        ms = (_clock() - started) * 1000.0
+        _samples.append(Sample(name, ms, selection, editor.getLength(), counting.calls))
+        if profile is not None:
+            _keep_profile(ms, name, profile)
+
+
+def _keep_profile(ms, name, profile):
+    entry = (ms, next(_sequence), name, profile)
+    if len(_profiles) < _profile_slowest:
+        heapq.heappush(_profiles, entry)
+    elif ms > _profiles[0][0]:
+        heapq.heapreplace(_profiles, entry)
+
+
+def percentile(values, fraction):
+    """Percentil po najbližem rangu; values mora biti sortirana i neprazna."""
+    rank = max(1, int(-(-fraction * len(values) // 1)))
+    return values[min(rank, len(values)) - 1]
+
+
+def summary():
+    """Vraća tabelu percentila trajanja i proseka veličina po akciji, kao tekst."""
+    by_name = {}
+    for sample in _samples:
+        by_name.setdefault(sample.name, []).append(sample)
+    lines = ["{0:<16} {1:>5} {2:>8} {3:>8} {4:>8} {5:>8} {6:>9} {7:>9} {8:>7}".format(
+        u"akcija", u"n", u"p50 ms", u"p90 ms", u"p99 ms", u"max ms", u"sel. KB", u"dok. KB", u"poziva")]
+    for name in sorted(by_name):
+        group = by_name[name]
+        times = sorted(sample.ms for sample in group)
+        count = len(group)
+        lines.append(u"{0:<16} {1:>5} {2:>8.2f} {3:>8.2f} {4:>8.2f} {5:>8.2f} {6:>9.1f} {7:>9.1f} {8:>7.0f}".format(
+            name, count, percentile(times, 0.5), percentile(times, 0.9), percentile(times, 0.99),
+            times[-1], sum(s.selection_bytes for s in group) / 1024.0 / count,
+            sum(s.document_bytes for s in group) / 1024.0 / count,
+            sum(s.calls for s in group) / float(count)))
+    if not by_name:
+        lines.append(u"(nema merenja; uključite ih sa profiling.enable())")
+    return u"\n".join(lines)
+
+
+def profile_reports():
+    """Vraća (ms, akcija, cProfile izveštaj) za sačuvane pozive, od najsporijeg."""
+    reports = []
+    for ms, _, name, profile in sorted(_profiles, reverse=True):
+        stream = io.StringIO() if sys.version_info[0] >= 3 else io.BytesIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(PROFILE_LINES)
+        reports.append((ms, name, stream.getvalue()))
+    return reports
+
+
+def report(out=None):
+    """Ispisuje summary() (podrazumevano u PythonScript konzolu, tj. sys.stdout)."""
+    (out or sys.stdout).write(summary() + u"\n")
+
+
+def report_profiles(out=None):
+    """Ispisuje cProfile izveštaje najsporijih poziva."""
+    out = out or sys.stdout
+    for ms, name, text in profile_reports():
+        out.write(u"=== {0}: {1:.2f} ms ===\n".format(name, ms))
+        out.write(text if isinstance(text, type(u"")) else text.decode('utf-8', 'replace'))
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+quotes.py
+Pretvaranje pravih navodnika ("...") u srpske („...“) u celom dokumentu
+ili fajlu. Automat stanja prolazi kroz tekst jednom (regularnim izrazima
+skače s jednog značajnog znaka na drugi), preskače tagove, vrednosti
+atributa, komentare i CDATA, i prijavljuje neuparene navodnike.
+"""
+
+import mmap
+import os
+import re
+
+from teiwrap.batch import replace_all
+from teiwrap.headless import rewrite_file
+from teiwrap.tags import SERBIAN_QUOTES, to_bytes
+
+# Sledeći značajan znak u tekstu, odnosno unutar taga
+_TEXT_RE = re.compile(b'[<"]')
+_TAG_RE = re.compile(b'[>"\']')
+
+# Bajtovi posle kojih navodnik otvara, odnosno ispred kojih zatvara
+_SPACE = b' \t\r\n'
+_OPEN_BEFORE = _SPACE + b'([{>'
+_CLOSE_AFTER = _SPACE + b'.,;:!?)]}<'
+
+
+def _skip_tag(data, pos):
+    """Vraća poziciju posle kraja taga koji počinje pre pos."""
+    while True:
+        match = _TAG_RE.search(data, pos)
+        if match is None:
+            return len(data)
+        if match.group() == b'>':
+            return match.end()
+        end = data.find(match.group(), match.end())
+        if end < 0:
+            return len(data)
+        pos = end + 1
+
+
+def _skip_until(data, pos, marker):
+    end = data.find(marker, pos)
+    return len(data) if end < 0 else end + len(marker)
+
+
+def scan_quotes(data):
+    """
+    Vraća (parovi, neupareni): parovi su (otvarajući, zatvarajući) bajt
+    pozicije navodnika, a neupareni su pozicije navodnika bez para.
+    """
+    pairs = []
+    unbalanced = []
+    pending = None
+    size = len(data)
+    pos = 0
+    while pos < size:
+        match = _TEXT_RE.search(data, pos)
+        if match is None:
+            break
+        at = match.start()
+        if match.group() == b'<':
+            if data[at:at + 4] == b'<!--':
+                pos = _skip_until(data, at + 4, b'-->')
+            elif data[at:at + 9] == b'<![CDATA[':
+                pos = _skip_until(data, at + 9, b']]>')
+            else:
+                pos = _skip_tag(data, at + 1)
+            continue
+        before = data[at - 1:at] if at else b' '
+        after = data[at + 1:at + 2] or b' '
+        opens = before in _OPEN_BEFORE and after not in _SPACE
+        closes = after in _CLOSE_AFTER and before not in _SPACE
+        if opens == closes:
+            opens = pending is None
+        if opens:
+            if pending is not None:
+                unbalanced.append(pending)
+            pending = at
+        elif pending is None:
+            unbalanced.append(at)
+        else:
+            pairs.append((pending, at))
+            pending = None
+        pos = at + 1
+    if pending is not None:
+        unbalanced.append(pending)
+    unbalanced.sort()
+    return pairs, unbalanced
+
+
+def quote_edits(pairs):
+    """Pretvara parove u sortirane izmene (pozicija, 1, srpski navodnik)."""
+    open_quote, close_quote = [to_bytes(quote) for quote in SERBIAN_QUOTES]
+    edits = []
+    for start, end in pairs:
+        edits.append((start, 1, open_quote))
+        edits.append((end, 1, close_quote))
+    edits.sort(key=lambda edit: edit[0])
+    return edits
+
+
+def line_numbers(data, positions):
+    """Vraća brojeve redova (od 1) za sortirane bajt pozicije, u jednom prolazu."""
+    lines = []
+    line = 1
+    pos = 0
+    for target in positions:
+        while True:
+            newline = data.find(b'\n', pos, target)
+            if newline < 0:
+                break
+            line += 1
+            pos = newline + 1
+        lines.append(line)
+    return lines
+
+
+def convert_document(editor):
+    """
+    Pretvara navodnike u celom dokumentu editora kao jedan Undo korak.
+    Vraća (broj parova, pozicije neuparenih navodnika posle izmene).
+    """
+    data = to_bytes(editor.getText())
+    pairs, unbalanced = scan_quotes(data)
+    edits = quote_edits(pairs)
+    replace_all(editor, edits)
+    return len(pairs), _shift_positions(unbalanced, edits)
+
+
+def _shift_positions(positions, edits):
+    """Pomera sortirane pozicije za razliku u dužini izmena ispred njih."""
+    shifted = []
+    delta = 0
+    index = 0
+    for pos in positions:
+        while index < len(edits) and edits[index][0] < pos:
+            delta += len(edits[index][2]) - edits[index][1]
+            index += 1
+        shifted.append(pos + delta)
+    return shifted
+
+
+def convert_file(path, out_path=None):
+    """
+    Pretvara navodnike u fajlu (mmap, bez učitavanja celog fajla).
+    Vraća (broj parova, lista (bajt pozicija, red) neuparenih navodnika).
+    """
+    with open(path, 'rb') as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            pairs, unbalanced, lines = [], [], []
+        else:
+            data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                pairs, unbalanced = scan_quotes(data)
+                lines = line_numbers(data, unbalanced)
+            finally:
+                data.close()
+    if pairs or (out_path and out_path != path):
+        rewrite_file(path, quote_edits(pairs), out_path or path)
+    return len(pairs), list(zip(unbalanced, lines))
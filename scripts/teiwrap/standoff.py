@@ -0,0 +1,600 @@
+# -*- coding: utf-8 -*-
+"""
+standoff.py
+Standoff obeležavanje: umesto da menja tekst, wrap akcija upisuje opseg
+(start, end, otvarajući i zatvarajući tag) u sidecar fajl pored dokumenta
+(<dokument>.standoff). Opsezi se drže u nizovima (array), po 12 bajtova po
+anotaciji, a render() ih u jednom prolazu kroz mmap ulaza umeće kao
+inline TEI (isti kod kao teiwrap_cli.py apply).
+
+Kad se osnovni tekst promeni, rebase() prenosi anotacije na novu verziju:
+redovi koji se javljaju tačno jednom u obe verzije su sidra, oko njih se
+šire jednaki redovi, a izmenjeni redovi se isto tako porede po rečima i
+na kraju po zajedničkom početku i kraju bajtova. Anotacija čiji kraj padne u izmenjen tekst se
+ne premešta, već se vraća kao izgubljena.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from array import array
+
+from teiwrap.elements import SC_MOD_DELETETEXT, SC_MOD_INSERTTEXT, _document_key, _unwrap
+from teiwrap.headless import (CHUNK_SIZE, _check_nesting, _replace, check_file_markup, file_hash,
+                               rewrite_file, text_plan)
+from teiwrap.tags import to_bytes
+
+SIDECAR_SUFFIX = '.standoff'
+FORMAT_VERSION = 1
+MAGIC = b'TEIWRAP-STANDOFF\n'
+
+# Pozicije su 32-bitne (dokumenti do 4 GB), zapisane kao little-endian
+_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+_MAX = 2 ** 32
+
+# Reči za poređenje izmenjenih redova: slova i cifre (i svi ne-ASCII bajtovi),
+# razmaci, ili jedan drugi znak
+_WORD_RE = re.compile(br'[0-9A-Za-z_\x80-\xff]+|\s+|.', re.S)
+
+# Sidecar fajlovi dokumenata za koje je uključen standoff režim
+enabled = set()
+
+# Putanja sidecar fajla -> učitan AnnotationStore
+_stores = {}
+
+# Putanja sidecar fajla -> (editor, dokument, callback) za izmene teksta
+# dok je režim uključen
+_watched = {}
+
+
+def _to_bytes(values):
+    """Niz pozicija kao little-endian bajtovi."""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes() if hasattr(values, 'tobytes') else values.tostring()
+
+
+def _from_bytes(data):
+    """Niz pozicija iz little-endian bajtova."""
+    values = array(_TYPECODE)
+    if hasattr(values, 'frombytes'):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class AnnotationStore(object):
+    """
+    Anotacije jednog dokumenta: starts, ends i kinds su paralelni nizovi,
+    a kinds[i] je indeks para (otvarajući, zatvarajući) tekst u specs.
+    base_length je dužina osnovnog teksta u bajtovima, a base_hash SHA-1
+    osnovnog teksta (None ako je nepoznat). note_insert i note_delete
+    pomeraju anotacije za izmenu teksta; lost broji anotacije čiji je tekst
+    ceo obrisan.
+    """
+
+    def __init__(self, base_length=None, base_hash=None):
+        self.starts = array(_TYPECODE)
+        self.ends = array(_TYPECODE)
+        self.kinds = array(_TYPECODE)
+        self.specs = []
+        self._spec_ids = {}
+        self._order = None
+        self.base_length = base_length
+        self.base_hash = base_hash
+        self.lost = 0
+
+    def __len__(self):
+        return len(self.starts)
+
+    def spec_id(self, open_text, close_text):
+        """Indeks para tagova u specs (dodaje ga ako ga nema)."""
+        key = (open_text, close_text)
+        if key not in self._spec_ids:
+            self._spec_ids[key] = len(self.specs)
+            self.specs.append(key)
+        return self._spec_ids[key]
+
+    def _sorted(self):
+        """Parovi (start, end) sortirani po početku i (end, start) po kraju."""
+        if self._order is None or len(self._order[0]) != len(self):
+            pairs = list(zip(self.starts, self.ends))
+            self._order = (sorted(pairs), sorted((end, start) for start, end in pairs))
+        return self._order
+
+    def crossing(self, start, end):
+        """
+        Prva anotacija (start, end) koju opseg seče, ili None. Pregledaju
+        se samo anotacije koje počinju ili se završavaju unutar opsega.
+        """
+        by_start, by_end = self._sorted()
+        for other_start, other_end in by_start[bisect.bisect_right(by_start, (start, _MAX)):
+                                               bisect.bisect_left(by_start, (end, -1))]:
+            if other_end > end:
+                return other_start, other_end
+        for other_end, other_start in by_end[bisect.bisect_right(by_end, (start, _MAX)):
+                                             bisect.bisect_left(by_end, (end, -1))]:
+            if other_start < start:
+                return other_start, other_end
+        return None
+
+    def add(self, start, end, open_text, close_text):
+        """Dodaje anotaciju; baca ValueError za neispravan ili ukršten opseg."""
+        if start < 0 or end <= start:
+            raise ValueError(u"Neispravan opseg: {0}-{1}".format(start, end))
+        other = self.crossing(start, end)
+        if other is not None:
+            raise ValueError(u"Opseg {0}-{1} seče postojeću anotaciju {2}-{3}".format(
+                start, end, other[0], other[1]))
+        by_start, by_end = self._order
+        bisect.insort(by_start, (start, end))
+        bisect.insort(by_end, (end, start))
+        self.starts.append(start)
+        self.ends.append(end)
+        self.kinds.append(self.spec_id(open_text, close_text))
+
+    def note_insert(self, pos, length):
+        """
+        Pomera anotacije za umetanje length bajtova na poziciji pos. Tekst
+        umetnut tačno na granici anotacije ostaje van nje, kao u rebase().
+        """
+        self.starts = array(_TYPECODE, [start + length if start >= pos else start for start in self.starts])
+        self.ends = array(_TYPECODE, [end + length if end > pos else end for end in self.ends])
+        self._changed(length)
+
+    def note_delete(self, pos, length):
+        """Pomera anotacije za brisanje length bajtova od pos; prazne se odbacuju."""
+        stop = pos + length
+
+        def move(value):
+            return value if value <= pos else (value - length if value >= stop else pos)
+
+        kept = [(move(start), move(end), kind) for start, end, kind in zip(self.starts, self.ends, self.kinds)]
+        kept_spans = [span for span in kept if span[1] > span[0]]
+        self.lost += len(kept) - len(kept_spans)
+        self.starts = array(_TYPECODE, [span[0] for span in kept_spans])
+        self.ends = array(_TYPECODE, [span[1] for span in kept_spans])
+        self.kinds = array(_TYPECODE, [span[2] for span in kept_spans])
+        self._changed(-length)
+
+    def on_modified(self, args):
+        """Obrađuje argumente Scintilla SCN_MODIFIED obaveštenja."""
+        kind = args.get('modificationType', 0)
+        if kind & SC_MOD_INSERTTEXT:
+            self.note_insert(args['position'], args['length'])
+        elif kind & SC_MOD_DELETETEXT:
+            self.note_delete(args['position'], args['length'])
+
+    def _changed(self, delta):
+        """Tekst je izmenjen: SHA-1 više ne važi, a dužina se menja za delta."""
+        self._order = None
+        self.base_hash = None
+        if self.base_length is not None:
+            self.base_length += delta
+
+    def spans(self):
+        """Anotacije kao lista (start, end, otvarajući, zatvarajući) redom dodavanja."""
+        return [(start, end) + self.specs[kind]
+                for start, end, kind in zip(self.starts, self.ends, self.kinds)]
+
+    def save(self, path):
+        """Upisuje sidecar fajl atomično (privremeni fajl pa preimenovanje)."""
+        header = {
+            'version': FORMAT_VERSION, 'count': len(self),
+            'base_length': self.base_length, 'base_hash': self.base_hash,
+            'specs': [list(spec) for spec in self.specs],
+        }
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(MAGIC)
+                out.write(json.dumps(header, ensure_ascii=True, sort_keys=True).encode('ascii'))
+                out.write(b'\n')
+                for values in (self.starts, self.ends, self.kinds):
+                    out.write(_to_bytes(values))
+            _replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Čita sidecar fajl; baca ValueError ako fajl nije ispravan."""
+        with open(path, 'rb') as sidecar:
+            data = sidecar.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(u"{0} nije standoff fajl".format(path))
+        line_end = data.find(b'\n', len(MAGIC))
+        try:
+            header = json.loads(data[len(MAGIC):line_end].decode('ascii'))
+        except ValueError:
+            raise ValueError(u"{0}: neispravno zaglavlje".format(path))
+        if header.get('version') != FORMAT_VERSION:
+            raise ValueError(u"{0}: nepodržana verzija {1}".format(path, header.get('version')))
+        count = header['count']
+        body = data[line_end + 1:]
+        size = count * array(_TYPECODE).itemsize
+        if len(body) != 3 * size:
+            raise ValueError(u"{0}: fajl je oštećen".format(path))
+        store = cls(header['base_length'], header['base_hash'])
+        for open_text, close_text in header['specs']:
+            store.spec_id(open_text, close_text)
+        store.starts = _from_bytes(body[:size])
+        store.ends = _from_bytes(body[size:2 * size])
+        store.kinds = _from_bytes(body[2 * size:])
+        return store
+
+
+def sidecar_path(path):
+    """Putanja sidecar fajla za dokument."""
+    return path + SIDECAR_SUFFIX
+
+
+def load_or_new(path):
+    """Učitava sidecar ako postoji, a inače vraća prazan AnnotationStore."""
+    if os.path.exists(path):
+        return AnnotationStore.load(path)
+    return AnnotationStore()
+
+
+def data_hash(data):
+    """SHA-1 bajtova teksta (isti kao headless.file_hash za fajl)."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def render(src_path, store, out_path, chunk_size=CHUNK_SIZE):
+    """
+    Umeće anotacije kao inline tagove u tekst src_path i upisuje rezultat u
+    out_path, u jednom prolazu. Baca ValueError ako sidecar ne odgovara
+    tekstu (treba prvo rebase) ili se anotacije seku. Vraća broj anotacija.
+    """
+    size = os.path.getsize(src_path)
+    if store.base_length is not None and store.base_length != size:
+        raise ValueError(u"Sidecar je za tekst od {0} bajtova, a {1} ima {2}".format(
+            store.base_length, src_path, size))
+    if store.base_hash is not None and store.base_hash != file_hash(src_path):
+        raise ValueError(u"Sidecar ne odgovara tekstu {0}".format(src_path))
+    spans = store.spans()
+    _check_nesting([(start, end, open_text.strip(u'<>').split(u' ')[0], None)
+                    for start, end, open_text, _ in spans])
+    check_file_markup(src_path, [(start, end, u"Anotacija {0}".format(open_text))
+                                 for start, end, open_text, _ in spans])
+    plan = text_plan([(start, end, to_bytes(open_text), to_bytes(close_text))
+                      for start, end, open_text, close_text in spans])
+    rewrite_file(src_path, [(pos, 0, text) for pos, text in plan], out_path, chunk_size)
+    return len(store)
+
+
+def _token_starts(tokens):
+    """Bajt pozicije početaka delova (redova ili reči), plus kraj teksta."""
+    starts = [0]
+    for token in tokens:
+        starts.append(starts[-1] + len(token))
+    return starts
+
+
+def _unique_pairs(old_tokens, new_tokens):
+    """Parovi (i, j) delova koji se javljaju tačno jednom u obe verzije, po i."""
+    counts = {}
+    for token in old_tokens:
+        counts[token] = counts.get(token, 0) + 1
+    new_at = {}
+    for j, token in enumerate(new_tokens):
+        new_at[token] = -1 if token in new_at else j
+    return [(i, new_at[token]) for i, token in enumerate(old_tokens)
+            if counts[token] == 1 and new_at.get(token, -1) >= 0]
+
+
+def _increasing(pairs):
+    """Najduži podniz parova sa rastućim j (patience sortiranje, n log n)."""
+    tails, tail_at, previous = [], [], [None] * len(pairs)
+    for k, (_, j) in enumerate(pairs):
+        slot = bisect.bisect_left(tails, j)
+        previous[k] = tail_at[slot - 1] if slot else None
+        if slot == len(tails):
+            tails.append(j)
+            tail_at.append(k)
+        else:
+            tails[slot] = j
+            tail_at[slot] = k
+    result = []
+    k = tail_at[-1] if tail_at else None
+    while k is not None:
+        result.append(pairs[k])
+        k = previous[k]
+    return result[::-1]
+
+
+def _token_blocks(old_tokens, new_tokens):
+    """
+    Blokovi (i, j, broj) jednakih delova: oko svakog sidra (deo koji se javlja
+    tačno jednom u obe verzije) šire se jednaki susedni delovi.
+    """
+    anchors = _increasing(_unique_pairs(old_tokens, new_tokens))
+    # Lažno sidro iza poslednjeg dela hvata zajednički kraj
+    anchors.append((len(old_tokens), len(new_tokens)))
+    blocks = []
+    done_i = done_j = 0
+    for i, j in anchors:
+        if i < done_i or j < done_j:
+            continue
+        begin_i, begin_j = i, j
+        while begin_i > done_i and begin_j > done_j and old_tokens[begin_i - 1] == new_tokens[begin_j - 1]:
+            begin_i -= 1
+            begin_j -= 1
+        end_i, end_j = i, j
+        while end_i < len(old_tokens) and end_j < len(new_tokens) and old_tokens[end_i] == new_tokens[end_j]:
+            end_i += 1
+            end_j += 1
+        if end_i > begin_i:
+            blocks.append((begin_i, begin_j, end_i - begin_i))
+        done_i, done_j = end_i, end_j
+    return blocks
+
+
+def _common_prefix(old, new):
+    """Dužina zajedničkog početka dva niza bajtova."""
+    low, high = 0, min(len(old), len(new))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[low:middle] == new[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _blocks(old, new, old_base, new_base, old_tokens, new_tokens, words):
+    """Bajt blokovi za tekstove podeljene na delove; razmaci se dalje porede po _gap_blocks."""
+    old_at = _token_starts(old_tokens)
+    new_at = _token_starts(new_tokens)
+    blocks = []
+    old_pos = new_pos = 0
+    for i, j, count in _token_blocks(old_tokens, new_tokens) + [(len(old_tokens), len(new_tokens), 0)]:
+        blocks.extend(_gap_blocks(old[old_pos:old_at[i]], new[new_pos:new_at[j]],
+                                  old_base + old_pos, new_base + new_pos, words))
+        if count:
+            blocks.append((old_base + old_at[i], new_base + new_at[j], old_at[i + count] - old_at[i]))
+        old_pos, new_pos = old_at[i + count], new_at[j + count]
+    return blocks
+
+
+def _gap_blocks(old, new, old_base, new_base, words):
+    """
+    Blokovi u izmenjenom delu: zajednički početak i kraj bajtova, a između
+    njih (za izmenjene redove) isto poređenje po rečima.
+    """
+    head = _common_prefix(old, new)
+    tail = _common_prefix(old[head:][::-1], new[head:][::-1])
+    blocks = [(old_base, new_base, head)] if head else []
+    old_middle, new_middle = old[head:len(old) - tail], new[head:len(new) - tail]
+    if words and old_middle and new_middle:
+        blocks.extend(_blocks(old_middle, new_middle, old_base + head, new_base + head,
+                              _WORD_RE.findall(old_middle), _WORD_RE.findall(new_middle), False))
+    if tail:
+        blocks.append((old_base + len(old) - tail, new_base + len(new) - tail, tail))
+    return blocks
+
+
+def matching_blocks(old, new):
+    """
+    Vraća sortiranu listu (stari početak, novi početak, dužina) bajt blokova
+    koji su isti u obe verzije teksta. Delovi se porede preko rečnika, pa je
+    cena linearna u veličini teksta (plus n log n za sidra). Premešteni
+    redovi se ne prate: ostaju u izmenjenom delu.
+    """
+    return _merge(_blocks(old, new, 0, 0, old.splitlines(True), new.splitlines(True), True))
+
+
+def _merge(blocks):
+    """Spaja blokove koji se nastavljaju jedan na drugi u obe verzije."""
+    merged = []
+    for old_start, new_start, length in blocks:
+        if merged:
+            last_old, last_new, last_length = merged[-1]
+            if last_old + last_length == old_start and last_new + last_length == new_start:
+                merged[-1] = (last_old, last_new, last_length + length)
+                continue
+        merged.append((old_start, new_start, length))
+    return merged
+
+
+def rebase(store, old, new):
+    """
+    Prenosi anotacije sa stare na novu verziju osnovnog teksta (bajtovi).
+    Tekst umetnut tačno na granici anotacije ostaje van nje. Vraća
+    (novi AnnotationStore, lista (start, end, otvarajući, zatvarajući)
+    anotacija koje nije moguće preneti).
+    """
+    blocks = matching_blocks(old, new)
+    old_starts = [block[0] for block in blocks]
+    old_ends = [block[0] + block[2] for block in blocks]
+
+    def move_start(pos):
+        k = bisect.bisect_right(old_starts, pos) - 1
+        if k >= 0 and pos < old_ends[k]:
+            return blocks[k][1] + pos - blocks[k][0]
+        return None
+
+    def move_end(pos):
+        k = bisect.bisect_left(old_ends, pos)
+        if k < len(blocks) and old_starts[k] < pos:
+            return blocks[k][1] + pos - blocks[k][0]
+        return None
+
+    moved = AnnotationStore(len(new), data_hash(new))
+    lost = []
+    for start, end, open_text, close_text in store.spans():
+        new_start, new_end = move_start(start), move_end(end)
+        if new_start is None or new_end is None or new_end <= new_start:
+            lost.append((start, end, open_text, close_text))
+            continue
+        moved.starts.append(new_start)
+        moved.ends.append(new_end)
+        moved.kinds.append(moved.spec_id(open_text, close_text))
+    return moved, lost
+
+
+def document_sidecar(notepad):
+    """Sidecar fajl aktivnog dokumenta, ili None ako dokument nije sačuvan."""
+    path = notepad.getCurrentFilename()
+    if not path or not os.path.isabs(path):
+        return None
+    return sidecar_path(path)
+
+
+def is_enabled(notepad):
+    """Da li je standoff režim uključen za aktivni dokument."""
+    return bool(enabled) and document_sidecar(notepad) in enabled
+
+
+def toggle(editor, notepad):
+    """
+    Uključuje ili isključuje standoff režim za aktivni dokument. Pri
+    uključivanju se tekst pročita i hešira jednom (i anotacije, ako treba,
+    prenesu na njega); dok je režim uključen, izmene teksta samo pomeraju
+    anotacije, pa upis opsega ne čita dokument.
+    """
+    title = "Standoff"
+    path = document_sidecar(notepad)
+    if path is None:
+        notepad.messageBox("Sačuvajte dokument pre standoff obeležavanja.", title)
+        return 0
+    if path in enabled:
+        enabled.discard(path)
+        _unwatch(path)
+        store = _stores.get(path)
+        if store is not None and store.base_hash is None and len(store):
+            # Tekst je izmenjen dok je režim bio uključen
+            store.base_hash = data_hash(to_bytes(editor.getText()))
+            store.save(path)
+        notepad.messageBox("Standoff režim je isključen; wrap akcije ponovo menjaju tekst.", title)
+        return 0
+    try:
+        store = _current_store(notepad, path, to_bytes(editor.getText()))
+    except ValueError as error:
+        notepad.messageBox(str(error), title)
+        return 0
+    if store is None:
+        return 0
+    enabled.add(path)
+    _watch(editor, path)
+    notepad.messageBox(
+        "Standoff režim je uključen: wrap akcije upisuju opsege u\n{0}\n"
+        "(anotacija: {1}). Tekst se ne menja.".format(path, len(store)), title)
+    return 1
+
+
+def _modified_notification():
+    """SCINTILLANOTIFICATION.MODIFIED u Notepad++ (van njega ime obaveštenja)."""
+    try:
+        from Npp import SCINTILLANOTIFICATION
+    except ImportError:
+        return 'MODIFIED'
+    return SCINTILLANOTIFICATION.MODIFIED
+
+
+def _watch(editor, path):
+    """Registruje Scintilla callback koji pomera anotacije dokumenta pri izmenama."""
+    editor = _unwrap(editor)
+    _unwatch(path)
+    document = _document_key(editor)
+
+    def callback(args):
+        store = _stores.get(path)
+        if store is not None and _document_key(editor) == document:
+            store.on_modified(args)
+
+    editor.callbackSync(callback, [_modified_notification()])
+    _watched[path] = (editor, callback)
+
+
+def _unwatch(path):
+    """Uklanja callback koji je registrovao _watch()."""
+    entry = _watched.pop(path, None)
+    if entry is not None:
+        entry[0].clearCallbacks(entry[1])
+
+
+def _previous_text(notepad, store):
+    """
+    Tekst za koji su anotacije zapisane (base_hash), iz sačuvanog fajla
+    dokumenta, ili None ako se sačuvani fajl razlikuje.
+    """
+    document = notepad.getCurrentFilename()
+    if os.path.exists(document) and file_hash(document) == store.base_hash:
+        with open(document, 'rb') as src:
+            return src.read()
+    return None
+
+
+def _current_store(notepad, path, data):
+    """
+    AnnotationStore dokumenta, prenet (rebase) na tekst data ako je sidecar
+    napravljen za drugu verziju teksta; base_length i base_hash se postavljaju
+    na data. Vraća None (uz poruku) ako prethodna verzija teksta nije dostupna.
+    """
+    title = "Standoff"
+    store = load_or_new(path)
+    current = data_hash(data)
+    if len(store) and store.base_hash not in (None, current):
+        old = _previous_text(notepad, store)
+    elif len(store) and store.base_length not in (None, len(data)):
+        old = None
+    else:
+        old = data
+    if old is None:
+        notepad.messageBox(
+            "Tekst je izmenjen posle poslednje anotacije, a verzija za koju je\n"
+            "sidecar napravljen nije dostupna: režim nije uključen.\n"
+            "Prenesite anotacije sa: python teiwrap_cli.py rebase STARI NOVI", title)
+        return None
+    changed = (store.base_length, store.base_hash) != (len(data), current)
+    if old is not data:
+        store, lost = rebase(store, old, data)
+        if lost:
+            notepad.messageBox(
+                "Tekst je izmenjen posle poslednje anotacije: {0} anotacija je premešteno,\n"
+                "{1} izgubljeno (njihov tekst je izmenjen).".format(len(store), len(lost)), title)
+    store.base_length = len(data)
+    store.base_hash = current
+    if changed and len(store):
+        store.save(path)
+    _stores[path] = store
+    return store
+
+
+def record(editor, notepad, ranges, open_text, close_text):
+    """
+    Upisuje opsege u sidecar aktivnog dokumenta umesto da obavija tekst.
+    Čitaju se samo anotacije u memoriji: izmene teksta ih pomeraju kroz
+    callback (vidi toggle). Ako bi neki opseg sekao postojeću anotaciju,
+    ništa se ne upisuje.
+    """
+    title = "Standoff"
+    path = document_sidecar(notepad)
+    store = _stores[path]
+    for start, end in ranges:
+        other = store.crossing(start, end)
+        if other is not None:
+            notepad.messageBox(
+                "Red {0}: opseg seče postojeću anotaciju, ništa nije upisano.".format(
+                    editor.lineFromPosition(start) + 1), title)
+            return 0
+    for start, end in ranges:
+        store.add(start, end, open_text, close_text)
+    store.save(path)
+    if store.lost:
+        notepad.messageBox(
+            "{0} anotacija je izgubljeno jer je njihov tekst obrisan.".format(store.lost), title)
+        store.lost = 0
+    return len(ranges)
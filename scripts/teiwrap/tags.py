@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+tags.py
+Pravljenje otvarajućih i zatvarajućih tagova. Koriste ga i wrap akcije u
+editoru i alati van Notepad++, pa je izlaz uvek bajt-identičan.
+"""
+
+from teiwrap.escaping import check_attr, check_name, escape_attr, to_native
+
+# Srpski navodnici („ i “)
+SERBIAN_QUOTES = ('„', '“')
+
+# Pseudo-tagovi koji nisu XML elementi
+WRAPPERS = {
+    'serbian_quotes': SERBIAN_QUOTES,
+}
+
+
+def element(tag, attrs=None):
+    """
+    Vraća (otvarajući, zatvarajući) tag; attrs je lista parova (ime, vrednost).
+    Tagovi su str (to_native) i kad vrednosti dolaze kao unicode. Baca
+    ValueError za neispravno ime elementa ili atributa i za neispravnu
+    vrednost atributa (npr. xml:lang).
+    """
+    tag = to_native(tag)
+    if tag in WRAPPERS:
+        return WRAPPERS[tag]
+    reason = check_name(tag)
+    if reason:
+        raise ValueError(reason)
+    parts = [tag]
+    for name, value in attrs or ():
+        reason = check_name(name) or check_attr(name, value)
+        if reason:
+            raise ValueError(reason)
+        parts.append('{0}="{1}"'.format(to_native(name), to_native(escape_attr(value))))
+    return '<{0}>'.format(' '.join(parts)), '</{0}>'.format(tag)
+
+
+def nest(pairs):
+    """
+    Spaja parove (otvarajući, zatvarajući), od spoljašnjeg ka unutrašnjem,
+    u jedan par: [("<quote>", "</quote>"), ("<hi>", "</hi>")] daje
+    ("<quote><hi>", "</hi></quote>").
+    """
+    return "".join(pair[0] for pair in pairs), "".join(pair[1] for pair in reversed(pairs))
+
+
+def to_bytes(text):
+    """Vraća tekst kao UTF-8 bajtove."""
+    if isinstance(text, bytes):
+        return text
+    return text.encode('utf-8')
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+translit.py
+Preslovljavanje srpskog teksta ćirilica <-> latinica koje ne dira markup:
+imena tagova, vrednosti atributa, entitete (&amp;), komentare, CDATA,
+instrukcije obrade, DOCTYPE i sadržaj <foreign> elemenata.
+
+Tekst se obrađuje u delovima (Transliterator.feed), pa fajl od 100 MB
+zauzima konstantnu memoriju. Deo se uvek seče ispred '<' ili posle
+razmaka, tako da digraf (lj, nj, dž) i reč pisana velikim slovima (ЉУБАВ
+-> LJUBAV) nikad nisu presečeni, a rezultat ne zavisi od veličine delova.
+Sam tekst između tagova se pretvara jednim str.translate pozivom po delu.
+"""
+
+import codecs
+import os
+import re
+import shutil
+import tempfile
+
+from teiwrap import elements
+from teiwrap.batch import replace_all, selection_ranges
+from teiwrap.headless import _replace
+from teiwrap.tags import to_bytes
+
+# Smerovi preslovljavanja
+LATIN = 'latin'
+CYRILLIC = 'cyrillic'
+DIRECTIONS = (LATIN, CYRILLIC)
+
+# Veličina dela fajla koji se odjednom čita i pretvara
+CHUNK_SIZE = 1024 * 1024
+
+_PAIRS = (
+    u'аa бb вv гg дd ђđ еe жž зz иi јj кk лl мm нn оo пp рr сs тt ћć уu фf хh цc чč шš'
+    u' АA БB ВV ГG ДD ЂĐ ЕE ЖŽ ЗZ ИI ЈJ КK ЛL МM НN ОO ПP РR СS ТT ЋĆ УU ФF ХH ЦC ЧČ ШŠ'
+)
+_SINGLE = dict(pair for pair in _PAIRS.split())
+
+_DIGRAPHS = (
+    (u'љ', u'lj'), (u'њ', u'nj'), (u'џ', u'dž'),
+    (u'Љ', u'Lj'), (u'Њ', u'Nj'), (u'Џ', u'Dž'),
+    (u'Љ', u'LJ'), (u'Њ', u'NJ'), (u'Џ', u'DŽ'),
+)
+
+# ћирилица -> latinica: jedan karakter u jedan ili dva
+_TO_LATIN = dict((ord(cyr), lat) for cyr, lat in _SINGLE.items())
+_TO_LATIN.update((ord(cyr), lat) for cyr, lat in _DIGRAPHS[:6])
+
+# latinica -> ћирилица: digrafi se zamenjuju pre translate; Unicode digrafi (ǉ, ǅ...) su jedan karakter
+_TO_CYRILLIC = dict((ord(lat), cyr) for cyr, lat in _SINGLE.items())
+_TO_CYRILLIC.update((ord(lat), cyr) for lat, cyr in (
+    (u'ǉ', u'љ'), (u'ǈ', u'Љ'), (u'Ǉ', u'Љ'), (u'ǌ', u'њ'), (u'ǋ', u'Њ'), (u'Ǌ', u'Њ'),
+    (u'ǆ', u'џ'), (u'ǅ', u'Џ'), (u'Ǆ', u'Џ')))
+
+# Љ, Њ, Џ uz veliko slovo pišu se LJ, NJ, DŽ (ЉУБАВ -> LJUBAV, ТАЊ -> TANJ)
+_CAPS_RE = re.compile(u'(?<=[Ѐ-Я])[ЉЊЏ]|[ЉЊЏ](?=[Ѐ-Я])')
+_CAPS = dict((cyr, lat) for cyr, lat in _DIGRAPHS[6:])
+
+# Markup koji se prepisuje bez izmene; tekst između ostaje u parnim delovima re.split
+_TAG = u'<(?:[^<>"\']|"[^"]*"|\'[^\']*\')*>'
+_CONSTRUCTS = (
+    (u'<!--', re.compile(u'<!--.*?-->', re.S)),
+    (u'<![CDATA[', re.compile(u'<!\\[CDATA\\[.*?\\]\\]>', re.S)),
+    (u'<?', re.compile(u'<\\?.*?\\?>', re.S)),
+    (u'<!DOCTYPE', re.compile(u'<!DOCTYPE[^\\[>]*(?:\\[.*?\\]\\s*)?>', re.S)),
+)
+_SPLIT_RE = re.compile(u'({0}|{1}|&[^;\\s<&]*;)'.format(
+    u'|'.join(regex.pattern for _, regex in _CONSTRUCTS), _TAG), re.S)
+_FOREIGN_RE = re.compile(u'(<!--.*?-->|<!\\[CDATA\\[.*?\\]\\]>)|<(/?)foreign(?=[\\s/>]){0}'.format(
+    _TAG[1:]), re.S)
+
+# Graničnik delova teksta pri pretvaranju jednim pozivom (u XML-u ne postoji)
+_SEPARATOR = u'\x00'
+
+
+def _decode(text):
+    """Vraća tekst iz editora (bajtovi u Python 2) kao unicode."""
+    return text.decode('utf-8') if isinstance(text, bytes) else text
+
+
+def to_latin(text):
+    """Pretvara ćirilicu u latinicu u tekstu bez markupa."""
+    if u'Љ' in text or u'Њ' in text or u'Џ' in text:
+        text = _CAPS_RE.sub(lambda match: _CAPS[match.group()], text)
+    return text.translate(_TO_LATIN)
+
+
+def to_cyrillic(text):
+    """
+    Pretvara latinicu u ćirilicu u tekstu bez markupa. Slova bez para u
+    ćirilici (q, w, x, y) ostaju; nj/dž u pozajmljenicama (konjunkcija,
+    nadživeti) se pretvaraju kao digrafi, pa takve reči treba staviti u
+    <foreign> ili ispraviti ručno.
+    """
+    for cyr, lat in _DIGRAPHS:
+        if lat in text:
+            text = text.replace(lat, cyr)
+    return text.translate(_TO_CYRILLIC)
+
+
+_CONVERTERS = {LATIN: to_latin, CYRILLIC: to_cyrillic}
+
+
+def _check_direction(direction):
+    if direction not in _CONVERTERS:
+        raise ValueError(u"Nepoznat smer preslovljavanja: {0} (latin ili cyrillic)".format(direction))
+
+
+class Transliterator(object):
+    """
+    Preslovljava tekst sa markupom deo po deo. feed() vraća pretvoren deo
+    do poslednjeg bezbednog mesta, a ostatak čuva za sledeći poziv;
+    feed(..., final=True) vraća sve. foreign je broj otvorenih <foreign>
+    elemenata na početku (npr. za selekciju unutar <foreign>).
+    """
+
+    def __init__(self, direction, foreign=0):
+        _check_direction(direction)
+        self.convert = _CONVERTERS[direction]
+        self.foreign = foreign
+        self.pending = u''
+
+    def feed(self, text, final=False):
+        text = self.pending + text
+        cut = len(text) if final else _safe_cut(text)
+        self.pending = text[cut:]
+        return self._convert(text[:cut])
+
+    def _convert(self, text):
+        """Pretvara tekst u kome su svi komentari, CDATA i tagovi celi."""
+        if not self.foreign and u'foreign' not in text:
+            return self._convert_markup(text)
+        parts = []
+        pos = 0
+        for match in _FOREIGN_RE.finditer(text):
+            if match.group(1):
+                continue
+            segment = text[pos:match.start()]
+            parts.append(segment if self.foreign else self._convert_markup(segment))
+            parts.append(match.group())
+            pos = match.end()
+            if not match.group(2):
+                if not match.group().endswith(u'/>'):
+                    self.foreign += 1
+            elif self.foreign:
+                self.foreign -= 1
+        segment = text[pos:]
+        parts.append(segment if self.foreign else self._convert_markup(segment))
+        return u''.join(parts)
+
+    def _convert_markup(self, text):
+        """Pretvara tekst između markupa jednim pozivom, spojen graničnikom."""
+        parts = _SPLIT_RE.split(text)
+        if len(parts) == 1:
+            return self.convert(text)
+        parts[0::2] = self.convert(_SEPARATOR.join(parts[0::2])).split(_SEPARATOR)
+        return u''.join(parts)
+
+
+def _safe_cut(text):
+    """
+    Poslednje mesto u text na kome se sme seći: ispred poslednjeg '<' (i
+    ispred nezavršenog komentara, CDATA...), ili posle poslednjeg razmaka
+    ako '<' nema.
+    """
+    cut = text.rfind(u'<')
+    if cut < 0:
+        return max(text.rfind(u' '), text.rfind(u'\n')) + 1
+    moved = True
+    while moved:
+        moved = False
+        for opener, regex in _CONSTRUCTS:
+            start = text.rfind(opener, 0, cut)
+            if start >= 0:
+                match = regex.match(text, start)
+                if match is None or match.end() > cut:
+                    cut = start
+                    moved = True
+    return cut
+
+
+def transliterate(text, direction, foreign=0):
+    """Preslovljava ceo tekst sa markupom (unicode)."""
+    return Transliterator(direction, foreign).feed(text, final=True)
+
+
+def convert_ranges(editor, ranges, direction):
+    """
+    Preslovljava opsege (start, end) dokumenta editora kao jedan Undo korak.
+    Opseg koji počinje ili se završava unutar taga ili komentara se
+    preskače. Vraća (pretvoreni opsezi posle izmene, broj preskočenih).
+    """
+    _check_direction(direction)
+    index = elements.index_for(editor)
+    edits = []
+    result = []
+    skipped = 0
+    delta = 0
+    for start, end in ranges:
+        if index.inside(start) or index.inside(end):
+            skipped += 1
+            continue
+        foreign = sum(1 for _, _, name in index.enclosing(start) if name == 'foreign')
+        text = _decode(editor.getTextRange(start, end))
+        data = to_bytes(transliterate(text, direction, foreign))
+        if data != to_bytes(text):
+            edits.append((start, end - start, data))
+        result.append((start + delta, start + delta + len(data)))
+        delta += len(data) - (end - start)
+    replace_all(editor, edits)
+    return result, skipped
+
+
+def convert_selection(editor, direction):
+    """
+    Preslovljava selekcije, ili ceo dokument ako selekcije nema, i ponovo
+    selektuje pretvoreni tekst. Vraća (broj pretvorenih opsega, broj preskočenih).
+    """
+    ranges = selection_ranges(editor)
+    whole = not ranges
+    if whole:
+        ranges = [(0, editor.getLength())]
+    converted, skipped = convert_ranges(editor, ranges, direction)
+    if not whole:
+        for i, (start, end) in enumerate(converted):
+            if i == 0:
+                editor.setSelection(end, start)
+            else:
+                editor.addSelection(end, start)
+    return len(converted), skipped
+
+
+def convert_stream(src, out, direction, chunk_size=CHUNK_SIZE):
+    """
+    Preslovljava UTF-8 tok src u out deo po deo. Vraća True ako se
+    izlaz razlikuje od ulaza.
+    """
+    converter = Transliterator(direction)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    changed = False
+    while True:
+        data = src.read(chunk_size)
+        text = converter.pending + decoder.decode(data, final=not data)
+        converter.pending = u''
+        result = converter.feed(text, final=not data)
+        if not changed and result != text[:len(text) - len(converter.pending)]:
+            changed = True
+        out.write(result.encode('utf-8'))
+        if not data:
+            return changed
+
+
+def convert_file(path, direction, out_path=None, chunk_size=CHUNK_SIZE):
+    """
+    Preslovljava fajl u out_path (podrazumevano na istom mestu) preko
+    privremenog fajla. Nepromenjen fajl na istom mestu se ne prepisuje.
+    Vraća True ako je tekst promenjen.
+    """
+    _check_direction(direction)
+    target = out_path or path
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            with open(path, 'rb') as src:
+                changed = convert_stream(src, out, direction, chunk_size)
+        if changed or os.path.abspath(target) != os.path.abspath(path):
+            shutil.copymode(path, tmp_path)
+            _replace(tmp_path, target)
+        else:
+            os.remove(tmp_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return changed
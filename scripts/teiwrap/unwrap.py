@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+unwrap.py
+Uklanjanje taga oko selekcije ili kursora. Element koji obuhvata poziciju
+traži se Scintilla pretragom (searchInTarget) unazad i unapred od kursora,
+ograničenom na SEARCH_WINDOW bajtova, pa se dokument nikad ne kopira u
+Python i cena ne zavisi od njegove veličine.
+
+Pretraga gleda samo tagove sa traženim imenom; ostali elementi ne utiču na
+uparivanje, jer se u dobro formiranom dokumentu ne ukrštaju. Tagovi u
+komentarima i CDATA sekcijama se ne preskaču.
+"""
+
+from teiwrap import elements
+from teiwrap.batch import suppressed_redraw, undo_action
+
+# Koliko bajtova pre i posle selekcije se pretražuje
+SEARCH_WINDOW = 256 * 1024
+
+# Najveća dužina taga (sa atributima) čiji se kraj '>' traži
+MAX_TAG = 4096
+
+# Scintilla SCFIND_MATCHCASE: doslovna pretraga, razlikuje velika i mala slova
+SCFIND_MATCHCASE = 0x4
+
+# Karakteri koji mogu da slede ime taga
+_NAME_END = frozenset(ord(c) for c in ' \t\r\n>/')
+
+
+def _search(editor, text, start, end):
+    """Traži text u [start, end) (unazad ako je start > end); vraća poziciju ili -1."""
+    editor.setTargetRange(start, end)
+    return editor.searchInTarget(text)
+
+
+def _tag_at(editor, tag, pos, limit):
+    """
+    Vraća (start, kraj, promena dubine) za tag sa imenom tag koji počinje na
+    pos (+1 otvarajući, -1 zatvarajući), ili None ako je tamo samo slično
+    ime (npr. <hiX), prazan element ili nezavršen tag.
+    """
+    closing = editor.getCharAt(pos + 1) == ord('/')
+    after = pos + len(tag) + (2 if closing else 1)
+    if editor.getCharAt(after) not in _NAME_END:
+        return None
+    end = _search(editor, '>', after, min(limit, after + MAX_TAG))
+    if end < 0:
+        return None
+    if closing:
+        return pos, end + 1, -1
+    if editor.getCharAt(end - 1) == ord('/'):
+        return None
+    return pos, end + 1, 1
+
+
+def _previous_tag(editor, tag, pos, lower, limit):
+    """Najbliži tag sa imenom tag koji počinje u [lower, pos), ili None."""
+    while pos > lower:
+        hit = max(_search(editor, '<' + tag, pos, lower), _search(editor, '</' + tag, pos, lower))
+        if hit < 0:
+            return None
+        found = _tag_at(editor, tag, hit, limit)
+        if found is not None:
+            return found
+        pos = hit
+    return None
+
+
+def _next_tag(editor, tag, pos, upper):
+    """Prvi tag sa imenom tag koji počinje u [pos, upper), ili None."""
+    while pos < upper:
+        hits = [hit for hit in (_search(editor, '<' + tag, pos, upper),
+                                _search(editor, '</' + tag, pos, upper)) if hit >= 0]
+        if not hits:
+            return None
+        found = _tag_at(editor, tag, min(hits), upper)
+        if found is not None:
+            return found
+        pos = min(hits) + 1
+    return None
+
+
+def _closing(editor, tag, pos, upper):
+    """Zatvarajući tag (start, kraj) za element čiji sadržaj počinje na pos, ili None."""
+    depth = 0
+    while True:
+        found = _next_tag(editor, tag, pos, upper)
+        if found is None:
+            return None
+        depth += found[2]
+        if depth < 0:
+            return found[0], found[1]
+        pos = found[1]
+
+
+def find_element(editor, tag, start, end=None, window=SEARCH_WINDOW):
+    """
+    Vraća (start otvarajućeg, kraj otvarajućeg, start zatvarajućeg, kraj
+    zatvarajućeg) za najdublji element tag koji obuhvata opseg [start, end),
+    ili None ako ga nema u okolini od window bajtova. Selekcija može da
+    obuhvati i same tagove elementa.
+    """
+    if end is None:
+        end = start
+    length = editor.getLength()
+    lower = max(0, start - window)
+    upper = min(length, end + window)
+    editor.setSearchFlags(SCFIND_MATCHCASE)
+    # Otvarajući tag koji počinje tačno na početku selekcije
+    candidate = None
+    if _search(editor, '<' + tag, start, min(length, start + len(tag) + 1)) == start:
+        candidate = _tag_at(editor, tag, start, upper)
+    pos = start
+    depth = 0
+    while True:
+        if candidate is None:
+            candidate = _previous_tag(editor, tag, pos, lower, upper)
+            if candidate is None:
+                return None
+            pos = candidate[0]
+            depth -= candidate[2]
+            if depth >= 0:
+                candidate = None
+                continue
+            depth = 0
+        closing = _closing(editor, tag, candidate[1], upper)
+        if closing is None:
+            return None
+        if closing[1] >= end:
+            return candidate[0], candidate[1], closing[0], closing[1]
+        # Element se završava pre kraja selekcije; traži se spoljašnji
+        pos = candidate[0]
+        candidate = None
+
+
+def unwrap_elements(editor, found):
+    """
+    Briše tagove elemenata (start, kraj otvarajućeg, start, kraj
+    zatvarajućeg), od kraja ka početku, kao jedan Undo korak. Selekcije
+    se pomeraju same, pa sadržaj ostaje selektovan. Vraća broj elemenata.
+    """
+    spans = sorted(set(span for item in set(found) for span in ((item[0], item[1]), (item[2], item[3]))))
+    if not spans:
+        return 0
+    with suppressed_redraw(editor):
+        with undo_action(editor):
+            for start, end in reversed(spans):
+                editor.deleteRange(start, end - start)
+    note_unwrap(editor, spans)
+    return len(set(found))
+
+
+def note_unwrap(editor, spans):
+    """
+    Prijavljuje indeksu elemenata brisanja koja je napravio unwrap_elements,
+    osim ako indeks već prati izmene kroz Scintilla callback.
+    """
+    index = elements.cached_index(editor)
+    if index is None or elements.watching(editor):
+        return
+    for start, end in reversed(spans):
+        index.note_delete(start, end - start)
+
+
+def unwrap_selections(editor, tag, window=SEARCH_WINDOW):
+    """
+    Uklanja element tag koji obuhvata svaku selekciju (ili kursor). Vraća
+    (broj uklonjenih elemenata, selekcije za koje element nije nađen).
+    """
+    found = []
+    missing = []
+    for i in range(editor.getSelections()):
+        start = editor.getSelectionNStart(i)
+        end = editor.getSelectionNEnd(i)
+        item = find_element(editor, tag, start, end, window)
+        if item is None:
+            missing.append((start, end))
+        else:
+            found.append(item)
+    return unwrap_elements(editor, found), missing
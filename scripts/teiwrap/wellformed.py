@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+wellformed.py
+Provera da obavijanje selekcije neće napraviti ukrštene elemente, npr.
+<hi>a<title>b</hi>c</title>. Koristi zajednički indeks elemenata
+(teiwrap.elements): provera čita samo blokove na krajevima selekcije, a
+između njih koristi sažetke steka tagova, pa cena ne zavisi od veličine
+dokumenta.
+"""
+
+from teiwrap import elements
+
+
+def problem(index, start, end):
+    """
+    Vraća opis problema ako bi obavijanje opsega [start, end) napravilo
+    ukrštene elemente, inače None.
+    """
+    if end <= start:
+        return None
+    if index.inside(start):
+        return "selekcija počinje unutar taga"
+    if index.inside(end):
+        return "selekcija se završava unutar taga"
+    depth, low = index.balance(start, end)
+    if low < 0:
+        return "selekcija zatvara element otvoren pre nje"
+    if depth:
+        return "selekcija otvara element koji se ne zatvara u njoj"
+    return None
+
+
+def check_ranges(editor, ranges):
+    """Vraća listu (start, end, opis) za opsege čije bi obavijanje ukrstilo elemente."""
+    if not ranges:
+        return []
+    index = elements.index_for(editor)
+    problems = []
+    for start, end in ranges:
+        reason = problem(index, start, end)
+        if reason:
+            problems.append((start, end, reason))
+    return problems
+
+
+def note_wrap(editor, ranges, open_len, close_len):
+    """
+    Prijavljuje indeksu umetanja koja je napravio wrap_ranges (od kraja ka
+    početku), osim ako indeks već prati izmene kroz Scintilla callback.
+    """
+    index = elements.cached_index(editor)
+    if index is None or elements.watching(editor):
+        return
+    for start, end in reversed(ranges):
+        index.note_insert(end, close_len)
+        index.note_insert(start, open_len)
@@ -2,135 +2,45 @@
 """
 test_scripts.py
 Mock okruženje za testiranje PythonScript skripti van Notepad++.
-Ovaj fajl simulira Npp modul i testira sve wrap skripte.
+Ovaj fajl simulira Npp modul (tests/mock_npp.py: editor sa gap baferom i
+UTF-8 bajt pozicijama, kao Scintilla) i pokreće sve wrap skripte.
 """
 
+import io
+import os
+import sys
 
-class MockEditor:
-    """Mock klasa koja simulira editor objekat iz Npp modula."""
-    
-    def __init__(self):
-        self.selected_text = ""
-        self.replaced_text = ""
-    
-    def getSelText(self):
-        """Vraća selektovani tekst."""
-        return self.selected_text
-    
-    def replaceSel(self, text):
-        """Zamenjuje selekciju sa novim tekstom."""
-        self.replaced_text = text
-        print("Replaced: {0}".format(text))
-
-
-class MockNotepad:
-    """Mock klasa koja simulira notepad objekat iz Npp modula."""
-    
-    def __init__(self):
-        self.prompt_response = "en"
-    
-    def prompt(self, message, title, default):
-        """Simulira prompt dijalog."""
-        print("Prompt: {0}".format(message))
-        print("Title: {0}".format(title))
-        print("Default: {0}".format(default))
-        return self.prompt_response
-
-
-def test_wrap_tag(tag_name, expected_output, mock_editor):
-    """Testira jednostavnu wrap skriptu."""
-    print("\n=== Test {0} ===".format(tag_name))
-    mock_editor.selected_text = "test text"
-    mock_editor.replaced_text = ""
-    
-    # Simuliraj izvršavanje skripte
-    sel = mock_editor.getSelText()
-    if sel:
-        mock_editor.replaceSel(expected_output.format(sel=sel))
-    
-    # Proveri rezultat
-    if mock_editor.replaced_text == expected_output.format(sel="test text"):
-        print("✓ {0} test PROŠAO".format(tag_name))
-        return True
-    else:
-        print("✗ {0} test NIJE PROŠAO".format(tag_name))
-        print("  Očekivano: {0}".format(expected_output.format(sel='test text')))
-        print("  Dobijeno: {0}".format(mock_editor.replaced_text))
-        return False
-
-
-def test_foreign_fixed(mock_editor):
-    """Testira wrap_foreign_fixed.py skriptu."""
-    print("\n=== Test wrap_foreign_fixed ===")
-    mock_editor.selected_text = "hello world"
-    mock_editor.replaced_text = ""
-    
-    DEFAULT_LANG = "en"
-    sel = mock_editor.getSelText()
-    if sel:
-        mock_editor.replaceSel('<foreign xml:lang="{0}">{1}</foreign>'.format(DEFAULT_LANG, sel))
-    
-    expected = '<foreign xml:lang="en">hello world</foreign>'
-    if mock_editor.replaced_text == expected:
-        print("✓ wrap_foreign_fixed test PROŠAO")
-        return True
-    else:
-        print("✗ wrap_foreign_fixed test NIJE PROŠAO")
-        print("  Očekivano: {0}".format(expected))
-        print("  Dobijeno: {0}".format(mock_editor.replaced_text))
-        return False
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPTS_DIR))
+sys.path.insert(0, SCRIPTS_DIR)
 
+from tests.mock_npp import MockNotepad, MockScintilla, fake_npp
 
-def test_foreign_prompt(mock_editor, mock_notepad):
-    """Testira wrap_foreign_prompt.py skriptu."""
-    print("\n=== Test wrap_foreign_prompt ===")
-    mock_editor.selected_text = "bonjour"
-    mock_editor.replaced_text = ""
-    mock_notepad.prompt_response = "fr"
-    
-    sel = mock_editor.getSelText()
-    if sel:
-        lang = mock_notepad.prompt("Unesite vrednost za xml:lang atribut:", "Jezik", "en")
-        if lang:
-            # Očisti lang od potencijalno opasnih karaktera
-            lang_clean = lang.replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-            mock_editor.replaceSel('<foreign xml:lang="{0}">{1}</foreign>'.format(lang_clean, sel))
-    
-    expected = '<foreign xml:lang="fr">bonjour</foreign>'
-    if mock_editor.replaced_text == expected:
-        print("✓ wrap_foreign_prompt test PROŠAO")
-        return True
-    else:
-        print("✗ wrap_foreign_prompt test NIJE PROŠAO")
-        print("  Očekivano: {0}".format(expected))
-        print("  Dobijeno: {0}".format(mock_editor.replaced_text))
-        return False
 
+def run_script(script_name, mock_editor, mock_notepad):
+    """Izvršava skriptu kao PythonScript: čita, kompajlira i pokreće fajl."""
+    path = os.path.join(SCRIPTS_DIR, script_name)
+    with io.open(path, encoding='utf-8') as handle:
+        code = compile(handle.read(), path, 'exec')
+    with fake_npp(mock_editor, mock_notepad):
+        exec(code, {'__name__': '__main__'})
 
-def test_foreign_prompt_with_escaping(mock_editor, mock_notepad):
-    """Testira XML escaping u wrap_foreign_prompt.py skripti."""
-    print("\n=== Test wrap_foreign_prompt (sa escapingom) ===")
-    mock_editor.selected_text = "test"
-    mock_editor.replaced_text = ""
-    mock_notepad.prompt_response = 'en"test'
-    
-    sel = mock_editor.getSelText()
-    if sel:
-        lang = mock_notepad.prompt("Unesite vrednost za xml:lang atribut:", "Jezik", "en")
-        if lang:
-            # Očisti lang od potencijalno opasnih karaktera
-            lang_clean = lang.replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-            mock_editor.replaceSel('<foreign xml:lang="{0}">{1}</foreign>'.format(lang_clean, sel))
-    
-    expected = '<foreign xml:lang="en&quot;test">test</foreign>'
-    if mock_editor.replaced_text == expected:
-        print("✓ wrap_foreign_prompt (escaping) test PROŠAO")
+
+def check(name, script_name, text, expected, mock_notepad, selection=None):
+    """Pokreće skriptu nad tekstom i poredi rezultat sa očekivanim."""
+    print("\n=== Test {0} ===".format(name))
+    if selection is None:
+        selection = (0, len(text.encode('utf-8')))
+    mock_editor = MockScintilla(text, [selection])
+    run_script(script_name, mock_editor, mock_notepad)
+
+    if mock_editor.text == expected:
+        print("✓ {0} test PROŠAO".format(name))
         return True
-    else:
-        print("✗ wrap_foreign_prompt (escaping) test NIJE PROŠAO")
-        print("  Očekivano: {0}".format(expected))
-        print("  Dobijeno: {0}".format(mock_editor.replaced_text))
-        return False
+    print("✗ {0} test NIJE PROŠAO".format(name))
+    print("  Očekivano: {0}".format(expected))
+    print("  Dobijeno: {0}".format(mock_editor.text))
+    return False
 
 
 def run_all_tests():
@@ -138,25 +48,33 @@ def run_all_tests():
     print("=" * 50)
     print("TESTIRANJE PYTHONSCRIPT SKRIPTI")
     print("=" * 50)
-    
-    mock_editor = MockEditor()
+
     mock_notepad = MockNotepad()
-    
     results = []
-    
+
     # Testiraj sve jednostavne wrap skripte
-    results.append(test_wrap_tag("wrap_trailer", "<trailer>{sel}</trailer>", mock_editor))
-    results.append(test_wrap_tag("wrap_title", "<title>{sel}</title>", mock_editor))
-    results.append(test_wrap_tag("wrap_quote", "<quote>{sel}</quote>", mock_editor))
-    results.append(test_wrap_tag("wrap_hi", "<hi>{sel}</hi>", mock_editor))
-    results.append(test_wrap_tag("wrap_head", "<head>{sel}</head>", mock_editor))
-    results.append(test_wrap_tag("wrap_serbian_quotes", '„{sel}“', mock_editor))
-    
+    for tag in ("trailer", "title", "quote", "hi", "head"):
+        results.append(check("wrap_" + tag, "wrap_{0}.py".format(tag), "test text",
+                             "<{0}>test text</{0}>".format(tag), mock_notepad))
+    results.append(check("wrap_serbian_quotes", "wrap_serbian_quotes.py", "test text",
+                         '„test text“', mock_notepad))
+
+    # Ćirilica: pozicije su UTF-8 bajtovi, kao u Scintilli
+    start = len("Ово је ".encode('utf-8'))
+    results.append(check("wrap_hi (ćirilica)", "wrap_hi.py", "Ово је текст",
+                         "Ово је <hi>текст</hi>", mock_notepad,
+                         (start, start + len("текст".encode('utf-8')))))
+
     # Testiraj foreign skripte
-    results.append(test_foreign_fixed(mock_editor))
-    results.append(test_foreign_prompt(mock_editor, mock_notepad))
-    results.append(test_foreign_prompt_with_escaping(mock_editor, mock_notepad))
-    
+    results.append(check("wrap_foreign_fixed", "wrap_foreign_fixed.py", "hello world",
+                         '<foreign xml:lang="en">hello world</foreign>', mock_notepad))
+    mock_notepad.prompt_response = "fr"
+    results.append(check("wrap_foreign_prompt", "wrap_foreign_prompt.py", "bonjour",
+                         '<foreign xml:lang="fr">bonjour</foreign>', mock_notepad))
+    mock_notepad.prompt_response = 'en"test'
+    results.append(check("wrap_foreign_prompt (neispravan xml:lang)", "wrap_foreign_prompt.py",
+                         "test", "test", mock_notepad))
+
     # Sumiraj rezultate
     print("\n" + "=" * 50)
     print("REZULTATI TESTIRANJA")
@@ -164,14 +82,14 @@ def run_all_tests():
     passed = sum(results)
     total = len(results)
     print("Prošlo: {0}/{1}".format(passed, total))
-    
+
     if passed == total:
         print("✓ SVI TESTOVI SU PROŠLI!")
     else:
         print("✗ NEKI TESTOVI NISU PROŠLI")
-    
+
     return passed == total
 
 
 if __name__ == "__main__":
-    run_all_tests()
+    sys.exit(0 if run_all_tests() else 1)
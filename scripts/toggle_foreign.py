@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+toggle_foreign.py
+PythonScript skripta za Notepad++ koja uklanja <foreign> element oko selekcije
+ili kursora, a ako ga nema, obavija selektovani tekst u <foreign> tag.
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("toggle_foreign")
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+toggle_quote.py
+PythonScript skripta za Notepad++ koja uklanja <quote> element oko selekcije
+ili kursora, a ako ga nema, obavija selektovani tekst u <quote> tag.
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("toggle_quote")
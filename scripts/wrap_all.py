@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+wrap_all.py
+PythonScript skripta za Notepad++ koja obavija sva pojavljivanja selektovanog
+teksta (ili regularnog izraza, ako selekcije nema) u element koji korisnik unese.
+Pogoci već unutar istog taga se preskaču; cela izmena je jedan Undo korak.
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("find_wrap")
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+wrap_chain.py
+PythonScript skripta za Notepad++ koja obavija selektovani tekst u lanac
+elemenata unet kroz dijalog, npr. quote > hi ili title > foreign xml:lang="la".
+Svi tagovi se umeću jednom izmenom (jedan Undo korak).
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("wrap_chain")
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+wrap_foreign_auto.py
+PythonScript skripta za Notepad++ koja obavija selektovani tekst
+u <foreign> tag sa xml:lang atributom koji se prepoznaje automatski
+(lokalni prepoznavač jezika, bez dijaloga).
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("foreign_auto")
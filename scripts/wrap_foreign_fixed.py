@@ -1,18 +1,13 @@
 # -*- coding: utf-8 -*-
 """
 wrap_foreign_fixed.py
-PythonScript skripta za Notepad++ koja obavija selektovani tekst 
+PythonScript skripta za Notepad++ koja obavija selektovani tekst
 u <foreign> tag sa fiksnim xml:lang="en" atributom.
+Radi i sa višestrukom i kolonskom selekcijom (jedan Undo korak).
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
 """
 
-from Npp import editor
+from teiwrap.dispatch import run
 
-# Podrazumevani jezik
-DEFAULT_LANG = "en"
-
-# Uzmi selektovani tekst
-sel = editor.getSelText()
-
-# Ako postoji selekcija, obavij je u <foreign> tag sa xml:lang atributom
-if sel:
-    editor.replaceSel('<foreign xml:lang="{0}">{1}</foreign>'.format(DEFAULT_LANG, sel))
+run("foreign_fixed")
@@ -2,13 +2,11 @@
 """
 wrap_hi.py
 PythonScript skripta za Notepad++ koja obavija selektovani tekst u <hi> tag.
+Radi i sa višestrukom i kolonskom selekcijom (jedan Undo korak).
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
 """
 
-from Npp import editor
+from teiwrap.dispatch import run
 
-# Uzmi selektovani tekst
-sel = editor.getSelText()
-
-# Ako postoji selekcija, obavij je u <hi> tag
-if sel:
-    editor.replaceSel("<hi>{0}</hi>".format(sel))
+run("hi")
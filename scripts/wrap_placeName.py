@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+wrap_placeName.py
+PythonScript skripta za Notepad++ koja obavija selektovani tekst u <placeName> tag.
+Radi i sa višestrukom i kolonskom selekcijom (jedan Undo korak).
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("placeName")
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+wrap_quote_hi.py
+PythonScript skripta za Notepad++ koja obavija selektovani tekst u lanac elemenata
+quote > hi (od spoljašnjeg ka unutrašnjem), jednom izmenom i jednim Undo korakom.
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("quote_hi")
@@ -1,14 +1,13 @@
 # -*- coding: utf-8 -*-
 """
 wrap_serbian_quotes.py
-PythonScript skripta za Notepad++ koja obavija selektovani tekst u srpske navodnike.
+PythonScript skripta za Notepad++ koja obavija selektovani tekst
+u srpske navodnike („ i “).
+Radi i sa višestrukom i kolonskom selekcijom (jedan Undo korak).
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
 """
 
-from Npp import editor
+from teiwrap.dispatch import run
 
-# Uzmi selektovani tekst
-sel = editor.getSelText()
-
-# Ako postoji selekcija, obavij je u srpske navodnike („ i “)
-if sel:
-    editor.replaceSel('„{0}“'.format(sel))
+run("serbian_quotes")
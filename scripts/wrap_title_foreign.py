@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+wrap_title_foreign.py
+PythonScript skripta za Notepad++ koja obavija selektovani tekst u lanac elemenata
+title > foreign_prompt (od spoljašnjeg ka unutrašnjem), jednom izmenom i jednim Undo korakom.
+Logika je u teiwrap.dispatch modulu koji se učitava jednom (startup.py).
+Generisano iz teiwrap/catalog.py (python teiwrap_cli.py stubs).
+"""
+
+from teiwrap.dispatch import run
+
+run("title_foreign")
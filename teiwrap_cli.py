@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+teiwrap_cli.py
+Command-line entry point for applying the wrap scripts' markup to files
+outside Notepad++ (corpus pipelines), and for regenerating the stub scripts
+from the tag catalogue (scripts/teiwrap/catalog.py).
+
+Usage:
+    python teiwrap_cli.py apply INPUT SPANS [-o OUTPUT] [--chars]
+    python teiwrap_cli.py automarkup GAZETTEER TARGET [-o OUTPUT] [--ext .xml]
+    python teiwrap_cli.py quotes TARGET [-o OUTPUT] [--ext .xml]
+    python teiwrap_cli.py translit {latin,cyrillic} TARGET [-o OUTPUT] [--ext .xml]
+    python teiwrap_cli.py corpus RECIPE FOLDER [-o OUTPUT] [--ext .xml] [--jobs N]
+    python teiwrap_cli.py render TEXT [-s SIDECAR] [-o OUTPUT]
+    python teiwrap_cli.py rebase OLD NEW [-s SIDECAR] [-o NEW_SIDECAR]
+    python teiwrap_cli.py stubs [FOLDER] [--check]
+
+SPANS is a tab-separated file with one span per line:
+    start<TAB>end<TAB>tag[<TAB>name=value ...]
+Positions are UTF-8 byte offsets, exactly like Scintilla positions, or
+character offsets (as in Python strings) with --chars.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# The shared library lives next to the Notepad++ scripts
+sys.path.insert(0, str(Path(__file__).parent / 'scripts'))
+
+from teiwrap import catalog, corpus, gazetteer, headless, quotes, standoff, translit
+
+
+def cmd_apply(args):
+    """Apply the spans from a spans file to the input file."""
+    with open(args.spans, encoding='utf-8') as spans_file:
+        spans = headless.parse_spans(spans_file)
+    if args.chars:
+        spans = headless.char_spans_to_bytes(args.input, spans)
+    for pos, reason in headless.content_problems(args.input, spans):
+        print(f"  ⚠ {args.input}: byte {pos}: {reason}")
+    output = args.output or args.input
+    count = headless.apply_spans(args.input, spans, output)
+    print(f"✓ Wrapped {count} span(s) → {output}")
+    return 0
+
+
+def cmd_automarkup(args):
+    """Wrap every gazetteer phrase in a file or in all files of a folder."""
+    gaz = gazetteer.load_gazetteer(args.gazetteer)
+    target = Path(args.target)
+    if target.is_dir():
+        results = gazetteer.markup_folder(str(target), gaz, args.ext, args.output)
+        total = sum(results.values())
+        print(f"✓ Marked up {total} phrase(s) in {len(results)} file(s)")
+    else:
+        total = gazetteer.markup_file(str(target), gaz, args.output)
+        print(f"✓ Marked up {total} phrase(s) → {args.output or target}")
+    return 0
+
+
+def iter_targets(target, output, ext):
+    """Yield (input, output) path pairs for a file or every matching file in a folder."""
+    target = Path(target)
+    if not target.is_dir():
+        yield target, Path(output) if output else None
+        return
+    for path in sorted(target.rglob(f'*{ext}')):
+        out_path = None
+        if output:
+            out_path = Path(output) / path.relative_to(target)
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+        yield path, out_path
+
+
+def cmd_quotes(args):
+    """Convert straight quotes to Serbian quotes in a file or folder."""
+    total = 0
+    for path, out_path in iter_targets(args.target, args.output, args.ext):
+        count, unbalanced = quotes.convert_file(str(path), str(out_path) if out_path else None)
+        total += count
+        for pos, line in unbalanced:
+            print(f"  ⚠ {path}:{line}: unbalanced quote at byte {pos}")
+    print(f"✓ Converted {total} quote pair(s)")
+    return 0
+
+
+def cmd_translit(args):
+    """Transliterate Serbian text between Cyrillic and Latin in a file or folder."""
+    changed = total = 0
+    for path, out_path in iter_targets(args.target, args.output, args.ext):
+        total += 1
+        if translit.convert_file(str(path), args.direction, str(out_path) if out_path else None):
+            changed += 1
+    print(f"✓ Transliterated {changed} of {total} file(s) to {args.direction}")
+    return 0
+
+
+def cmd_corpus(args):
+    """Apply a markup recipe to every file of a corpus folder on a process pool."""
+    def progress(rel, status, detail):
+        if status == 'error':
+            print(f"  ✗ {rel}: {detail}")
+
+    totals = corpus.run_corpus(args.recipe, args.folder, args.output, args.ext, args.jobs,
+                               args.checkpoint, progress)
+    print(f"✓ {totals['done']} file(s) marked up, {totals['skipped']} unchanged since the last run, "
+          f"{totals['error']} error(s)")
+    return 1 if totals['error'] else 0
+
+
+def cmd_render(args):
+    """Render the standoff annotations of a text as inline TEI."""
+    store = standoff.AnnotationStore.load(args.sidecar or standoff.sidecar_path(args.text))
+    output = args.output or args.text
+    count = standoff.render(args.text, store, output)
+    print(f"✓ Rendered {count} annotation(s) → {output}")
+    return 0
+
+
+def cmd_rebase(args):
+    """Move the standoff annotations of an old text revision onto a new one."""
+    sidecar = args.sidecar or standoff.sidecar_path(args.old)
+    store = standoff.AnnotationStore.load(sidecar)
+    old = Path(args.old).read_bytes()
+    new = Path(args.new).read_bytes()
+    moved, lost = standoff.rebase(store, old, new)
+    output = args.output or standoff.sidecar_path(args.new)
+    moved.save(output)
+    for start, end, open_text, _ in lost:
+        print(f"  ⚠ lost {open_text} at bytes {start}-{end}: the text there changed")
+    print(f"✓ Moved {len(moved)} annotation(s), lost {len(lost)} → {output}")
+    return 1 if lost else 0
+
+
+def cmd_stubs(args):
+    """Write (or with --check, compare) the stub scripts generated from the tag catalogue."""
+    folder = Path(args.folder)
+    stale = []
+    for item in catalog.CATALOG:
+        path = folder / item['script']
+        source = catalog.stub_source(item)
+        if path.exists() and path.read_text(encoding='utf-8') == source:
+            continue
+        stale.append(item['script'])
+        if not args.check:
+            with open(path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(source)
+            print(f"  ✓ Wrote {path}")
+    if args.check:
+        for script in stale:
+            print(f"  ✗ Out of date: {folder / script}")
+        return 1 if stale else 0
+    print(f"✓ {len(stale)} stub(s) written, {len(catalog.CATALOG) - len(stale)} up to date")
+    return 0
+
+
+def build_parser():
+    """Build the argument parser with all subcommands."""
+    parser = argparse.ArgumentParser(
+        description="Apply Notepad++ wrap markup to files without the editor."
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    apply_parser = subparsers.add_parser('apply', help="wrap byte spans from a spans file")
+    apply_parser.add_argument('input', help="input file (UTF-8)")
+    apply_parser.add_argument('spans', help="tab-separated spans file")
+    apply_parser.add_argument('-o', '--output', help="output file (default: overwrite input)")
+    apply_parser.add_argument('--chars', action='store_true',
+                              help="positions in SPANS are character offsets, not UTF-8 byte offsets")
+    apply_parser.set_defaults(func=cmd_apply)
+
+    auto_parser = subparsers.add_parser('automarkup', help="wrap all gazetteer phrases")
+    auto_parser.add_argument('gazetteer', help="gazetteer file: phrase<TAB>tag[<TAB>name=value ...]")
+    auto_parser.add_argument('target', help="file or folder to mark up")
+    auto_parser.add_argument('-o', '--output', help="output file or folder (default: in place)")
+    auto_parser.add_argument('--ext', default='.xml', help="file extension for folders (default: .xml)")
+    auto_parser.set_defaults(func=cmd_automarkup)
+
+    quotes_parser = subparsers.add_parser('quotes', help='convert "..." to Serbian „...“ quotes')
+    quotes_parser.add_argument('target', help="file or folder to convert")
+    quotes_parser.add_argument('-o', '--output', help="output file or folder (default: in place)")
+    quotes_parser.add_argument('--ext', default='.xml', help="file extension for folders (default: .xml)")
+    quotes_parser.set_defaults(func=cmd_quotes)
+
+    translit_parser = subparsers.add_parser('translit', help="transliterate Serbian Cyrillic <-> Latin, "
+                                                             "leaving markup and <foreign> alone")
+    translit_parser.add_argument('direction', choices=translit.DIRECTIONS, help="target script")
+    translit_parser.add_argument('target', help="file or folder to convert")
+    translit_parser.add_argument('-o', '--output', help="output file or folder (default: in place)")
+    translit_parser.add_argument('--ext', default='.xml', help="file extension for folders (default: .xml)")
+    translit_parser.set_defaults(func=cmd_translit)
+
+    corpus_parser = subparsers.add_parser('corpus', help="apply a markup recipe to a corpus folder")
+    corpus_parser.add_argument('recipe', help="recipe file: phrase|regex<TAB>pattern<TAB>element ... "
+                                              "or gazetteer<TAB>path")
+    corpus_parser.add_argument('folder', help="corpus folder")
+    corpus_parser.add_argument('-o', '--output', help="output folder (default: in place)")
+    corpus_parser.add_argument('--ext', default='.xml', help="file extension (default: .xml)")
+    corpus_parser.add_argument('-j', '--jobs', type=int, help="worker processes (default: CPU count)")
+    corpus_parser.add_argument('--checkpoint',
+                               help=f"checkpoint file (default: OUTPUT/{corpus.CHECKPOINT_NAME})")
+    corpus_parser.set_defaults(func=cmd_corpus)
+
+    render_parser = subparsers.add_parser('render', help="render standoff annotations as inline TEI")
+    render_parser.add_argument('text', help="base text (UTF-8)")
+    render_parser.add_argument('-s', '--sidecar', help=f"sidecar file (default: TEXT{standoff.SIDECAR_SUFFIX})")
+    render_parser.add_argument('-o', '--output', help="output file (default: overwrite TEXT)")
+    render_parser.set_defaults(func=cmd_render)
+
+    rebase_parser = subparsers.add_parser('rebase', help="move standoff annotations to a new text revision")
+    rebase_parser.add_argument('old', help="text revision the sidecar was made for")
+    rebase_parser.add_argument('new', help="new text revision")
+    rebase_parser.add_argument('-s', '--sidecar', help=f"sidecar file (default: OLD{standoff.SIDECAR_SUFFIX})")
+    rebase_parser.add_argument('-o', '--output', help=f"new sidecar file (default: NEW{standoff.SIDECAR_SUFFIX})")
+    rebase_parser.set_defaults(func=cmd_rebase)
+
+    stubs_parser = subparsers.add_parser('stubs', help="generate stub scripts from the tag catalogue")
+    stubs_parser.add_argument('folder', nargs='?', default=str(Path(__file__).parent / 'scripts'),
+                              help="scripts folder (default: scripts/ next to this file)")
+    stubs_parser.add_argument('--check', action='store_true',
+                              help="only report stubs that differ from the catalogue")
+    stubs_parser.set_defaults(func=cmd_stubs)
+
+    return parser
+
+
+def main(argv=None):
+    """Main CLI function."""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"✗ ERROR: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
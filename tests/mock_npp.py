@@ -0,0 +1,498 @@
+# -*- coding: utf-8 -*-
+"""
+mock_npp.py
+Shared mock of the Notepad++ PythonScript Npp module (editor, notepad) for tests.
+
+MockScintilla follows Scintilla closely enough for position bugs and
+large-document costs to show up outside Notepad++: the document is a gap
+buffer of UTF-8 bytes, positions are byte offsets, selections move with
+edits, edits are grouped for undo and SCN_MODIFIED callbacks are sent
+synchronously after every insertion and deletion.
+"""
+
+import bisect
+import itertools
+import re
+import sys
+import types
+from contextlib import contextmanager
+
+# SCN_MODIFIED modificationType flags (Scintilla.h)
+SC_MOD_INSERTTEXT = 0x1
+SC_MOD_DELETETEXT = 0x2
+SC_PERFORMED_USER = 0x10
+SC_PERFORMED_UNDO = 0x20
+SC_PERFORMED_REDO = 0x40
+
+# Search flags (Scintilla.h)
+SCFIND_MATCHCASE = 0x4
+SCFIND_REGEX = 0x00200000
+
+# Document pointers handed out by getDocPointer
+_doc_pointers = itertools.count(1)
+
+
+class GapBuffer:
+    """Byte buffer with a movable gap, the structure Scintilla stores text in."""
+
+    def __init__(self, data=b'', gap=4096):
+        self.data = bytearray(data) + bytearray(gap)
+        self.gap_start = len(data)
+        self.gap_end = len(self.data)
+
+    def __len__(self):
+        return len(self.data) - (self.gap_end - self.gap_start)
+
+    def __bytes__(self):
+        return self.get(0, len(self))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("GapBuffer slices must be contiguous")
+            return self.get(start, max(start, stop))
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("GapBuffer index out of range")
+        return self.data[key if key < self.gap_start else key + self.gap_end - self.gap_start]
+
+    def _move_gap(self, pos):
+        # memoryview slice assignment is a memmove, without a temporary copy
+        with memoryview(self.data) as view:
+            if pos < self.gap_start:
+                count = self.gap_start - pos
+                view[self.gap_end - count:self.gap_end] = view[pos:self.gap_start]
+                self.gap_start = pos
+                self.gap_end -= count
+            elif pos > self.gap_start:
+                count = pos - self.gap_start
+                view[self.gap_start:pos] = view[self.gap_end:self.gap_end + count]
+                self.gap_start = pos
+                self.gap_end += count
+
+    def get(self, start, end):
+        """Return the bytes in [start, end)."""
+        gap = self.gap_end - self.gap_start
+        if end <= self.gap_start:
+            return bytes(self.data[start:end])
+        if start >= self.gap_start:
+            return bytes(self.data[start + gap:end + gap])
+        return bytes(self.data[start:self.gap_start] + self.data[self.gap_end:end + gap])
+
+    def insert(self, pos, data):
+        """Insert bytes at pos, growing the gap when it is too small."""
+        self._move_gap(pos)
+        if len(data) > self.gap_end - self.gap_start:
+            grow = max(len(data), len(self) // 2, 4096)
+            self.data[self.gap_end:self.gap_end] = bytearray(grow)
+            self.gap_end += grow
+        self.data[self.gap_start:self.gap_start + len(data)] = data
+        self.gap_start += len(data)
+
+    def delete(self, pos, length):
+        """Delete length bytes starting at pos."""
+        self._move_gap(pos)
+        self.gap_end += length
+
+    def find(self, sub, start, end, reverse=False):
+        """
+        Return the position of sub (bytes or a compiled bytes regex) in
+        [start, end), the last one if reverse, or -1 and the match end.
+        The gap is moved out of the range, so nothing is copied.
+        """
+        if start < self.gap_start < end:
+            self._move_gap(end)
+        gap = 0 if end <= self.gap_start else self.gap_end - self.gap_start
+        low, high = start + gap, end + gap
+        if isinstance(sub, bytes):
+            found = self.data.rfind(sub, low, high) if reverse else self.data.find(sub, low, high)
+            return (found - gap, found - gap + len(sub)) if found >= 0 else (-1, -1)
+        if reverse:
+            match = None
+            for match in sub.finditer(self.data, low, high):
+                pass
+        else:
+            match = sub.search(self.data, low, high)
+        return (match.start() - gap, match.end() - gap) if match else (-1, -1)
+
+    def count(self, sub, start=0, end=None):
+        """Count occurrences of sub in [start, end)."""
+        return self.get(start, len(self) if end is None else end).count(sub)
+
+
+class MockScintilla:
+    """Mock editor with a UTF-8 gap buffer and Scintilla-style multi-selection."""
+
+    def __init__(self, text="", selections=()):
+        self.buffer = GapBuffer(text.encode('utf-8'))
+        self._selections = [list(sel) for sel in selections] or [[0, 0]]
+        # Insertions (position, length) not yet applied to the selections,
+        # at non-increasing positions, i.e. all in the same coordinates
+        self._pending_moves = []
+        self.undo_depth = 0
+        self.undo_actions = 0
+        self.insert_calls = 0
+        self.bytes_read = 0
+        self.target = (0, 0)
+        self.search_flags = 0
+        self.callbacks = []
+        self.doc_pointer = next(_doc_pointers)
+        self._undo = []
+        self._redo = []
+        self._group = None
+
+    @property
+    def text(self):
+        return bytes(self.buffer).decode('utf-8')
+
+    @property
+    def selections(self):
+        self._move_selections()
+        return self._selections
+
+    @selections.setter
+    def selections(self, value):
+        self._pending_moves = []
+        self._selections = value
+
+    def _move_selections(self):
+        """
+        Apply pending insertions to the selections in one pass. Scintilla
+        moves a position when an insertion lands strictly before it; with
+        insertions from the end towards the start (as in a batch wrap) that
+        is the total length inserted before the original position.
+        """
+        pending = self._pending_moves
+        if not pending:
+            return
+        self._pending_moves = []
+        pending.reverse()
+        positions = [pos for pos, _ in pending]
+        totals = [0]
+        for _, length in pending:
+            totals.append(totals[-1] + length)
+        for sel in self._selections:
+            sel[0] += totals[bisect.bisect_left(positions, sel[0])]
+            sel[1] += totals[bisect.bisect_left(positions, sel[1])]
+
+    def _check_position(self, pos):
+        if not 0 <= pos <= len(self.buffer):
+            raise ValueError("position {0} outside document of {1} bytes".format(pos, len(self.buffer)))
+        if pos < len(self.buffer) and 0x80 <= self.buffer[pos] < 0xc0:
+            raise ValueError("position {0} is inside a UTF-8 character".format(pos))
+
+    # Reading
+
+    def getText(self):
+        return self.text
+
+    def getLength(self):
+        return len(self.buffer)
+
+    def getTextLength(self):
+        return len(self.buffer)
+
+    def getDocPointer(self):
+        return self.doc_pointer
+
+    def getSelText(self):
+        start, end = self.selections[0]
+        return self.getTextRange(start, end)
+
+    def getTextRange(self, start, end):
+        self._check_position(start)
+        self._check_position(end)
+        self.bytes_read += end - start
+        return self.buffer.get(start, end).decode('utf-8')
+
+    def getCharAt(self, pos):
+        """Return the byte at pos as a signed char, like Scintilla."""
+        if not 0 <= pos < len(self.buffer):
+            return 0
+        self.bytes_read += 1
+        value = self.buffer[pos]
+        return value - 256 if value > 127 else value
+
+    def positionBefore(self, pos):
+        """Return the start of the character before pos, like Scintilla."""
+        pos = min(max(pos, 0), len(self.buffer))
+        if pos > 0:
+            pos -= 1
+            while pos > 0 and 0x80 <= self.buffer[pos] < 0xc0:
+                pos -= 1
+        return pos
+
+    def positionAfter(self, pos):
+        """Return the start of the character after pos, like Scintilla."""
+        pos = min(max(pos, 0), len(self.buffer))
+        if pos < len(self.buffer):
+            pos += 1
+            while pos < len(self.buffer) and 0x80 <= self.buffer[pos] < 0xc0:
+                pos += 1
+        return pos
+
+    def lineFromPosition(self, pos):
+        return self.buffer.count(b'\n', 0, min(pos, len(self.buffer)))
+
+    def getLineCount(self):
+        return self.buffer.count(b'\n') + 1
+
+    # Selections
+
+    def getSelections(self):
+        return len(self.selections)
+
+    def getSelectionNStart(self, n):
+        return self.selections[n][0]
+
+    def getSelectionNEnd(self, n):
+        return self.selections[n][1]
+
+    def setSelection(self, caret, anchor):
+        # Replaces every selection, so pending moves need not be applied
+        self.selections = [[min(caret, anchor), max(caret, anchor)]]
+
+    def addSelection(self, caret, anchor):
+        self.selections.append([min(caret, anchor), max(caret, anchor)])
+
+    def gotoPos(self, pos):
+        """Move the caret to pos and drop all selections, like Scintilla."""
+        self._check_position(pos)
+        self.selections = [[pos, pos]]
+
+    def clearSelections(self):
+        self.selections = [[0, 0]]
+
+    def selected_texts(self):
+        return [self.buffer.get(start, end).decode('utf-8') for start, end in self.selections]
+
+    # Target
+
+    def setTargetRange(self, start, end):
+        self.target = (start, end)
+
+    def setTargetStart(self, pos):
+        self.target = (pos, self.target[1])
+
+    def setTargetEnd(self, pos):
+        self.target = (self.target[0], pos)
+
+    def getTargetStart(self):
+        return self.target[0]
+
+    def getTargetEnd(self):
+        return self.target[1]
+
+    def setSearchFlags(self, flags):
+        self.search_flags = flags
+
+    def getSearchFlags(self):
+        return self.search_flags
+
+    def searchInTarget(self, text):
+        """
+        Find text in the target and move the target to the match; a target
+        with start > end is searched backwards, like Scintilla. Text is
+        literal and case-sensitive, or a Python regex with SCFIND_REGEX
+        (case-insensitive without SCFIND_MATCHCASE); an invalid regex returns
+        -2. Searching does not count as bytes read into Python.
+        """
+        start, end = self.target
+        pattern = text.encode('utf-8')
+        if self.search_flags & SCFIND_REGEX:
+            try:
+                pattern = re.compile(pattern, 0 if self.search_flags & SCFIND_MATCHCASE else re.I)
+            except re.error:
+                return -2
+        low, high = min(start, end), min(max(start, end), len(self.buffer))
+        found, found_end = self.buffer.find(pattern, low, high, reverse=start > end)
+        if found < 0:
+            return -1
+        self.target = (found, found_end)
+        return found
+
+    # Editing
+
+    def insertText(self, pos, text):
+        self.insert_calls += 1
+        if pos == -1:
+            pos = self.selections[0][1]
+        self._insert(pos, text.encode('utf-8'), SC_PERFORMED_USER)
+
+    def deleteRange(self, pos, length):
+        self._delete(pos, length, SC_PERFORMED_USER)
+
+    def replaceTarget(self, text):
+        start, end = self.target
+        data = text.encode('utf-8')
+        with self._grouped():
+            if end > start:
+                self._delete(start, end - start, SC_PERFORMED_USER)
+            if data:
+                self._insert(start, data, SC_PERFORMED_USER)
+        self.target = (start, start + len(data))
+        return len(data)
+
+    def replaceSel(self, text):
+        start, end = self.selections[0]
+        self.setTargetRange(start, end)
+        self.replaceTarget(text)
+        caret = self.target[1]
+        self.setSelection(caret, caret)
+
+    def _insert(self, pos, data, source, record=True):
+        self._check_position(pos)
+        self.buffer.insert(pos, data)
+        # Scintilla's MovePositionForInsertion, deferred: wrapping thousands of
+        # selections would otherwise move every selection on every insertion
+        if self._pending_moves and pos > self._pending_moves[-1][0]:
+            self._move_selections()
+        self._pending_moves.append((pos, len(data)))
+        if record:
+            self._record(('insert', pos, data))
+        self._notify(SC_MOD_INSERTTEXT | source, pos, data)
+
+    def _delete(self, pos, length, source, record=True):
+        self._check_position(pos)
+        self._check_position(pos + length)
+        data = self.buffer.get(pos, pos + length)
+        self.buffer.delete(pos, length)
+        end = pos + length
+        for sel in self.selections:
+            # Scintilla's MovePositionForDeletion
+            if sel[1] > pos:
+                sel[1] = sel[1] - length if sel[1] > end else pos
+                if sel[0] > pos:
+                    sel[0] = sel[0] - length if sel[0] > end else pos
+        if record:
+            self._record(('delete', pos, data))
+        self._notify(SC_MOD_DELETETEXT | source, pos, data)
+
+    # Undo
+
+    def beginUndoAction(self):
+        if self.undo_depth == 0:
+            self.undo_actions += 1
+            self._group = []
+        self.undo_depth += 1
+
+    def endUndoAction(self):
+        self.undo_depth -= 1
+        if self.undo_depth == 0:
+            if self._group:
+                self._undo.append(self._group)
+            self._group = None
+
+    @contextmanager
+    def _grouped(self):
+        self.undo_depth += 1
+        if self._group is None:
+            self._group = []
+        try:
+            yield
+        finally:
+            self.undo_depth -= 1
+            if self.undo_depth == 0:
+                if self._group:
+                    self._undo.append(self._group)
+                self._group = None
+
+    def _record(self, step):
+        self._redo = []
+        if self._group is not None:
+            self._group.append(step)
+        else:
+            self._undo.append([step])
+
+    def canUndo(self):
+        return bool(self._undo)
+
+    def canRedo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """Revert the last undo group, newest step first."""
+        if not self._undo:
+            return
+        group = self._undo.pop()
+        for kind, pos, data in reversed(group):
+            if kind == 'insert':
+                self._delete(pos, len(data), SC_PERFORMED_UNDO, record=False)
+            else:
+                self._insert(pos, data, SC_PERFORMED_UNDO, record=False)
+        self._redo.append(group)
+
+    def redo(self):
+        """Reapply the last undone group."""
+        if not self._redo:
+            return
+        group = self._redo.pop()
+        for kind, pos, data in group:
+            if kind == 'insert':
+                self._insert(pos, data, SC_PERFORMED_REDO, record=False)
+            else:
+                self._delete(pos, len(data), SC_PERFORMED_REDO, record=False)
+        self._undo.append(group)
+
+    def emptyUndoBuffer(self):
+        self._undo = []
+        self._redo = []
+
+    # Notifications
+
+    def callbackSync(self, func, notifications):
+        self.callbacks.append(func)
+        return True
+
+    def clearCallbacks(self, func=None):
+        self.callbacks = [f for f in self.callbacks if func is not None and f is not func]
+
+    def _notify(self, kind, pos, data):
+        if not self.callbacks:
+            return
+        args = {'modificationType': kind, 'position': pos, 'length': len(data),
+                'text': data, 'linesAdded': data.count(b'\n') * (1 if kind & SC_MOD_INSERTTEXT else -1)}
+        for func in list(self.callbacks):
+            func(args)
+
+
+class MockNotepad:
+    """Mock class that simulates notepad object from Npp module."""
+
+    def __init__(self, prompt_response="en", filename="new 1"):
+        self.prompt_response = prompt_response
+        self.filename = filename
+        self.prompts = []
+        self.messages = []
+
+    def getCurrentFilename(self):
+        """Returns the path of the active document ("new 1" if it was never saved)."""
+        return self.filename
+
+    def prompt(self, message, title, default):
+        """Simulates prompt dialog and records the default value."""
+        self.prompts.append(default)
+        return self.prompt_response
+
+    def messageBox(self, message, title="", flags=0):
+        """Simulates a message box and records the message."""
+        self.messages.append(message)
+
+
+@contextmanager
+def fake_npp(editor, notepad=None):
+    """Installs a fake Npp module in sys.modules for the duration of the block."""
+    module = types.ModuleType('Npp')
+    module.editor = editor
+    module.notepad = notepad if notepad is not None else MockNotepad()
+    previous = sys.modules.get('Npp')
+    sys.modules['Npp'] = module
+    try:
+        yield module
+    finally:
+        if previous is None:
+            del sys.modules['Npp']
+        else:
+            sys.modules['Npp'] = previous
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+script_harness.py
+Runs the real scripts/*.py files in tests, the way PythonScript would, but
+fast: each file is compiled once into a cached code object (recompiled only
+when the file changes) and the fake Npp module is installed once for a
+whole batch of runs.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+from tests.mock_npp import MockNotepad
+
+SCRIPTS_DIR = Path(__file__).parent.parent / 'scripts'
+
+# Make the shared teiwrap package importable, as it is in the Scripts folder
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def script_names(pattern='*.py'):
+    """Return the names of the runnable scripts (test_scripts.py excluded)."""
+    return sorted(path.name for path in SCRIPTS_DIR.glob(pattern) if path.name != 'test_scripts.py')
+
+
+class ScriptRunner:
+    """
+    Executes scripts from scripts/ against a mock editor and notepad.
+
+    Use as a context manager to keep the fake Npp module installed between
+    runs; run() also works outside a with block and installs it per call.
+    """
+
+    def __init__(self, scripts_dir=SCRIPTS_DIR):
+        self.scripts_dir = Path(scripts_dir)
+        self.module = types.ModuleType('Npp')
+        self.compiles = 0
+        self._codes = {}
+        self._previous = None
+        self._depth = 0
+
+    def code(self, script_name):
+        """Return the cached code object of a script, compiling it if it changed."""
+        path = self.scripts_dir / script_name
+        mtime = path.stat().st_mtime_ns
+        cached = self._codes.get(script_name)
+        if cached is None or cached[0] != mtime:
+            source = path.read_text(encoding='utf-8')
+            cached = (mtime, compile(source, str(path), 'exec'))
+            self._codes[script_name] = cached
+            self.compiles += 1
+        return cached[1]
+
+    def __enter__(self):
+        if self._depth == 0:
+            self._previous = sys.modules.get('Npp')
+            sys.modules['Npp'] = self.module
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth == 0:
+            if self._previous is None:
+                del sys.modules['Npp']
+            else:
+                sys.modules['Npp'] = self._previous
+        return False
+
+    def run(self, script_name, editor, notepad=None):
+        """Run a script with editor/notepad as Npp.editor and Npp.notepad."""
+        code = self.code(script_name)
+        self.module.editor = editor
+        self.module.notepad = notepad if notepad is not None else MockNotepad()
+        with self:
+            exec(code, {'__name__': '__main__'})
+        return editor
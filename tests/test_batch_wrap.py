@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+test_batch_wrap.py
+Unit tests for the shared multi-selection batch-wrap engine (scripts/teiwrap/batch.py).
+"""
+
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import batch
+from tests.mock_npp import MockScintilla
+
+
+class TestBatchWrap(unittest.TestCase):
+    """Test cases for teiwrap.batch."""
+
+    def test_byte_len(self):
+        """Test that byte_len counts UTF-8 bytes, not characters."""
+        self.assertEqual(batch.byte_len("<hi>"), 4)
+        self.assertEqual(batch.byte_len("„"), 3)
+        self.assertEqual(batch.byte_len("Ћ".encode('utf-8')), 2)
+
+    def test_insert_and_replace_accept_bytes(self):
+        """Test that planned text may be str or UTF-8 bytes, in one undo step."""
+        editor = MockScintilla("Вук рођен")
+        self.assertEqual(batch.insert_all(editor, [(0, "<hi>"), (6, "</hi>".encode('utf-8'))]), 2)
+        self.assertEqual(editor.text, "<hi>Вук</hi> рођен")
+        edits = [(1, 2, "emph"), (len("<hi>Вук</hi> ".encode('utf-8')), 10, "рекао".encode('utf-8'))]
+        self.assertEqual(batch.replace_all(editor, edits), 2)
+
+        self.assertEqual(editor.text, "<emph>Вук</hi> рекао")
+        self.assertEqual(editor.undo_actions, 2)
+
+    def test_single_selection(self):
+        """Test wrapping a single selection."""
+        editor = MockScintilla("a test b", [(2, 6)])
+        count = batch.wrap_selections(editor, "<title>", "</title>")
+
+        self.assertEqual(count, 1)
+        self.assertEqual(editor.text, "a <title>test</title> b")
+
+    def test_multiple_selections(self):
+        """Test that every selection is wrapped, regardless of selection order."""
+        editor = MockScintilla("one two three", [(8, 13), (0, 3), (4, 7)])
+        count = batch.wrap_selections(editor, "<hi>", "</hi>")
+
+        self.assertEqual(count, 3)
+        self.assertEqual(editor.text, "<hi>one</hi> <hi>two</hi> <hi>three</hi>")
+
+    def test_empty_selections_are_skipped(self):
+        """Test that empty selections (plain carets) are ignored."""
+        editor = MockScintilla("one two", [(0, 0), (4, 7), (2, 2)])
+        count = batch.wrap_selections(editor, "<hi>", "</hi>")
+
+        self.assertEqual(count, 1)
+        self.assertEqual(editor.text, "one <hi>two</hi>")
+
+    def test_no_selection_no_edit(self):
+        """Test that nothing is edited and no undo action is opened without a selection."""
+        editor = MockScintilla("one two", [(3, 3)])
+        count = batch.wrap_selections(editor, "<hi>", "</hi>")
+
+        self.assertEqual(count, 0)
+        self.assertEqual(editor.text, "one two")
+        self.assertEqual(editor.undo_actions, 0)
+
+    def test_single_undo_action(self):
+        """Test that all edits are grouped into exactly one undo action."""
+        editor = MockScintilla("a b c d", [(0, 1), (2, 3), (4, 5), (6, 7)])
+        batch.wrap_selections(editor, "<hi>", "</hi>")
+
+        self.assertEqual(editor.undo_actions, 1)
+        self.assertEqual(editor.undo_depth, 0)
+        self.assertEqual(editor.insert_calls, 8)
+
+    def test_cyrillic_byte_positions(self):
+        """Test wrapping with UTF-8 byte positions in Cyrillic text."""
+        text = "Ово је текст"
+        first = len("Ово".encode('utf-8'))
+        second_start = len("Ово је ".encode('utf-8'))
+        editor = MockScintilla(text, [(0, first), (second_start, len(text.encode('utf-8')))])
+        batch.wrap_selections(editor, "„", "“")
+
+        self.assertEqual(editor.text, "„Ово“ је „текст“")
+
+    def test_duplicate_selections_wrapped_once(self):
+        """Test that identical selection ranges are only wrapped once."""
+        editor = MockScintilla("word", [(0, 4), (0, 4)])
+        count = batch.wrap_selections(editor, "<hi>", "</hi>")
+
+        self.assertEqual(count, 1)
+        self.assertEqual(editor.text, "<hi>word</hi>")
+
+    def test_many_selections_performance(self):
+        """Test that 2,000 selections are wrapped in one fast pass."""
+        words = ["реч{0}".format(i) for i in range(2000)]
+        text = " ".join(words)
+        selections = []
+        pos = 0
+        for word in words:
+            length = len(word.encode('utf-8'))
+            selections.append((pos, pos + length))
+            pos += length + 1
+        editor = MockScintilla(text, selections)
+
+        started = time.perf_counter()
+        count = batch.wrap_selections(editor, "<hi>", "</hi>")
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(count, 2000)
+        self.assertEqual(editor.text, " ".join("<hi>{0}</hi>".format(w) for w in words))
+        self.assertLess(elapsed, 1.0)
+
+
+class TestBoundaryWrap(unittest.TestCase):
+    """Test cases for copy-free boundary insertion and selection restore."""
+
+    def test_selection_restored_to_content(self):
+        """Test that the wrapped content is selected again after wrapping."""
+        editor = MockScintilla("a test b", [(2, 6)])
+        batch.wrap_selections(editor, "<quote>", "</quote>")
+
+        self.assertEqual(editor.selected_texts(), ["test"])
+
+    def test_multiple_selections_restored(self):
+        """Test that every selection is restored, shifted past earlier tags."""
+        editor = MockScintilla("one two three", [(8, 13), (0, 3), (4, 7)])
+        batch.wrap_selections(editor, "<hi>", "</hi>")
+
+        self.assertEqual(editor.selected_texts(), ["one", "two", "three"])
+
+    def test_restore_with_multibyte_wrappers(self):
+        """Test that restore uses byte lengths of the Serbian quote characters."""
+        text = "Ово је текст"
+        editor = MockScintilla(text, [(0, 6), (len("Ово је ".encode('utf-8')), len(text.encode('utf-8')))])
+        batch.wrap_selections(editor, "„", "“")
+
+        self.assertEqual(editor.selected_texts(), ["Ово", "текст"])
+
+    def test_restore_disabled(self):
+        """Test that selections only move with the inserted tags when restore is off."""
+        editor = MockScintilla("a test b", [(2, 6)])
+        batch.wrap_selections(editor, "<hi>", "</hi>", restore=False)
+
+        # Scintilla keeps a boundary in place for an insertion exactly at it
+        self.assertEqual(editor.selections, [[2, 10]])
+
+    def test_huge_selection_is_not_copied(self):
+        """Test that wrapping cost does not grow with the selection size."""
+        small = MockScintilla("x" * 10, [(0, 10)])
+        huge_size = 8 * 1024 * 1024
+        huge = MockScintilla("x" * huge_size, [(0, huge_size)])
+
+        batch.wrap_selections(small, "<trailer>", "</trailer>")
+        batch.wrap_selections(huge, "<trailer>", "</trailer>")
+
+        self.assertEqual(huge.bytes_read, 0)
+        self.assertEqual(small.insert_calls, huge.insert_calls)
+        self.assertEqual(huge.selections, [[9, 9 + huge_size]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+test_benchmark.py
+Unit tests for the wrap benchmark harness (benchmark.py): the synthetic TEI
+corpus, the selections it offers and the regression check.
+"""
+
+import contextlib
+import io
+import json
+import random
+import tempfile
+import unittest
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import benchmark
+from teiwrap import elements, wellformed
+from tests.mock_npp import MockScintilla
+
+TEI = '{http://www.tei-c.org/ns/1.0}'
+
+
+class TestCorpus(unittest.TestCase):
+    """Test cases for benchmark.generate_corpus."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.corpus = benchmark.generate_corpus(300 * 1024, seed=1)
+        cls.data = cls.corpus.text.encode('utf-8')
+
+    def test_well_formed_tei(self):
+        """Test that the corpus parses as XML with the expected TEI elements."""
+        root = ET.fromstring(self.data)
+
+        self.assertEqual(root.tag, TEI + 'TEI')
+        self.assertEqual(len(root.findall('.//' + TEI + 'div')), len(self.corpus.divs))
+        self.assertEqual(len(root.findall('.//' + TEI + 'p')), len(self.corpus.paragraphs))
+        self.assertTrue(root.findall('.//' + TEI + 'foreign'))
+
+    def test_size_and_cyrillic_content(self):
+        """Test that the corpus is about the requested size and mostly Cyrillic."""
+        self.assertLess(abs(len(self.data) - 300 * 1024), 64 * 1024)
+        cyrillic = sum(1 for char in self.corpus.text if 'А' <= char <= 'ш')
+        self.assertGreater(cyrillic, len(self.corpus.text) // 3)
+
+    def test_same_seed_same_corpus(self):
+        """Test that generation is deterministic."""
+        again = benchmark.generate_corpus(300 * 1024, seed=1)
+        self.assertEqual(again.text, self.corpus.text)
+
+    def test_selections_are_balanced(self):
+        """Test that every selection kind passes the crossing-markup check."""
+        editor = MockScintilla(self.corpus.text)
+        index = elements.ElementIndex(editor)
+        rng = random.Random(2)
+        for kind in benchmark.SELECTION_KINDS:
+            for _ in range(20):
+                start, end = self.corpus.selection(kind, rng)
+                self.assertIsNone(wellformed.problem(index, start, end), kind)
+        self.assertEqual(self.data[slice(*self.corpus.paragraphs[0])][:3], b'<p ')
+        words = self.corpus.word_selections(100, rng)
+        self.assertEqual(len(words), 100)
+        self.assertEqual(words, sorted(words))
+
+
+class TestHarness(unittest.TestCase):
+    """Test cases for running configurations and comparing results."""
+
+    def test_tiny_run(self):
+        """Test a run on a small document, including the JSON report."""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / 'results.json'
+            with contextlib.redirect_stdout(io.StringIO()):
+                code = benchmark.main(['--sizes', '0.1', '--repeats', '2', '-o', str(output)])
+            report = json.loads(output.read_text(encoding='utf-8'))
+
+        self.assertEqual(code, 0)
+        axes = {result['axis'] for result in report['results']}
+        self.assertEqual(axes, {'script', 'length', 'count'})
+        scripts = {result['script'] for result in report['results']}
+        self.assertIn('wrap_foreign_prompt.py', scripts)
+        for result in report['results']:
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+            self.assertGreater(result['peak_kb'], 0)
+
+    def test_compare_flags_regressions(self):
+        """Test that slower or hungrier configurations are reported."""
+        base = {'axis': 'size', 'script': 'wrap_hi.py', 'doc_mb': 1, 'kind': 'word',
+                'selections': 1, 'p50_ms': 2.0, 'p99_ms': 3.0, 'peak_kb': 100.0}
+        baseline = {'results': [base]}
+
+        self.assertEqual(benchmark.compare([dict(base, p50_ms=6.5)], baseline), [])
+        slow = benchmark.compare([dict(base, p50_ms=7.5)], baseline)
+        hungry = benchmark.compare([dict(base, peak_kb=700.0)], baseline)
+        self.assertEqual(len(slow), 1)
+        self.assertIn('p50', slow[0])
+        self.assertIn('peak', hungry[0])
+        self.assertEqual(benchmark.compare([dict(base, doc_mb=4, p50_ms=99.0)], baseline), [])
+
+    def test_compare_scales_baseline_by_machine_speed(self):
+        """Test that the baseline is scaled by the reference workload before comparing."""
+        base = {'axis': 'count', 'script': 'wrap_hi.py', 'doc_mb': 4, 'kind': 'word',
+                'selections': 1000, 'p50_ms': 100.0, 'p99_ms': 120.0, 'peak_kb': 100.0}
+        baseline = {'reference_ms': 50.0, 'results': [base]}
+
+        speed = benchmark.machine_speed({'reference_ms': 75.0}, baseline)
+        self.assertEqual(speed, 1.5)
+        self.assertEqual(benchmark.compare([dict(base, p50_ms=290.0)], baseline, 2, speed=speed), [])
+        self.assertEqual(len(benchmark.compare([dict(base, p50_ms=250.0)], baseline, 2)), 1)
+        self.assertEqual(len(benchmark.compare([dict(base, p50_ms=320.0)], baseline, 2, speed=speed)), 1)
+        self.assertEqual(benchmark.machine_speed({'reference_ms': 75.0}, {'results': []}), 1.0)
+        self.assertGreater(benchmark.reference_ms(repeats=1), 0)
+
+    def test_percentile(self):
+        """Test the nearest-rank percentile."""
+        samples = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(samples, 0.5), 50)
+        self.assertEqual(benchmark.percentile(samples, 0.99), 99)
+        self.assertEqual(benchmark.percentile([5.0], 0.99), 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
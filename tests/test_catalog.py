@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+test_catalog.py
+Unit tests for the declarative tag catalogue (scripts/teiwrap/catalog.py),
+the dispatcher handlers built from it and the generated stub scripts.
+"""
+
+import contextlib
+import io
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import teiwrap_cli
+from teiwrap import catalog, dispatch
+from tests.mock_npp import MockNotepad, MockScintilla
+from tests.test_dispatch import run_stub
+
+SCRIPTS_DIR = Path(__file__).parent.parent / 'scripts'
+
+
+class TestCatalog(unittest.TestCase):
+    """Test cases for the catalogue entries."""
+
+    def test_names_scripts_and_keys_are_unique(self):
+        """Test that no two entries share an action, a script or a shortcut."""
+        for field in ('name', 'script', 'key'):
+            values = [item[field] for item in catalog.CATALOG if item[field]]
+            self.assertEqual(len(values), len(set(values)), field)
+
+    def test_every_entry_is_registered(self):
+        """Test that the dispatcher has a handler for every catalogue action."""
+        for item in catalog.CATALOG:
+            self.assertIn(item['name'], dispatch.HANDLERS)
+
+    def test_tag_entries_wrap(self):
+        """Test that every plain tag entry wraps a selection in its tag."""
+        for item in catalog.CATALOG:
+            if item['custom'] or item['text'] or item['prompt'] or item['chain']:
+                continue
+            with self.subTest(action=item['name']):
+                editor = MockScintilla("реч", [(0, 6)])
+                dispatch.run(item['name'], editor, MockNotepad())
+                self.assertTrue(editor.text.startswith("<" + item['tag']))
+                self.assertTrue(editor.text.endswith("реч</{0}>".format(item['tag'])))
+
+    def test_parse_key(self):
+        """Test shortcut parsing into shortcuts.xml attributes."""
+        self.assertEqual(catalog.parse_key("Ctrl+Alt+1"),
+                         {'key': '49', 'ctrl': 'yes', 'alt': 'yes', 'shift': 'no'})
+        self.assertEqual(catalog.parse_key("Ctrl+Shift+F5"),
+                         {'key': '116', 'ctrl': 'yes', 'alt': 'no', 'shift': 'yes'})
+        self.assertEqual(catalog.parse_key("Alt+n")['key'], '78')
+        for bad in ("Ctrl+Alt+", "Hyper+1", "Ctrl+Enter"):
+            with self.assertRaises(ValueError):
+                catalog.parse_key(bad)
+
+    def test_key_name(self):
+        """Test that virtual-key codes map back to key names, F-keys included."""
+        for n in range(1, 13):
+            key = "F{0}".format(n)
+            self.assertEqual(catalog.key_name(catalog.parse_key("Ctrl+" + key)['key']), key)
+        for key in ("1", "0", "A", "Z"):
+            self.assertEqual(catalog.key_name(catalog.parse_key("Alt+" + key)['key']), key)
+        self.assertEqual(catalog.key_name('46'), 'Delete')
+        self.assertEqual(catalog.key_name(97), 'Num1')
+        self.assertEqual(catalog.key_name('226'), '0xE2')
+
+    def test_new_entry_needs_no_code(self):
+        """Test that a new entry, with a prompted attribute, works from data alone."""
+        item = catalog.entry("note_n", tag="note", attrs=[("place", "foot")],
+                             prompt=("n", "Broj napomene:", "Napomena", "1"))
+        dispatch.register_catalog([item])
+        try:
+            editor = MockScintilla("tekst", [(0, 5)])
+            notepad = MockNotepad('3"')
+            dispatch.run("note_n", editor, notepad)
+        finally:
+            del dispatch.HANDLERS["note_n"]
+
+        self.assertEqual(editor.text, '<note place="foot" n="3&quot;">tekst</note>')
+        self.assertEqual(notepad.prompts, ["1"])
+
+
+class TestStubs(unittest.TestCase):
+    """Test cases for the stub scripts generated from the catalogue."""
+
+    def test_stubs_in_repository_are_up_to_date(self):
+        """Test that scripts/ holds exactly the generated stubs (teiwrap_cli.py stubs --check)."""
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            code = teiwrap_cli.main(['stubs', '--check'])
+        self.assertEqual(code, 0, out.getvalue())
+
+    def test_generated_stubs_run(self):
+        """Test that every generated stub runs its catalogue action."""
+        for item in catalog.CATALOG:
+            if item['custom']:
+                continue
+            with self.subTest(script=item['script']):
+                editor = MockScintilla("x", [(0, 1)])
+                run_stub(item['script'], editor, MockNotepad('en'))
+                self.assertNotEqual(editor.text, "x")
+
+    def test_cli_writes_only_changed_stubs(self):
+        """Test that the stubs command writes missing or changed stubs only."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with contextlib.redirect_stdout(io.StringIO()):
+                teiwrap_cli.main(['stubs', tmpdir])
+                (Path(tmpdir) / 'wrap_hi.py').write_text("# edited", encoding='utf-8')
+                self.assertEqual(teiwrap_cli.main(['stubs', tmpdir, '--check']), 1)
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                teiwrap_cli.main(['stubs', tmpdir])
+
+            self.assertEqual(sorted(p.name for p in Path(tmpdir).iterdir()),
+                             sorted(item['script'] for item in catalog.CATALOG))
+            self.assertIn('1 stub(s) written', out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
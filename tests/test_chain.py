@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+test_chain.py
+Unit tests for composite (nested) wrap chains: catalogue entries with
+chain=..., the wrap_chain action in teiwrap.dispatch and
+findall.parse_chain.
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import catalog, dispatch, elements, findall
+from tests.mock_npp import MockNotepad, MockScintilla
+from tests.test_wellformed import span_of
+
+TEXT = 'Вук Караџић и Carpe diem.'
+
+
+class TestCatalogueChains(unittest.TestCase):
+    """Test cases for chains declared in the catalogue."""
+
+    def test_static_chain_is_one_edit(self):
+        """Test that quote_hi inserts both tags around every selection in one undo step."""
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Вук'), span_of(TEXT, 'diem')])
+        self.assertEqual(dispatch.run('quote_hi', editor, MockNotepad()), 2)
+
+        self.assertEqual(editor.text, '<quote><hi>Вук</hi></quote> Караџић и Carpe <quote><hi>diem</hi></quote>.')
+        self.assertEqual(editor.undo_actions, 1)
+        self.assertEqual(editor.insert_calls, 4)
+        self.assertEqual(editor.selected_texts(), ['Вук', 'diem'])
+        editor.undo()
+        self.assertEqual(editor.text, TEXT)
+
+    def test_prompts_are_asked_once_up_front(self):
+        """Test that a chain with a prompted attribute asks once for all selections."""
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Carpe'), span_of(TEXT, 'diem')])
+        notepad = MockNotepad('la')
+        dispatch.run('title_foreign', editor, notepad)
+
+        self.assertEqual(len(notepad.prompts), 1)
+        self.assertEqual(editor.text, 'Вук Караџић и <title><foreign xml:lang="la">Carpe</foreign></title> '
+                                      '<title><foreign xml:lang="la">diem</foreign></title>.')
+
+    def test_invalid_prompt_answer_changes_nothing(self):
+        """Test that a refused attribute value leaves the document alone."""
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Carpe diem')])
+        notepad = MockNotepad('latinski!')
+
+        self.assertEqual(dispatch.run('title_foreign', editor, notepad), 0)
+        self.assertEqual(editor.text, TEXT)
+        self.assertEqual(editor.undo_actions, 0)
+        self.assertEqual(len(notepad.messages), 1)
+
+    def test_new_chain_needs_no_code(self):
+        """Test a chain of catalogue entries of every kind, including quotes."""
+        item = catalog.entry("quotes_hi_lang", chain=("serbian_quotes", "hi", "foreign_prompt"))
+        dispatch.register_catalog([item])
+        try:
+            editor = MockScintilla(TEXT, [span_of(TEXT, 'Carpe diem')])
+            dispatch.run("quotes_hi_lang", editor, MockNotepad('la'))
+        finally:
+            del dispatch.HANDLERS["quotes_hi_lang"]
+
+        self.assertEqual(editor.text, 'Вук Караџић и „<hi><foreign xml:lang="la">Carpe diem</foreign></hi>“.')
+        self.assertIn('serbian_quotes > hi > foreign_prompt', item['doc'])
+
+    def test_bad_links_are_rejected(self):
+        """Test that chains of unknown, custom, toggle or chain entries are refused at load time."""
+        for link in ('nema', 'auto_markup', 'toggle_hi', 'quote_hi'):
+            with self.subTest(link=link):
+                with self.assertRaises(ValueError):
+                    dispatch.register_catalog([catalog.entry("bad_chain", chain=("hi", link))])
+        self.assertNotIn("bad_chain", dispatch.HANDLERS)
+
+    def test_chains_get_installer_shortcuts(self):
+        """Test that catalogue chains have stubs and shortcuts like any other entry."""
+        shortcuts = catalog.shortcuts()
+        self.assertEqual(shortcuts['wrap_quote_hi.py'], catalog.parse_key('Ctrl+Shift+F10'))
+        self.assertIn('wrap_title_foreign.py', shortcuts)
+        self.assertIn('wrap_chain.py', shortcuts)
+
+
+class TestWrapChainAction(unittest.TestCase):
+    """Test cases for the wrap_chain action."""
+
+    def setUp(self):
+        dispatch._wrap_chain_last.clear()
+
+    def tearDown(self):
+        dispatch._wrap_chain_last.clear()
+        elements._indexes.clear()
+
+    def test_chain_from_dialog(self):
+        """Test wrapping in a chain typed into the dialog, remembered for next time."""
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Carpe diem')])
+        notepad = MockNotepad('title > foreign xml:lang="la"')
+
+        self.assertEqual(dispatch.run('wrap_chain', editor, notepad), 1)
+        self.assertEqual(editor.text, 'Вук Караџић и <title><foreign xml:lang="la">Carpe diem</foreign></title>.')
+        self.assertEqual(editor.undo_actions, 1)
+        dispatch.run('wrap_chain', MockScintilla(TEXT, [(0, 6)]), notepad)
+        self.assertEqual(notepad.prompts, ['quote > hi', 'title > foreign xml:lang="la"'])
+
+    def test_invalid_chain_is_reported(self):
+        """Test that a malformed chain or attribute changes nothing."""
+        for spec in ('quote >', 'hi > 1x', 'foreign xml:lang="???"'):
+            with self.subTest(spec=spec):
+                editor = MockScintilla(TEXT, [(0, 6)])
+                notepad = MockNotepad(spec)
+                self.assertEqual(dispatch.run('wrap_chain', editor, notepad), 0)
+                self.assertEqual(editor.text, TEXT)
+                self.assertEqual(len(notepad.messages), 1)
+
+    def test_crossing_chain_is_refused(self):
+        """Test that a chain that would cross an element is refused as a whole."""
+        text = '<hi>Вук Караџић</hi> и Тршић'
+        editor = MockScintilla(text, [span_of(text, 'Караџић</hi> и')])
+
+        self.assertEqual(dispatch.run('quote_hi', editor, MockNotepad()), 0)
+        self.assertEqual(editor.text, text)
+
+    def test_index_follows_chain(self):
+        """Test that a cached element index sees both inserted elements."""
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Вук')])
+        index = elements.index_for(editor)
+        dispatch.run('quote_hi', editor, MockNotepad())
+
+        self.assertIs(elements.index_for(editor), index)
+        inner = span_of(editor.text, 'Вук')[0]
+        self.assertEqual([name for _, _, name in index.enclosing(inner)], ['hi', 'quote'])
+
+
+class TestParseChain(unittest.TestCase):
+    """Test cases for findall.parse_chain."""
+
+    def test_links_and_attributes(self):
+        """Test splitting a chain on '>' outside quoted attribute values."""
+        self.assertEqual(findall.parse_chain('quote>hi'), [('quote', []), ('hi', [])])
+        self.assertEqual(findall.parse_chain(' hi rend="a>b" > foreign xml:lang=\'la\' '),
+                         [('hi', [('rend', 'a>b')]), ('foreign', [('xml:lang', 'la')])])
+
+    def test_invalid(self):
+        """Test that empty links raise ValueError."""
+        for spec in ('', '  ', '> hi', 'hi >', 'quote >> hi'):
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    findall.parse_chain(spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
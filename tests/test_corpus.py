@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+test_corpus.py
+Unit tests for the process-pool corpus runner (scripts/teiwrap/corpus.py):
+recipes, atomic outputs, checkpoints, resume and skipping unchanged files.
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import teiwrap_cli
+from teiwrap import corpus
+
+RECIPE = (
+    "# recept\n"
+    "phrase\tad hoc\t@foreign_fixed\n"
+    "phrase\tcarpe diem\t@foreign_fixed\txml:lang=la\n"
+    "regex\t\\b1[89][0-9]{2}\\b\tdate\n"
+    "gazetteer\timena.tsv\n"
+)
+
+GAZETTEER = "Вук Караџић\tpersName\nБеоград\tplaceName\n"
+
+
+class CorpusTestCase(unittest.TestCase):
+    """Temporary corpus folder with a recipe and a gazetteer."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmpdir = Path(self._tmp.name)
+        self.recipe = self.tmpdir / 'recept.tsv'
+        self.recipe.write_text(RECIPE, encoding='utf-8')
+        (self.tmpdir / 'imena.tsv').write_text(GAZETTEER, encoding='utf-8')
+        self.folder = self.tmpdir / 'korpus'
+        self.folder.mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write_corpus(self, count):
+        for i in range(count):
+            path = self.folder / 'deo{0}'.format(i % 3) / 'f{0:03}.xml'.format(i)
+            path.parent.mkdir(exist_ok=True)
+            path.write_text('<p>Вук Караџић, Београд {0}. carpe diem</p>'.format(1800 + i),
+                            encoding='utf-8')
+
+    def run_corpus(self, out=None, **kwargs):
+        return corpus.run_corpus(str(self.recipe), str(self.folder), out and str(out), **kwargs)
+
+
+class TestRecipe(CorpusTestCase):
+    """Test cases for loading and applying recipes."""
+
+    def test_rules_and_catalogue_templates(self):
+        """Test phrases, regexes, gazetteer files and @catalogue elements together."""
+        recipe = corpus.load_recipe(str(self.recipe))
+        data = '<p n="1850">Вук Караџић, 1850, carpe diem, ad hoc, 2050.</p>'.encode('utf-8')
+        found = [(data[s:e].decode('utf-8'), tag, attrs) for s, e, tag, attrs in recipe.find(data)]
+
+        self.assertEqual(found, [
+            ('Вук Караџић', 'persName', []),
+            ('1850', 'date', []),
+            ('carpe diem', 'foreign', [('xml:lang', 'la')]),
+            ('ad hoc', 'foreign', [('xml:lang', 'en')]),
+        ])
+
+    def test_invalid_recipes(self):
+        """Test that bad lines are reported with their line number."""
+        for text in ("regex\t(\tdate\n", "phrase\tx\n", "word\tx\thi\n", "phrase\tx\t@auto_markup\n",
+                     "phrase\tx\thi\trend\n", "phrase\tx\tforeign\txml:lang=???\n"):
+            with self.subTest(text=text):
+                self.recipe.write_text("# prvi red\n" + text, encoding='utf-8')
+                with self.assertRaises(ValueError) as context:
+                    corpus.load_recipe(str(self.recipe))
+                self.assertNotIn('Red 1:', str(context.exception))
+
+    def test_digest_follows_recipe_and_gazetteer(self):
+        """Test that the recipe version changes with the recipe and the gazetteer."""
+        first = corpus.load_recipe(str(self.recipe)).digest
+        self.assertEqual(corpus.load_recipe(str(self.recipe)).digest, first)
+        (self.tmpdir / 'imena.tsv').write_text(GAZETTEER + "Нови Сад\tplaceName\n", encoding='utf-8')
+        second = corpus.load_recipe(str(self.recipe)).digest
+        self.assertNotEqual(second, first)
+        with mock.patch.object(corpus, 'RECIPE_VERSION', corpus.RECIPE_VERSION + 1):
+            self.assertNotEqual(corpus.load_recipe(str(self.recipe)).digest, second)
+
+    def test_reapplying_changes_nothing(self):
+        """Test that a file marked up by the recipe is not wrapped again."""
+        path = self.folder / 'a.xml'
+        path.write_text('<p>Београд 1900 carpe diem</p>', encoding='utf-8')
+        recipe = corpus.load_recipe(str(self.recipe))
+        corpus.process_file(recipe, str(path), str(path))
+        once = path.read_bytes()
+        status, record, count = corpus.process_file(recipe, str(path), str(path))
+
+        self.assertEqual((status, count), ('done', 0))
+        self.assertEqual(path.read_bytes(), once)
+        self.assertEqual(record['input'], record['output'])
+
+
+class TestRunCorpus(CorpusTestCase):
+    """Test cases for corpus.run_corpus."""
+
+    def test_process_pool_matches_serial_run(self):
+        """Test that the process pool writes the same outputs as one process."""
+        self.write_corpus(30)
+        serial = self.run_corpus(self.tmpdir / 'serial', jobs=1)
+        pooled = self.run_corpus(self.tmpdir / 'pool', jobs=2)
+
+        self.assertEqual(serial, {'done': 30, 'skipped': 0, 'error': 0})
+        self.assertEqual(pooled, serial)
+        for rel in corpus.corpus_files(str(self.folder)):
+            self.assertEqual((self.tmpdir / 'pool' / rel).read_bytes(),
+                             (self.tmpdir / 'serial' / rel).read_bytes())
+        sample = (self.tmpdir / 'pool' / 'deo0' / 'f000.xml').read_text(encoding='utf-8')
+        self.assertEqual(sample, '<p><persName>Вук Караџић</persName>, <placeName>Београд</placeName> '
+                                 '<date>1800</date>. <foreign xml:lang="la">carpe diem'
+                                 '</foreign></p>')
+
+    def test_unchanged_files_are_skipped(self):
+        """Test that a second run skips files whose content and recipe are unchanged."""
+        self.write_corpus(6)
+        self.run_corpus(jobs=1)
+        changed = self.folder / 'deo1' / 'f001.xml'
+        changed.write_text('<p>Београд</p>', encoding='utf-8')
+
+        self.assertEqual(self.run_corpus(jobs=1), {'done': 1, 'skipped': 5, 'error': 0})
+        self.assertEqual(changed.read_text(encoding='utf-8'), '<p><placeName>Београд</placeName></p>')
+
+        self.recipe.write_text(RECIPE + "phrase\tBeograd\tplaceName\n", encoding='utf-8')
+        self.assertEqual(self.run_corpus(jobs=1), {'done': 6, 'skipped': 0, 'error': 0})
+
+    def test_interrupted_run_resumes(self):
+        """Test that an interrupted run keeps its checkpoint and resumes after it."""
+        self.write_corpus(10)
+        seen = []
+
+        def interrupt(rel, status, detail):
+            seen.append(rel)
+            if len(seen) == 4:
+                raise KeyboardInterrupt
+
+        with mock.patch.object(corpus, 'CHECKPOINT_EVERY', 1000):
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_corpus(self.tmpdir / 'out', jobs=1, progress=interrupt)
+        checkpoint = json.loads((self.tmpdir / 'out' / corpus.CHECKPOINT_NAME).read_text(encoding='utf-8'))
+        self.assertEqual(sorted(checkpoint['files']), sorted(seen))
+
+        totals = self.run_corpus(self.tmpdir / 'out', jobs=1)
+        self.assertEqual(totals, {'done': 6, 'skipped': 4, 'error': 0})
+
+    def test_in_place_rerun_after_lost_checkpoint(self):
+        """Test that losing the checkpoint of an in-place run does not double the markup."""
+        self.write_corpus(3)
+        self.run_corpus(jobs=1)
+        before = {rel: (self.folder / rel).read_bytes() for rel in corpus.corpus_files(str(self.folder))}
+        (self.folder / corpus.CHECKPOINT_NAME).unlink()
+        self.run_corpus(jobs=1)
+
+        for rel, data in before.items():
+            self.assertEqual((self.folder / rel).read_bytes(), data)
+
+    def test_errors_do_not_stop_the_run(self):
+        """Test that an unreadable file is reported and retried on the next run."""
+        self.write_corpus(3)
+        try:
+            os.symlink(str(self.tmpdir / 'missing.xml'), str(self.folder / 'broken.xml'))
+        except (OSError, NotImplementedError):
+            self.skipTest("symbolic links are not available")
+        errors = []
+        totals = self.run_corpus(jobs=1, progress=lambda rel, status, detail:
+                                 errors.append(rel) if status == 'error' else None)
+
+        self.assertEqual(totals, {'done': 3, 'skipped': 0, 'error': 1})
+        self.assertEqual(errors, ['broken.xml'])
+        self.assertEqual(self.run_corpus(jobs=1)['error'], 1)
+
+    def test_cli_corpus_command(self):
+        """Test the corpus CLI command."""
+        self.write_corpus(4)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            code = teiwrap_cli.main(['corpus', str(self.recipe), str(self.folder),
+                                     '-o', str(self.tmpdir / 'out'), '--jobs', '2'])
+
+        self.assertEqual(code, 0)
+        self.assertIn('4 file(s) marked up, 0 unchanged', out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+test_dispatch.py
+Unit tests for the resident wrap dispatcher (scripts/teiwrap/dispatch.py)
+and the per-shortcut stub scripts that call into it.
+"""
+
+import ast
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import dispatch
+from tests.mock_npp import MockNotepad, MockScintilla, fake_npp
+
+SCRIPTS_DIR = Path(__file__).parent.parent / 'scripts'
+
+# Per-invocation latency budget for a stub script (read + compile + run),
+# measured at about 0.07 ms on a developer machine; leaves headroom for CI.
+LATENCY_BUDGET_P50_MS = 1.0
+LATENCY_BUDGET_P99_MS = 5.0
+
+STUB_ACTIONS = {
+    'wrap_title.py': ('title', '<title>x</title>'),
+    'wrap_head.py': ('head', '<head>x</head>'),
+    'wrap_hi.py': ('hi', '<hi>x</hi>'),
+    'wrap_quote.py': ('quote', '<quote>x</quote>'),
+    'wrap_trailer.py': ('trailer', '<trailer>x</trailer>'),
+    'wrap_serbian_quotes.py': ('serbian_quotes', '„x“'),
+    'wrap_foreign_fixed.py': ('foreign_fixed', '<foreign xml:lang="en">x</foreign>'),
+    'wrap_foreign_prompt.py': ('foreign_prompt', '<foreign xml:lang="en">x</foreign>'),
+}
+
+
+def run_stub(script_name, editor, notepad):
+    """Runs a stub the way PythonScript does: read, compile and exec the file."""
+    path = SCRIPTS_DIR / script_name
+    source = path.read_text(encoding='utf-8')
+    code = compile(source, str(path), 'exec')
+    with fake_npp(editor, notepad):
+        exec(code, {'__name__': '__main__'})
+
+
+class TestDispatchHandlers(unittest.TestCase):
+    """Test cases for the handlers registered in teiwrap.dispatch."""
+
+    def test_all_actions_registered(self):
+        """Test that every stub action has a resident handler."""
+        for action, _ in STUB_ACTIONS.values():
+            self.assertIn(action, dispatch.HANDLERS)
+
+    def test_run_with_explicit_editor(self):
+        """Test running a handler with explicitly passed editor and notepad."""
+        editor = MockScintilla("a b", [(0, 1), (2, 3)])
+        count = dispatch.run('hi', editor, MockNotepad())
+
+        self.assertEqual(count, 2)
+        self.assertEqual(editor.text, "<hi>a</hi> <hi>b</hi>")
+
+    def test_run_uses_npp_module(self):
+        """Test that run() falls back to the Npp module's editor and notepad."""
+        editor = MockScintilla("word", [(0, 4)])
+        with fake_npp(editor):
+            dispatch.run('title')
+
+        self.assertEqual(editor.text, "<title>word</title>")
+
+    def test_foreign_prompt_refuses_invalid_lang(self):
+        """Test that a prompted value which is not a BCP 47 tag is refused."""
+        editor = MockScintilla("test", [(0, 4)])
+        notepad = MockNotepad('en"<x>')
+        count = dispatch.run('foreign_prompt', editor, notepad)
+
+        self.assertEqual(count, 0)
+        self.assertEqual(editor.text, "test")
+        self.assertIn('BCP 47', notepad.messages[0])
+
+    def test_foreign_prompt_accepts_subtags(self):
+        """Test that language tags with script and region subtags are accepted."""
+        editor = MockScintilla("test", [(0, 4)])
+        dispatch.run('foreign_prompt', editor, MockNotepad('sr-Latn-RS'))
+
+        self.assertEqual(editor.text, '<foreign xml:lang="sr-Latn-RS">test</foreign>')
+
+    def test_foreign_prompt_cancel(self):
+        """Test that cancelling the prompt leaves the document untouched."""
+        editor = MockScintilla("test", [(0, 4)])
+        dispatch.run('foreign_prompt', editor, MockNotepad(''))
+
+        self.assertEqual(editor.text, "test")
+
+    def test_foreign_prompt_no_selection_no_prompt(self):
+        """Test that no dialog is shown without a selection."""
+        notepad = MockNotepad('fr')
+        dispatch.run('foreign_prompt', MockScintilla("test", [(1, 1)]), notepad)
+
+        self.assertEqual(notepad.prompts, [])
+
+
+class TestStubScripts(unittest.TestCase):
+    """Test cases for the per-shortcut stub scripts in scripts/."""
+
+    def test_stubs_call_dispatcher(self):
+        """Test that every stub script runs its resident handler."""
+        for script_name, (_, expected) in STUB_ACTIONS.items():
+            with self.subTest(script=script_name):
+                editor = MockScintilla("x", [(0, 1)])
+                run_stub(script_name, editor, MockNotepad('en'))
+                self.assertEqual(editor.text, expected)
+
+    def test_stubs_are_tiny(self):
+        """Test that stubs contain no wrap logic of their own."""
+        for script_name in STUB_ACTIONS:
+            source = (SCRIPTS_DIR / script_name).read_text(encoding='utf-8')
+            statements = ast.parse(source).body
+            # Docstring, one import and one run() call
+            self.assertLessEqual(len(statements), 3, script_name)
+
+    def test_stub_latency_budget(self):
+        """Test the per-invocation latency of a stub against the budget."""
+        run_stub('wrap_hi.py', MockScintilla("x", [(0, 1)]), MockNotepad())  # warm-up import
+        samples = []
+        for _ in range(300):
+            editor = MockScintilla("x", [(0, 1)])
+            started = time.perf_counter()
+            run_stub('wrap_hi.py', editor, MockNotepad())
+            samples.append((time.perf_counter() - started) * 1000.0)
+        samples.sort()
+        p50 = samples[len(samples) // 2]
+        p99 = samples[int(len(samples) * 0.99) - 1]
+
+        self.assertLess(p50, LATENCY_BUDGET_P50_MS)
+        self.assertLess(p99, LATENCY_BUDGET_P99_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+test_elements.py
+Unit tests for the shared element span index (scripts/teiwrap/elements.py).
+"""
+
+import random
+import re
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import dispatch, elements, wellformed
+from tests.mock_npp import MockNotepad, MockScintilla
+
+DOC = ('<TEI><text><body><p>Реч <hi rend="it">x<foreign xml:lang="la">y</foreign></hi>'
+       '<lb/> z</p><p><foreign xml:lang="en">w</foreign></p></body></text></TEI>')
+
+
+def naive_elements(data):
+    """Parse well-formed markup with a stack; return (start, end, name) for every element."""
+    result = []
+    stack = []
+    for match in re.finditer(rb'<(/?)([^\s/>]+)[^>]*?(/?)>', data):
+        if match.group(3):
+            continue
+        if match.group(1):
+            start, name = stack.pop()
+            result.append((start, match.end(), name.decode('utf-8')))
+        else:
+            stack.append((match.start(), match.group(2)))
+    return result
+
+
+def naive_enclosing(data, pos):
+    found = [e for e in naive_elements(data) if e[0] < pos and data.rfind(b'<', 0, e[1]) >= pos]
+    return sorted(found, key=lambda e: -e[0])
+
+
+class TestElementQueries(unittest.TestCase):
+    """Test cases for enclosing() and next_element()."""
+
+    def test_enclosing_innermost_first(self):
+        """Test the chain of elements around a position."""
+        data = DOC.encode('utf-8')
+        index = elements.ElementIndex(MockScintilla(DOC))
+        chain = index.enclosing(data.index(b'y<'))
+
+        self.assertEqual([name for _, _, name in chain],
+                         ['foreign', 'hi', 'p', 'body', 'text', 'TEI'])
+        start, end, _ = chain[1]
+        self.assertEqual(data[start:end], b'<hi rend="it">x<foreign xml:lang="la">y</foreign></hi>')
+
+    def test_enclosing_outside_elements(self):
+        """Test positions outside the root element and empty elements."""
+        index = elements.ElementIndex(MockScintilla(DOC))
+        data = DOC.encode('utf-8')
+
+        self.assertEqual(index.enclosing(0), [])
+        self.assertEqual(index.enclosing(len(data)), [])
+        self.assertEqual(index.enclosing(data.index(b'<lb/>') + 5)[0][2], 'p')
+
+    def test_next_element(self):
+        """Test finding the next element of a type."""
+        data = DOC.encode('utf-8')
+        index = elements.ElementIndex(MockScintilla(DOC))
+        first = index.next_element('foreign')
+        second = index.next_element('foreign', first[0] + 1)
+
+        self.assertEqual(data[first[0]:first[1]], b'<foreign xml:lang="la">y</foreign>')
+        self.assertEqual(data[second[0]:second[1]], b'<foreign xml:lang="en">w</foreign>')
+        self.assertIsNone(index.next_element('foreign', second[0] + 1))
+        self.assertIsNone(index.next_element('lb'))
+
+    def test_queries_match_naive_parse_across_blocks(self):
+        """Test queries against a stack parse on a document split into many blocks."""
+        rng = random.Random(9)
+        parts = []
+        for i in range(300):
+            parts.append('<p n="{0}">Реч <hi>а<foreign xml:lang="la">б</foreign></hi>'.format(i))
+            parts.append('<note>{0}</note>'.format('ш' * rng.randrange(40)) if i % 3 else '')
+            parts.append('</p>\n')
+        text = '<body>' + ''.join(parts) + '</body>'
+        data = text.encode('utf-8')
+        index = elements.ElementIndex(MockScintilla(text), block_size=64)
+        everything = naive_elements(data)
+
+        for _ in range(200):
+            pos = rng.randrange(len(data))
+            self.assertEqual(index.enclosing(pos), naive_enclosing(data, pos))
+            expected = min((e for e in everything if e[0] >= pos and e[2] == 'note'), default=None)
+            self.assertEqual(index.next_element('note', pos), expected)
+
+    def test_query_time_independent_of_document_size(self):
+        """Test that enclosing() costs about the same in small and large documents."""
+        def query_time(repeat):
+            text = '<body>' + '<p>Реч <hi>реч</hi>.</p>\n' * repeat + '</body>'
+            index = elements.ElementIndex(MockScintilla(text))
+            pos = len(text.encode('utf-8')) // 2
+            timings = []
+            for _ in range(20):
+                started = time.perf_counter()
+                index.enclosing(pos)
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        self.assertLess(query_time(200000), query_time(2000) * 10 + 0.002)
+
+
+class TestIncrementalUpdates(unittest.TestCase):
+    """Test cases for patching the index after edits."""
+
+    def test_incremental_updates_match_rebuild(self):
+        """Test that note_insert/note_delete keep the index equal to a fresh build."""
+        rng = random.Random(8)
+        pieces = ['<hi>', '</hi>', '<lb/>', 'ш', 'ab ', '<!--x-->', '"']
+        editor = MockScintilla('<p>' + 'текст <hi>a</hi> ' * 20 + '</p>')
+        index = elements.ElementIndex(editor, block_size=32)
+        for _ in range(200):
+            size = len(editor.buffer)
+            if rng.random() < 0.6 or size < 10:
+                piece = rng.choice(pieces)
+                pos = rng.randrange(size + 1)
+                while pos < size and 0x80 <= editor.buffer[pos] < 0xc0:
+                    pos += 1
+                editor.insertText(pos, piece)
+                index.note_insert(pos, len(piece.encode('utf-8')))
+            else:
+                pos = rng.randrange(size)
+                while 0x80 <= editor.buffer[pos] < 0xc0:
+                    pos -= 1
+                end = min(size, pos + rng.randrange(1, 12))
+                while end < size and 0x80 <= editor.buffer[end] < 0xc0:
+                    end += 1
+                editor.deleteRange(pos, end - pos)
+                index.note_delete(pos, end - pos)
+            fresh = elements.ElementIndex(editor, block_size=32)
+            index.refresh()
+            if index.stale:
+                # Unclosed comment: index_for() would rebuild the index
+                index = fresh
+            for _ in range(5):
+                start = rng.randrange(len(editor.buffer) + 1)
+                end = rng.randrange(start, len(editor.buffer) + 1)
+                self.assertEqual(wellformed.problem(index, start, end),
+                                 wellformed.problem(fresh, start, end))
+                self.assertEqual(index.enclosing(start), fresh.enclosing(start))
+                self.assertEqual(index.next_element('hi', start), fresh.next_element('hi', start))
+
+    def test_modification_callback_patches_index(self):
+        """Test that a watched editor keeps its index current through callbacks."""
+        editor = MockScintilla(DOC)
+        elements.watch(editor, 'MODIFIED')
+        self.addCleanup(elements.unwatch, editor)
+        index = elements.index_for(editor)
+        start, end = DOC.encode('utf-8').index(b'z'), DOC.encode('utf-8').index(b'z') + 1
+        editor.selections = [[start, end]]
+
+        dispatch.run('quote', editor, MockNotepad())
+
+        self.assertTrue(elements.watching(editor))
+        self.assertIs(elements.index_for(editor), index)
+        chain = index.enclosing(start + len('<quote>'))
+        self.assertEqual([name for _, _, name in chain][:2], ['quote', 'p'])
+        self.assertEqual(chain, naive_enclosing(bytes(editor.buffer), start + len('<quote>')))
+
+    def test_watched_wrap_of_many_selections_is_fast(self):
+        """Test that the callback adds little to wrapping 2,000 selections in a large document."""
+        paragraph = '<p>Вук Караџић рођен је у Тршићу, <hi>љубав</hi> и њива.</p>\n'
+        text = paragraph * 100000
+        size = len(paragraph.encode('utf-8'))
+        word = len('Вук'.encode('utf-8'))
+        selections = [(i * 50 * size + 3, i * 50 * size + 3 + word) for i in range(2000)]
+
+        plain = MockScintilla(text, selections)
+        started = time.perf_counter()
+        dispatch.wrap_ranges(plain, selections, '<hi>', '</hi>')
+        raw = time.perf_counter() - started
+
+        editor = MockScintilla(text, selections)
+        elements.watch(editor, 'MODIFIED')
+        self.addCleanup(elements.unwatch, editor)
+        index = elements.index_for(editor)
+        started = time.perf_counter()
+        self.assertEqual(dispatch.run('hi', editor, MockNotepad()), 2000)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(editor.text, plain.text)
+        self.assertLess(elapsed - raw, 0.25)
+        pos = selections[-1][0] + 1999 * len('<hi></hi>') + len('<hi>')
+        self.assertEqual([name for _, _, name in index.enclosing(pos)], ['hi', 'p'])
+
+    def test_unwatch_removes_callback(self):
+        """Test that unwatch() removes only the index callback."""
+        editor = MockScintilla(DOC)
+        other = []
+        editor.callbackSync(other.append, ['MODIFIED'])
+        elements.watch(editor, 'MODIFIED')
+        elements.unwatch(editor)
+        editor.insertText(0, 'x')
+
+        self.assertFalse(elements.watching(editor))
+        self.assertEqual(len(editor.callbacks), 1)
+        self.assertEqual(len(other), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
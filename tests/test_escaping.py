@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+test_escaping.py
+Unit tests for single-pass escaping and validation (scripts/teiwrap/escaping.py)
+and its use when building tags and applying spans to files.
+"""
+
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import teiwrap_cli
+from teiwrap import escaping, gazetteer, headless, tags
+
+VALID_LANGS = ['en', 'EN-us', 'sr-Latn', 'sr-Cyrl-RS', 'de-CH-1901', 'es-419', 'zh-yue-HK',
+               'sl-rozaj-biske', 'en-a-bbb-x-a-ccc', 'x-whatever', 'i-klingon', 'en-GB-oed', '']
+INVALID_LANGS = ['en"<x>', 'e', 'en-', 'sr_Latn', 'en--US', 'sr-Latn-Latn', 'abcdefghi',
+                 'en-x', 'de-1', ' en']
+
+
+class TestEscaping(unittest.TestCase):
+    """Test cases for escape_attr and tags.element."""
+
+    def test_escape_attr(self):
+        """Test that every character special in a quoted attribute is escaped."""
+        self.assertEqual(escaping.escape_attr('a&b<c>"d\te\nf\r'),
+                         'a&amp;b&lt;c&gt;&quot;d&#9;e&#10;f&#13;')
+        self.assertEqual(escaping.escape_attr("Ћирилица 'x'"), "Ћирилица 'x'")
+
+    def test_bytes_stay_bytes(self):
+        """Test that UTF-8 bytes (Python 2 str in PythonScript) are returned as bytes."""
+        self.assertEqual(escaping.escape_attr('„a“ & b'.encode('utf-8')),
+                         '„a“ &amp; b'.encode('utf-8'))
+
+    def test_element_escapes_attributes(self):
+        """Test that tags.element escapes attribute values."""
+        self.assertEqual(tags.element('hi', [('rend', 'a&"b"')])[0], '<hi rend="a&amp;&quot;b&quot;">')
+
+    def test_non_ascii_attributes(self):
+        """Test that non-ASCII names and values give str tags that join with the Serbian quotes."""
+        open_text, close_text = tags.nest([tags.element('serbian_quotes'),
+                                           tags.element('title', [('ref', '#Đ1'), ('n', 'ш"')])])
+        self.assertEqual((open_text, close_text), ('„<title ref="#Đ1" n="ш&quot;">', '</title>“'))
+        self.assertEqual(escaping.to_native(b'\xc4\x90'), 'Đ')
+        self.assertIn('"шш"', escaping.check_attr('xml:lang', 'шш'))
+
+
+class TestLanguageTags(unittest.TestCase):
+    """Test cases for BCP 47 validation of xml:lang."""
+
+    def test_valid_langs(self):
+        """Test well-formed BCP 47 tags, including private use and grandfathered ones."""
+        for value in VALID_LANGS:
+            with self.subTest(lang=value):
+                self.assertTrue(escaping.valid_lang(value))
+
+    def test_invalid_langs(self):
+        """Test values that are not BCP 47 tags."""
+        for value in INVALID_LANGS:
+            with self.subTest(lang=value):
+                self.assertFalse(escaping.valid_lang(value))
+
+    def test_element_rejects_invalid_lang(self):
+        """Test that tags.element refuses an invalid xml:lang."""
+        with self.assertRaises(ValueError):
+            tags.element('foreign', [('xml:lang', 'en"<x>')])
+        self.assertIsNone(escaping.check_attr('rend', 'en"<x>'))
+
+    def test_spans_and_gazetteer_report_line(self):
+        """Test that invalid xml:lang values in input files are reported with the line."""
+        with self.assertRaisesRegex(ValueError, 'Red 2'):
+            headless.parse_spans(['0\t1\thi\n', '0\t4\tforeign\txml:lang=en us\n'])
+        with self.assertRaisesRegex(ValueError, 'Red 1'):
+            gazetteer.parse_gazetteer(['carpe diem\tforeign\txml:lang=latin_\n'])
+
+    def test_invalid_names_are_refused(self):
+        """Test that tag and attribute names are checked against the XML Name pattern."""
+        for tag, attrs in (('1hi', []), ('hi x', []), ('<hi>', []), ('', []),
+                           ('hi', [('re nd', 'x')]), ('hi', [('rend"', 'x')]), ('hi', [('-a', 'x')])):
+            with self.subTest(tag=tag, attrs=attrs):
+                with self.assertRaises(ValueError):
+                    tags.element(tag, attrs)
+        self.assertEqual(tags.element('tei:hi', [('xml:id', 'a1'), ('ана', 'б')]),
+                         ('<tei:hi xml:id="a1" ана="б">', '</tei:hi>'))
+
+    def test_invalid_names_in_files_report_line(self):
+        """Test that invalid names in span and gazetteer files are reported with the line."""
+        with self.assertRaisesRegex(ValueError, 'Red 2.*1hi'):
+            headless.parse_spans(['0\t1\thi\n', '0\t4\t1hi\n'])
+        with self.assertRaisesRegex(ValueError, 'Red 3.*re nd'):
+            headless.parse_spans(['\n', '# c\n', '0\t4\thi\tre nd=x\n'])
+        with self.assertRaisesRegex(ValueError, 'Red 1'):
+            gazetteer.parse_gazetteer(['carpe diem\tforeign>\n'])
+
+
+class TestContentCheck(unittest.TestCase):
+    """Test cases for check_text, check_spans and headless.content_problems."""
+
+    def test_bare_ampersand_and_control_characters(self):
+        """Test that bare & and control characters are found, entity references are not."""
+        data = 'a &amp; &#169; &#xA9; &ш; & b\x01\tc'.encode('utf-8')
+        problems = escaping.check_text(data)
+
+        self.assertEqual([pos for pos, _ in problems], [data.index(b'& b'), data.index(b'\x01')])
+        self.assertIn('&amp;', problems[0][1])
+
+    def test_check_spans_merges_nested_spans(self):
+        """Test that nested and overlapping spans report each problem once."""
+        data = b'x & y & z'
+        problems = escaping.check_spans(data, [(0, 9), (2, 5), (4, 7), (8, 9)])
+
+        self.assertEqual([pos for pos, _ in problems], [2, 6])
+        self.assertEqual(escaping.check_spans(data, [(0, 1), (8, 9)]), [])
+
+    def test_content_problems_in_file(self):
+        """Test checking span content in a file and the CLI warning."""
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / 'in.xml'
+            spans_file = Path(tmp) / 'spans.tsv'
+            src.write_bytes(b'Tom & Jerry, A &amp; B')
+            spans_file.write_text('0\t11\thi\n13\t22\thi\n', encoding='utf-8')
+            spans = headless.parse_spans(spans_file.read_text(encoding='utf-8').splitlines())
+
+            self.assertEqual([pos for pos, _ in headless.content_problems(str(src), spans)], [4])
+            self.assertEqual(teiwrap_cli.main(['apply', str(src), str(spans_file)]), 0)
+            self.assertEqual(src.read_bytes(), b'<hi>Tom & Jerry</hi>, <hi>A &amp; B</hi>')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+test_findall.py
+Unit tests for wrapping every occurrence of a phrase or regex
+(scripts/teiwrap/findall.py) and the find_wrap action in teiwrap.dispatch.
+"""
+
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import dispatch, elements, findall
+from tests.mock_npp import MockScintilla
+from tests.test_wellformed import span_of
+
+
+class ScriptedNotepad:
+    """Notepad mock that answers successive prompts from a list."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.prompts = []
+        self.messages = []
+
+    def prompt(self, message, title, default):
+        self.prompts.append(default)
+        return self.answers.pop(0)
+
+    def messageBox(self, message, title="", flags=0):
+        self.messages.append(message)
+
+
+class TestParseElement(unittest.TestCase):
+    """Test cases for findall.parse_element."""
+
+    def test_name_and_attributes(self):
+        """Test quoted, single-quoted and bare attribute values."""
+        self.assertEqual(findall.parse_element('foreign xml:lang="la"'), ('foreign', [('xml:lang', 'la')]))
+        self.assertEqual(findall.parse_element("  hi rend='i' n=2 "), ('hi', [('rend', 'i'), ('n', '2')]))
+        self.assertEqual(findall.parse_element('persName'), ('persName', []))
+
+    def test_invalid(self):
+        """Test that bad names and attributes raise ValueError."""
+        for spec in ('', '1hi', '<hi>', 'hi rend', 'hi ="x"', 'hi a="x" "'):
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    findall.parse_element(spec)
+
+
+class TestFindAll(unittest.TestCase):
+    """Test cases for findall.find_all and findall.wrap_all."""
+
+    def test_literal_matches(self):
+        """Test non-overlapping, case-sensitive literal matches as byte spans."""
+        matches = findall.find_all(MockScintilla('ааа АА аа'), 'аа')
+        self.assertEqual(matches, [(0, 4), (12, 16)])
+
+    def test_regex_matches(self):
+        """Test regex matches; empty matches are skipped and bad patterns raise."""
+        editor = MockScintilla('a1 b22 c')
+        self.assertEqual(findall.find_all(editor, r'[0-9]+', regex=True), [(1, 2), (4, 6)])
+        self.assertEqual(findall.find_all(editor, r'x*', regex=True), [])
+        with self.assertRaises(ValueError):
+            findall.find_all(editor, r'(', regex=True)
+
+    def test_skips_matches_inside_the_tag(self):
+        """Test that matches already inside the same tag, or inside a tag, are not wrapped."""
+        text = ('<p>lorem <foreign xml:lang="la">lorem ipsum</foreign> '
+                '<hi>lorem</hi> <note n="lorem"/> lorem</p>')
+        editor = MockScintilla(text)
+        open_text, close_text = '<foreign xml:lang="la">', '</foreign>'
+        wrapped, inside, crossing = findall.wrap_all(editor, 'lorem', 'foreign', open_text, close_text)
+
+        self.assertEqual((len(wrapped), len(inside), len(crossing)), (3, 1, 1))
+        self.assertEqual(editor.text, (
+            '<p><foreign xml:lang="la">lorem</foreign> <foreign xml:lang="la">lorem ipsum</foreign> '
+            '<hi><foreign xml:lang="la">lorem</foreign></hi> <note n="lorem"/> '
+            '<foreign xml:lang="la">lorem</foreign></p>'))
+        self.assertEqual(editor.undo_actions, 1)
+        editor.undo()
+        self.assertEqual(editor.text, text)
+
+    def test_second_run_changes_nothing(self):
+        """Test that wrapping all occurrences twice wraps them once."""
+        editor = MockScintilla('Ave Maria, ave. Ave!')
+        findall.wrap_all(editor, 'Ave', 'foreign', '<foreign>', '</foreign>')
+        once = editor.text
+        wrapped, inside, _ = findall.wrap_all(editor, 'Ave', 'foreign', '<foreign>', '</foreign>')
+
+        self.assertEqual(editor.text, once)
+        self.assertEqual((len(wrapped), len(inside)), (0, 2))
+
+    def test_many_matches_in_a_large_document(self):
+        """Test that thousands of matches are found without copying the document."""
+        text = '<p>' + 'реч и фраза, ' * 200000 + '</p>'
+        editor = MockScintilla(text)
+        started = time.perf_counter()
+        matches = findall.find_all(editor, 'фраза')
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(matches), 200000)
+        self.assertEqual(editor.bytes_read, 0)
+        self.assertLess(elapsed, 5.0)
+
+    def test_index_follows_wrap(self):
+        """Test that a cached element index matches a fresh one after the wrap."""
+        editor = MockScintilla('<p>a b a</p> a')
+        index = elements.index_for(editor)
+        findall.wrap_all(editor, 'a', 'hi', '<hi>', '</hi>')
+
+        self.assertIs(elements.index_for(editor), index)
+        fresh = elements.ElementIndex(MockScintilla(editor.text))
+        for pos in range(editor.getLength()):
+            self.assertEqual(index.enclosing(pos), fresh.enclosing(pos))
+
+
+    def test_document_is_read_once(self):
+        """Test that only the first run copies the document, to build the element index."""
+        editor = MockScintilla('<p>Ave Maria, ave. Ave!</p>')
+        elements.watch(editor, 'MODIFIED')
+        self.addCleanup(elements.unwatch, editor)
+        reads = []
+        get_text = editor.getText
+        editor.getText = lambda: reads.append(1) or get_text()
+        findall.wrap_all(editor, 'Ave', 'foreign', '<foreign>', '</foreign>')
+        findall.wrap_all(editor, 'Maria', 'persName', '<persName>', '</persName>')
+        findall.wrap_all(editor, 'ave', 'hi', '<hi>', '</hi>')
+
+        self.assertEqual(len(reads), 1)
+        self.assertEqual(editor.text, '<p><foreign>Ave</foreign> <persName>Maria</persName>, '
+                                      '<hi>ave</hi>. <foreign>Ave</foreign>!</p>')
+
+
+class TestFindWrapAction(unittest.TestCase):
+    """Test cases for the find_wrap dispatcher action."""
+
+    def setUp(self):
+        dispatch._find_wrap_last.clear()
+
+    def test_selection_is_the_phrase(self):
+        """Test that the selected text is wrapped everywhere, with a report."""
+        text = 'Lorem ipsum, dixit. Lorem ipsum!'
+        editor = MockScintilla(text, [span_of(text, 'Lorem ipsum')])
+        notepad = ScriptedNotepad('foreign xml:lang="la"')
+        self.assertEqual(dispatch.run('find_wrap', editor, notepad), 2)
+
+        self.assertEqual(editor.text.count('<foreign xml:lang="la">Lorem ipsum</foreign>'), 2)
+        self.assertTrue(notepad.prompts[0].startswith('foreign xml:lang="'))
+        self.assertIn('Obavijeno: 2', notepad.messages[0])
+
+    def test_regex_without_selection(self):
+        """Test that without a selection a regex is asked for, and answers are remembered."""
+        editor = MockScintilla('1914, 1918. 1941')
+        notepad = ScriptedNotepad(r'19[0-9]{2}', 'date')
+        dispatch.run('find_wrap', editor, notepad)
+        self.assertEqual(editor.text, '<date>1914</date>, <date>1918</date>. <date>1941</date>')
+
+        notepad = ScriptedNotepad(None)
+        dispatch.run('find_wrap', MockScintilla('x'), notepad)
+        self.assertEqual(notepad.prompts, [r'19[0-9]{2}'])
+
+    def test_invalid_input_changes_nothing(self):
+        """Test that a bad element or regex is reported without any edit."""
+        for answers in (('a', '"><x'), ('(', 'hi'), ('a', 'foreign xml:lang="???"')):
+            with self.subTest(answers=answers):
+                editor = MockScintilla('a b a')
+                notepad = ScriptedNotepad(*answers)
+                self.assertEqual(dispatch.run('find_wrap', editor, notepad), 0)
+                self.assertEqual(editor.text, 'a b a')
+                self.assertEqual(len(notepad.messages), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
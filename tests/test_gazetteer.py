@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+test_gazetteer.py
+Unit tests for gazetteer-driven auto-markup (scripts/teiwrap/gazetteer.py).
+"""
+
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import teiwrap_cli
+from teiwrap import dispatch, gazetteer
+from tests.mock_npp import MockNotepad, MockScintilla
+
+ENTRIES = [
+    ("Rat i mir", "title", []),
+    ("Rat", "hi", []),
+    ("carpe diem", "foreign", [("xml:lang", "la")]),
+    ("На Дрини ћуприја", "title", []),
+]
+
+
+def find_text(gaz, text):
+    """Run gaz.find on text and return the spans with character offsets."""
+    data = text.encode('utf-8')
+    return [
+        (len(data[:s].decode('utf-8')), len(data[:e].decode('utf-8')), tag, attrs)
+        for s, e, tag, attrs in gaz.find(data)
+    ]
+
+
+class TestGazetteerMatching(unittest.TestCase):
+    """Test cases for the Aho-Corasick matcher."""
+
+    def setUp(self):
+        self.gaz = gazetteer.Gazetteer(ENTRIES)
+
+    def test_parse_gazetteer(self):
+        """Test parsing tab-separated gazetteer lines."""
+        entries = gazetteer.parse_gazetteer(["# c\n", "carpe diem\tforeign\txml:lang=la\n"])
+
+        self.assertEqual(entries, [("carpe diem", "foreign", [("xml:lang", "la")])])
+
+    def test_longest_match_wins(self):
+        """Test that overlapping phrases resolve to the leftmost-longest match."""
+        spans = find_text(self.gaz, "Čitam Rat i mir i Rat.")
+
+        self.assertEqual(spans, [(6, 15, 'title', []), (18, 21, 'hi', [])])
+
+    def test_word_boundaries(self):
+        """Test that phrases are not matched inside longer words."""
+        self.assertEqual(find_text(self.gaz, "Ratni Krat"), [])
+
+    def test_cyrillic_phrase_byte_offsets(self):
+        """Test that Cyrillic phrases are found at UTF-8 byte offsets."""
+        text = "Роман „На Дрини ћуприја“."
+        spans = self.gaz.find(text.encode('utf-8'))
+        start, end = spans[0][:2]
+
+        self.assertEqual(text.encode('utf-8')[start:end].decode('utf-8'), "На Дрини ћуприја")
+
+    def test_matches_inside_tags_skipped(self):
+        """Test that phrases in tag names, attribute values or across tags are skipped."""
+        text = '<note n="Rat">Rat</note> <hi>Rat i</hi> mir'
+        spans = find_text(self.gaz, text)
+
+        self.assertEqual(spans, [(14, 17, 'hi', []), (29, 32, 'hi', [])])
+
+    def test_duplicate_phrase_last_wins(self):
+        """Test that a repeated phrase uses the last gazetteer entry."""
+        gaz = gazetteer.Gazetteer([("Rat", "hi", []), ("Rat", "title", [])])
+
+        self.assertEqual(find_text(gaz, "Rat"), [(0, 3, 'title', [])])
+
+    def test_suffix_phrases_found(self):
+        """Test that phrases ending inside other phrases are found via dictionary links."""
+        gaz = gazetteer.Gazetteer([("abcd x", "a", []), ("cd", "b", [])])
+
+        self.assertEqual(find_text(gaz, "abcd y cd"), [(7, 9, 'b', [])])
+
+    def test_scan_time_independent_of_gazetteer_size(self):
+        """Test that matching time does not grow with the number of phrases."""
+        text = ("Ovo je običan tekst bez fraza iz gazetira. " * 2000).encode('utf-8')
+        small = gazetteer.Gazetteer(ENTRIES)
+        large = gazetteer.Gazetteer(
+            ENTRIES + [("fraza {0} broj".format(i), "hi", []) for i in range(20000)]
+        )
+
+        def best_of(gaz):
+            timings = []
+            for _ in range(3):
+                started = time.perf_counter()
+                gaz.find(text)
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        self.assertLess(best_of(large), best_of(small) * 3)
+
+
+class TestGazetteerFiles(unittest.TestCase):
+    """Test cases for gazetteer loading, caching and file/folder markup."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmpdir = Path(self._tmp.name)
+        self.gaz_path = self.tmpdir / 'gazetteer.tsv'
+        self.gaz_path.write_text(
+            "Rat i mir\ttitle\ncarpe diem\tforeign\txml:lang=la\n", encoding='utf-8'
+        )
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_cache_is_written_and_reused(self):
+        """Test that the automaton is cached and not rebuilt for an unchanged gazetteer."""
+        gazetteer.load_gazetteer(str(self.gaz_path))
+        self.assertTrue(Path(str(self.gaz_path) + '.cache').exists())
+
+        with mock.patch.object(gazetteer, 'parse_gazetteer', side_effect=AssertionError("rebuilt")):
+            gaz = gazetteer.load_gazetteer(str(self.gaz_path))
+        self.assertEqual(len(gaz.entries), 2)
+
+    def test_cache_invalidated_on_change(self):
+        """Test that editing the gazetteer rebuilds the automaton."""
+        gazetteer.load_gazetteer(str(self.gaz_path))
+        self.gaz_path.write_text("Rat\thi\n", encoding='utf-8')
+
+        gaz = gazetteer.load_gazetteer(str(self.gaz_path))
+        self.assertEqual([entry[1] for entry in gaz.entries], ['hi'])
+
+    def test_markup_folder(self):
+        """Test marking up all .xml files in a folder, leaving other files alone."""
+        folder = self.tmpdir / 'corpus'
+        (folder / 'sub').mkdir(parents=True)
+        (folder / 'a.xml').write_text("<p>Rat i mir</p>", encoding='utf-8')
+        (folder / 'sub' / 'b.xml').write_text("<p>carpe diem!</p>", encoding='utf-8')
+        (folder / 'c.txt').write_text("Rat i mir", encoding='utf-8')
+
+        gaz = gazetteer.load_gazetteer(str(self.gaz_path))
+        results = gazetteer.markup_folder(str(folder), gaz)
+
+        self.assertEqual(sorted(results.values()), [1, 1])
+        self.assertEqual((folder / 'a.xml').read_text(encoding='utf-8'),
+                         "<p><title>Rat i mir</title></p>")
+        self.assertEqual((folder / 'sub' / 'b.xml').read_text(encoding='utf-8'),
+                         '<p><foreign xml:lang="la">carpe diem</foreign>!</p>')
+        self.assertEqual((folder / 'c.txt').read_text(encoding='utf-8'), "Rat i mir")
+
+    def test_markup_document_single_undo(self):
+        """Test marking up the editor document as one undo action."""
+        editor = MockScintilla("Rat i mir, carpe diem.")
+        gaz = gazetteer.load_gazetteer(str(self.gaz_path))
+        count = gazetteer.markup_document(editor, gaz)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(editor.text,
+                         '<title>Rat i mir</title>, <foreign xml:lang="la">carpe diem</foreign>.')
+        self.assertEqual(editor.undo_actions, 1)
+
+    def test_markup_document_twice_changes_nothing(self):
+        """Test that a second run skips phrases already wrapped, with non-ASCII attributes."""
+        self.gaz_path.write_text("На Дрини ћуприја\ttitle\tref=#Đ1\nДрини\tplaceName\n", encoding='utf-8')
+        gaz = gazetteer.load_gazetteer(str(self.gaz_path))
+        editor = MockScintilla("На Дрини ћуприја, на Дрини.")
+
+        self.assertEqual(gazetteer.markup_document(editor, gaz), 2)
+        marked = '<title ref="#Đ1">На Дрини ћуприја</title>, на <placeName>Дрини</placeName>.'
+        self.assertEqual(editor.text, marked)
+        self.assertEqual(gazetteer.markup_document(editor, gaz), 0)
+        self.assertEqual(editor.text, marked)
+
+    def test_auto_markup_action_missing_gazetteer(self):
+        """Test that the auto_markup action reports a missing gazetteer."""
+        notepad = MockNotepad()
+        with mock.patch.object(dispatch, 'GAZETTEER_PATH', str(self.tmpdir / 'missing.tsv')):
+            count = dispatch.run('auto_markup', MockScintilla("Rat i mir"), notepad)
+
+        self.assertEqual(count, 0)
+        self.assertEqual(len(notepad.messages), 1)
+
+    def test_cli_automarkup_file(self):
+        """Test the automarkup CLI command on a single file."""
+        src = self.tmpdir / 'doc.xml'
+        out = self.tmpdir / 'out.xml'
+        src.write_text("Rat i mir", encoding='utf-8')
+
+        code = teiwrap_cli.main(['automarkup', str(self.gaz_path), str(src), '-o', str(out)])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(out.read_text(encoding='utf-8'), "<title>Rat i mir</title>")
+        self.assertEqual(src.read_text(encoding='utf-8'), "Rat i mir")
+
+
+if __name__ == "__main__":
+    unittest.main()
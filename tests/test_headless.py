@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+test_headless.py
+Unit tests for headless span wrapping (scripts/teiwrap/headless.py) and teiwrap_cli.py.
+"""
+
+import tempfile
+import tracemalloc
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import teiwrap_cli
+from teiwrap import batch, dispatch, headless
+from tests.mock_npp import MockNotepad, MockScintilla
+
+
+class TestHeadlessWrap(unittest.TestCase):
+    """Test cases for teiwrap.headless."""
+
+    def setUp(self):
+        """Create a temporary directory for input and output files."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmpdir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def wrap_file(self, text, spans, **kwargs):
+        """Write text to a file, apply spans and return the output text."""
+        src = self.tmpdir / 'in.xml'
+        out = self.tmpdir / 'out.xml'
+        src.write_bytes(text.encode('utf-8'))
+        headless.apply_spans(str(src), spans, str(out), **kwargs)
+        return out.read_bytes().decode('utf-8')
+
+    def test_parse_spans(self):
+        """Test parsing tab-separated span lines."""
+        lines = ["# comment\n", "\n", "0\t4\ttitle\n", "5\t9\tforeign\txml:lang=la\n"]
+        spans = headless.parse_spans(lines)
+
+        self.assertEqual(spans, [(0, 4, 'title', []), (5, 9, 'foreign', [('xml:lang', 'la')])])
+
+    def test_parse_spans_invalid(self):
+        """Test that malformed lines are rejected with the line number."""
+        with self.assertRaises(ValueError) as context:
+            headless.parse_spans(["0\t4\n"])
+        self.assertIn('1', str(context.exception))
+
+    def test_simple_spans(self):
+        """Test wrapping several spans with plain and attributed tags."""
+        result = self.wrap_file("one two three", [
+            (0, 3, 'title', []),
+            (8, 13, 'foreign', [('xml:lang', 'la')]),
+        ])
+
+        self.assertEqual(result, '<title>one</title> two <foreign xml:lang="la">three</foreign>')
+
+    def test_nested_and_adjacent_spans(self):
+        """Test that nested and touching spans produce well-formed markup."""
+        result = self.wrap_file("abcdef", [
+            (0, 6, 'quote', []),
+            (0, 3, 'hi', []),
+            (3, 6, 'hi', []),
+        ])
+
+        self.assertEqual(result, "<quote><hi>abc</hi><hi>def</hi></quote>")
+
+    def test_identical_spans_first_is_outer(self):
+        """Test that for identical spans the first listed one is outermost."""
+        result = self.wrap_file("x", [(0, 1, 'title', []), (0, 1, 'hi', [])])
+
+        self.assertEqual(result, "<title><hi>x</hi></title>")
+
+    def test_crossing_spans_rejected(self):
+        """Test that crossing spans raise ValueError."""
+        with self.assertRaises(ValueError):
+            headless.insertion_plan([(0, 4, 'hi', []), (2, 6, 'title', [])])
+
+    def test_span_crossing_existing_element_rejected(self):
+        """Test that a span crossing an element already in the file is refused, as in the editor."""
+        text = "<p>Вук <hi>Караџић</hi> и Тршић</p>"
+        start = text.encode('utf-8').index(b'<hi>')
+        end = text.encode('utf-8').index(b' \xd0\xb8')
+        for span in ((start + 4, end, 'quote'), (0, start + 6, 'quote'), (3, len(text.encode('utf-8')), 'quote')):
+            with self.subTest(span=span):
+                with self.assertRaisesRegex(ValueError, 'Opseg <quote>'):
+                    self.wrap_file(text, [span + ([],)])
+                self.assertFalse((self.tmpdir / 'out.xml').exists())
+        self.assertEqual(self.wrap_file(text, [(start, end + 3, 'quote', [])]),
+                         "<p>Вук <quote><hi>Караџић</hi> и</quote> Тршић</p>")
+
+    def test_span_inside_tag_rejected(self):
+        """Test that a span starting or ending inside a tag or comment is refused."""
+        text = "<hi>x</hi><!-- c --> y"
+        for start, end in ((1, 5), (4, 8), (12, 22), (0, 3)):
+            with self.subTest(span=(start, end)):
+                with self.assertRaisesRegex(ValueError, 'unutar taga'):
+                    self.wrap_file(text, [(start, end, 'quote', [])])
+
+    def test_span_inside_utf8_character_rejected(self):
+        """Test that a position in the middle of a Cyrillic letter is rejected."""
+        with self.assertRaises(ValueError):
+            self.wrap_file("Ћ", [(1, 2, 'hi', [])])
+        self.assertFalse((self.tmpdir / 'out.xml').exists())
+
+    def test_span_outside_file_rejected(self):
+        """Test that spans past the end of the file are rejected."""
+        with self.assertRaises(ValueError):
+            self.wrap_file("abc", [(0, 10, 'hi', [])])
+
+    def test_empty_file_and_empty_spans(self):
+        """Test an empty input file and empty spans (which are skipped)."""
+        self.assertEqual(self.wrap_file("", []), "")
+        self.assertEqual(self.wrap_file("abc", [(1, 1, 'hi', [])]), "abc")
+
+    def test_byte_identical_to_editor(self):
+        """Test that headless output matches the editor scripts byte for byte."""
+        text = "Ово је „текст“ & <b/>, a ово је други део."
+        data = text.encode('utf-8')
+        spans = [(0, 6), (19, 36), (46, len(data))]
+        for action, tag, attrs in [
+            ('title', 'title', []),
+            ('serbian_quotes', 'serbian_quotes', []),
+            ('foreign_prompt', 'foreign', [('xml:lang', 'sr-Latn')]),
+        ]:
+            with self.subTest(action=action):
+                editor = MockScintilla(text, spans)
+                dispatch.run(action, editor, MockNotepad('sr-Latn'))
+                result = self.wrap_file(text, [(s, e, tag, attrs) for s, e in spans])
+                self.assertEqual(result.encode('utf-8'), bytes(editor.buffer))
+
+    def test_in_place_output(self):
+        """Test writing the result back over the input file."""
+        src = self.tmpdir / 'doc.xml'
+        src.write_text("abc", encoding='utf-8')
+        headless.apply_spans(str(src), [(0, 3, 'hi', [])], str(src))
+
+        self.assertEqual(src.read_text(encoding='utf-8'), "<hi>abc</hi>")
+        self.assertEqual([p.name for p in self.tmpdir.iterdir()], ['doc.xml'])
+
+    def test_memory_does_not_grow_with_file_size(self):
+        """Test that peak memory is bounded by the chunk size, not the file size."""
+        src = self.tmpdir / 'big.xml'
+        size = 16 * 1024 * 1024
+        src.write_bytes(b"x" * size)
+        out = self.tmpdir / 'big.out.xml'
+
+        tracemalloc.start()
+        headless.apply_spans(str(src), [(0, 10, 'hi', []), (size - 10, size, 'hi', [])],
+                             str(out), chunk_size=64 * 1024)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertLess(peak, 1024 * 1024)
+        self.assertEqual(out.stat().st_size, size + 2 * len("<hi></hi>"))
+
+
+class TestCli(unittest.TestCase):
+    """Test cases for the teiwrap_cli.py apply command."""
+
+    def test_apply_command(self):
+        """Test the apply subcommand end to end."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / 'in.xml'
+            spans = Path(tmpdir) / 'spans.tsv'
+            out = Path(tmpdir) / 'out.xml'
+            src.write_text("Hello world", encoding='utf-8')
+            spans.write_text("0\t5\thi\n6\t11\tforeign\txml:lang=en\n", encoding='utf-8')
+
+            code = teiwrap_cli.main(['apply', str(src), str(spans), '-o', str(out)])
+
+            self.assertEqual(code, 0)
+            self.assertEqual(out.read_text(encoding='utf-8'),
+                             '<hi>Hello</hi> <foreign xml:lang="en">world</foreign>')
+
+    def test_apply_command_error(self):
+        """Test that invalid spans return a non-zero exit code."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / 'in.xml'
+            spans = Path(tmpdir) / 'spans.tsv'
+            src.write_text("abc", encoding='utf-8')
+            spans.write_text("0\t99\thi\n", encoding='utf-8')
+
+            code = teiwrap_cli.main(['apply', str(src), str(spans)])
+
+            self.assertEqual(code, 1)
+            self.assertEqual(src.read_text(encoding='utf-8'), "abc")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,8 @@ test_install.py
 Unit tests for install.py script.
 """
 
+import contextlib
+import io
 import unittest
 import tempfile
 import shutil
@@ -109,6 +111,241 @@ class TestInstallHelperFunctions(unittest.TestCase):
             self.assertTrue((target_dir / 'wrap_title.py').exists())
             self.assertTrue((target_dir / 'wrap_head.py').exists())
             self.assertFalse((target_dir / 'test_scripts.py').exists())
+    
+    def test_register_startup_creates_file(self):
+        """Test that register_startup creates startup.py with the dispatcher import."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.assertTrue(install.register_startup(tmpdir))
+            
+            content = (Path(tmpdir) / 'startup.py').read_text(encoding='utf-8')
+            self.assertIn('import teiwrap.dispatch', content)
+    
+    def test_register_startup_preserves_and_is_idempotent(self):
+        """Test that register_startup keeps user code and only appends once."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            startup_file = Path(tmpdir) / 'startup.py'
+            startup_file.write_text('import my_stuff', encoding='utf-8')
+            
+            self.assertTrue(install.register_startup(tmpdir))
+            self.assertFalse(install.register_startup(tmpdir))
+            
+            content = startup_file.read_text(encoding='utf-8')
+            self.assertTrue(content.startswith('import my_stuff\n'))
+            self.assertEqual(content.count(install.STARTUP_MARKER), 1)
+
+
+class TestIncrementalInstall(unittest.TestCase):
+    """Test the manifest-based incremental copy and --verify."""
+    
+    def setUp(self):
+        """Set up source and target directories."""
+        if install is None or sys.platform != 'win32':
+            self.skipTest("install.py requires Windows")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source_dir = Path(self.tmp.name) / 'source'
+        self.target_dir = Path(self.tmp.name) / 'target'
+        (self.source_dir / 'teiwrap').mkdir(parents=True)
+        self.target_dir.mkdir()
+        (self.source_dir / 'wrap_title.py').write_text('# title')
+        (self.source_dir / 'wrap_hi.py').write_text('# hi')
+        (self.source_dir / 'teiwrap' / '__init__.py').write_text('')
+        (self.source_dir / 'teiwrap' / 'batch.py').write_text('# batch')
+    
+    def tearDown(self):
+        """Remove the temporary directories."""
+        self.tmp.cleanup()
+    
+    def install_quietly(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            copied = install.copy_scripts(self.source_dir, self.target_dir)
+        return copied, out.getvalue()
+    
+    def test_manifest_lists_installed_files(self):
+        """Test that the manifest records a hash for every installed file."""
+        copied, _ = self.install_quietly()
+        
+        self.assertEqual(sorted(copied), ['wrap_hi.py', 'wrap_title.py'])
+        manifest = install.load_manifest(self.target_dir)
+        self.assertEqual(sorted(manifest), ['teiwrap/__init__.py', 'teiwrap/batch.py',
+                                            'wrap_hi.py', 'wrap_title.py'])
+        self.assertEqual(manifest['wrap_hi.py']['sha256'],
+                         install.file_hash(self.source_dir / 'wrap_hi.py'))
+    
+    def test_second_run_copies_only_changes(self):
+        """Test that unchanged files are not copied again."""
+        self.install_quietly()
+        (self.source_dir / 'teiwrap' / 'batch.py').write_text('# batch v2')
+        
+        _, output = self.install_quietly()
+        
+        self.assertIn('Copied: teiwrap/batch.py', output)
+        self.assertEqual(output.count('Copied:'), 1)
+        self.assertEqual((self.target_dir / 'teiwrap' / 'batch.py').read_text(), '# batch v2')
+        _, output = self.install_quietly()
+        self.assertNotIn('Copied:', output)
+    
+    def test_edited_installed_file_is_restored(self):
+        """Test that an installed file edited by hand is overwritten again."""
+        self.install_quietly()
+        (self.target_dir / 'wrap_hi.py').write_text('# local edit, longer')
+        
+        _, output = self.install_quietly()
+        
+        self.assertIn('Copied: wrap_hi.py', output)
+        self.assertEqual((self.target_dir / 'wrap_hi.py').read_text(), '# hi')
+    
+    def test_removes_files_no_longer_shipped(self):
+        """Test that previously installed files are removed, unless edited."""
+        (self.source_dir / 'teiwrap' / 'old.py').write_text('# old')
+        (self.source_dir / 'wrap_old.py').write_text('# old script')
+        (self.source_dir / 'wrap_edited.py').write_text('# edited script')
+        self.install_quietly()
+        (self.target_dir / 'wrap_edited.py').write_text('# my changes')
+        for name in ('teiwrap/old.py', 'wrap_old.py', 'wrap_edited.py'):
+            (self.source_dir / name).unlink()
+        (self.target_dir / 'user_script.py').write_text('# not ours')
+        
+        _, output = self.install_quietly()
+        
+        self.assertFalse((self.target_dir / 'wrap_old.py').exists())
+        self.assertFalse((self.target_dir / 'teiwrap' / 'old.py').exists())
+        self.assertTrue((self.target_dir / 'wrap_edited.py').exists())
+        self.assertTrue((self.target_dir / 'user_script.py').exists())
+        self.assertIn('Kept: wrap_edited.py', output)
+        self.assertNotIn('wrap_old.py', install.load_manifest(self.target_dir))
+    
+    def test_verify_reports_drift_without_writing(self):
+        """Test that verify_installation reports drift and changes nothing."""
+        self.install_quietly()
+        (self.source_dir / 'wrap_quote.py').write_text('# quote')
+        (self.source_dir / 'wrap_hi.py').write_text('# hi v2')
+        (self.source_dir / 'wrap_title.py').unlink()
+        before = {p: p.read_bytes() for p in self.target_dir.rglob('*') if p.is_file()}
+        
+        drift = install.verify_installation(self.source_dir, self.target_dir)
+        
+        self.assertEqual(drift, {'missing': ['wrap_quote.py'], 'changed': ['wrap_hi.py'],
+                                 'stale': ['wrap_title.py']})
+        after = {p: p.read_bytes() for p in self.target_dir.rglob('*') if p.is_file()}
+        self.assertEqual(after, before)
+        self.install_quietly()
+        self.assertEqual(install.verify_installation(self.source_dir, self.target_dir),
+                         {'missing': [], 'changed': [], 'stale': []})
+    
+    def test_generated_stubs_are_installed(self):
+        """Test that catalogue stubs are installed from memory, replacing source files."""
+        stubs = install.generated_stubs()
+        with contextlib.redirect_stdout(io.StringIO()):
+            copied = install.copy_scripts(self.source_dir, self.target_dir, stubs)
+        
+        self.assertIn('wrap_persName.py', copied)
+        self.assertEqual((self.target_dir / 'wrap_title.py').read_bytes(), stubs['wrap_title.py'])
+        self.assertEqual(install.verify_installation(self.source_dir, self.target_dir, stubs),
+                         {'missing': [], 'changed': [], 'stale': []})
+        self.assertEqual(sorted(install.SCRIPT_SHORTCUTS),
+                         sorted(item['script'] for item in install.catalog.CATALOG if item['key']))
+    
+    def test_corrupt_manifest_is_ignored(self):
+        """Test that an unreadable manifest only makes the next run copy everything."""
+        self.install_quietly()
+        (self.target_dir / install.MANIFEST_NAME).write_text('{not json')
+        
+        _, output = self.install_quietly()
+        
+        self.assertNotIn('Copied:', output)
+        self.assertEqual(len(install.load_manifest(self.target_dir)), 4)
+
+
+USER_SHORTCUTS = """<?xml version="1.0" encoding="UTF-8" ?>
+<NotepadPlus>
+    <!-- my customisations -->
+    <InternalCommands>
+        <Shortcut id="41001" Ctrl="yes" Alt="yes" Shift="no" Key="50" />
+    </InternalCommands>
+    <Macros>
+        <Macro name="Trim" Ctrl="no" Alt="yes" Shift="no" Key="84">
+            <Action type="2" message="0" wParam="42024" lParam="0" sParam="" />
+        </Macro>
+    </Macros>
+    <PluginCommands>
+        <PluginCommand moduleName="Other.dll" internalID="3" Ctrl="no" Alt="no" Shift="no" Key="0" />
+        <Command name="PythonScript:wrap_hi" Ctrl="yes" Alt="yes" Shift="no" Key="99" />
+    </PluginCommands>
+    <ScintillaCommands />
+</NotepadPlus>
+"""
+
+
+class TestShortcutMerge(unittest.TestCase):
+    """Test the in-place, comment-preserving merge of shortcuts.xml."""
+    
+    def setUp(self):
+        """Skip tests on non-Windows systems."""
+        if install is None or sys.platform != 'win32':
+            self.skipTest("install.py requires Windows")
+    
+    def test_merge_keeps_user_content(self):
+        """Test that comments, formatting and other entries are kept byte for byte."""
+        text, added, _ = install.merge_shortcuts(USER_SHORTCUTS, list(install.SCRIPT_SHORTCUTS))
+        
+        for line in USER_SHORTCUTS.splitlines():
+            if 'PythonScript:wrap_hi' not in line:
+                self.assertIn(line, text)
+        self.assertIn('        <Command name="PythonScript:wrap_title" Ctrl="yes" Alt="yes" '
+                      'Shift="no" Key="49" />\n', text)
+        self.assertTrue(text.endswith('    </PluginCommands>\n    <ScintillaCommands />\n</NotepadPlus>\n'))
+        self.assertIn(('wrap_hi.py', 'Ctrl+Alt+3'), added)
+        self.assertEqual(text.count('PythonScript:wrap_hi"'), 1)
+        ET.fromstring(text.encode('utf-8'))
+    
+    def test_merge_reports_collisions(self):
+        """Test that shortcuts already bound elsewhere are reported and not added."""
+        text, _, collisions = install.merge_shortcuts(USER_SHORTCUTS, list(install.SCRIPT_SHORTCUTS))
+        
+        self.assertEqual(collisions, [('wrap_head.py', 'Ctrl+Alt+2', ['InternalCommands/Shortcut 41001'])])
+        self.assertNotIn('PythonScript:wrap_head', text)
+    
+    def test_merge_is_idempotent(self):
+        """Test that merging twice changes nothing the second time."""
+        text, _, _ = install.merge_shortcuts(USER_SHORTCUTS, list(install.SCRIPT_SHORTCUTS))
+        again, added, _ = install.merge_shortcuts(text, list(install.SCRIPT_SHORTCUTS))
+        
+        self.assertEqual(again, text)
+        self.assertEqual(added, [])
+    
+    def test_merge_removes_scripts_not_installed(self):
+        """Test that entries for scripts that were not installed are removed with their line."""
+        text, _, _ = install.merge_shortcuts(USER_SHORTCUTS, ['wrap_title.py'])
+        
+        self.assertNotIn('wrap_hi', text)
+        self.assertIn('Key="0" />\n        <Command name="PythonScript:wrap_title"', text)
+    
+    def test_merge_creates_missing_section(self):
+        """Test empty and missing PluginCommands sections."""
+        empty = install.merge_shortcuts('<NotepadPlus>\n  <PluginCommands />\n</NotepadPlus>\n',
+                                        ['wrap_hi.py'])[0]
+        missing = install.merge_shortcuts('<NotepadPlus>\n  <Macros />\n</NotepadPlus>\n',
+                                          ['wrap_hi.py'])[0]
+        
+        for text in (empty, missing):
+            root = ET.fromstring(text)
+            self.assertEqual(root.find('PluginCommands/Command').get('name'), 'PythonScript:wrap_hi')
+    
+    def test_update_writes_atomically_and_only_on_change(self):
+        """Test create_or_update_shortcuts on disk."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            appdata = Path(tmpdir)
+            shortcuts_file = appdata / 'shortcuts.xml'
+            shortcuts_file.write_text(USER_SHORTCUTS, encoding='utf-8')
+            
+            with contextlib.redirect_stdout(io.StringIO()):
+                install.create_or_update_shortcuts(appdata, ['wrap_title.py'])
+                mtime = shortcuts_file.stat().st_mtime_ns
+                install.create_or_update_shortcuts(appdata, ['wrap_title.py'])
+            
+            self.assertIn('<!-- my customisations -->', shortcuts_file.read_text(encoding='utf-8'))
+            self.assertEqual(shortcuts_file.stat().st_mtime_ns, mtime)
+            self.assertEqual([p.name for p in appdata.iterdir()], ['shortcuts.xml'])
 
 
 class TestShortcutConfiguration(unittest.TestCase):
@@ -157,6 +394,17 @@ class TestShortcutConfiguration(unittest.TestCase):
             self.assertIn(shortcut['alt'], ['yes', 'no'])
             self.assertIn(shortcut['shift'], ['yes', 'no'])
 
+    def test_describe_shortcut_matches_catalogue(self):
+        """Test that every described shortcut reads back as its catalogue key, F-keys included."""
+        if install is None:
+            self.skipTest("install.py requires Windows")
+
+        keys = {item['script']: item['key'] for item in install.catalog.CATALOG if item['key']}
+        for script_name, shortcut in install.SCRIPT_SHORTCUTS.items():
+            self.assertEqual(install.describe_shortcut(shortcut), keys[script_name])
+        self.assertEqual(install.describe_shortcut(install.catalog.parse_key('Ctrl+Shift+F10')),
+                         'Ctrl+Shift+F10')
+
 
 class TestGetPaths(unittest.TestCase):
     """Test path detection functions."""
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+test_langid.py
+Unit tests for offline language identification (scripts/teiwrap/langid.py)
+and the xml:lang suggestion in the <foreign> wrap actions.
+"""
+
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import dispatch, langid
+from teiwrap.langprofiles import PROFILES, PROFILE_SIZE
+from tests.mock_npp import MockNotepad, MockScintilla
+from tests.test_dispatch import run_stub
+
+# Per-call budget for detecting the language of a selection
+DETECT_BUDGET_MS = 5.0
+
+SAMPLES = [
+    ("en", "The quick brown fox jumps over the lazy dog while the children watch."),
+    ("de", "Die Würde des Menschen ist unantastbar. Sie zu achten ist Verpflichtung."),
+    ("fr", "Je pense, donc je suis, et la liberté est le droit de faire tout ce que les lois permettent."),
+    ("it", "Nel mezzo del cammin di nostra vita mi ritrovai per una selva oscura."),
+    ("es", "En un lugar de la Mancha, de cuyo nombre no quiero acordarme, vivía un hidalgo."),
+    ("la", "Gallia est omnis divisa in partes tres, quarum unam incolunt Belgae."),
+    ("sr", "Na Drini ćuprija je roman o mostu koji povezuje dve obale i mnoge generacije."),
+    ("sr", "На Дрини ћуприја је роман о мосту који повезује две обале."),
+    ("ru", "Все счастливые семьи похожи друг на друга, каждая несчастливая семья несчастлива по-своему."),
+    ("el", "Μῆνιν ἄειδε θεὰ Πηληϊάδεω Ἀχιλῆος."),
+]
+
+
+class TestLanguageIdentification(unittest.TestCase):
+    """Test cases for langid.detect and the bundled profiles."""
+
+    def setUp(self):
+        langid._cache.clear()
+
+    def test_detects_sample_languages(self):
+        """Test that sentences in every profiled language are recognised."""
+        for expected, text in SAMPLES:
+            with self.subTest(lang=expected):
+                self.assertEqual(langid.detect(text), expected)
+
+    def test_bytes_input(self):
+        """Test that UTF-8 bytes (as returned by Scintilla) are accepted."""
+        text = "На Дрини ћуприја је роман о мосту."
+        self.assertEqual(langid.detect(text.encode('utf-8')), 'sr')
+
+    def test_no_letters_returns_default(self):
+        """Test that text without letters falls back to the default."""
+        self.assertEqual(langid.detect("12, 34 - 56!", "en"), "en")
+        self.assertIsNone(langid.detect("   "))
+
+    def test_profiles_are_compact(self):
+        """Test that every profile has at most PROFILE_SIZE distinct n-grams."""
+        for lang, profile in PROFILES.items():
+            grams = profile.split(' ')
+            self.assertLessEqual(len(grams), PROFILE_SIZE, lang)
+            self.assertEqual(len(set(grams)), len(grams), lang)
+
+    def test_build_profile_ranks_by_frequency(self):
+        """Test that build_profile puts the most frequent n-grams first."""
+        profile = langid.build_profile("aaa ab", 3).split(' ')
+
+        self.assertEqual(profile[0], 'a')
+        self.assertEqual(len(profile), 3)
+
+    def test_results_are_cached(self):
+        """Test that a repeated selection is answered from the cache."""
+        text = SAMPLES[0][1]
+        langid.detect(text)
+        original = langid.scores
+        langid.scores = None  # any recomputation would fail
+        try:
+            self.assertEqual(langid.detect(text), 'en')
+        finally:
+            langid.scores = original
+
+    def test_cache_is_bounded(self):
+        """Test that the cache never grows past CACHE_SIZE entries."""
+        for i in range(langid.CACHE_SIZE + 10):
+            langid.detect("word{0} tekst".format(i))
+
+        self.assertEqual(len(langid._cache), langid.CACHE_SIZE)
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test that a text detected again is kept when older entries are evicted."""
+        langid.detect("word0 tekst")
+        for i in range(1, langid.CACHE_SIZE):
+            langid.detect("word{0} tekst".format(i))
+        langid.detect("word0 tekst")
+        langid.detect("new tekst")
+
+        self.assertIn("word0 tekst", langid._cache)
+        self.assertNotIn("word1 tekst", langid._cache)
+        self.assertEqual(list(langid._cache)[-2:], ["word0 tekst", "new tekst"])
+
+    def test_cache_is_keyed_by_text(self):
+        """Test that the cache is keyed by the text itself and does not keep long texts."""
+        english, serbian = SAMPLES[0][1], SAMPLES[-3][1]
+        langid.detect(english)
+        langid.detect(english.encode('utf-8'))
+        self.assertEqual(list(langid._cache), [english])
+        self.assertEqual(langid.detect(serbian), 'sr')
+
+        long_text = english * (langid.SAMPLE_BYTES // len(english) + 1)
+        self.assertEqual(langid.detect(long_text), 'en')
+        self.assertNotIn(long_text, langid._cache)
+
+    def test_detect_selection_latency(self):
+        """Test that detecting a full 1 KB selection stays within the budget."""
+        text = ("Gallia est omnis divisa in partes tres, quarum unam incolunt Belgae. " * 20)
+        editor = MockScintilla(text, [(0, len(text))])
+        samples = []
+        for _ in range(50):
+            langid._cache.clear()
+            started = time.perf_counter()
+            langid.detect_selection(editor)
+            samples.append((time.perf_counter() - started) * 1000.0)
+        samples.sort()
+
+        self.assertLess(samples[len(samples) // 2], DETECT_BUDGET_MS)
+
+    def test_detect_selection_reads_bounded_sample(self):
+        """Test that only the first SAMPLE_BYTES of a huge selection are read."""
+        text = "Die Würde des Menschen ist unantastbar. " * 5000
+        editor = MockScintilla(text, [(0, len(text.encode('utf-8')))])
+
+        self.assertEqual(langid.detect_selection(editor), 'de')
+        self.assertLessEqual(editor.bytes_read, langid.SAMPLE_BYTES)
+
+    def test_sample_does_not_split_characters(self):
+        """Test that a sample ending inside a Cyrillic letter stops before it."""
+        text = "xx" + "Ово је српски текст. " * 200
+        editor = MockScintilla(text, [(0, len(text.encode('utf-8')))])
+
+        self.assertEqual(langid.detect_selection(editor), 'sr')
+
+
+class TestForeignActions(unittest.TestCase):
+    """Test cases for the xml:lang suggestion in the dispatcher actions."""
+
+    def setUp(self):
+        langid._cache.clear()
+
+    def test_prompt_prefilled_with_detected_language(self):
+        """Test that the foreign_prompt dialog defaults to the detected language."""
+        text = "Je pense, donc je suis."
+        editor = MockScintilla(text, [(0, len(text))])
+        notepad = MockNotepad('fr')
+        dispatch.run('foreign_prompt', editor, notepad)
+
+        self.assertEqual(notepad.prompts, ['fr'])
+
+    def test_foreign_auto_without_prompt(self):
+        """Test that foreign_auto wraps with the detected language and no dialog."""
+        text = "Вук Стефановић Караџић је реформисао српски језик."
+        editor = MockScintilla(text, [(0, len(text.encode('utf-8')))])
+        notepad = MockNotepad()
+        count = dispatch.run('foreign_auto', editor, notepad)
+
+        self.assertEqual(count, 1)
+        self.assertEqual(notepad.prompts, [])
+        self.assertEqual(editor.text, '<foreign xml:lang="sr">{0}</foreign>'.format(text))
+
+    def test_foreign_auto_stub(self):
+        """Test the wrap_foreign_auto.py stub script."""
+        editor = MockScintilla("carpe diem", [(0, 10)])
+        run_stub('wrap_foreign_auto.py', editor, MockNotepad())
+
+        self.assertTrue(editor.text.startswith('<foreign xml:lang="'))
+        self.assertTrue(editor.text.endswith('">carpe diem</foreign>'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+test_mock_npp.py
+Unit tests for the Scintilla mock itself (tests/mock_npp.py): the gap buffer,
+byte positions, selection movement, undo grouping and modification callbacks.
+"""
+
+import random
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests import mock_npp
+from tests.mock_npp import GapBuffer, MockScintilla
+
+
+class TestGapBuffer(unittest.TestCase):
+    """Test cases for GapBuffer."""
+
+    def test_matches_bytearray_under_random_edits(self):
+        """Test that random inserts and deletes give the same bytes as a bytearray."""
+        rng = random.Random(11)
+        gap = GapBuffer(b'pocetak', gap=4)
+        plain = bytearray(b'pocetak')
+        for _ in range(2000):
+            if rng.random() < 0.6 or not plain:
+                pos = rng.randrange(len(plain) + 1)
+                data = bytes(rng.randrange(97, 123) for _ in range(rng.randrange(1, 9)))
+                gap.insert(pos, data)
+                plain[pos:pos] = data
+            else:
+                pos = rng.randrange(len(plain))
+                length = rng.randrange(1, min(8, len(plain) - pos) + 1)
+                gap.delete(pos, length)
+                del plain[pos:pos + length]
+            start = rng.randrange(len(plain) + 1)
+            end = rng.randrange(start, len(plain) + 1)
+            self.assertEqual(gap.get(start, end), bytes(plain[start:end]))
+        self.assertEqual(bytes(gap), bytes(plain))
+        self.assertEqual(len(gap), len(plain))
+
+    def test_indexing(self):
+        """Test integer and slice access across the gap."""
+        gap = GapBuffer(b'abcdef')
+        gap.insert(3, b'XY')
+
+        self.assertEqual(gap[3], ord('X'))
+        self.assertEqual(gap[-1], ord('f'))
+        self.assertEqual(gap[2:6], b'cXYd')
+        with self.assertRaises(IndexError):
+            gap[8]
+
+    def test_local_edits_do_not_copy_document(self):
+        """Test that repeated edits at one place cost the same in small and large buffers."""
+        def edit_time(size):
+            gap = GapBuffer(b'x' * size)
+            gap.insert(size // 2, b'')
+            started = time.perf_counter()
+            for i in range(2000):
+                gap.insert(size // 2 + i, b'y')
+            return time.perf_counter() - started
+
+        self.assertLess(edit_time(32 * 1024 * 1024), edit_time(1024) * 10 + 0.01)
+
+
+class TestMockScintilla(unittest.TestCase):
+    """Test cases for MockScintilla."""
+
+    def test_positions_are_utf8_bytes(self):
+        """Test that positions count UTF-8 bytes and cannot split a character."""
+        editor = MockScintilla("Ћао свете")
+
+        self.assertEqual(editor.getLength(), len("Ћао свете".encode('utf-8')))
+        self.assertEqual(editor.getTextRange(0, 6), "Ћао")
+        self.assertEqual(editor.getCharAt(0), -48)  # 0xD0, signed like Scintilla
+        with self.assertRaises(ValueError):
+            editor.insertText(1, "x")
+        with self.assertRaises(ValueError):
+            editor.getTextRange(0, 3)
+
+    def test_selections_move_with_edits(self):
+        """Test Scintilla's rules for moving selections on insertion and deletion."""
+        editor = MockScintilla("0123456789", [(2, 4), (6, 8)])
+        editor.insertText(4, "ab")
+        self.assertEqual(editor.selections, [[2, 4], [8, 10]])
+
+        editor.insertText(2, "cd")
+        self.assertEqual(editor.selections, [[2, 6], [10, 12]])
+
+        editor.deleteRange(5, 6)
+        self.assertEqual(editor.selections, [[2, 5], [5, 6]])
+
+    def test_deferred_selection_moves_match_scintilla_rule(self):
+        """Test that batched insertions move selections exactly as one-by-one moves would."""
+        rng = random.Random(5)
+        for _ in range(50):
+            selections = sorted(sorted(rng.sample(range(40), 2)) for _ in range(5))
+            editor = MockScintilla("x" * 40, selections)
+            expected = [list(sel) for sel in selections]
+            for _ in range(rng.randrange(1, 12)):
+                pos = rng.randrange(len(editor.buffer) + 1)
+                length = rng.randrange(1, 4)
+                editor.insertText(pos, "y" * length)
+                for sel in expected:
+                    if sel[1] > pos:
+                        sel[1] += length
+                        if sel[0] > pos:
+                            sel[0] += length
+                if rng.random() < 0.2:
+                    self.assertEqual(editor.selections, expected)
+            self.assertEqual(editor.selections, expected)
+
+    def test_many_selections_move_in_one_pass(self):
+        """Test that 4,000 insertions from the end move 2,000 selections quickly."""
+        editor = MockScintilla("ab " * 2000, [(i * 3, i * 3 + 2) for i in range(2000)])
+        started = time.perf_counter()
+        editor.beginUndoAction()
+        for start, end in reversed(editor.selections[:]):
+            editor.insertText(end, "</hi>")
+            editor.insertText(start, "<hi>")
+        editor.endUndoAction()
+        self.assertEqual(editor.text, "<hi>ab</hi> " * 2000)
+        self.assertEqual(editor.selected_texts()[-1], "<hi>ab")
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_replace_target_and_replace_sel(self):
+        """Test target replacement and replaceSel."""
+        editor = MockScintilla("a bb c", [(2, 4)])
+        editor.setTargetRange(0, 1)
+        self.assertEqual(editor.replaceTarget("ш"), 2)
+        self.assertEqual((editor.getTargetStart(), editor.getTargetEnd()), (0, 2))
+
+        editor.replaceSel("<hi>bb</hi>")
+        self.assertEqual(editor.text, "ш <hi>bb</hi> c")
+        self.assertEqual(editor.selections, [[14, 14]])
+
+    def test_search_in_target(self):
+        """Test forward and backward searchInTarget without reading bytes into Python."""
+        editor = MockScintilla("<hi>ш</hi> <hi>x</hi>")
+        editor.setTargetRange(0, editor.getLength())
+        self.assertEqual(editor.searchInTarget("</hi>"), 6)
+        self.assertEqual((editor.getTargetStart(), editor.getTargetEnd()), (6, 11))
+        editor.setTargetRange(editor.getLength(), 0)
+        self.assertEqual(editor.searchInTarget("<hi>"), 12)
+        editor.setTargetRange(11, 0)
+        self.assertEqual(editor.searchInTarget("<hi>"), 0)
+        editor.setTargetRange(1, 5)
+        self.assertEqual(editor.searchInTarget("<hi>"), -1)
+        self.assertEqual(editor.bytes_read, 0)
+
+    def test_undo_groups(self):
+        """Test that grouped edits undo and redo together, ungrouped ones one by one."""
+        editor = MockScintilla("text")
+        editor.beginUndoAction()
+        editor.insertText(4, "</hi>")
+        editor.insertText(0, "<hi>")
+        editor.endUndoAction()
+        editor.insertText(0, "x")
+
+        editor.undo()
+        self.assertEqual(editor.text, "<hi>text</hi>")
+        editor.undo()
+        self.assertEqual(editor.text, "text")
+        self.assertFalse(editor.canUndo())
+        editor.redo()
+        self.assertEqual(editor.text, "<hi>text</hi>")
+        self.assertEqual(editor.undo_actions, 1)
+
+    def test_modification_callbacks(self):
+        """Test that SCN_MODIFIED-style arguments are sent for edits and undo."""
+        editor = MockScintilla("ab")
+        events = []
+        editor.callbackSync(events.append, ['MODIFIED'])
+        editor.insertText(1, "ш\n")
+        editor.undo()
+
+        self.assertEqual([(e['modificationType'], e['position'], e['length']) for e in events], [
+            (mock_npp.SC_MOD_INSERTTEXT | mock_npp.SC_PERFORMED_USER, 1, 3),
+            (mock_npp.SC_MOD_DELETETEXT | mock_npp.SC_PERFORMED_UNDO, 1, 3),
+        ])
+        self.assertEqual(events[0]['linesAdded'], 1)
+
+    def test_distinct_document_pointers(self):
+        """Test that every mock document has its own getDocPointer value."""
+        self.assertNotEqual(MockScintilla().getDocPointer(), MockScintilla().getDocPointer())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+test_offsets.py
+Unit tests for the byte/character offset index (scripts/teiwrap/offsets.py)
+and its users: apply --chars and Unicode regexes in corpus recipes.
+"""
+
+import contextlib
+import io
+import random
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import teiwrap_cli
+from teiwrap import corpus, offsets
+from tests.mock_npp import MockScintilla
+from tests.test_wellformed import span_of
+
+PIECES = ['а', 'ђ', 'Ж', 'a', ' ', '\n', '😀', 'é', '<hi>', '</hi>', '中']
+
+
+def random_text(rng, size):
+    return ''.join(rng.choice(PIECES) for _ in range(size))
+
+
+class OffsetTestCase(unittest.TestCase):
+    """Comparison of an index with direct conversion of the whole text."""
+
+    def assertMatchesText(self, index, text):
+        data = text.encode('utf-8')
+        self.assertEqual(index.length, len(data))
+        pos = 0
+        for char, ch in enumerate(text + '\0'):
+            self.assertEqual(index.to_byte(char), pos, char)
+            self.assertEqual(index.to_char(pos), char, pos)
+            pos += len(ch.encode('utf-8'))
+
+
+class TestOffsetIndex(OffsetTestCase):
+    """Test cases for offsets.OffsetIndex."""
+
+    def test_count_chars(self):
+        """Test that characters are counted like len() of the decoded text."""
+        for text in ('', 'abc', 'Вук Караџић', 'a😀b', '中文 é'):
+            with self.subTest(text=text):
+                self.assertEqual(offsets.count_chars(text.encode('utf-8')), len(text))
+
+    def test_both_directions(self):
+        """Test every position of mixed-width text, with small and default blocks."""
+        text = random_text(random.Random(7), 3000)
+        for block_size in (8, 64, offsets.BLOCK_SIZE):
+            with self.subTest(block_size=block_size):
+                self.assertMatchesText(offsets.OffsetIndex.for_bytes(text.encode('utf-8'), block_size), text)
+
+    def test_out_of_range(self):
+        """Test that positions outside the text raise ValueError."""
+        index = offsets.OffsetIndex.for_bytes('аб'.encode('utf-8'), 1)
+        for call, value in ((index.to_byte, 3), (index.to_byte, -1), (index.to_char, 5), (index.to_char, -1)):
+            with self.subTest(call=call.__name__, value=value):
+                with self.assertRaises(ValueError):
+                    call(value)
+
+    def test_lazy_checkpoints(self):
+        """Test that a question near the start does not read the rest of the document."""
+        text = 'Вук Караџић ' * 500000
+        editor = MockScintilla(text)
+        index = offsets.OffsetIndex.for_editor(editor)
+        self.assertEqual(index.to_byte(10000), len(text[:10000].encode('utf-8')))
+        self.assertLess(editor.bytes_read, offsets.BLOCK_SIZE * (offsets.READ_BLOCKS + 2))
+
+    def test_large_document_is_fast(self):
+        """Test that conversions in a large Cyrillic document take logarithmic time."""
+        text = 'Вук Караџић рођен је у Тршићу. ' * 400000
+        data = text.encode('utf-8')
+        index = offsets.OffsetIndex.for_bytes(data)
+        index.to_char(len(data))
+        rng = random.Random(1)
+        chars = [rng.randrange(len(text)) for _ in range(5000)]
+        started = time.perf_counter()
+        for char in chars:
+            self.assertEqual(index.to_char(index.to_byte(char)), char)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(index.to_byte(len(text)), len(data))
+        self.assertLess(elapsed, 2.0)
+
+
+class TestIncrementalUpdates(OffsetTestCase):
+    """Test cases for keeping the index current while the document changes."""
+
+    def test_watched_edits(self):
+        """Test that SCN_MODIFIED notifications keep the index exact through edits and undo."""
+        rng = random.Random(3)
+        editor = MockScintilla(random_text(rng, 2000))
+        index = offsets.OffsetIndex.for_editor(editor, 32)
+        editor.callbackSync(index.on_modified, ['modified'])
+        index.to_char(editor.getLength())
+        for step in range(60):
+            data = editor.buffer[:]
+            cuts = [i for i in range(len(data) + 1) if i == len(data) or not 0x80 <= data[i] < 0xc0]
+            pos = rng.choice(cuts)
+            if step % 3:
+                editor.insertText(pos, random_text(rng, rng.randrange(1, 20)))
+            else:
+                end = rng.choice([cut for cut in cuts if cut >= pos])
+                editor.deleteRange(pos, end - pos)
+            if step % 7 == 0:
+                self.assertEqual(index.to_char(pos), len(data[:pos].decode('utf-8')))
+        editor.undo()
+        self.assertMatchesText(index, editor.text)
+
+    def test_reported_edits_in_any_order(self):
+        """Test that deferred shifts stay exact for edits in any order, between queries."""
+        rng = random.Random(7)
+        for block_size in (4, 16):
+            text = random_text(rng, 400)
+            index = offsets.OffsetIndex.for_bytes(text.encode('utf-8'), block_size)
+            index.to_char(index.length)
+            for step in range(80):
+                char = rng.randrange(len(text) + 1)
+                pos = len(text[:char].encode('utf-8'))
+                if step % 4:
+                    piece = random_text(rng, rng.randrange(1, 6))
+                    text = text[:char] + piece + text[char:]
+                    index.note_insert(pos, len(piece.encode('utf-8')), len(piece))
+                else:
+                    gone = text[char:char + rng.randrange(0, 30)]
+                    text = text[:char] + text[char + len(gone):]
+                    index.note_delete(pos, len(gone.encode('utf-8')), len(gone))
+                data = text.encode('utf-8')
+                index.read = lambda a, b, data=data: data[a:b]
+                if step % 5 == 0:
+                    self.assertEqual(index.to_byte(char), pos)
+            with self.subTest(block_size=block_size):
+                self.assertMatchesText(index, text)
+
+    def test_many_edits_in_large_document_are_fast(self):
+        """Test that a batch of edits from the end shifts the checkpoints about once in total."""
+        text = 'Вук Караџић рођен је у Тршићу. ' * 400000
+        data = text.encode('utf-8')
+        index = offsets.OffsetIndex.for_bytes(data)
+        index.to_char(len(data))
+        rng = random.Random(2)
+        positions = sorted((index.to_byte(rng.randrange(len(text))) for _ in range(2000)), reverse=True)
+        started = time.perf_counter()
+        for pos in positions:
+            index.note_insert(pos, 8, 8)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.5)
+
+        cuts = [0] + sorted(positions) + [len(data)]
+        edited = b'<quote/>'.join(data[a:b] for a, b in zip(cuts, cuts[1:]))
+        edited_text = edited.decode('utf-8')
+        index.read = lambda a, b: edited[a:b]
+        self.assertEqual(index.length, len(edited))
+        for char in [rng.randrange(len(edited_text)) for _ in range(20)] + [len(edited_text)]:
+            pos = len(edited_text[:char].encode('utf-8'))
+            self.assertEqual((index.to_byte(char), index.to_char(pos)), (pos, char))
+
+    def test_delete_without_text(self):
+        """Test that a deletion reported without its text drops and rebuilds later checkpoints."""
+        text = random_text(random.Random(5), 1000)
+        data = text.encode('utf-8')
+        index = offsets.OffsetIndex.for_bytes(data, 16)
+        index.to_char(len(data))
+        start, end = span_of(text, text[100:300])
+        data = data[:start] + data[end:]
+        index.read = lambda a, b: data[a:b]
+        index.note_delete(start, end - start)
+        self.assertMatchesText(index, text[:100] + text[300:])
+
+
+class TestCharOffsetTools(unittest.TestCase):
+    """Test cases for the headless tools that take character offsets."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmpdir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_apply_with_character_offsets(self):
+        """Test that apply --chars wraps the same text as byte offsets would."""
+        text = 'Вук Караџић рођен је у Тршићу 😀.'
+        src = self.tmpdir / 'a.txt'
+        src.write_text(text, encoding='utf-8')
+        spans = self.tmpdir / 'spans.tsv'
+        start = text.index('Тршићу')
+        spans.write_text('0\t11\tpersName\n{0}\t{1}\tplaceName\n'.format(start, start + 6), encoding='utf-8')
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = teiwrap_cli.main(['apply', str(src), str(spans), '--chars', '-o', str(self.tmpdir / 'b.xml')])
+
+        self.assertEqual(code, 0)
+        self.assertEqual((self.tmpdir / 'b.xml').read_text(encoding='utf-8'),
+                         '<persName>Вук Караџић</persName> рођен је у <placeName>Тршићу</placeName> 😀.')
+
+    def test_recipe_regex_understands_cyrillic(self):
+        """Test that \\w and \\b in recipe regexes match Cyrillic words."""
+        recipe = self.tmpdir / 'recept.tsv'
+        recipe.write_text('regex\t\\b\\w+ић\\b\tpersName\n', encoding='utf-8')
+        data = '<p n="Јовић">Вук Караџић и Мирковић, Петровићи</p>'.encode('utf-8')
+        found = [data[start:end].decode('utf-8') for start, end, _, _ in corpus.load_recipe(str(recipe)).find(data)]
+        self.assertEqual(found, ['Караџић', 'Мирковић'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+test_outline.py
+Unit tests for the document outline of <head> and <title> elements
+(scripts/teiwrap/outline.py) and the outline action in teiwrap.dispatch.
+"""
+
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import dispatch, elements, outline
+from tests.mock_npp import MockNotepad, MockScintilla
+from tests.test_wellformed import span_of
+
+DOC = ('<TEI><teiHeader><title>Српске народне пјесме</title></teiHeader>\n'
+       '<text><body>\n'
+       '<div><head>Књига прва <title>Пјесме\n  женске</title></head>\n<p>Текст.</p></div>\n'
+       '<div><head rend="b">Књига <hi>друга</hi></head><p>Још текста.</p></div>\n'
+       '<!-- <head>у коментару</head> -->\n'
+       '</body></text></TEI>')
+
+
+class ScriptedNotepad(MockNotepad):
+    """MockNotepad that answers prompts from a list and records their messages."""
+
+    def __init__(self, answers, **kwargs):
+        super().__init__(**kwargs)
+        self.answers = list(answers)
+        self.prompt_messages = []
+
+    def prompt(self, message, title, default):
+        self.prompt_messages.append(message)
+        return self.answers.pop(0) if self.answers else None
+
+
+class TestOutline(unittest.TestCase):
+    """Test cases for outline.outline."""
+
+    def tearDown(self):
+        elements._indexes.clear()
+
+    def test_entries_in_document_order(self):
+        """Test names, nesting depth and labels of the outline entries."""
+        entries = outline.outline(MockScintilla(DOC))
+
+        self.assertEqual([(name, depth, label) for _, _, name, depth, label in entries], [
+            ('title', 0, 'Српске народне пјесме'),
+            ('head', 0, 'Књига прва Пјесме женске'),
+            ('title', 1, 'Пјесме женске'),
+            ('head', 0, 'Књига друга'),
+        ])
+        data = DOC.encode('utf-8')
+        start, end = entries[3][:2]
+        self.assertEqual(data[start:end], '<head rend="b">Књига <hi>друга</hi></head>'.encode('utf-8'))
+
+    def test_long_labels_are_cut(self):
+        """Test that only the start of a long element is read for its label."""
+        text = '<head>' + 'Дуг наслов ' * 1000 + '</head>'
+        editor = MockScintilla(text)
+        elements.index_for(editor)
+        editor.bytes_read = 0
+        (_, _, _, _, label), = outline.outline(editor)
+
+        self.assertLessEqual(len(label), outline.LABEL_CHARS)
+        self.assertTrue(label.endswith('…'))
+        self.assertLessEqual(editor.bytes_read, outline.LABEL_BYTES)
+
+    def test_follows_edits_without_rescanning(self):
+        """Test that a watched index gives a current outline after edits, reading only near them."""
+        chapter = '<div><head>Глава {0}</head>' + '<p>Вук Караџић рођен је у Тршићу.</p>' * 300 + '</div>\n'
+        text = ''.join(chapter.format(i) for i in range(500))
+        editor = MockScintilla(text)
+        elements.watch(editor, 'MODIFIED')
+        self.addCleanup(elements.unwatch, editor)
+        self.assertEqual(len(outline.outline(editor)), 500)
+
+        editor.selections = [list(span_of(text, 'Вук Караџић', 1000))]
+        dispatch.run('head', editor, MockNotepad())
+        editor.bytes_read = 0
+        started = time.perf_counter()
+        entries = outline.outline(editor)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(entries), 501)
+        self.assertEqual(entries[4][4], 'Вук Караџић')
+        self.assertLess(editor.bytes_read, 501 * outline.LABEL_BYTES + 4 * elements.BLOCK_SIZE)
+        self.assertLess(elapsed, 1.0)
+
+
+class TestOutlineAction(unittest.TestCase):
+    """Test cases for the outline action."""
+
+    def tearDown(self):
+        elements._indexes.clear()
+
+    def test_jump_by_number(self):
+        """Test that a number moves the caret to that entry."""
+        editor = MockScintilla(DOC)
+        notepad = ScriptedNotepad(['4'])
+
+        self.assertEqual(dispatch.run('outline', editor, notepad), 1)
+        self.assertIn('3.   <title> Пјесме женске (red 3)', notepad.prompt_messages[0])
+        self.assertEqual(editor.selections, [[DOC.encode('utf-8').index(b'<head rend')] * 2])
+
+    def test_filter_then_jump(self):
+        """Test that text narrows the list and a single match jumps."""
+        editor = MockScintilla(DOC)
+        notepad = ScriptedNotepad(['пјесме', 'прва'])
+
+        self.assertEqual(dispatch.run('outline', editor, notepad), 1)
+        self.assertEqual(len(notepad.prompt_messages), 2)
+        self.assertNotIn('друга', notepad.prompt_messages[1])
+        self.assertEqual(editor.selections, [[span_of(DOC, '<head>Књига прва')[0]] * 2])
+
+    def test_cancel_and_empty_document(self):
+        """Test cancelling the dialog and a document without headings."""
+        editor = MockScintilla(DOC, [(5, 5)])
+        self.assertEqual(dispatch.run('outline', editor, ScriptedNotepad([])), 0)
+        self.assertEqual(editor.selections, [[5, 5]])
+
+        notepad = ScriptedNotepad(['1'])
+        self.assertEqual(dispatch.run('outline', MockScintilla('<p>Текст</p>'), notepad), 0)
+        self.assertIn('<head>', notepad.messages[0])
+        self.assertEqual(notepad.prompt_messages, [])
+
+    def test_long_outline_shows_entries_near_caret(self):
+        """Test that a long outline lists the entries around the caret."""
+        text = ''.join('<head>Глава {0}</head>\n'.format(i) for i in range(200))
+        caret = span_of(text, '<head>Глава 120<')[0]
+        editor = MockScintilla(text, [(caret, caret)])
+        notepad = ScriptedNotepad(['200'])
+
+        self.assertEqual(dispatch.run('outline', editor, notepad), 1)
+        message = notepad.prompt_messages[0]
+        self.assertIn('116. <head> Глава 115', message)
+        self.assertNotIn('Глава 114 ', message)
+        self.assertIn('(115 pre)', message)
+        self.assertEqual(editor.selections, [[span_of(text, '<head>Глава 199')[0]] * 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
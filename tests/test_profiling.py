@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+test_profiling.py
+Unit tests for the opt-in timing and profiling hooks
+(scripts/teiwrap/profiling.py) around dispatcher actions.
+"""
+
+import io
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import dispatch, elements, profiling
+from tests.mock_npp import MockNotepad, MockScintilla
+
+
+class TestProfiling(unittest.TestCase):
+    """Test cases for teiwrap.profiling and its use in dispatch.run."""
+
+    def setUp(self):
+        profiling.disable()
+        profiling.clear()
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.clear()
+
+    def test_disabled_passes_editor_through(self):
+        """Test that nothing is wrapped or recorded while profiling is off."""
+        seen = []
+        dispatch.register('probe', lambda editor, notepad: seen.append(editor))
+        try:
+            editor = MockScintilla("x")
+            dispatch.run('probe', editor, MockNotepad())
+        finally:
+            del dispatch.HANDLERS['probe']
+
+        self.assertIs(seen[0], editor)
+        self.assertEqual(profiling.samples(), [])
+
+    def test_records_sample(self):
+        """Test that a wrap records its name, sizes and Scintilla call count."""
+        profiling.enable()
+        editor = MockScintilla("Ћао свете", [(0, 6)])
+        dispatch.run('hi', editor, MockNotepad())
+
+        self.assertEqual(editor.text, "<hi>Ћао</hi> свете")
+        sample, = profiling.samples()
+        self.assertEqual(sample.name, 'hi')
+        self.assertEqual(sample.selection_bytes, 6)
+        self.assertEqual(sample.document_bytes, editor.getLength())
+        self.assertGreater(sample.calls, 2)
+        self.assertGreaterEqual(sample.ms, 0.0)
+
+    def test_failing_action_is_recorded(self):
+        """Test that an action that raises is still measured."""
+        def broken(editor, notepad):
+            editor.getLength()
+            raise RuntimeError("kvar")
+        dispatch.register('broken', broken)
+        profiling.enable()
+        try:
+            with self.assertRaises(RuntimeError):
+                dispatch.run('broken', MockScintilla("x"), MockNotepad())
+        finally:
+            del dispatch.HANDLERS['broken']
+
+        self.assertEqual([(s.name, s.calls) for s in profiling.samples()], [('broken', 1)])
+
+    def test_ring_buffer_is_bounded(self):
+        """Test that only the last RING_SIZE samples are kept."""
+        profiling.enable()
+        for _ in range(profiling.RING_SIZE + 10):
+            dispatch.run('title', MockScintilla("x", [(0, 1)]), MockNotepad())
+
+        self.assertEqual(len(profiling.samples()), profiling.RING_SIZE)
+
+    def test_watched_index_survives_profiling(self):
+        """Test that profiled wraps keep using and updating the shared element index."""
+        text = "<p>" + "реч " * 2000 + "</p>"
+        editor = MockScintilla(text, [(3, 9)])
+        elements.watch(editor, 'MODIFIED')
+        try:
+            index = elements.index_for(editor)
+            profiling.enable()
+            dispatch.run('hi', editor, MockNotepad())
+            dispatch.run('quote', editor, MockNotepad())
+            self.assertIs(elements.index_for(editor), index)
+            self.assertTrue(editor.text.startswith("<p><hi><quote>реч</quote></hi> "))
+            fresh = elements.ElementIndex(MockScintilla(editor.text))
+            for pos in (5, 12, 20, 30, 100):
+                self.assertEqual(index.enclosing(pos), fresh.enclosing(pos))
+        finally:
+            elements.unwatch(editor)
+
+    def test_profiles_slowest_calls(self):
+        """Test that cProfile output is kept for the N slowest calls only."""
+        profiling.enable(profile_slowest=2)
+        for size in (1, 4000, 10, 8000, 5):
+            text = "реч " * size
+            dispatch.run('hi', MockScintilla(text, [(0, len(text.encode('utf-8')))]), MockNotepad())
+
+        reports = profiling.profile_reports()
+        self.assertEqual(len(reports), 2)
+        self.assertGreaterEqual(reports[0][0], reports[1][0])
+        self.assertIn('checked_wrap', reports[0][2])
+        out = io.StringIO()
+        profiling.report_profiles(out)
+        self.assertEqual(out.getvalue().count('=== hi:'), 2)
+
+    def test_summary(self):
+        """Test the percentile table printed in the console."""
+        out = io.StringIO()
+        profiling.report(out)
+        self.assertIn('nema merenja', out.getvalue())
+
+        profiling.enable()
+        for _ in range(20):
+            dispatch.run('hi', MockScintilla("abc", [(0, 3)]), MockNotepad())
+        dispatch.run('title', MockScintilla("abc", [(0, 3)]), MockNotepad())
+        lines = profiling.summary().splitlines()
+
+        self.assertIn('p99 ms', lines[0])
+        self.assertEqual([line.split()[:2] for line in lines[1:]], [['hi', '20'], ['title', '1']])
+
+    def test_percentile(self):
+        """Test the nearest-rank percentile."""
+        values = list(range(1, 101))
+        self.assertEqual(profiling.percentile(values, 0.5), 50)
+        self.assertEqual(profiling.percentile(values, 0.99), 99)
+        self.assertEqual(profiling.percentile([7.0], 0.9), 7.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
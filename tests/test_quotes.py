@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+test_quotes.py
+Unit tests for document-wide Serbian quote conversion (scripts/teiwrap/quotes.py).
+"""
+
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import teiwrap_cli
+from teiwrap import dispatch, quotes
+from tests.mock_npp import MockNotepad, MockScintilla
+
+
+def convert(text):
+    """Convert quotes in text through the editor path and return (text, unbalanced)."""
+    editor = MockScintilla(text)
+    _, unbalanced = quotes.convert_document(editor)
+    return editor.text, unbalanced
+
+
+class TestQuoteStateMachine(unittest.TestCase):
+    """Test cases for scan_quotes and convert_document."""
+
+    def test_simple_pairs(self):
+        """Test converting several quote pairs."""
+        text, unbalanced = convert('Rekao je "da" i "ne".')
+
+        self.assertEqual(text, 'Rekao je „da“ i „ne“.')
+        self.assertEqual(unbalanced, [])
+
+    def test_cyrillic_text(self):
+        """Test converting quotes around Cyrillic words."""
+        text, _ = convert('Он рече: "Добро јутро", и оде.')
+
+        self.assertEqual(text, 'Он рече: „Добро јутро“, и оде.')
+
+    def test_attribute_values_untouched(self):
+        """Test that quotes in tags and attribute values are not converted."""
+        source = '<p rend="it" n=\'a"b\'>"Tekst" <hi rend="b">"x"</hi></p>'
+        text, unbalanced = convert(source)
+
+        self.assertEqual(text, '<p rend="it" n=\'a"b\'>„Tekst“ <hi rend="b">„x“</hi></p>')
+        self.assertEqual(unbalanced, [])
+
+    def test_comments_and_cdata_untouched(self):
+        """Test that comments and CDATA sections are skipped."""
+        source = '<!-- "a" > --><![CDATA["b"]]>"c"'
+        text, _ = convert(source)
+
+        self.assertEqual(text, '<!-- "a" > --><![CDATA["b"]]>„c“')
+
+    def test_quotes_around_markup(self):
+        """Test a quote pair that encloses an element."""
+        text, _ = convert('<p>"<hi>Naslov</hi>"</p>')
+
+        self.assertEqual(text, '<p>„<hi>Naslov</hi>“</p>')
+
+    def test_unbalanced_opening_reported(self):
+        """Test that an unclosed opening quote is reported and left unchanged."""
+        source = 'Prvi "citat bez kraja. Drugi "pravi" citat.'
+        text, unbalanced = convert(source)
+
+        self.assertEqual(text, 'Prvi "citat bez kraja. Drugi „pravi“ citat.')
+        self.assertEqual(unbalanced, [5])
+
+    def test_unbalanced_closing_reported(self):
+        """Test that a stray closing quote is reported."""
+        source = 'kraj" pa "novi"'
+        text, unbalanced = convert(source)
+
+        self.assertEqual(text, 'kraj" pa „novi“')
+        self.assertEqual(unbalanced, [4])
+
+    def test_single_undo_action(self):
+        """Test that the whole document conversion is one undo action."""
+        editor = MockScintilla('"a" "b" "c"')
+        quotes.convert_document(editor)
+
+        self.assertEqual(editor.undo_actions, 1)
+
+    def test_line_numbers(self):
+        """Test line number lookup for unbalanced positions."""
+        data = b'a\nb\n"c\nd'
+        self.assertEqual(quotes.line_numbers(data, [0, 4, 7]), [1, 3, 4])
+
+    def test_convert_quotes_action_reports_lines(self):
+        """Test that the editor action reports unbalanced quotes with line numbers."""
+        editor = MockScintilla('"a"\nb "c\n')
+        notepad = MockNotepad()
+        count = dispatch.run('convert_quotes', editor, notepad)
+
+        self.assertEqual(count, 1)
+        self.assertEqual(len(notepad.messages), 1)
+        self.assertIn('2', notepad.messages[0])
+
+    def test_large_document_one_pass(self):
+        """Test converting a multi-megabyte document quickly."""
+        paragraph = '<p n="1">Он рече: "Добро јутро", а она "Здраво".</p>\n'
+        data = (paragraph * 40000).encode('utf-8')
+
+        started = time.perf_counter()
+        pairs, unbalanced = quotes.scan_quotes(data)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(pairs), 80000)
+        self.assertEqual(unbalanced, [])
+        self.assertLess(elapsed, 5.0)
+
+
+class TestQuoteFiles(unittest.TestCase):
+    """Test cases for file conversion and the quotes CLI command."""
+
+    def test_convert_file_in_place(self):
+        """Test converting a file in place and reporting unbalanced quotes."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'doc.xml'
+            path.write_text('<p>"a"</p>\n<p>"b</p>\n', encoding='utf-8')
+
+            count, unbalanced = quotes.convert_file(str(path))
+
+            self.assertEqual(count, 1)
+            self.assertEqual(unbalanced, [(14, 2)])
+            self.assertEqual(path.read_text(encoding='utf-8'), '<p>„a“</p>\n<p>"b</p>\n')
+
+    def test_convert_empty_file(self):
+        """Test converting an empty file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'empty.xml'
+            path.write_bytes(b'')
+
+            self.assertEqual(quotes.convert_file(str(path)), (0, []))
+
+    def test_cli_quotes_folder(self):
+        """Test the quotes CLI command on a folder with an output folder."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / 'src'
+            out = Path(tmpdir) / 'out'
+            (src / 'sub').mkdir(parents=True)
+            (src / 'sub' / 'a.xml').write_text('"a"', encoding='utf-8')
+
+            code = teiwrap_cli.main(['quotes', str(src), '-o', str(out)])
+
+            self.assertEqual(code, 0)
+            self.assertEqual((out / 'sub' / 'a.xml').read_text(encoding='utf-8'), '„a“')
+            self.assertEqual((src / 'sub' / 'a.xml').read_text(encoding='utf-8'), '"a"')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+test_script_fuzz.py
+Runs the real scripts/*.py files through tests/script_harness.py (cached
+code objects, fake Npp module) and fuzzes every script with random Unicode
+documents, empty, multiple (non-overlapping) and huge selections, and
+hostile prompt input.
+
+Every failure message names the seed and case, so a failure can be
+replayed with TEIWRAP_FUZZ_SEED=<seed>. TEIWRAP_FUZZ_CASES sets the number
+of cases per script.
+"""
+
+import os
+import random
+import re
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import catalog, elements, escaping, wellformed
+from tests.mock_npp import MockNotepad, MockScintilla
+from tests.script_harness import ScriptRunner, script_names
+
+SEED = int(os.environ.get('TEIWRAP_FUZZ_SEED', '20240601'))
+CASES = int(os.environ.get('TEIWRAP_FUZZ_CASES', '250'))
+
+# Whole matrix budget (all scripts x CASES) on a developer machine is ~2 s
+MATRIX_BUDGET_S = 30.0
+
+PIECES = [
+    'а', 'ш', 'ђ', 'Ж', 'č', 'ć', 'ž', 'a', 'Z', '7', ' ', ' ', '\n', '\r\n', '\t',
+    '"', '„', '“', "'", '&', '&amp;', '&#x10FFFF;', '<', '>', '😀', '中', 'é', '​',
+    '<p>', '</p>', '<hi rend="i">', '</hi>', '<lb/>', '<!-- к -->', '<![CDATA[<x>]]>', '<?pi x?>',
+]
+
+PROMPTS = [
+    None, '', ' ', 'en', 'fr', 'sr-Latn', 'de-CH-1901', 'i-klingon', 'x-' + 'a' * 8,
+    'en"<x>', '"><script>alert(1)</script>', '&amp;', 'la\n', '\x00', 'x' * 10000,
+    'ћирилица', '{0}', '%s', 'en-', '-',
+]
+
+# Tags of the plain wrap scripts (catalogue entries without attributes)
+TAG_SCRIPTS = dict((item['script'], item['tag']) for item in catalog.CATALOG
+                   if item['tag'] and not (item['attrs'] or item['prompt'] or item['custom']
+                                           or item['toggle']))
+
+HUGE_SIZE = 256 * 1024
+
+
+def boundaries(data):
+    """Byte offsets that start a UTF-8 character, plus the end of the data."""
+    return [i for i in range(len(data) + 1) if i == len(data) or not 0x80 <= data[i] < 0xc0]
+
+
+def random_case(rng):
+    """Return (text, selections, prompt) for one fuzz case."""
+    roll = rng.random()
+    if roll < 0.01:
+        text = ''.join(rng.choice(PIECES) for _ in range(64))
+        text = text * (HUGE_SIZE // len(text.encode('utf-8')) + 1)
+        data = text.encode('utf-8')
+        selections = [(0, len(data))]
+    else:
+        text = ''.join(rng.choice(PIECES) for _ in range(rng.randrange(0, 40)))
+        data = text.encode('utf-8')
+        points = boundaries(data)
+        mode = rng.random()
+        if mode < 0.15:
+            caret = rng.choice(points)
+            selections = [(caret, caret)]
+        elif mode < 0.3:
+            selections = [(0, len(data))]
+        else:
+            chosen = sorted(rng.sample(points, min(len(points), 2 * rng.randrange(1, 5))))
+            selections = list(zip(chosen[::2], chosen[1::2])) or [(0, 0)]
+    return text, selections, rng.choice(PROMPTS)
+
+
+def expected_wrap(data, selections, open_text, close_text):
+    """The document after wrapping every non-empty selection, as bytes."""
+    result = bytearray(data)
+    open_data, close_data = open_text.encode('utf-8'), close_text.encode('utf-8')
+    for start, end in sorted({sel for sel in selections if sel[1] > sel[0]}, reverse=True):
+        result[end:end] = close_data
+        result[start:start] = open_data
+    return bytes(result)
+
+
+def crossing(text, selections):
+    """Whether any non-empty selection would create crossing elements."""
+    index = elements.ElementIndex(MockScintilla(text))
+    return any(wellformed.problem(index, start, end) for start, end in selections if end > start)
+
+
+class TestScriptHarness(unittest.TestCase):
+    """Test cases for tests/script_harness.ScriptRunner."""
+
+    def test_code_objects_are_cached(self):
+        """Test that each script is compiled once for many runs."""
+        runner = ScriptRunner()
+        with runner:
+            for _ in range(50):
+                runner.run('wrap_hi.py', MockScintilla("x", [(0, 1)]))
+
+        self.assertEqual(runner.compiles, 1)
+        self.assertNotIn('Npp', sys.modules)
+
+    def test_changed_script_is_recompiled(self):
+        """Test that editing a script on disk invalidates its cached code object."""
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            script = Path(tmp) / 'wrap_x.py'
+            script.write_text('from Npp import editor\neditor.insertText(0, "a")\n', encoding='utf-8')
+            runner = ScriptRunner(tmp)
+            editor = runner.run('wrap_x.py', MockScintilla())
+            script.write_text('from Npp import editor\neditor.insertText(0, "b")\n', encoding='utf-8')
+            os.utime(script, ns=(0, script.stat().st_mtime_ns + 1000000))
+            runner.run('wrap_x.py', editor)
+
+        self.assertEqual(editor.text, "ba")
+        self.assertEqual(runner.compiles, 2)
+
+    def test_thousands_of_runs_per_second(self):
+        """Test that the harness runs a stub at least a thousand times per second."""
+        runner = ScriptRunner()
+        with runner:
+            runner.run('wrap_hi.py', MockScintilla("x", [(0, 1)]))
+            started = time.perf_counter()
+            for _ in range(2000):
+                runner.run('wrap_hi.py', MockScintilla("x", [(0, 1)]))
+            elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 2.0)
+
+    def test_every_script_runs(self):
+        """Test that every script in scripts/ runs against a plain selection."""
+        runner = ScriptRunner()
+        for name in script_names():
+            with self.subTest(script=name):
+                editor = runner.run(name, MockScintilla('реч "a"', [(0, 6)]), MockNotepad('sr'))
+                self.assertTrue(editor.text)
+
+
+class TestScriptFuzz(unittest.TestCase):
+    """Property-based fuzzing of every script."""
+
+    def check_case(self, runner, name, case_id, text, selections, prompt):
+        data = text.encode('utf-8')
+        editor = MockScintilla(text, selections)
+        notepad = MockNotepad(prompt)
+        before = [data[start:end] for start, end in sorted(set(selections)) if end > start]
+        context = "seed={0} case={1} script={2} text={3!r} selections={4} prompt={5!r}".format(
+            SEED, case_id, name, text[:200], selections, None if prompt is None else prompt[:40])
+
+        try:
+            runner.run(name, editor, notepad)
+        except Exception as error:  # any exception from a script is a failure
+            self.fail("{0}: {1!r}".format(context, error))
+        after = bytes(editor.buffer)
+        changed = after != data
+
+        if name in TAG_SCRIPTS or name.startswith('wrap_foreign') or name == 'wrap_serbian_quotes.py':
+            self.check_wrap(name, editor, notepad, data, after, changed, selections, prompt, before, context)
+        elif name == 'convert_serbian_quotes.py':
+            plain = lambda value: value.replace('„'.encode('utf-8'), b'"').replace('“'.encode('utf-8'), b'"')
+            self.assertEqual(plain(after), plain(data), context)
+
+        # A change is always one undo step away from the original
+        self.assertLessEqual(editor.undo_actions, 1, context)
+        if changed:
+            editor.undo()
+            self.assertEqual(bytes(editor.buffer), data, context)
+
+    def check_wrap(self, name, editor, notepad, data, after, changed, selections, prompt, before, context):
+        if not before:
+            self.assertFalse(changed, context)
+            return
+        if name == 'wrap_serbian_quotes.py':
+            self.assertEqual(after, expected_wrap(data, selections, '„', '“'), context)
+            return
+        if name in TAG_SCRIPTS:
+            open_text = '<{0}>'.format(TAG_SCRIPTS[name])
+        elif name == 'wrap_foreign_fixed.py':
+            open_text = '<foreign xml:lang="en">'
+        elif name == 'wrap_foreign_prompt.py':
+            if not prompt or not escaping.valid_lang(prompt):
+                self.assertFalse(changed, context)
+                self.assertEqual(len(notepad.messages), 1 if prompt else 0, context)
+                return
+            open_text = '<foreign xml:lang="{0}">'.format(escaping.escape_attr(prompt))
+        else:
+            match = re.search(rb'<foreign xml:lang="([^"]+)">', after)
+            open_text = '<foreign xml:lang="{0}">'.format(match.group(1).decode() if match else 'en')
+        close_text = '</{0}>'.format(open_text[1:].split(' ')[0].rstrip('>'))
+
+        if crossing(data.decode('utf-8'), selections):
+            self.assertFalse(changed, context)
+            self.assertEqual(len(notepad.messages), 1, context)
+            return
+        self.assertEqual(after, expected_wrap(data, selections, open_text, close_text), context)
+        # The wrapped content is selected again
+        self.assertEqual(sorted(text.encode('utf-8') for text in editor.selected_texts()),
+                         sorted(before), context)
+
+    def test_fuzz_all_scripts(self):
+        """Test every script against random documents, selections and prompts."""
+        runner = ScriptRunner()
+        started = time.perf_counter()
+        with runner:
+            for name in script_names():
+                rng = random.Random('{0}:{1}'.format(SEED, name))
+                for case_id in range(CASES):
+                    self.check_case(runner, name, case_id, *random_case(rng))
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, MATRIX_BUDGET_S)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+test_standoff.py
+Unit tests for standoff annotations (scripts/teiwrap/standoff.py): the
+array-backed sidecar file, rendering to inline TEI, moving annotations to
+a new text revision, and the standoff_mode action in teiwrap.dispatch.
+"""
+
+import contextlib
+import io
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import teiwrap_cli
+from teiwrap import dispatch, elements, headless, standoff
+from tests.mock_npp import MockNotepad, MockScintilla
+from tests.test_wellformed import span_of
+
+TEXT = 'Вук Караџић рођен је у Тршићу.\nCarpe diem, рекао је.\n'
+
+
+def store_of(text, *parts, **kwargs):
+    """AnnotationStore with a <hi> annotation on each (part, occurrence)."""
+    store = standoff.AnnotationStore(**kwargs)
+    for part in parts:
+        part, occurrence = part if isinstance(part, tuple) else (part, 0)
+        store.add(*span_of(text, part, occurrence), '<hi>', '</hi>')
+    return store
+
+
+class TempDirTestCase(unittest.TestCase):
+    """Temporary folder, plus a clean standoff state."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmpdir = Path(self._tmp.name)
+
+    def tearDown(self):
+        standoff.enabled.clear()
+        standoff._stores.clear()
+        for path in list(standoff._watched):
+            standoff._unwatch(path)
+        self._tmp.cleanup()
+
+
+class TestAnnotationStore(TempDirTestCase):
+    """Test cases for standoff.AnnotationStore."""
+
+    def test_sidecar_round_trip(self):
+        """Test that a saved sidecar loads back with the same annotations."""
+        store = store_of(TEXT, 'Вук Караџић', 'Тршићу', base_length=len(TEXT.encode('utf-8')))
+        store.add(*span_of(TEXT, 'Carpe diem'), '<foreign xml:lang="la">', '</foreign>')
+        path = self.tmpdir / 'a.txt.standoff'
+        store.save(str(path))
+        loaded = standoff.AnnotationStore.load(str(path))
+
+        self.assertEqual(loaded.spans(), store.spans())
+        self.assertEqual(loaded.base_length, store.base_length)
+        self.assertEqual(loaded.specs, [('<hi>', '</hi>'), ('<foreign xml:lang="la">', '</foreign>')])
+
+    def test_sidecar_is_compact(self):
+        """Test that each annotation takes twelve bytes after the header."""
+        store = standoff.AnnotationStore()
+        for i in range(10000):
+            store.add(i * 10, i * 10 + 5, '<hi>', '</hi>')
+        path = self.tmpdir / 'a.standoff'
+        store.save(str(path))
+        self.assertLess(path.stat().st_size, 10000 * 12 + 200)
+
+    def test_bad_sidecars_are_rejected(self):
+        """Test that foreign and truncated files raise ValueError."""
+        path = self.tmpdir / 'a.standoff'
+        store_of(TEXT, 'Вук').save(str(path))
+        data = path.read_bytes()
+        for bad in (b'<TEI/>', data[:-1], data.replace(b'"version": 1', b'"version": 9')):
+            with self.subTest(bad=bad[:40]):
+                path.write_bytes(bad)
+                with self.assertRaises(ValueError):
+                    standoff.AnnotationStore.load(str(path))
+
+    def test_crossing_annotations_are_rejected(self):
+        """Test that nested annotations are accepted and crossing ones are not."""
+        store = store_of(TEXT, 'Вук Караџић', 'Караџић')
+        with self.assertRaises(ValueError):
+            store.add(*span_of(TEXT, 'Караџић рођен'), '<hi>', '</hi>')
+        with self.assertRaises(ValueError):
+            store.add(5, 5, '<hi>', '</hi>')
+        self.assertEqual(len(store), 2)
+
+
+class TestRender(TempDirTestCase):
+    """Test cases for standoff.render."""
+
+    def test_same_output_as_apply(self):
+        """Test that rendering matches inline wrapping of the same spans."""
+        src = self.tmpdir / 'a.txt'
+        src.write_text(TEXT, encoding='utf-8')
+        store = store_of(TEXT, 'Вук Караџић', 'Караџић', 'Тршићу')
+        store.add(*span_of(TEXT, 'Carpe diem'), '<foreign xml:lang="la">', '</foreign>')
+        spans = [(start, end, 'hi', []) for start, end, _, _ in store.spans()[:3]]
+        spans.append(span_of(TEXT, 'Carpe diem') + ('foreign', [('xml:lang', 'la')]))
+
+        standoff.render(str(src), store, str(self.tmpdir / 'out.xml'))
+        headless.apply_spans(str(src), spans, str(self.tmpdir / 'inline.xml'))
+        self.assertEqual((self.tmpdir / 'out.xml').read_bytes(), (self.tmpdir / 'inline.xml').read_bytes())
+        self.assertEqual(src.read_text(encoding='utf-8'), TEXT)
+
+    def test_wrong_revision_is_refused(self):
+        """Test that a sidecar made for another text is not rendered."""
+        src = self.tmpdir / 'a.txt'
+        src.write_text(TEXT, encoding='utf-8')
+        size = len(TEXT.encode('utf-8'))
+        for store in (store_of(TEXT, 'Вук', base_length=size + 1),
+                      store_of(TEXT, 'Вук', base_length=size, base_hash='0' * 40)):
+            with self.assertRaises(ValueError):
+                standoff.render(str(src), store, str(self.tmpdir / 'out.xml'))
+        self.assertFalse((self.tmpdir / 'out.xml').exists())
+
+
+    def test_annotations_crossing_markup_are_refused(self):
+        """Test that annotations inside tags or crossing inline elements are not rendered."""
+        text = '<p>a <hi>bc</hi> d</p>'
+        src = self.tmpdir / 'a.xml'
+        src.write_text(text, encoding='utf-8')
+        for part in ('a <h', 'a <hi>b', 'c</hi> d', 'hi'):
+            with self.subTest(part=part):
+                with self.assertRaises(ValueError):
+                    standoff.render(str(src), store_of(text, part), str(self.tmpdir / 'out.xml'))
+        self.assertFalse((self.tmpdir / 'out.xml').exists())
+
+        standoff.render(str(src), store_of(text, 'a <hi>bc</hi>', 'bc'), str(self.tmpdir / 'out.xml'))
+        self.assertEqual((self.tmpdir / 'out.xml').read_text(encoding='utf-8'),
+                         '<p><hi>a <hi><hi>bc</hi></hi></hi> d</p>')
+
+
+class TestRebase(unittest.TestCase):
+    """Test cases for standoff.rebase."""
+
+    def rebase(self, old, new, *parts):
+        store = store_of(old, *parts)
+        moved, lost = standoff.rebase(store, old.encode('utf-8'), new.encode('utf-8'))
+        data = new.encode('utf-8')
+        return [data[start:end].decode('utf-8') for start, end, _, _ in moved.spans()], lost
+
+    def test_edits_before_and_inside(self):
+        """Test that annotations follow edits before them and inside them."""
+        new = 'Вук Стефановић Караџић рођен је у Тршићу.\nCarpe diem, рекао је.\n'
+        moved, lost = self.rebase(TEXT, new, 'Вук Караџић', 'Тршићу', 'Carpe diem')
+        self.assertEqual(moved, ['Вук Стефановић Караџић', 'Тршићу', 'Carpe diem'])
+        self.assertEqual(lost, [])
+
+    def test_insertion_at_boundary_stays_outside(self):
+        """Test that text inserted exactly at an annotation's start or end is not included."""
+        new = 'Вук Караџић рођен је у селу Тршићу!!.\nCarpe diem, рекао је.\n'
+        moved, _ = self.rebase(TEXT, new, 'Тршићу')
+        self.assertEqual(moved, ['Тршићу'])
+
+    def test_moved_and_deleted_lines(self):
+        """Test that annotations on deleted lines, and on lines moved up, are lost."""
+        old = 'први ред\nдруги ред\nтрећи ред\nчетврти ред\n'
+        new = 'четврти ред\nпрви ред\nтрећи ред\n'
+        moved, lost = self.rebase(old, new, 'први', 'четврти', 'други')
+        self.assertEqual(moved, ['први'])
+        self.assertEqual(len(lost), 2)
+
+        moved, lost = self.rebase(old, 'нешто сасвим друго\n', 'први')
+        self.assertEqual((moved, len(lost)), ([], 1))
+
+    def test_repeated_lines(self):
+        """Test that repeated lines next to a unique anchor keep their annotations."""
+        old = 'a\nx\nx\nx\nb\n'
+        new = 'нов\na\nx\nx\nx\nb\n'
+        moved, lost = self.rebase(old, new, ('x', 1), ('x', 2))
+        self.assertEqual((moved, lost), (['x', 'x'], []))
+
+    def test_large_text_is_fast(self):
+        """Test that rebasing a multi-megabyte text with scattered edits is quick."""
+        lines = ['{0} Вук Караџић рођен је у Тршићу.\n'.format(i) for i in range(100000)]
+        old = ''.join(lines)
+        lines[500] = 'нов ' + lines[500]
+        del lines[70000]
+        new = ''.join(lines)
+        store = standoff.AnnotationStore()
+        data = old.encode('utf-8')
+        word = 'Тршићу'.encode('utf-8')
+        start = 0
+        for _ in range(1000):
+            start = data.index(word, start) + len(word)
+            store.add(start - len(word), start, '<placeName>', '</placeName>')
+        started = time.perf_counter()
+        moved, lost = standoff.rebase(store, data, new.encode('utf-8'))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual((len(moved), lost), (1000, []))
+        new_data = new.encode('utf-8')
+        self.assertTrue(all(new_data[start:end] == word for start, end, _, _ in moved.spans()))
+        self.assertLess(elapsed, 5.0)
+
+
+class TestStandoffMode(TempDirTestCase):
+    """Test cases for the standoff_mode action and wraps recorded in standoff mode."""
+
+    def test_wraps_are_recorded(self):
+        """Test that in standoff mode wraps fill the sidecar and leave the text alone."""
+        path = self.tmpdir / 'a.xml'
+        notepad = MockNotepad(filename=str(path))
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Вук Караџић')])
+        self.assertEqual(dispatch.run('standoff_mode', editor, notepad), 1)
+        self.assertEqual(dispatch.run('hi', editor, notepad), 1)
+        editor.selections = [list(span_of(TEXT, 'Carpe diem'))]
+        dispatch.run('foreign_fixed', editor, notepad)
+
+        self.assertEqual(editor.text, TEXT)
+        store = standoff.AnnotationStore.load(str(path) + '.standoff')
+        self.assertEqual([spec for _, _, spec, _ in store.spans()], ['<hi>', '<foreign xml:lang="en">'])
+
+        dispatch.run('standoff_mode', editor, notepad)
+        dispatch.run('hi', editor, notepad)
+        self.assertIn('<hi>Carpe diem</hi>', editor.text)
+
+    def test_crossing_wrap_is_refused(self):
+        """Test that a wrap crossing a recorded annotation records nothing."""
+        notepad = MockNotepad(filename=str(self.tmpdir / 'a.xml'))
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Вук Караџић')])
+        dispatch.run('standoff_mode', editor, notepad)
+        dispatch.run('hi', editor, notepad)
+        editor.selections = [list(span_of(TEXT, 'Караџић рођен'))]
+
+        self.assertEqual(dispatch.run('hi', editor, notepad), 0)
+        self.assertIn('Red 1', notepad.messages[-1])
+        self.assertEqual(len(standoff.AnnotationStore.load(str(self.tmpdir / 'a.xml.standoff'))), 1)
+
+    def test_wrap_crossing_markup_is_refused(self):
+        """Test that standoff mode refuses the same selections as inline wrapping."""
+        text = 'a <hi>bc</hi> d'
+        notepad = MockNotepad(filename=str(self.tmpdir / 'a.xml'))
+        editor = MockScintilla(text, [(0, 4)])
+        dispatch.run('standoff_mode', editor, notepad)
+
+        self.assertEqual(dispatch.run('title', editor, notepad), 0)
+        self.assertIn('ukrštene', notepad.messages[-1])
+        self.assertFalse((self.tmpdir / 'a.xml.standoff').exists())
+
+    def test_annotations_follow_edits_between_wraps(self):
+        """Test that edits made in standoff mode move the recorded annotations."""
+        path = self.tmpdir / 'a.xml'
+        notepad = MockNotepad(filename=str(path))
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Вук Караџић')])
+        dispatch.run('standoff_mode', editor, notepad)
+        dispatch.run('hi', editor, notepad)
+        editor.insertText(0, 'Увод.\n')
+        editor.selections = [list(span_of(editor.text, 'Тршићу'))]
+        self.assertEqual(dispatch.run('title', editor, notepad), 1)
+
+        store = standoff.AnnotationStore.load(str(path) + '.standoff')
+        data = editor.text.encode('utf-8')
+        self.assertEqual([data[start:end].decode('utf-8') for start, end, _, _ in store.spans()],
+                         ['Вук Караџић', 'Тршићу'])
+        self.assertEqual((store.base_length, store.base_hash), (len(data), None))
+        dispatch.run('standoff_mode', editor, notepad)
+        store = standoff.AnnotationStore.load(str(path) + '.standoff')
+        self.assertEqual(store.base_hash, standoff.data_hash(data))
+        path.write_bytes(data)
+        standoff.render(str(path), store, str(self.tmpdir / 'out.xml'))
+        self.assertEqual((self.tmpdir / 'out.xml').read_text(encoding='utf-8'),
+                         'Увод.\n<hi>Вук Караџић</hi> рођен је у <title>Тршићу</title>.\nCarpe diem, рекао је.\n')
+
+    def test_deleted_annotation_is_reported(self):
+        """Test that an annotation whose text is deleted is dropped and reported."""
+        notepad = MockNotepad(filename=str(self.tmpdir / 'a.xml'))
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Вук Караџић')])
+        dispatch.run('standoff_mode', editor, notepad)
+        dispatch.run('hi', editor, notepad)
+        start, end = span_of(TEXT, 'Вук Караџић')
+        editor.deleteRange(start, end - start + 1)
+        editor.selections = [list(span_of(editor.text, 'Тршићу'))]
+
+        self.assertEqual(dispatch.run('hi', editor, notepad), 1)
+        self.assertIn('1 anotacija je izgubljeno', notepad.messages[-1])
+        data = editor.text.encode('utf-8')
+        self.assertEqual([data[s:e].decode('utf-8') for s, e, _, _ in standoff._stores[
+            str(self.tmpdir / 'a.xml.standoff')].spans()], ['Тршићу'])
+
+    def test_wraps_do_not_read_the_document(self):
+        """Test that a wrap in standoff mode records offsets without copying the text."""
+        notepad = MockNotepad(filename=str(self.tmpdir / 'a.xml'))
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Вук Караџић')])
+        dispatch.run('standoff_mode', editor, notepad)
+        dispatch.run('hi', editor, notepad)
+        # In Notepad++ the element index follows edits through its own callback
+        elements.watch(editor, 'MODIFIED')
+        self.addCleanup(elements.unwatch, editor)
+        reads = []
+        get_text = editor.getText
+        editor.getText = lambda: reads.append(1) or get_text()
+        editor.insertText(0, 'Увод.\n')
+        for part in ('Тршићу', 'Carpe diem', 'рекао'):
+            editor.selections = [list(span_of(editor.text, part))]
+            self.assertEqual(dispatch.run('hi', editor, notepad), 1)
+
+        self.assertEqual(reads, [])
+
+    def test_edit_without_previous_text(self):
+        """Test that text edited outside standoff mode is rebased from the saved document, or refused."""
+        path = self.tmpdir / 'a.xml'
+        notepad = MockNotepad(filename=str(path))
+        editor = MockScintilla(TEXT, [span_of(TEXT, 'Вук Караџић')])
+        dispatch.run('standoff_mode', editor, notepad)
+        dispatch.run('hi', editor, notepad)
+        dispatch.run('standoff_mode', editor, notepad)
+        editor.insertText(0, 'x')
+
+        self.assertEqual(dispatch.run('standoff_mode', editor, notepad), 0)
+        self.assertIn('rebase', notepad.messages[-1])
+        self.assertNotIn(str(path) + '.standoff', standoff.enabled)
+        self.assertEqual(len(standoff.AnnotationStore.load(str(path) + '.standoff')), 1)
+
+        # The saved document is the revision the sidecar was made for
+        path.write_text(TEXT, encoding='utf-8')
+        self.assertEqual(dispatch.run('standoff_mode', editor, notepad), 1)
+        start, end = span_of(TEXT, 'Вук Караџић')
+        store = standoff.AnnotationStore.load(str(path) + '.standoff')
+        self.assertEqual(store.spans()[0][:2], (start + 1, end + 1))
+        self.assertEqual(store.base_hash, standoff.data_hash(('x' + TEXT).encode('utf-8')))
+
+    def test_unsaved_document(self):
+        """Test that standoff mode needs a saved document."""
+        notepad = MockNotepad()
+        editor = MockScintilla(TEXT, [(0, 6)])
+        self.assertEqual(dispatch.run('standoff_mode', editor, notepad), 0)
+        self.assertIn('Sačuvajte', notepad.messages[0])
+        dispatch.run('hi', editor, notepad)
+        self.assertTrue(editor.text.startswith('<hi>'))
+
+
+class TestCli(TempDirTestCase):
+    """Test cases for the render and rebase CLI commands."""
+
+    def test_rebase_then_render(self):
+        """Test rebasing a sidecar to a new revision and rendering it."""
+        old, new = self.tmpdir / 'v1.txt', self.tmpdir / 'v2.txt'
+        old.write_text(TEXT, encoding='utf-8')
+        new.write_text('Увод.\n' + TEXT, encoding='utf-8')
+        store_of(TEXT, 'Тршићу').save(str(old) + '.standoff')
+
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(teiwrap_cli.main(['rebase', str(old), str(new)]), 0)
+            self.assertEqual(teiwrap_cli.main(['render', str(new), '-o', str(self.tmpdir / 'v2.xml')]), 0)
+
+        self.assertIn('Moved 1 annotation(s), lost 0', out.getvalue())
+        self.assertEqual((self.tmpdir / 'v2.xml').read_text(encoding='utf-8'),
+                         'Увод.\n' + TEXT.replace('Тршићу', '<hi>Тршићу</hi>'))
+
+
+if __name__ == "__main__":
+    unittest.main()
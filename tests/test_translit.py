@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+test_translit.py
+Unit tests for Serbian Cyrillic <-> Latin transliteration
+(scripts/teiwrap/translit.py): digraphs, markup and <foreign> left alone,
+chunk boundaries, the editor actions and the translit CLI command.
+"""
+
+import contextlib
+import io
+import random
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import teiwrap_cli
+from teiwrap import dispatch, translit
+from tests.mock_npp import MockNotepad, MockScintilla
+from tests.test_wellformed import span_of
+
+PIECES = ['Љ', 'љ', 'Њ', 'Џ', 'У', 'ш', 'lj', 'Nj', 'DŽ', 'd', 'ž', 'a', ' ', '\n', '&amp;',
+          '<hi>', '</hi>', '<p n="шљ">', '<foreign>', '</foreign>', '<foreign/>',
+          '<!-- ш <x> -->', '<![CDATA[ш<]]>', '<?pi ш?>']
+
+
+class TestTransliterate(unittest.TestCase):
+    """Test cases for translit.transliterate."""
+
+    def test_digraphs_both_ways(self):
+        """Test that digraphs convert both ways and round-trip."""
+        cyrillic = 'Љубав, њива и џак. Њутн, Џон. ЉУБАВ, ТАЊ, ЏЏ.'
+        latin = 'Ljubav, njiva i džak. Njutn, Džon. LJUBAV, TANJ, DŽDŽ.'
+
+        self.assertEqual(translit.transliterate(cyrillic, 'latin'), latin)
+        self.assertEqual(translit.transliterate(latin, 'cyrillic'), cyrillic)
+        self.assertEqual(translit.transliterate('ǈubav ǆak', 'cyrillic'), 'Љубав џак')
+
+    def test_markup_untouched(self):
+        """Test that tags, attribute values, entities, comments and CDATA are not converted."""
+        source = ('<?xml version="1.0"?><!DOCTYPE TEI [ <!ENTITY a "ш"> ]>'
+                  '<p rend="ћ>" n=\'ђ\'>Ђорђе &amp; <hi>шума</hi><!-- шума --><![CDATA[шума]]></p>')
+        self.assertEqual(translit.transliterate(source, 'latin'),
+                         source.replace('Ђорђе', 'Đorđe').replace('<hi>шума', '<hi>šuma'))
+        latin = '<p rend="lj">Ljiljan &nbsp; <lb/>nj</p>'
+        self.assertEqual(translit.transliterate(latin, 'cyrillic'), '<p rend="lj">Љиљан &nbsp; <lb/>њ</p>')
+
+    def test_foreign_content_untouched(self):
+        """Test that nested <foreign> content is left alone and text after it is converted."""
+        source = ('<p>Москва <foreign xml:lang="ru">Москва <foreign>да</foreign> Москва</foreign> '
+                  'и <foreign/>Москва</p>')
+        self.assertEqual(translit.transliterate(source, 'latin'),
+                         '<p>Moskva <foreign xml:lang="ru">Москва <foreign>да</foreign> Москва</foreign> '
+                         'i <foreign/>Moskva</p>')
+        self.assertEqual(translit.transliterate('Москва</foreign> Москва', 'latin', foreign=1),
+                         'Москва</foreign> Moskva')
+
+    def test_unknown_direction(self):
+        """Test that an unknown direction raises ValueError."""
+        with self.assertRaises(ValueError):
+            translit.Transliterator('glagolitic')
+
+
+class TestChunks(unittest.TestCase):
+    """Test cases for chunked conversion."""
+
+    def convert_stream(self, text, direction, chunk_size):
+        out = io.BytesIO()
+        translit.convert_stream(io.BytesIO(text.encode('utf-8')), out, direction, chunk_size)
+        return out.getvalue().decode('utf-8')
+
+    def test_chunk_size_does_not_matter(self):
+        """Test that every chunk size gives the same result as one conversion."""
+        rng = random.Random(11)
+        for _ in range(200):
+            text = ''.join(rng.choice(PIECES) for _ in range(rng.randrange(80)))
+            for direction in translit.DIRECTIONS:
+                whole = translit.transliterate(text, direction)
+                for chunk_size in (1, 2, 3, 7, 64):
+                    with self.subTest(text=text, direction=direction, chunk_size=chunk_size):
+                        self.assertEqual(self.convert_stream(text, direction, chunk_size), whole)
+
+    def test_large_stream(self):
+        """Test converting a multi-megabyte document and back quickly."""
+        paragraph = ('<p n="1">Вук Караџић рођен је у Тршићу, <hi>љубав</hi> и њива &amp; џак. '
+                     '<foreign xml:lang="la">carpe diem</foreign></p>\n')
+        text = paragraph * 40000
+        started = time.perf_counter()
+        latin = self.convert_stream(text, 'latin', translit.CHUNK_SIZE)
+        back = self.convert_stream(latin, 'cyrillic', translit.CHUNK_SIZE)
+        elapsed = time.perf_counter() - started
+
+        self.assertIn('Vuk Karadžić rođen je u Tršiću, <hi>ljubav</hi> i njiva &amp; džak.', latin)
+        self.assertEqual(back, text)
+        self.assertLess(elapsed, 5.0)
+
+
+class TestEditorActions(unittest.TestCase):
+    """Test cases for the to_latin and to_cyrillic actions."""
+
+    def test_whole_document_is_one_undo_step(self):
+        """Test converting the whole document when nothing is selected."""
+        text = '<p n="ш">Шума и <foreign>шума</foreign></p>'
+        editor = MockScintilla(text)
+        self.assertEqual(dispatch.run('to_latin', editor, MockNotepad()), 1)
+
+        self.assertEqual(editor.text, '<p n="ш">Šuma i <foreign>шума</foreign></p>')
+        self.assertEqual(editor.undo_actions, 1)
+        editor.undo()
+        self.assertEqual(editor.text, text)
+
+    def test_selections_are_converted_and_reselected(self):
+        """Test that several selections are converted and stay selected."""
+        text = 'Ljubav i <foreign>nj</foreign> njiva, džak'
+        editor = MockScintilla(text, [span_of(text, 'Ljubav'), span_of(text, 'nj', 1), span_of(text, 'džak')])
+        dispatch.run('to_cyrillic', editor, MockNotepad())
+
+        self.assertEqual(editor.text, 'Љубав i <foreign>nj</foreign> њiva, џак')
+        self.assertEqual(editor.selected_texts(), ['Љубав', 'њ', 'џак'])
+
+    def test_selection_inside_tag_is_reported(self):
+        """Test that a selection starting inside a tag is skipped and reported."""
+        text = '<p n="ш">шума</p>'
+        editor = MockScintilla(text, [(3, len(text) - 4)])
+        notepad = MockNotepad()
+
+        self.assertEqual(dispatch.run('to_latin', editor, notepad), 0)
+        self.assertEqual(editor.text, text)
+        self.assertIn('1', notepad.messages[0])
+
+
+class TestTranslitFiles(unittest.TestCase):
+    """Test cases for file conversion and the translit CLI command."""
+
+    def test_unchanged_file_is_not_rewritten(self):
+        """Test that a file without anything to convert keeps its modification time."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'a.xml'
+            path.write_text('<p>Latinica</p>', encoding='utf-8')
+            before = path.stat().st_mtime_ns
+
+            self.assertFalse(translit.convert_file(str(path), 'latin'))
+            self.assertEqual(path.stat().st_mtime_ns, before)
+            self.assertEqual(len(list(Path(tmpdir).iterdir())), 1)
+
+    def test_cli_translit_folder(self):
+        """Test the translit CLI command on a folder with an output folder."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = Path(tmpdir) / 'src'
+            out = Path(tmpdir) / 'out'
+            (src / 'sub').mkdir(parents=True)
+            (src / 'sub' / 'a.xml').write_text('<p>Љубав</p>', encoding='utf-8')
+            (src / 'b.xml').write_text('<p>Ljubav</p>', encoding='utf-8')
+
+            with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                code = teiwrap_cli.main(['translit', 'latin', str(src), '-o', str(out)])
+
+            self.assertEqual(code, 0)
+            self.assertIn('Transliterated 1 of 2 file(s)', stdout.getvalue())
+            self.assertEqual((out / 'sub' / 'a.xml').read_text(encoding='utf-8'), '<p>Ljubav</p>')
+            self.assertEqual((out / 'b.xml').read_text(encoding='utf-8'), '<p>Ljubav</p>')
+            self.assertEqual((src / 'sub' / 'a.xml').read_text(encoding='utf-8'), '<p>Љубав</p>')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+test_unwrap.py
+Unit tests for removing the element around the selection or caret
+(scripts/teiwrap/unwrap.py) and the toggle actions in teiwrap.dispatch.
+"""
+
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import dispatch, elements, unwrap
+from tests.mock_npp import MockNotepad, MockScintilla
+from tests.test_wellformed import span_of
+
+
+class TestFindElement(unittest.TestCase):
+    """Test cases for unwrap.find_element."""
+
+    TEXT = '<p><hi>а <hi rend="b">бб</hi> в</hi><hix/> <hi/> г</p>'
+
+    def find(self, part, occurrence=0, tag='hi', text=TEXT):
+        start, end = span_of(text, part, occurrence)
+        return unwrap.find_element(MockScintilla(text), tag, start, end)
+
+    def test_innermost_element(self):
+        """Test that the deepest element of the tag around the range is found."""
+        outer = span_of(self.TEXT, '<hi>')[0], span_of(self.TEXT, '</hi>', 1)[1]
+        inner = span_of(self.TEXT, '<hi rend')[0], span_of(self.TEXT, '</hi>')[1]
+        self.assertEqual(self.find('бб')[::3], inner)
+        self.assertEqual(self.find('а')[::3], outer)
+        self.assertEqual(self.find(' в')[::3], outer)
+        self.assertEqual(self.find('а <hi rend="b">бб</hi> в')[::3], outer)
+
+    def test_tag_boundaries(self):
+        """Test that the returned spans are exactly the start and end tags."""
+        found = self.find('бб')
+        data = self.TEXT.encode('utf-8')
+        self.assertEqual(data[found[0]:found[1]], b'<hi rend="b">')
+        self.assertEqual(data[found[2]:found[3]], b'</hi>')
+
+    def test_selection_covering_the_tags(self):
+        """Test that a selection of the whole element finds that element."""
+        found = self.find('<hi rend="b">бб</hi>')
+        self.assertEqual(found[::3], span_of(self.TEXT, '<hi rend="b">бб</hi>'))
+
+    def test_selection_leaving_inner_element(self):
+        """Test that a range ending after the inner element finds the outer one."""
+        self.assertEqual(self.find('бб</hi> в')[0], span_of(self.TEXT, '<hi>')[0])
+
+    def test_similar_names_and_empty_elements(self):
+        """Test that <hix/>, <hi/> and other tags are not taken for the element."""
+        self.assertIsNone(self.find(' г'))
+        self.assertIsNone(self.find('бб', tag='h'))
+        self.assertEqual(self.find('бб', tag='p')[0], 0)
+
+    def test_outside_the_window(self):
+        """Test that an element whose tags are farther than the window is not found."""
+        text = '<hi>' + 'x' * 1000 + '</hi>'
+        editor = MockScintilla(text)
+        self.assertIsNone(unwrap.find_element(editor, 'hi', 500, window=100))
+        self.assertEqual(unwrap.find_element(editor, 'hi', 500, window=600), (0, 4, 1004, 1009))
+
+    def test_large_document_is_not_copied(self):
+        """Test that the search reads a few bytes only, however big the document."""
+        text = '<p>' + 'реч ' * 2000000 + '<hi>мета</hi>' + 'реч ' * 2000000 + '</p>'
+        editor = MockScintilla(text)
+        start, end = span_of(text, 'мета')
+        started = time.perf_counter()
+        found = unwrap.find_element(editor, 'hi', start, end)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(found[::3], span_of(text, '<hi>мета</hi>'))
+        self.assertLess(editor.bytes_read, 100)
+        self.assertLess(elapsed, 0.5)
+
+
+class TestToggle(unittest.TestCase):
+    """Test cases for the toggle actions built from the catalogue."""
+
+    def test_caret_inside_unwraps(self):
+        """Test that a caret inside the element removes its tags as one undo step."""
+        text = '<p><hi rend="i">Ћао</hi> свете</p>'
+        caret = span_of(text, 'а')[0]
+        editor = MockScintilla(text, [(caret, caret)])
+        self.assertEqual(dispatch.run('toggle_hi', editor, MockNotepad()), 1)
+
+        self.assertEqual(editor.text, '<p>Ћао свете</p>')
+        self.assertEqual(editor.selections, [[caret - len('<hi rend="i">')] * 2])
+        self.assertEqual(editor.undo_actions, 1)
+        editor.undo()
+        self.assertEqual(editor.text, text)
+
+    def test_selection_keeps_content_selected(self):
+        """Test that the unwrapped content stays selected."""
+        text = 'а <quote>б в</quote> г'
+        editor = MockScintilla(text, [span_of(text, '<quote>б в</quote>')])
+        dispatch.run('toggle_quote', editor, MockNotepad())
+
+        self.assertEqual(editor.text, 'а б в г')
+        self.assertEqual(editor.selected_texts(), ['б в'])
+
+    def test_outside_wraps(self):
+        """Test that a selection outside any such element is wrapped."""
+        editor = MockScintilla('а <hi>б</hi> в', [(0, 2)])
+        dispatch.run('toggle_hi', editor, MockNotepad())
+        self.assertEqual(editor.text, '<hi>а</hi> <hi>б</hi> в')
+
+        editor = MockScintilla('Ћао', [(0, 6)])
+        dispatch.run('toggle_foreign', editor, MockNotepad())
+        self.assertEqual(editor.text, '<foreign xml:lang="en">Ћао</foreign>')
+
+    def test_caret_outside_reports(self):
+        """Test that a caret outside any such element changes nothing and says so."""
+        editor = MockScintilla('а <hi>б</hi> в', [(1, 1)])
+        notepad = MockNotepad()
+        self.assertEqual(dispatch.run('toggle_hi', editor, notepad), 0)
+        self.assertEqual(editor.text, 'а <hi>б</hi> в')
+        self.assertIn('<hi>', notepad.messages[0])
+
+    def test_multiple_selections(self):
+        """Test that every selection's element is removed, each once, in one undo step."""
+        text = '<hi>а</hi> <hi>б в</hi> <hi>г</hi>'
+        b, v, g = (span_of(text, part)[0] for part in ('б', 'в', 'г'))
+        editor = MockScintilla(text, [(b, b), (v, v), (g, g)])
+        self.assertEqual(dispatch.run('toggle_hi', editor, MockNotepad()), 2)
+
+        self.assertEqual(editor.text, '<hi>а</hi> б в г')
+        self.assertEqual(editor.undo_actions, 1)
+
+    def test_index_follows_unwrap(self):
+        """Test that a cached, unwatched element index is told about the deletions."""
+        text = '<p><hi>а</hi> <title>б</title></p>'
+        caret = span_of(text, 'а')[0]
+        editor = MockScintilla(text, [(caret, caret)])
+        index = elements.index_for(editor)
+        dispatch.run('toggle_hi', editor, MockNotepad())
+
+        self.assertIs(elements.index_for(editor), index)
+        fresh = elements.ElementIndex(MockScintilla(editor.text))
+        for pos in range(editor.getLength()):
+            self.assertEqual(index.enclosing(pos), fresh.enclosing(pos))
+
+
+if __name__ == "__main__":
+    unittest.main()
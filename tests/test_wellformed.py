@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+test_wellformed.py
+Unit tests for the incremental crossing-markup check (scripts/teiwrap/wellformed.py)
+and its use by the wrap actions in teiwrap.dispatch.
+"""
+
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from teiwrap import dispatch, elements, wellformed
+from tests.mock_npp import MockNotepad, MockScintilla
+
+
+def span_of(text, part, occurrence=0):
+    """Return the (start, end) byte span of the n-th occurrence of part in text."""
+    data = text.encode('utf-8')
+    start = -1
+    for _ in range(occurrence + 1):
+        start = data.index(part.encode('utf-8'), start + 1)
+    return start, start + len(part.encode('utf-8'))
+
+
+class TestProblem(unittest.TestCase):
+    """Test cases for wellformed.problem."""
+
+    TEXT = '<p><hi>а<title>б</title>в</hi> <!-- <hi> --> <lb/> г</p>'
+
+    def problem(self, part, occurrence=0, text=TEXT):
+        index = elements.ElementIndex(MockScintilla(text))
+        return wellformed.problem(index, *span_of(text, part, occurrence))
+
+    def test_balanced_selection_accepted(self):
+        """Test that selections with balanced markup are accepted."""
+        self.assertIsNone(self.problem('<title>б</title>'))
+        self.assertIsNone(self.problem('<hi>а<title>б</title>в</hi>'))
+        self.assertIsNone(self.problem('б'))
+
+    def test_crossing_selection_refused(self):
+        """Test that selections cutting across elements are refused."""
+        self.assertIn('otvara', self.problem('а<title>б'))
+        self.assertIn('zatvara', self.problem('б</title>в'))
+        self.assertIn('zatvara', self.problem('</title>в</hi> '))
+
+    def test_selection_inside_tag_refused(self):
+        """Test that selection boundaries inside a tag are refused."""
+        self.assertIn('počinje', self.problem('title>б</title>'))
+        self.assertIn('završava', self.problem('б</tit'))
+
+    def test_comments_and_empty_elements_ignored(self):
+        """Test that comments and self-closing tags do not change the depth."""
+        self.assertIsNone(self.problem(' <!-- <hi> --> <lb/> г'))
+        self.assertIn('počinje', self.problem('hi> --'))
+
+    def test_tag_across_block_boundary(self):
+        """Test a tag that straddles two index blocks."""
+        text = 'x' * 10 + '<title rend="a>b">' + 'y' * 10 + '</title>'
+        index = elements.ElementIndex(MockScintilla(text), block_size=16)
+
+        self.assertGreater(len(index.offsets), 2)
+        self.assertEqual(wellformed.problem(index, 17, 20), "selekcija počinje unutar taga")
+        self.assertIsNone(wellformed.problem(index, 0, len(text)))
+        self.assertIsNotNone(wellformed.problem(index, 0, 30))
+
+
+class TestCheckedWrap(unittest.TestCase):
+    """Test cases for the check in the dispatcher wrap actions."""
+
+    def test_crossing_wrap_refused(self):
+        """Test that a wrap which would cross markup is refused with a message."""
+        text = '<hi>a<title>b</title>c</hi>'
+        editor = MockScintilla(text, [span_of(text, 'a<title>b')])
+        notepad = MockNotepad()
+        count = dispatch.run('quote', editor, notepad)
+
+        self.assertEqual(count, 0)
+        self.assertEqual(editor.text, text)
+        self.assertEqual(editor.undo_actions, 0)
+        self.assertIn('red 1', notepad.messages[0])
+
+    def test_multi_selection_refused_as_a_whole(self):
+        """Test that one bad selection out of several leaves the document untouched."""
+        text = 'x <hi>y</hi> z'
+        editor = MockScintilla(text, [(0, 1), span_of(text, '<hi>y')])
+        dispatch.run('title', editor, MockNotepad())
+
+        self.assertEqual(editor.text, text)
+
+    def test_serbian_quotes_not_checked(self):
+        """Test that quotes, which are not elements, may cross markup."""
+        text = 'a<hi>b</hi>'
+        editor = MockScintilla(text, [span_of(text, 'a<hi>b')])
+        dispatch.run('serbian_quotes', editor, MockNotepad())
+
+        self.assertEqual(editor.text, '„a<hi>b“</hi>')
+
+    def test_index_reused_after_wrap(self):
+        """Test that consecutive wraps patch the cached index instead of rebuilding it."""
+        text = '<p>' + 'Реч и <hi>реч</hi>. ' * 20000 + '</p>'
+        editor = MockScintilla(text)
+        first = elements.index_for(editor)
+        for occurrence in (5, 100, 19000):
+            editor.selections = [list(span_of(editor.text, 'Реч', occurrence))]
+            editor.bytes_read = 0
+            dispatch.run('hi', editor, MockNotepad())
+            # Only the blocks around the selection are read, never the whole document
+            self.assertLess(editor.bytes_read, 4 * elements.BLOCK_SIZE)
+
+        self.assertIs(elements.index_for(editor), first)
+        self.assertEqual(editor.text.count('<hi>Реч</hi>'), 3)
+
+    def test_check_time_independent_of_document_size(self):
+        """Test that a check costs about the same in small and large documents."""
+        def check_time(repeat):
+            text = '<p>' + 'Реч и <hi>реч</hi>. ' * repeat + '</p>'
+            editor = MockScintilla(text)
+            index = elements.index_for(editor)
+            start, end = span_of(text, 'Реч', repeat // 2)
+            timings = []
+            for _ in range(20):
+                index.note_insert(start, 0)
+                started = time.perf_counter()
+                wellformed.problem(index, start, end)
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        self.assertLess(check_time(100000), check_time(2000) * 10 + 0.002)
+
+
+if __name__ == "__main__":
+    unittest.main()
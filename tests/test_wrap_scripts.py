@@ -2,210 +2,132 @@
 """
 test_wrap_scripts.py
 Unit tests for all PythonScript wrap scripts using unittest framework.
+The stub scripts are executed against MockScintilla, which works on UTF-8
+byte positions like the real editor.
 """
 
 import unittest
 import sys
 from pathlib import Path
 
+# Make the repository root and the scripts/ folder importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
 
-# Mock classes to simulate Notepad++ Npp module
+from tests.mock_npp import MockNotepad, MockScintilla
+from tests.test_dispatch import run_stub
 
-class MockEditor:
-    """Mock class that simulates editor object from Npp module."""
-    
-    def __init__(self):
-        self.selected_text = ""
-        self.replaced_text = ""
-    
-    def getSelText(self):
-        """Returns selected text."""
-        return self.selected_text
-    
-    def replaceSel(self, text):
-        """Replaces selection with new text."""
-        self.replaced_text = text
 
-
-class MockNotepad:
-    """Mock class that simulates notepad object from Npp module."""
-    
-    def __init__(self):
-        self.prompt_response = "en"
-    
-    def prompt(self, message, title, default):
-        """Simulates prompt dialog."""
-        return self.prompt_response
+def whole(text):
+    """Return a selection covering the whole text, in UTF-8 bytes."""
+    return [(0, len(text.encode('utf-8')))]
 
 
 class TestWrapScripts(unittest.TestCase):
     """Test cases for all wrap scripts."""
-    
+
     def setUp(self):
         """Set up test fixtures."""
-        self.editor = MockEditor()
         self.notepad = MockNotepad()
-    
+
+    def run_script(self, script_name, text, selections=None):
+        """Run a wrap script on text with the given selections; return the new text."""
+        self.editor = MockScintilla(text, whole(text) if selections is None else selections)
+        run_stub(script_name, self.editor, self.notepad)
+        return self.editor.text
+
     def test_wrap_title(self):
         """Test wrap_title script wraps text in <title> tag."""
-        self.editor.selected_text = "test text"
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel("<title>{0}</title>".format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, "<title>test text</title>")
-    
+        self.assertEqual(self.run_script('wrap_title.py', "test text"), "<title>test text</title>")
+
     def test_wrap_head(self):
         """Test wrap_head script wraps text in <head> tag."""
-        self.editor.selected_text = "test text"
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel("<head>{0}</head>".format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, "<head>test text</head>")
-    
+        self.assertEqual(self.run_script('wrap_head.py', "test text"), "<head>test text</head>")
+
     def test_wrap_hi(self):
         """Test wrap_hi script wraps text in <hi> tag."""
-        self.editor.selected_text = "test text"
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel("<hi>{0}</hi>".format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, "<hi>test text</hi>")
-    
+        self.assertEqual(self.run_script('wrap_hi.py', "test text"), "<hi>test text</hi>")
+
     def test_wrap_quote(self):
         """Test wrap_quote script wraps text in <quote> tag."""
-        self.editor.selected_text = "test text"
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel("<quote>{0}</quote>".format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, "<quote>test text</quote>")
-    
+        self.assertEqual(self.run_script('wrap_quote.py', "test text"), "<quote>test text</quote>")
+
     def test_wrap_trailer(self):
         """Test wrap_trailer script wraps text in <trailer> tag."""
-        self.editor.selected_text = "test text"
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel("<trailer>{0}</trailer>".format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, "<trailer>test text</trailer>")
-    
+        self.assertEqual(self.run_script('wrap_trailer.py', "test text"), "<trailer>test text</trailer>")
+
     def test_wrap_serbian_quotes(self):
         """Test wrap_serbian_quotes script wraps text in Serbian quotation marks."""
-        self.editor.selected_text = "test text"
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel('„{0}“'.format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, '„test text“')
-    
+        self.assertEqual(self.run_script('wrap_serbian_quotes.py', "test text"), '„test text“')
+
     def test_wrap_foreign_fixed(self):
         """Test wrap_foreign_fixed script wraps text with fixed language attribute."""
-        DEFAULT_LANG = "en"
-        self.editor.selected_text = "hello world"
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel('<foreign xml:lang="{0}">{1}</foreign>'.format(DEFAULT_LANG, sel))
-        
-        self.assertEqual(self.editor.replaced_text, '<foreign xml:lang="en">hello world</foreign>')
-    
+        self.assertEqual(self.run_script('wrap_foreign_fixed.py', "hello world"),
+                         '<foreign xml:lang="en">hello world</foreign>')
+
     def test_wrap_foreign_prompt(self):
         """Test wrap_foreign_prompt script wraps text with user-provided language."""
-        self.editor.selected_text = "bonjour"
         self.notepad.prompt_response = "fr"
-        
-        sel = self.editor.getSelText()
-        if sel:
-            lang = self.notepad.prompt("Unesite vrednost za xml:lang atribut:", "Jezik", "en")
-            if lang:
-                lang_clean = lang.replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-                self.editor.replaceSel('<foreign xml:lang="{0}">{1}</foreign>'.format(lang_clean, sel))
-        
-        self.assertEqual(self.editor.replaced_text, '<foreign xml:lang="fr">bonjour</foreign>')
-    
+        self.assertEqual(self.run_script('wrap_foreign_prompt.py', "bonjour"),
+                         '<foreign xml:lang="fr">bonjour</foreign>')
+
     def test_wrap_foreign_prompt_xml_escaping(self):
-        """Test wrap_foreign_prompt properly escapes XML special characters in language attribute."""
-        self.editor.selected_text = "test"
+        """Test wrap_foreign_prompt refuses a language containing a quote."""
         self.notepad.prompt_response = 'en"test'
-        
-        sel = self.editor.getSelText()
-        if sel:
-            lang = self.notepad.prompt("Unesite vrednost za xml:lang atribut:", "Jezik", "en")
-            if lang:
-                lang_clean = lang.replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-                self.editor.replaceSel('<foreign xml:lang="{0}">{1}</foreign>'.format(lang_clean, sel))
-        
-        self.assertEqual(self.editor.replaced_text, '<foreign xml:lang="en&quot;test">test</foreign>')
-    
+
+        self.assertEqual(self.run_script('wrap_foreign_prompt.py', "test"), "test")
+        self.assertEqual(self.editor.undo_actions, 0)
+        self.assertEqual(len(self.notepad.messages), 1)
+
     def test_wrap_foreign_prompt_escape_lt_gt(self):
-        """Test wrap_foreign_prompt escapes < and > characters."""
-        self.editor.selected_text = "test"
+        """Test wrap_foreign_prompt refuses a language containing < and >."""
         self.notepad.prompt_response = 'en<script>alert()</script>'
-        
-        sel = self.editor.getSelText()
-        if sel:
-            lang = self.notepad.prompt("Unesite vrednost za xml:lang atribut:", "Jezik", "en")
-            if lang:
-                lang_clean = lang.replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;')
-                self.editor.replaceSel('<foreign xml:lang="{0}">{1}</foreign>'.format(lang_clean, sel))
-        
-        expected = '<foreign xml:lang="en&lt;script&gt;alert()&lt;/script&gt;">test</foreign>'
-        self.assertEqual(self.editor.replaced_text, expected)
-    
+
+        self.assertEqual(self.run_script('wrap_foreign_prompt.py', "test"), "test")
+        self.assertEqual(len(self.notepad.messages), 1)
+
     def test_no_selection_no_replacement(self):
         """Test that scripts don't replace anything when there's no selection."""
-        self.editor.selected_text = ""
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel("<title>{0}</title>".format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, "")
-    
+        self.assertEqual(self.run_script('wrap_title.py', "test text", [(4, 4)]), "test text")
+        self.assertEqual(self.editor.insert_calls, 0)
+
     def test_wrap_title_empty_string(self):
-        """Test wrap_title with empty selection."""
-        self.editor.selected_text = ""
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel("<title>{0}</title>".format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, "")
-    
+        """Test wrap_title with an empty document."""
+        self.assertEqual(self.run_script('wrap_title.py', ""), "")
+
     def test_wrap_with_special_characters(self):
         """Test wrapping text containing special characters."""
-        self.editor.selected_text = "Test <>&\""
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel("<title>{0}</title>".format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, '<title>Test <>&"</title>')
-    
+        self.assertEqual(self.run_script('wrap_title.py', 'Test & "x" > y'),
+                         '<title>Test & "x" > y</title>')
+
     def test_wrap_with_unicode(self):
-        """Test wrapping text containing unicode characters."""
-        self.editor.selected_text = "Тест текст ćирилица"
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel("<title>{0}</title>".format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, "<title>Тест текст ćирилица</title>")
-    
+        """Test wrapping a Cyrillic word selected by its UTF-8 byte offsets."""
+        text = "Тест текст ćирилица"
+        start = len("Тест ".encode('utf-8'))
+        end = start + len("текст".encode('utf-8'))
+
+        self.assertEqual(self.run_script('wrap_title.py', text, [(start, end)]),
+                         "Тест <title>текст</title> ćирилица")
+        self.assertEqual(self.editor.selected_texts(), ["текст"])
+
     def test_wrap_serbian_quotes_with_unicode(self):
         """Test Serbian quotes with Cyrillic text."""
-        self.editor.selected_text = "Ово је српски текст"
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel('„{0}“'.format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, '„Ово је српски текст“')
-    
+        self.assertEqual(self.run_script('wrap_serbian_quotes.py', "Ово је српски текст"),
+                         '„Ово је српски текст“')
+
     def test_wrap_multiline_text(self):
         """Test wrapping multiline text."""
-        self.editor.selected_text = "Line 1\nLine 2\nLine 3"
-        sel = self.editor.getSelText()
-        if sel:
-            self.editor.replaceSel("<quote>{0}</quote>".format(sel))
-        
-        self.assertEqual(self.editor.replaced_text, "<quote>Line 1\nLine 2\nLine 3</quote>")
+        self.assertEqual(self.run_script('wrap_quote.py', "Line 1\nLine 2\nLine 3"),
+                         "<quote>Line 1\nLine 2\nLine 3</quote>")
+
+    def test_wrap_is_one_undo_step(self):
+        """Test that a wrap of several selections is undone in one step."""
+        text = "prva druga"
+        self.run_script('wrap_hi.py', text, [(0, 4), (5, 10)])
+        self.assertEqual(self.editor.text, "<hi>prva</hi> <hi>druga</hi>")
+
+        self.editor.undo()
+        self.assertEqual(self.editor.text, text)
 
 
 if __name__ == "__main__":